@@ -1,9 +1,190 @@
-"""Helper functions to extract administrative hierarchy relationships from CSV data."""
+"""Helper functions to extract administrative hierarchy relationships from CSV data.
+
+The cascading state → county → payam → boma dropdowns read a materialized
+parent → children table (admin_hierarchy) built from the admin polygons and
+the compiled dataset CSV. It is rebuilt only when a layer or the CSV
+changes, and kept in memory on the store, so a widget interaction does no
+I/O. The CSV itself is parsed once per file version (memoized in process
+and on disk) and shared by every accessor below.
+"""
+import hashlib
+import json
+import threading
 import pandas as pd
+import shapely
 from pathlib import Path
-from typing import Dict, List, Set, Optional
-from app.core.config import PROJECT_ROOT
-from app.utils.logging import log_error
+from typing import Any, Dict, List, Optional, Tuple
+from app.core.config import ADMIN_HIERARCHY_CACHE_DIR, PROJECT_ROOT
+from app.core.duckdb_store import DuckDBStore
+from app.utils.logging import log_error, log_structured
+from app.utils.metrics import inc, timed
+
+
+# (level, admin layer, CSV column, parent-name keys in the layer properties)
+HIERARCHY_LEVELS = [
+    ("state", "admin1_state", "admin1_state", ()),
+    ("county", "admin2_county", "admin2_county", ("admin1Name", "admin1", "state", "STATE", "State")),
+    ("payam", "admin3_payam", "admin3_payam", ("admin2Name", "admin2", "county", "COUNTY", "County")),
+    ("boma", "admin4_boma", "admin4_boma", ("admin3Name", "admin3", "payam", "PAYAM", "Payam")),
+]
+
+# Level → (parent → children key, all-names key) in the hierarchy dict
+LEVEL_KEYS = {
+    "state": (None, "states"),
+    "county": ("state_to_counties", "counties"),
+    "payam": ("county_to_payams", "payams"),
+    "boma": ("payam_to_bomas", "bomas"),
+}
+
+# Sessions share one store; only one of them builds the table
+_build_lock = threading.Lock()
+
+# Parsed compiled dataset per resolved path: ((mtime_ns, size), hierarchy)
+_csv_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+_csv_lock = threading.Lock()
+
+
+def _default_csv_path() -> Path:
+    """Compiled dataset shipped under resources/."""
+    return PROJECT_ROOT / "resources" / "GPS point data" / "Compiled dataset.csv"
+
+
+def _empty_csv_hierarchy() -> Dict[str, Any]:
+    """Hierarchy of a missing or unusable CSV."""
+    hierarchy: Dict[str, Any] = {}
+    for relation, all_key in LEVEL_KEYS.values():
+        hierarchy[all_key] = []
+        if relation:
+            hierarchy[relation] = {}
+    return hierarchy
+
+
+def _parse_hierarchy_csv(csv_path: Path) -> Dict[str, Any]:
+    """
+    Group the compiled dataset into parent → children lists.
+    
+    Only the four admin columns are read; each relation is one
+    drop_duplicates/groupby pass instead of a Python loop over the rows.
+    """
+    columns = [csv_column for _, _, csv_column, _ in HIERARCHY_LEVELS]
+    df = pd.read_csv(csv_path, usecols=lambda col: col in columns, dtype=str)
+    if not all(col in df.columns for col in columns):
+        return _empty_csv_hierarchy()
+    df = df[columns].apply(lambda col: col.str.strip()).replace("", None)
+    
+    hierarchy: Dict[str, Any] = {}
+    parent_column = None
+    for level, _, csv_column, _ in HIERARCHY_LEVELS:
+        relation, all_key = LEVEL_KEYS[level]
+        hierarchy[all_key] = sorted(df[csv_column].dropna().unique().tolist())
+        if relation:
+            pairs = df[[parent_column, csv_column]].dropna().drop_duplicates()
+            hierarchy[relation] = (
+                pairs.sort_values([parent_column, csv_column])
+                .groupby(parent_column)[csv_column]
+                .agg(list)
+                .to_dict()
+            )
+        parent_column = csv_column
+    return hierarchy
+
+
+def _file_sha1(path: Path) -> str:
+    """SHA-1 of a file's contents."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _disk_cache_file(csv_path: Path) -> Path:
+    """On-disk cache entry for a CSV path."""
+    key = hashlib.sha1(str(csv_path.resolve()).encode("utf-8")).hexdigest()[:16]
+    return ADMIN_HIERARCHY_CACHE_DIR / f"{key}.json"
+
+
+def _load_or_parse(csv_path: Path, stamp: Tuple[int, int]) -> Dict[str, Any]:
+    """
+    Hierarchy from the on-disk cache, or parsed and written back.
+    
+    An entry is reused when the CSV's mtime and size match, or, after a
+    touch or copy, when its SHA-1 still does.
+    """
+    cache_file = _disk_cache_file(csv_path)
+    entry = None
+    try:
+        entry = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+    if entry and [entry.get("mtime_ns"), entry.get("size")] == list(stamp):
+        inc("admin_hierarchy_csv_total", result="disk")
+        return entry["hierarchy"]
+    
+    sha1 = _file_sha1(csv_path)
+    if entry and entry.get("sha1") == sha1:
+        inc("admin_hierarchy_csv_total", result="disk")
+        hierarchy = entry["hierarchy"]
+    else:
+        inc("admin_hierarchy_csv_total", result="parse")
+        hierarchy = _parse_hierarchy_csv(csv_path)
+    
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        tmp_file.write_text(json.dumps({
+            "csv_path": str(csv_path),
+            "mtime_ns": stamp[0],
+            "size": stamp[1],
+            "sha1": sha1,
+            "hierarchy": hierarchy,
+        }), encoding="utf-8")
+        tmp_file.replace(cache_file)
+    except OSError as e:
+        log_structured("warning", "Could not write admin hierarchy cache", module="admin_hierarchy",
+                       function="_load_or_parse", cache_file=str(cache_file), error=str(e))
+    return hierarchy
+
+
+def load_csv_hierarchy(csv_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Parsed compiled dataset, shared by every accessor in the process.
+    
+    Memoized per file by mtime and size, and persisted across restarts in
+    ADMIN_HIERARCHY_CACHE_DIR. The lists are shared; treat them as
+    read-only.
+    
+    Args:
+        csv_path: Compiled dataset CSV (default: resources copy)
+    
+    Returns:
+        Dictionary with "states", "counties", "payams", "bomas" (sorted
+        names) and "state_to_counties", "county_to_payams", "payam_to_bomas"
+    """
+    csv_path = Path(csv_path or _default_csv_path())
+    try:
+        stat = csv_path.stat()
+    except OSError:
+        return _empty_csv_hierarchy()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = str(csv_path.resolve())
+    
+    with _csv_lock:
+        cached = _csv_cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            inc("admin_hierarchy_csv_total", result="memory")
+            return cached[1]
+        try:
+            hierarchy = _load_or_parse(csv_path, stamp)
+        except Exception as e:
+            log_error(e, {
+                "module": "admin_hierarchy",
+                "function": "load_csv_hierarchy",
+                "csv_path": str(csv_path)
+            })
+            return _empty_csv_hierarchy()
+        _csv_cache[key] = (stamp, hierarchy)
+        return hierarchy
 
 
 def load_hierarchy_from_csv(csv_path: Optional[Path] = None) -> Dict[str, Dict[str, List[str]]]:
@@ -17,147 +198,255 @@ def load_hierarchy_from_csv(csv_path: Optional[Path] = None) -> Dict[str, Dict[s
         "payam_to_bomas": {"Payam Name": ["Boma1", "Boma2", ...]}
     }
     """
-    if csv_path is None:
-        csv_path = PROJECT_ROOT / "resources" / "GPS point data" / "Compiled dataset.csv"
-    
-    if not csv_path.exists():
-        return {
-            "state_to_counties": {},
-            "county_to_payams": {},
-            "payam_to_bomas": {}
-        }
-    
+    hierarchy = load_csv_hierarchy(csv_path)
+    return {relation: hierarchy[relation] for relation, _ in LEVEL_KEYS.values() if relation}
+
+
+def get_all_states(csv_path: Optional[Path] = None) -> List[str]:
+    """Get all unique state names from the CSV."""
+    return load_csv_hierarchy(csv_path)["states"]
+
+
+def get_all_counties(csv_path: Optional[Path] = None) -> List[str]:
+    """Get all unique county names from the CSV."""
+    return load_csv_hierarchy(csv_path)["counties"]
+
+
+def get_all_payams(csv_path: Optional[Path] = None) -> List[str]:
+    """Get all unique payam names from the CSV."""
+    return load_csv_hierarchy(csv_path)["payams"]
+
+
+def get_all_bomas(csv_path: Optional[Path] = None) -> List[str]:
+    """Get all unique boma names from the CSV."""
+    return load_csv_hierarchy(csv_path)["bomas"]
+
+
+def _csv_edges(csv_path: Path) -> pd.DataFrame:
+    """Distinct (level, parent, child) rows of the compiled dataset."""
+    hierarchy = load_csv_hierarchy(csv_path)
+    rows = [("state", "", state) for state in hierarchy["states"]]
+    for level, (relation, _) in LEVEL_KEYS.items():
+        if relation:
+            rows.extend(
+                (level, parent, child)
+                for parent, children in hierarchy[relation].items()
+                for child in children
+            )
+    return pd.DataFrame(rows, columns=["level", "parent", "child"])
+
+
+def _parent_from_properties(properties: Optional[str], keys) -> Optional[str]:
+    """Parent name recorded in a feature's properties, if any."""
+    if not properties or not keys:
+        return None
     try:
-        # Read CSV
-        df = pd.read_csv(csv_path)
-        
-        # Check for required columns
-        required_cols = ["admin1_state", "admin2_county", "admin3_payam", "admin4_boma"]
-        if not all(col in df.columns for col in required_cols):
-            return {
-                "state_to_counties": {},
-                "county_to_payams": {},
-                "payam_to_bomas": {}
-            }
-        
-        # Build state -> counties mapping
-        state_to_counties: Dict[str, Set[str]] = {}
-        for _, row in df.iterrows():
-            state = str(row["admin1_state"]).strip() if pd.notna(row["admin1_state"]) else None
-            county = str(row["admin2_county"]).strip() if pd.notna(row["admin2_county"]) else None
-            if state and county:
-                if state not in state_to_counties:
-                    state_to_counties[state] = set()
-                state_to_counties[state].add(county)
-        
-        # Build county -> payams mapping
-        county_to_payams: Dict[str, Set[str]] = {}
-        for _, row in df.iterrows():
-            county = str(row["admin2_county"]).strip() if pd.notna(row["admin2_county"]) else None
-            payam = str(row["admin3_payam"]).strip() if pd.notna(row["admin3_payam"]) else None
-            if county and payam:
-                if county not in county_to_payams:
-                    county_to_payams[county] = set()
-                county_to_payams[county].add(payam)
+        props = json.loads(properties)
+    except (json.JSONDecodeError, TypeError):
+        return None
+    for key in keys:
+        value = props.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+
+def _polygon_edges(db_store: DuckDBStore) -> pd.DataFrame:
+    """
+    Distinct (level, parent, child) rows of the admin layers.
+    
+    The parent comes from the feature properties (STATE/COUNTY/PAYAM and
+    the other keys the pages used to check); features without one are
+    placed by a spatial join of their representative point on the parent
+    layer.
+    """
+    frames = []
+    parent_layer = None
+    for level, layer, _, keys in HIERARCHY_LEVELS:
+        rows = db_store.conn.execute(f"""
+            SELECT TRIM(name), properties, geometry_wkb FROM {layer}
+            WHERE name IS NOT NULL AND TRIM(name) <> ''
+        """).fetchall()
+        children = [row[0] for row in rows]
+        parents = [_parent_from_properties(row[1], keys) if parent_layer else "" for row in rows]
         
-        # Build payam -> bomas mapping
-        payam_to_bomas: Dict[str, Set[str]] = {}
-        for _, row in df.iterrows():
-            payam = str(row["admin3_payam"]).strip() if pd.notna(row["admin3_payam"]) else None
-            boma = str(row["admin4_boma"]).strip() if pd.notna(row["admin4_boma"]) else None
-            if payam and boma:
-                if payam not in payam_to_bomas:
-                    payam_to_bomas[payam] = set()
-                payam_to_bomas[payam].add(boma)
+        missing = [i for i, parent in enumerate(parents) if parent is None and rows[i][2] is not None]
+        if missing and parent_layer:
+            parent_rows = db_store.conn.execute(f"""
+                SELECT TRIM(name), geometry_wkb FROM {parent_layer}
+                WHERE name IS NOT NULL AND TRIM(name) <> '' AND geometry_wkb IS NOT NULL
+            """).fetchall()
+            if parent_rows:
+                tree = shapely.STRtree(shapely.from_wkb([row[1] for row in parent_rows]))
+                points = shapely.point_on_surface(shapely.from_wkb([rows[i][2] for i in missing]))
+                point_idx, parent_idx = tree.query(points, predicate="within")
+                for p, q in zip(point_idx, parent_idx):
+                    parents[missing[p]] = parent_rows[q][0]
         
-        # Convert sets to sorted lists
-        return {
-            "state_to_counties": {k: sorted(list(v)) for k, v in state_to_counties.items()},
-            "county_to_payams": {k: sorted(list(v)) for k, v in county_to_payams.items()},
-            "payam_to_bomas": {k: sorted(list(v)) for k, v in payam_to_bomas.items()}
-        }
-    
-    except Exception as e:
-        log_error(e, {
-            "module": "admin_hierarchy",
-            "function": "load_hierarchy_from_csv",
-            "csv_path": str(csv_path)
-        })
-        return {
-            "state_to_counties": {},
-            "county_to_payams": {},
-            "payam_to_bomas": {}
-        }
+        frames.append(pd.DataFrame({"level": level, "parent": parents, "child": children}).dropna())
+        parent_layer = layer
+    return pd.concat(frames, ignore_index=True).drop_duplicates()
 
 
-def get_all_states(csv_path: Optional[Path] = None) -> List[str]:
-    """Get all unique state names from the CSV."""
-    if csv_path is None:
-        csv_path = PROJECT_ROOT / "resources" / "GPS point data" / "Compiled dataset.csv"
+def source_versions(db_store: DuckDBStore, csv_path: Optional[Path] = None) -> Dict[str, str]:
+    """
+    Versions of the hierarchy sources: each admin layer and the CSV.
     
-    if not csv_path.exists():
-        return []
+    Args:
+        db_store: Store holding the admin layers
+        csv_path: Compiled dataset CSV (default: resources copy)
     
-    try:
-        df = pd.read_csv(csv_path)
-        if "admin1_state" not in df.columns:
-            return []
-        states = df["admin1_state"].dropna().unique().tolist()
-        return sorted([str(s).strip() for s in states if str(s).strip()])
-    except Exception:
-        return []
+    Returns:
+        Mapping of source name to version string
+    """
+    csv_path = csv_path or _default_csv_path()
+    versions = {layer: db_store.layer_version(layer) for _, layer, _, _ in HIERARCHY_LEVELS}
+    if csv_path.exists():
+        stat = csv_path.stat()
+        versions["csv"] = f"{stat.st_mtime_ns}:{stat.st_size}"
+    else:
+        versions["csv"] = "missing"
+    return versions
 
 
-def get_all_counties(csv_path: Optional[Path] = None) -> List[str]:
-    """Get all unique county names from the CSV."""
-    if csv_path is None:
-        csv_path = PROJECT_ROOT / "resources" / "GPS point data" / "Compiled dataset.csv"
+def _hierarchy_edges(db_store: DuckDBStore, csv_path: Path) -> pd.DataFrame:
+    """Rows of the admin_hierarchy table, from the polygons and the CSV."""
+    return pd.concat([
+        _polygon_edges(db_store).assign(source="polygons"),
+        _csv_edges(csv_path).assign(source="csv"),
+    ], ignore_index=True)
+
+
+def _hierarchy_current(db_store: DuckDBStore, csv_path: Optional[Path] = None) -> bool:
+    """Whether the hierarchy table was built from the current sources."""
+    stored = dict(db_store.conn.execute(
+        "SELECT source, version FROM admin_hierarchy_versions"
+    ).fetchall())
+    return stored == source_versions(db_store, csv_path)
+
+
+@timed("admin_hierarchy_build_seconds")
+def build_admin_hierarchy(db_store: DuckDBStore, csv_path: Optional[Path] = None) -> int:
+    """
+    (Re)build the admin_hierarchy table from the polygons and the CSV.
     
-    if not csv_path.exists():
-        return []
+    Args:
+        db_store: Store holding the admin layers
+        csv_path: Compiled dataset CSV (default: resources copy)
     
-    try:
-        df = pd.read_csv(csv_path)
-        if "admin2_county" not in df.columns:
-            return []
-        counties = df["admin2_county"].dropna().unique().tolist()
-        return sorted([str(c).strip() for c in counties if str(c).strip()])
-    except Exception:
-        return []
+    Returns:
+        Number of parent → child rows written
+    """
+    csv_path = csv_path or _default_csv_path()
+    versions = source_versions(db_store, csv_path)
+    edges = _hierarchy_edges(db_store, csv_path)
+    
+    db_store.conn.execute("DELETE FROM admin_hierarchy")
+    written = 0
+    if not edges.empty:
+        written = db_store._insert_frame("admin_hierarchy", edges, ["level", "parent", "child", "source"])
+    db_store.conn.execute("DELETE FROM admin_hierarchy_versions")
+    db_store.conn.executemany(
+        "INSERT INTO admin_hierarchy_versions (source, version) VALUES (?, ?)",
+        list(versions.items())
+    )
+    db_store._admin_hierarchy = None
+    
+    log_structured("info", "Admin hierarchy built", module="admin_hierarchy",
+                   function="build_admin_hierarchy", rows=written, csv_path=str(csv_path))
+    return written
 
 
-def get_all_payams(csv_path: Optional[Path] = None) -> List[str]:
-    """Get all unique payam names from the CSV."""
-    if csv_path is None:
-        csv_path = PROJECT_ROOT / "resources" / "GPS point data" / "Compiled dataset.csv"
+def ensure_admin_hierarchy(db_store: DuckDBStore, csv_path: Optional[Path] = None) -> bool:
+    """
+    Build the hierarchy table if it is missing or older than its sources.
     
-    if not csv_path.exists():
-        return []
+    Args:
+        db_store: Store holding the admin layers
+        csv_path: Compiled dataset CSV (default: resources copy)
     
-    try:
-        df = pd.read_csv(csv_path)
-        if "admin3_payam" not in df.columns:
-            return []
-        payams = df["admin3_payam"].dropna().unique().tolist()
-        return sorted([str(p).strip() for p in payams if str(p).strip()])
-    except Exception:
-        return []
+    Returns:
+        True if the table was (re)built (never on a read-only replica)
+    """
+    if db_store.read_only:
+        return False
+    with _build_lock:
+        if _hierarchy_current(db_store, csv_path):
+            return False
+        inc("admin_hierarchy_total", result="build")
+        build_admin_hierarchy(db_store, csv_path)
+        return True
 
 
-def get_all_bomas(csv_path: Optional[Path] = None) -> List[str]:
-    """Get all unique boma names from the CSV."""
-    if csv_path is None:
-        csv_path = PROJECT_ROOT / "resources" / "GPS point data" / "Compiled dataset.csv"
+def _group_children(edges: pd.DataFrame) -> Dict[str, List[str]]:
+    """Sorted children per parent."""
+    return {parent: sorted(set(group)) for parent, group in edges.groupby("parent")["child"]}
+
+
+def get_hierarchy(db_store: DuckDBStore, csv_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    In-memory parent → children lookups for the cascading dropdowns.
     
-    if not csv_path.exists():
-        return []
+    Loaded from the admin_hierarchy table once per store and dropped when a
+    layer is re-ingested. For each parent the compiled dataset wins (as it
+    did in the pages); polygons fill in parents the CSV does not know.
     
-    try:
-        df = pd.read_csv(csv_path)
-        if "admin4_boma" not in df.columns:
-            return []
-        bomas = df["admin4_boma"].dropna().unique().tolist()
-        return sorted([str(b).strip() for b in bomas if str(b).strip()])
-    except Exception:
-        return []
+    Args:
+        db_store: Store holding the admin layers
+        csv_path: Compiled dataset CSV (default: resources copy)
+    
+    Returns:
+        Dictionary with "states", "counties", "payams", "bomas" (all names,
+        sorted) and "state_to_counties", "county_to_payams", "payam_to_bomas"
+    """
+    hierarchy = db_store._admin_hierarchy
+    if hierarchy is not None:
+        inc("admin_hierarchy_total", result="hit")
+        return hierarchy
+    
+    inc("admin_hierarchy_total", result="load")
+    if db_store.read_only and not _hierarchy_current(db_store, csv_path):
+        # A replica cannot rebuild the table; derive the rows from its snapshot
+        edges = _hierarchy_edges(db_store, csv_path or _default_csv_path())
+    else:
+        ensure_admin_hierarchy(db_store, csv_path)
+        edges = db_store.conn.execute(
+            "SELECT level, parent, child, source FROM admin_hierarchy"
+        ).df()
+    
+    hierarchy = {}
+    for level, (relation, all_key) in LEVEL_KEYS.items():
+        rows = edges[edges["level"] == level]
+        csv_rows = rows[rows["source"] == "csv"]
+        polygon_rows = rows[(rows["source"] == "polygons") & ~rows["parent"].isin(set(csv_rows["parent"]))]
+        hierarchy[all_key] = sorted(set(csv_rows["child"]) or set(rows["child"]))
+        if relation:
+            hierarchy[relation] = _group_children(pd.concat([csv_rows, polygon_rows]))
+    
+    db_store._admin_hierarchy = hierarchy
+    return hierarchy
+
 
+def get_children(hierarchy: Dict[str, Any], level: str, parent: Optional[str]) -> List[str]:
+    """
+    Names at a level under a parent, for one step of the cascade.
+    
+    Args:
+        hierarchy: Result of get_hierarchy
+        level: "state", "county", "payam" or "boma"
+        parent: Selected parent name (ignored for states)
+    
+    Returns:
+        Sorted child names; every name at the level if the parent is unknown
+    """
+    relation, all_key = LEVEL_KEYS[level]
+    if relation is None:
+        return hierarchy[all_key]
+    children = hierarchy[relation]
+    if parent in children:
+        return children[parent]
+    folded = (parent or "").strip().casefold()
+    for name, names in children.items():
+        if name.casefold() == folded:
+            return names
+    return hierarchy[all_key]
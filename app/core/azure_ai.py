@@ -11,6 +11,7 @@ from app.core.config import (
 )
 from app.core.models import ExtractedLocation
 from app.utils.logging import log_error, log_structured
+from app.utils.metrics import observe
 
 
 class AzureAIParser:
@@ -65,15 +66,16 @@ Return a JSON object with the following structure:
 Extract all plausible place names from the text. Return empty arrays if no candidates found for a level."""
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Extract place names from: {text}"}
-                ],
-                temperature=0.0,
-                response_format={"type": "json_object"}
-            )
+            with observe("llm_request_seconds", provider="azure", operation="extract_candidates"):
+                response = self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": f"Extract place names from: {text}"}
+                    ],
+                    temperature=0.0,
+                    response_format={"type": "json_object"}
+                )
             
             content = response.choices[0].message.content
             result = json.loads(content)
@@ -164,15 +166,16 @@ Extract locations in formats like:
 Only extract actual location mentions, not general references. Return empty array if no locations found."""
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Extract all location mentions from this document:\n\n{document_text}"}
-                ],
-                temperature=0.0,
-                response_format={"type": "json_object"}
-            )
+            with observe("llm_request_seconds", provider="azure", operation="extract_location_strings"):
+                response = self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": f"Extract all location mentions from this document:\n\n{document_text}"}
+                    ],
+                    temperature=0.0,
+                    response_format={"type": "json_object"}
+                )
             
             content = response.choices[0].message.content
             result = json.loads(content)
@@ -0,0 +1,220 @@
+"""Multi-resolution admin boundary cache for the map views.
+
+The Geocoder and Location Extractor maps used to decode every polygon of
+a layer from hex WKB on each rerun and send full-resolution GeoJSON to
+pydeck, although a boma outline at zoom 10 needs a fraction of its
+vertices. Each layer is simplified once per version into a few levels of
+detail (one per zoom band) and the GeoJSON is stored in DuckDB
+(boundary_tiles); maps fetch the level for their zoom.
+
+Simplification is coverage-aware (shapely.coverage_simplify), so
+neighbouring units keep a shared edge instead of opening slivers; layers
+that are not a valid coverage fall back to per-polygon topology-preserving
+simplification.
+"""
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import shapely
+from app.core.duckdb_store import DuckDBStore
+from app.core.security import sanitize_layer_name
+from app.utils.logging import log_structured
+from app.utils.metrics import inc, timed
+
+
+# (level, lowest zoom it is used from, simplification tolerance in degrees)
+ZOOM_LEVELS: List[Tuple[str, float, float]] = [
+    ("low", 0, 0.02),
+    ("medium", 7, 0.005),
+    ("high", 10, 0.001),
+    ("full", 13, 0.0),
+]
+
+# Coordinate grid of stored geometries (~1 m), trims GeoJSON digits
+GRID_SIZE = 1e-5
+
+# Sessions share one store; only one of them builds a layer's tiles
+_build_lock = threading.Lock()
+
+
+def level_for_zoom(zoom: float) -> str:
+    """
+    Level of detail for a map zoom.
+    
+    Args:
+        zoom: Deck/Web Mercator zoom
+    
+    Returns:
+        Level name from ZOOM_LEVELS
+    """
+    level = ZOOM_LEVELS[0][0]
+    for name, min_zoom, _ in ZOOM_LEVELS:
+        if zoom >= min_zoom:
+            level = name
+    return level
+
+
+def _simplify(geometries: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplify polygons, keeping shared edges when they form a coverage."""
+    if tolerance <= 0:
+        return geometries
+    polygonal = np.isin(shapely.get_type_id(geometries), [3, 6])
+    simplified = geometries.copy()
+    if polygonal.any():
+        polygons = geometries[polygonal]
+        # Coverage functions need shapely 2.1 (GEOS 3.12); older installs use the plain pass
+        if hasattr(shapely, "coverage_simplify") and shapely.coverage_is_valid(polygons):
+            simplified[polygonal] = shapely.coverage_simplify(polygons, tolerance)
+        else:
+            simplified[polygonal] = shapely.simplify(polygons, tolerance, preserve_topology=True)
+    # Points and lines only get the topology-preserving pass
+    others = ~polygonal & ~shapely.is_missing(geometries)
+    if others.any():
+        simplified[others] = shapely.simplify(geometries[others], tolerance, preserve_topology=True)
+    return simplified
+
+
+@timed("boundary_tiles_build_seconds")
+def build_boundary_tiles(db_store: DuckDBStore, layer_name: str) -> int:
+    """
+    (Re)build every level of detail for a layer.
+    
+    Args:
+        db_store: Store holding the layer
+        layer_name: Admin layer (validated against the whitelist)
+    
+    Returns:
+        Number of tiles written across all levels
+    
+    Raises:
+        ValueError: If layer_name is not an allowed layer
+    """
+    layer = sanitize_layer_name(layer_name)
+    if not layer:
+        raise ValueError(f"Invalid layer name: {layer_name}")
+    
+    version = db_store.layer_version(layer)
+    rows = db_store.conn.execute(
+        f"SELECT feature_id, name, geometry_wkb FROM {layer} WHERE geometry_wkb IS NOT NULL"
+    ).fetchall()
+    feature_ids = [row[0] for row in rows]
+    names = [row[1] for row in rows]
+    geometries = shapely.from_wkb([row[2] for row in rows]) if rows else np.array([], dtype=object)
+    bounds = shapely.bounds(geometries) if rows else np.empty((0, 4))
+    
+    frames = []
+    for level, _, tolerance in ZOOM_LEVELS:
+        simplified = shapely.set_precision(_simplify(geometries, tolerance), GRID_SIZE)
+        frames.append(pd.DataFrame({
+            "layer": layer,
+            "level": level,
+            "feature_id": feature_ids,
+            "name": names,
+            "min_lon": bounds[:, 0],
+            "min_lat": bounds[:, 1],
+            "max_lon": bounds[:, 2],
+            "max_lat": bounds[:, 3],
+            "geojson": shapely.to_geojson(simplified),
+        }))
+    
+    db_store.conn.execute("DELETE FROM boundary_tiles WHERE layer = ?", [layer])
+    written = 0
+    if rows:
+        written = db_store._insert_frame(
+            "boundary_tiles",
+            pd.concat(frames, ignore_index=True),
+            ["layer", "level", "feature_id", "name", "min_lon", "min_lat", "max_lon", "max_lat", "geojson"]
+        )
+    db_store.conn.execute("""
+        INSERT INTO boundary_tile_versions (layer, version, built_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (layer) DO UPDATE SET version = EXCLUDED.version, built_at = EXCLUDED.built_at
+    """, [layer, version])
+    
+    log_structured("info", "Boundary tiles built", module="boundary_tiles",
+                   function="build_boundary_tiles", layer=layer,
+                   features=len(rows), tiles=written, version=version)
+    return written
+
+
+def ensure_boundary_tiles(db_store: DuckDBStore, layer_name: str) -> bool:
+    """
+    Build a layer's tiles if they are missing or older than the layer.
+    
+    Args:
+        db_store: Store holding the layer
+        layer_name: Admin layer
+    
+    Returns:
+        True if the tiles were (re)built; a read-only replica serves the
+        tiles its snapshot has and never builds
+    """
+    layer = sanitize_layer_name(layer_name)
+    if not layer:
+        raise ValueError(f"Invalid layer name: {layer_name}")
+    if db_store.read_only:
+        inc("boundary_tiles_total", result="replica")
+        return False
+    with _build_lock:
+        stored = db_store.conn.execute(
+            "SELECT version FROM boundary_tile_versions WHERE layer = ?", [layer]
+        ).fetchone()
+        if stored is not None and stored[0] == db_store.layer_version(layer):
+            inc("boundary_tiles_total", result="hit")
+            return False
+        inc("boundary_tiles_total", result="build")
+        build_boundary_tiles(db_store, layer)
+        return True
+
+
+def get_boundary_geojson(
+    db_store: DuckDBStore,
+    layer_name: str,
+    zoom: float,
+    names: Optional[Iterable[str]] = None,
+    bbox: Optional[Tuple[float, float, float, float]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Boundaries of a layer at the level of detail for a zoom.
+    
+    Args:
+        db_store: Store holding the layer
+        layer_name: Admin layer
+        zoom: Map zoom
+        names: Only features with these names
+        bbox: Only features intersecting (min_lon, min_lat, max_lon, max_lat)
+    
+    Returns:
+        GeoJSON FeatureCollection with name and feature_id properties,
+        or None if nothing matches
+    """
+    ensure_boundary_tiles(db_store, layer_name)
+    layer = sanitize_layer_name(layer_name)
+    
+    clauses, params = ["layer = ?", "level = ?"], [layer, level_for_zoom(zoom)]
+    if names is not None:
+        names = [name for name in names if name]
+        if not names:
+            return None
+        clauses.append(f"name IN ({', '.join('?' for _ in names)})")
+        params.extend(names)
+    if bbox is not None:
+        clauses.append("max_lon >= ? AND min_lon <= ? AND max_lat >= ? AND min_lat <= ?")
+        params.extend([bbox[0], bbox[2], bbox[1], bbox[3]])
+    
+    rows = db_store.conn.execute(
+        f"SELECT feature_id, name, geojson FROM boundary_tiles WHERE {' AND '.join(clauses)}",
+        params
+    ).fetchall()
+    if not rows:
+        return None
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "properties": {"name": name, "feature_id": feature_id}, "geometry": json.loads(geojson)}
+            for feature_id, name, geojson in rows
+            if geojson
+        ],
+    }
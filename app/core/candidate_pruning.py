@@ -0,0 +1,125 @@
+"""Candidate pruning before fuzzy search.
+
+extract_candidates emits every 1- to 5-word n-gram of the input, and each
+one is fuzzy-scored against the whole gazetteer. Most n-grams of free text
+cannot reach the match threshold, so CandidatePruner drops them with cheap
+checks against the gazetteer's tokens before any scorer runs.
+"""
+import math
+from bisect import bisect_left
+from typing import Iterable, Set
+
+from app.core.config import FUZZY_THRESHOLD
+from app.core.normalization import STOP_WORDS
+
+
+# Words naming an admin level or settlement type rather than a place
+ADMIN_KEYWORDS = {
+    "state", "states", "county", "counties", "payam", "payams", "boma", "bomas",
+    "town", "village", "villages", "settlement", "settlements", "city", "cities",
+    "area", "administrative",
+}
+
+
+def _trigrams(word: str) -> Set[str]:
+    """Character trigrams of a word (the word itself if shorter)."""
+    if len(word) < 3:
+        return {word}
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class CandidatePruner:
+    """
+    Drops candidate n-grams that cannot plausibly match any gazetteer name.
+    
+    A candidate is kept when:
+    - it does not start or end with a stopword and has at least one word
+      that is not a stopword or admin keyword;
+    - some gazetteer name has a length within the bound that an Indel ratio
+      of `threshold` allows (shorter n-grams of the same text cover
+      partial/substring matches);
+    - every remaining word is an exact gazetteer token, or enough of its
+      trigrams occur in gazetteer tokens. Misspellings anywhere in a word,
+      including its first letter (Kwajok, Gwajok for Kuajok), only cost
+      the trigrams around the typo.
+    """
+    
+    def __init__(self, names: Iterable[str], threshold: float = FUZZY_THRESHOLD):
+        """
+        Build the token set, trigram set and length table.
+        
+        Args:
+            names: Normalized gazetteer names and aliases
+            threshold: Minimum fuzzy score (0-1) a candidate must be able to reach
+        """
+        self.tokens: Set[str] = set()
+        self.trigrams: Set[str] = set()
+        lengths = set()
+        
+        for name in names:
+            if not name:
+                continue
+            lengths.add(len(name))
+            for token in name.split():
+                if token in self.tokens:
+                    continue
+                self.tokens.add(token)
+                self.trigrams.update(_trigrams(token))
+        
+        self.lengths = sorted(lengths)
+        # ratio(a, b) <= 2 * min(len) / (len(a) + len(b)), so a score of
+        # `threshold` needs len(b) / len(a) within [r, 1 / r]
+        self.length_ratio = threshold / (2 - threshold)
+        # A word scoring `threshold` against a token keeps about that share
+        # of its trigrams; one typo costs up to three, so allow 2t - 1
+        self.min_trigram_coverage = max(0.0, 2 * threshold - 1)
+    
+    def __len__(self) -> int:
+        return len(self.tokens)
+    
+    def _length_ok(self, length: int) -> bool:
+        low = math.ceil(length * self.length_ratio)
+        high = math.floor(length / self.length_ratio)
+        idx = bisect_left(self.lengths, low)
+        return idx < len(self.lengths) and self.lengths[idx] <= high
+    
+    def _word_ok(self, word: str) -> bool:
+        if word in self.tokens:
+            return True
+        grams = _trigrams(word)
+        return len(grams & self.trigrams) / len(grams) >= self.min_trigram_coverage
+    
+    def is_plausible(self, candidate: str) -> bool:
+        """
+        Check whether a normalized candidate can reach the threshold.
+        
+        Args:
+            candidate: Normalized candidate string
+        
+        Returns:
+            True if the candidate should be fuzzy-scored
+        """
+        words = candidate.split()
+        if not words or words[0] in STOP_WORDS or words[-1] in STOP_WORDS:
+            return False
+        
+        content = [w for w in words if w not in STOP_WORDS and w not in ADMIN_KEYWORDS]
+        if not content:
+            return False
+        
+        if not self._length_ok(len(candidate)):
+            return False
+        
+        return all(self._word_ok(word) for word in content)
+    
+    def prune(self, candidates: Iterable[str]) -> Set[str]:
+        """
+        Keep only the candidates worth fuzzy-scoring.
+        
+        Args:
+            candidates: Candidate strings from extract_candidates
+        
+        Returns:
+            Set of plausible candidates
+        """
+        return {candidate for candidate in candidates if self.is_plausible(candidate)}
@@ -1,10 +1,97 @@
 """Centroid computation utilities for polygons."""
-import geopandas as gpd
-from shapely.geometry import Point
+from functools import lru_cache
+import numpy as np
+import shapely
+from shapely.geometry import box
 from pyproj import Transformer
 from typing import Tuple, Optional
 from app.core.config import CENTROID_CRS
 
+# shapely type ids
+_POINT = 0
+_POLYGONS = (3, 6)  # Polygon, MultiPolygon
+
+
+@lru_cache(maxsize=32)
+def get_transformer(source_crs: str, target_crs: str) -> Transformer:
+    """
+    Cached transformer between two CRSs (x/y in lon/lat order).
+    
+    Args:
+        source_crs: Source CRS
+        target_crs: Target CRS
+    
+    Returns:
+        pyproj Transformer
+    """
+    return Transformer.from_crs(source_crs, target_crs, always_xy=True)
+
+
+def _resolve_target_crs(geometries: np.ndarray, target_crs: Optional[str]) -> str:
+    """Target CRS for a batch; "auto" picks one UTM zone for the whole batch."""
+    target_crs = target_crs or CENTROID_CRS
+    if not target_crs.lower().startswith("auto"):
+        return target_crs
+    return auto_select_utm(box(*shapely.total_bounds(geometries)))
+
+
+def compute_centroids(
+    geometries,
+    source_crs: str = "EPSG:4326",
+    target_crs: Optional[str] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute centroids of many geometries at once.
+    
+    Polygons are projected in one batch, their centroids computed with
+    shapely's vectorized functions and transformed back together. Points
+    keep their coordinates and other geometry types use their centroid in
+    the source CRS, as in compute_centroid.
+    
+    Args:
+        geometries: GeoSeries or array-like of shapely geometries
+        source_crs: Source CRS (default EPSG:4326)
+        target_crs: Projected CRS for polygon centroids (default from config;
+            "auto" selects one UTM zone for the whole batch)
+    
+    Returns:
+        Tuple of (lon, lat) arrays; missing or empty geometries get NaN
+    """
+    geoms = np.asarray(geometries, dtype=object)
+    lon = np.full(len(geoms), np.nan)
+    lat = np.full(len(geoms), np.nan)
+    if not len(geoms):
+        return lon, lat
+    
+    valid = ~shapely.is_missing(geoms)
+    valid[valid] = ~shapely.is_empty(geoms[valid])
+    type_ids = np.where(valid, shapely.get_type_id(geoms), -1)
+    
+    is_point = type_ids == _POINT
+    lon[is_point] = shapely.get_x(geoms[is_point])
+    lat[is_point] = shapely.get_y(geoms[is_point])
+    
+    is_polygon = np.isin(type_ids, _POLYGONS)
+    if is_polygon.any():
+        polygons = geoms[is_polygon]
+        target_crs = _resolve_target_crs(polygons, target_crs)
+        to_projected = get_transformer(source_crs, target_crs)
+        projected = shapely.transform(
+            polygons, lambda coords: np.column_stack(to_projected.transform(coords[:, 0], coords[:, 1]))
+        )
+        centroids = shapely.centroid(projected)
+        lon[is_polygon], lat[is_polygon] = get_transformer(target_crs, source_crs).transform(
+            shapely.get_x(centroids), shapely.get_y(centroids)
+        )
+    
+    is_other = valid & ~is_point & ~is_polygon
+    if is_other.any():
+        centroids = shapely.centroid(geoms[is_other])
+        lon[is_other] = shapely.get_x(centroids)
+        lat[is_other] = shapely.get_y(centroids)
+    
+    return lon, lat
+
 
 def compute_centroid(
     geometry,
@@ -25,36 +112,8 @@ def compute_centroid(
     if geometry is None or geometry.is_empty:
         raise ValueError("Geometry is None or empty")
     
-    if target_crs is None:
-        target_crs = CENTROID_CRS
-    
-    # If already a point, return its coordinates
-    if geometry.geom_type == "Point":
-        return (geometry.x, geometry.y)
-    
-    # For polygons, compute centroid in projected CRS
-    if geometry.geom_type in ["Polygon", "MultiPolygon"]:
-        # Create transformer
-        transformer_to_proj = Transformer.from_crs(
-            source_crs, target_crs, always_xy=True
-        )
-        transformer_to_wgs = Transformer.from_crs(
-            target_crs, source_crs, always_xy=True
-        )
-        
-        # Transform geometry to projected CRS
-        geom_proj = gpd.GeoSeries([geometry], crs=source_crs).to_crs(target_crs).iloc[0]
-        
-        # Compute centroid
-        centroid_proj = geom_proj.centroid
-        
-        # Transform back to WGS84
-        lon, lat = transformer_to_wgs.transform(centroid_proj.x, centroid_proj.y)
-        
-        return (lon, lat)
-    
-    # For other geometry types, use default centroid
-    return (geometry.centroid.x, geometry.centroid.y)
+    lon, lat = compute_centroids([geometry], source_crs, target_crs)
+    return (float(lon[0]), float(lat[0]))
 
 
 def auto_select_utm(geometry) -> str:
@@ -82,4 +141,3 @@ def auto_select_utm(geometry) -> str:
     epsg_code = 32700 + zone
     
     return f"EPSG:{epsg_code}"
-
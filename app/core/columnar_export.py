@@ -0,0 +1,527 @@
+"""Columnar export of geocode results and HRD incidents.
+
+Batch outputs used to be collected into one pandas frame and written to
+Excel with openpyxl, holding every row and the whole workbook in memory.
+ColumnarWriter streams records to Parquet (GeoParquet when the records
+carry coordinates) or Arrow IPC one row group at a time, so memory is
+bounded by the row group size. An Excel view is derived from the file
+only when asked for (export_excel), again one row group at a time.
+GeocodeResultBatch keeps results in memory in the same columnar form.
+
+The files can be queried in place, e.g. with DuckDB:
+SELECT state, COUNT(*) FROM 'results.parquet' GROUP BY state.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import shapely
+from app.core.config import EXPORT_ROW_GROUP_SIZE
+from app.core.models import GeocodeResult
+from app.utils.logging import log_structured
+from app.utils.metrics import inc, timed
+
+
+# Suffixes written as Arrow IPC; anything else is Parquet
+ARROW_SUFFIXES = {".arrow", ".feather", ".ipc"}
+
+GEOMETRY_COLUMN = "geometry"
+
+GEOCODE_RESULT_FIELDS: List[Tuple[str, pa.DataType]] = [
+    ("input_text", pa.string()),
+    ("normalized_text", pa.string()),
+    ("resolved_layer", pa.string()),
+    ("feature_id", pa.string()),
+    ("matched_name", pa.string()),
+    ("score", pa.float64()),
+    ("lon", pa.float64()),
+    ("lat", pa.float64()),
+    ("state", pa.string()),
+    ("county", pa.string()),
+    ("payam", pa.string()),
+    ("boma", pa.string()),
+    ("village", pa.string()),
+    ("resolution_too_coarse", pa.bool_()),
+    ("alternatives", pa.string()),  # JSON array
+]
+
+HRD_INCIDENT_FIELDS: List[Tuple[str, pa.DataType]] = [
+    ("date_of_incident", pa.timestamp("us")),
+    ("date_of_interview", pa.timestamp("us")),
+    ("reporting_field_office", pa.string()),
+    ("incident_state", pa.string()),
+    ("location_of_incident", pa.string()),
+    ("source_information", pa.string()),
+    ("types_of_violations", pa.string()),
+    ("generalized_violations", pa.string()),
+    ("alleged_perpetrators", pa.string()),
+    ("involved_in_hostilities", pa.string()),
+    ("origin_of_perpetrators", pa.string()),
+    ("ethnicity_tribe_victim", pa.string()),
+    ("total_victims", pa.int64()),
+    ("male_count", pa.int64()),
+    ("female_count", pa.int64()),
+    ("minor_male", pa.int64()),
+    ("minor_female", pa.int64()),
+    ("description", pa.string()),
+    ("corroborated_verified", pa.string()),
+    ("payam", pa.string()),
+    ("county", pa.string()),
+    ("lat", pa.float64()),
+    ("lon", pa.float64()),
+]
+
+
+def _geo_metadata() -> bytes:
+    """GeoParquet 1.0 file metadata for a WKB point column in WGS84 (CRS84)."""
+    return json.dumps({
+        "version": "1.0.0",
+        "primary_column": GEOMETRY_COLUMN,
+        "columns": {
+            GEOMETRY_COLUMN: {"encoding": "WKB", "geometry_types": ["Point"]},
+        },
+    }).encode("utf-8")
+
+
+def _point_wkb(lon: pa.Array, lat: pa.Array) -> pa.Array:
+    """WKB points for a row group; null where either coordinate is missing."""
+    lon = lon.to_numpy(zero_copy_only=False).astype(float)
+    lat = lat.to_numpy(zero_copy_only=False).astype(float)
+    valid = ~(np.isnan(lon) | np.isnan(lat))
+    wkb = np.full(len(lon), None, dtype=object)
+    if valid.any():
+        wkb[valid] = shapely.to_wkb(shapely.points(lon[valid], lat[valid]))
+    return pa.array(wkb, type=pa.binary())
+
+
+def _to_array(values: Sequence[Any], dtype: pa.DataType) -> pa.Array:
+    """Arrow array of a column; stray non-string values (LLM output) are stringified."""
+    try:
+        return pa.array(values, type=dtype)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        if not pa.types.is_string(dtype):
+            raise
+        return pa.array([v if v is None or isinstance(v, str) else str(v) for v in values], type=dtype)
+
+
+def _rows_to_batch(rows: Sequence[Sequence[Any]], fields: Sequence[Tuple[str, pa.DataType]]) -> pa.RecordBatch:
+    """Record batch from value tuples in field order."""
+    columns = zip(*rows)
+    arrays = [_to_array(values, dtype) for values, (_, dtype) in zip(columns, fields)]
+    return pa.RecordBatch.from_arrays(arrays, schema=pa.schema(fields))
+
+
+class ColumnarWriter:
+    """Stream records to Parquet/GeoParquet or Arrow IPC, one row group at a time."""
+    
+    def __init__(
+        self,
+        path: Union[str, Path],
+        fields: Sequence[Tuple[str, pa.DataType]],
+        extract: Callable[[Any], Sequence[Any]],
+        point_columns: Optional[Tuple[str, str]] = None,
+        row_group_size: int = EXPORT_ROW_GROUP_SIZE
+    ):
+        """
+        Initialize the writer; the file is created on the first flush.
+        
+        Args:
+            path: Output file (.arrow/.feather/.ipc for Arrow IPC, else Parquet)
+            fields: (column, Arrow type) pairs
+            extract: Maps a record to its values in field order
+            point_columns: (lon, lat) columns to also store as a WKB point
+                geometry column, with GeoParquet metadata for Parquet output
+            row_group_size: Records buffered before a row group is written
+        """
+        self.path = Path(path)
+        self.format = "arrow" if self.path.suffix.lower() in ARROW_SUFFIXES else "parquet"
+        self.fields = list(fields)
+        self.extract = extract
+        self.row_group_size = max(1, row_group_size)
+        self.rows = 0
+        
+        names = [name for name, _ in self.fields]
+        self._point_idx = tuple(names.index(col) for col in point_columns) if point_columns else None
+        schema = pa.schema([pa.field(name, dtype) for name, dtype in self.fields])
+        if self._point_idx:
+            schema = schema.append(pa.field(GEOMETRY_COLUMN, pa.binary()))
+            if self.format == "parquet":
+                schema = schema.with_metadata({b"geo": _geo_metadata()})
+        self.schema = schema
+        
+        # Written under a temporary name and renamed on close
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._buffer: List[Sequence[Any]] = []
+        self._writer = None
+    
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+    
+    def write(self, record: Any):
+        """
+        Add one record, flushing a row group when the buffer is full.
+        
+        Args:
+            record: Object accepted by the extract function
+        """
+        self._buffer.append(self.extract(record))
+        if len(self._buffer) >= self.row_group_size:
+            self._flush()
+    
+    def write_all(self, records: Iterable[Any]) -> int:
+        """
+        Add every record of an iterable (consumed lazily).
+        
+        Args:
+            records: Records to write
+        
+        Returns:
+            Total rows written so far
+        """
+        for record in records:
+            self.write(record)
+        return self.rows + len(self._buffer)
+    
+    def _open(self):
+        """Create the temporary output file."""
+        if self.format == "arrow":
+            self._writer = pa.ipc.new_file(str(self._tmp_path), self.schema)
+        else:
+            self._writer = pq.ParquetWriter(str(self._tmp_path), self.schema, compression="zstd")
+    
+    def write_batch(self, batch: pa.RecordBatch):
+        """
+        Write a record batch with the writer's fields as its own row group.
+        
+        Buffered records are flushed first, so row order is kept.
+        
+        Args:
+            batch: Batch holding (at least) the writer's field columns
+        """
+        self._flush()
+        self._write(batch)
+    
+    def _flush(self):
+        """Write the buffered records as one row group."""
+        if not self._buffer:
+            return
+        batch = _rows_to_batch(self._buffer, self.fields)
+        self._buffer = []
+        self._write(batch)
+    
+    def _write(self, batch: pa.RecordBatch):
+        """Add the geometry column if configured and write the batch."""
+        arrays = [batch.column(name) for name, _ in self.fields]
+        if self._point_idx:
+            arrays.append(_point_wkb(arrays[self._point_idx[0]], arrays[self._point_idx[1]]))
+        
+        if self._writer is None:
+            self._open()
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.rows += batch.num_rows
+        inc("columnar_export_row_groups_total", format=self.format)
+    
+    def close(self) -> Path:
+        """
+        Flush the last row group and move the file into place.
+        
+        Returns:
+            Path of the written file
+        """
+        self._flush()
+        if self._writer is None:
+            self._open()  # empty file that still carries the schema
+        self._writer.close()
+        os.replace(self._tmp_path, self.path)
+        inc("columnar_export_rows_total", self.rows, format=self.format)
+        log_structured("info", "Columnar export written", module="columnar_export",
+                       function="close", path=str(self.path), format=self.format, rows=self.rows)
+        return self.path
+    
+    def abort(self):
+        """Discard a partially written file."""
+        if self._writer is not None:
+            self._writer.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+
+def _geocode_result_row(result: GeocodeResult) -> Tuple[Any, ...]:
+    """Values of a GeocodeResult in GEOCODE_RESULT_FIELDS order."""
+    return (
+        result.input_text,
+        result.normalized_text,
+        result.resolved_layer,
+        result.feature_id,
+        result.matched_name,
+        result.score,
+        result.lon,
+        result.lat,
+        result.state,
+        result.county,
+        result.payam,
+        result.boma,
+        result.village,
+        result.resolution_too_coarse,
+        json.dumps(result.alternatives, default=str) if result.alternatives else None,
+    )
+
+
+def _hrd_incident_row(incident: Any) -> Tuple[Any, ...]:
+    """Values of an HRDIncident in HRD_INCIDENT_FIELDS order."""
+    return tuple(getattr(incident, name) for name, _ in HRD_INCIDENT_FIELDS)
+
+
+class GeocodeResultBatch:
+    """
+    Columnar container for many geocode results.
+    
+    Results are buffered as value tuples and frozen into Arrow record
+    batches every chunk_size rows, so a large run holds compact Arrow
+    buffers instead of one GeocodeResult (and one to_dict) per row.
+    DataFrames wrap the Arrow data without copying it.
+    """
+    
+    def __init__(self, chunk_size: int = EXPORT_ROW_GROUP_SIZE):
+        """
+        Initialize an empty batch.
+        
+        Args:
+            chunk_size: Results buffered before they are frozen into Arrow
+        """
+        self.chunk_size = max(1, chunk_size)
+        self._batches: List[pa.RecordBatch] = []
+        self._buffer: List[Tuple[Any, ...]] = []
+    
+    @classmethod
+    def from_results(cls, results: Iterable[GeocodeResult], chunk_size: int = EXPORT_ROW_GROUP_SIZE) -> "GeocodeResultBatch":
+        """
+        Batch of an iterable of results (consumed lazily).
+        
+        Args:
+            results: Geocode results
+            chunk_size: Results per Arrow record batch
+        
+        Returns:
+            New batch
+        """
+        batch = cls(chunk_size)
+        batch.extend(results)
+        return batch
+    
+    def __len__(self) -> int:
+        return sum(batch.num_rows for batch in self._batches) + len(self._buffer)
+    
+    def append(self, result: GeocodeResult):
+        """
+        Add one result.
+        
+        Args:
+            result: Geocode result (not kept; its values are copied)
+        """
+        self._buffer.append(_geocode_result_row(result))
+        if len(self._buffer) >= self.chunk_size:
+            self._freeze()
+    
+    def extend(self, results: Iterable[GeocodeResult]):
+        """
+        Add results from an iterable.
+        
+        Args:
+            results: Geocode results
+        """
+        for result in results:
+            self.append(result)
+    
+    def _freeze(self):
+        """Move the buffered rows into an Arrow record batch."""
+        if self._buffer:
+            self._batches.append(_rows_to_batch(self._buffer, GEOCODE_RESULT_FIELDS))
+            self._buffer = []
+    
+    def to_arrow(self) -> pa.Table:
+        """
+        Arrow table of all results (alternatives as JSON strings).
+        
+        Returns:
+            Table with GEOCODE_RESULT_FIELDS columns
+        """
+        self._freeze()
+        return pa.Table.from_batches(self._batches, schema=pa.schema(GEOCODE_RESULT_FIELDS))
+    
+    def to_pandas(self, arrow_dtypes: bool = True) -> pd.DataFrame:
+        """
+        DataFrame of all results.
+        
+        Args:
+            arrow_dtypes: Keep Arrow-backed columns (pd.ArrowDtype, no copy);
+                False converts to NumPy dtypes (NaN/None for missing values)
+        
+        Returns:
+            One row per result, GEOCODE_RESULT_FIELDS columns
+        """
+        table = self.to_arrow()
+        if arrow_dtypes:
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        return table.to_pandas()
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Results as to_dict-style dictionaries, built column-wise.
+        
+        Returns:
+            List of dicts with the keys of GeocodeResult.to_dict
+        """
+        records = self.to_arrow().to_pylist()
+        for record in records:
+            record["alternatives"] = json.loads(record["alternatives"]) if record["alternatives"] else []
+        return records
+    
+    def __iter__(self) -> Iterator[GeocodeResult]:
+        """Rebuild GeocodeResult objects, one record batch at a time."""
+        self._freeze()
+        for batch in self._batches:
+            for record in batch.to_pylist():
+                record["alternatives"] = json.loads(record["alternatives"]) if record["alternatives"] else []
+                yield GeocodeResult(**record)
+    
+    def write(self, path: Union[str, Path]) -> int:
+        """
+        Write the results to GeoParquet (or Arrow IPC by suffix), one row group per record batch.
+        
+        Args:
+            path: Output file
+        
+        Returns:
+            Number of rows written
+        """
+        self._freeze()
+        with ColumnarWriter(path, GEOCODE_RESULT_FIELDS, _geocode_result_row,
+                            point_columns=("lon", "lat"), row_group_size=self.chunk_size) as writer:
+            for batch in self._batches:
+                writer.write_batch(batch)
+        return writer.rows
+
+
+@timed("columnar_export_seconds", kind="geocode_results")
+def write_geocode_results(
+    results: Union[Iterable[GeocodeResult], GeocodeResultBatch],
+    path: Union[str, Path],
+    row_group_size: int = EXPORT_ROW_GROUP_SIZE
+) -> int:
+    """
+    Write geocode results to GeoParquet (or Arrow IPC by suffix).
+    
+    Args:
+        results: Results to write, consumed lazily, or a GeocodeResultBatch
+            (written as its record batches, without rebuilding objects)
+        path: Output file
+        row_group_size: Results per row group
+    
+    Returns:
+        Number of rows written
+    """
+    if isinstance(results, GeocodeResultBatch):
+        return results.write(path)
+    with ColumnarWriter(path, GEOCODE_RESULT_FIELDS, _geocode_result_row,
+                        point_columns=("lon", "lat"), row_group_size=row_group_size) as writer:
+        writer.write_all(results)
+    return writer.rows
+
+
+@timed("columnar_export_seconds", kind="hrd_incidents")
+def write_hrd_incidents(
+    incidents: Iterable[Any],
+    path: Union[str, Path],
+    row_group_size: int = EXPORT_ROW_GROUP_SIZE
+) -> int:
+    """
+    Write HRD incidents to GeoParquet (or Arrow IPC by suffix).
+    
+    Args:
+        incidents: HRDIncident objects, consumed lazily
+        path: Output file
+        row_group_size: Incidents per row group
+    
+    Returns:
+        Number of rows written
+    """
+    with ColumnarWriter(path, HRD_INCIDENT_FIELDS, _hrd_incident_row,
+                        point_columns=("lon", "lat"), row_group_size=row_group_size) as writer:
+        writer.write_all(incidents)
+    return writer.rows
+
+
+def iter_batches(path: Union[str, Path]) -> Iterator[pa.RecordBatch]:
+    """
+    Record batches of a Parquet or Arrow IPC file, one row group at a time.
+    
+    Args:
+        path: File written by ColumnarWriter
+    
+    Yields:
+        Record batches in file order
+    """
+    path = Path(path)
+    if path.suffix.lower() in ARROW_SUFFIXES:
+        with pa.memory_map(str(path)) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+    else:
+        parquet_file = pq.ParquetFile(str(path))
+        for i in range(parquet_file.num_row_groups):
+            yield from parquet_file.read_row_group(i).to_batches()
+
+
+def _file_schema(path: Union[str, Path]) -> pa.Schema:
+    """Schema of a Parquet or Arrow IPC file."""
+    path = Path(path)
+    if path.suffix.lower() in ARROW_SUFFIXES:
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).schema
+    return pq.read_schema(str(path))
+
+
+@timed("columnar_export_seconds", kind="excel")
+def export_excel(
+    source_path: Union[str, Path],
+    excel_path: Union[str, Path],
+    sheet_name: str = "Sheet1"
+) -> Path:
+    """
+    Excel view of a columnar file, streamed into a write-only workbook.
+    
+    The binary geometry column is left out; lon/lat stay as numbers.
+    
+    Args:
+        source_path: Parquet or Arrow IPC file
+        excel_path: Output .xlsx path
+        sheet_name: Worksheet title
+    
+    Returns:
+        Path of the workbook
+    """
+    from openpyxl import Workbook
+    
+    columns = [name for name in _file_schema(source_path).names if name != GEOMETRY_COLUMN]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_name)
+    sheet.append(columns)
+    for batch in iter_batches(source_path):
+        values = [batch.column(name).to_pylist() for name in columns]
+        for row in zip(*values):
+            sheet.append(row)
+    
+    excel_path = Path(excel_path)
+    workbook.save(str(excel_path))
+    return excel_path
@@ -31,7 +31,9 @@ except (PermissionError, OSError) as e:
 # Base paths
 DATA_DIR = Path(os.getenv("DATA_DIR", PROJECT_ROOT / "data"))
 DUCKDB_PATH = Path(os.getenv("DATABASE_PATH", DATA_DIR / "duckdb" / "geocoder.duckdb"))
+DUCKDB_SNAPSHOT_INTERVAL: int = int(os.getenv("DUCKDB_SNAPSHOT_INTERVAL", "300"))  # Seconds between read-only snapshots for other processes (0 disables)
 INGESTED_DIR = DATA_DIR / "ingested"
+GEONAMES_CACHE_DIR = Path(os.getenv("GEONAMES_CACHE_DIR", DATA_DIR / "geonames"))
 
 # Ensure directories exist
 DUCKDB_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -70,11 +72,20 @@ UNMISS_DEPLOYMENTS = {
 
 # Geocoding settings
 FUZZY_THRESHOLD: float = float(os.getenv("FUZZY_THRESHOLD", "0.7"))
+CANDIDATE_PRUNING: bool = os.getenv("CANDIDATE_PRUNING", "true").lower() == "true"  # Drop n-grams that cannot reach FUZZY_THRESHOLD
 CENTROID_CRS: str = os.getenv("CENTROID_CRS", "EPSG:32736")  # UTM Zone 36N for South Sudan
 ENABLE_AI_EXTRACTION: bool = os.getenv("ENABLE_AI_EXTRACTION", "true").lower() == "true"  # Enabled by default for better accuracy
 
 # Cache settings
 CACHE_TTL: int = int(os.getenv("CACHE_TTL", "86400"))  # 24 hours
+ADMIN_HIERARCHY_CACHE_DIR: Path = Path(os.getenv("ADMIN_HIERARCHY_CACHE_DIR", DATA_DIR / "cache" / "admin_hierarchy"))  # Parsed compiled dataset, keyed by mtime and hash
+EXPORT_ROW_GROUP_SIZE: int = int(os.getenv("EXPORT_ROW_GROUP_SIZE", "10000"))  # Rows per Parquet/Arrow row group in batch exports
+
+# Scraper HTTP cache (shared by BaseScraper subclasses)
+SCRAPER_CACHE_PATH: Path = Path(os.getenv("SCRAPER_CACHE_PATH", DATA_DIR / "cache" / "scraper_http.sqlite"))
+SCRAPER_CACHE_TTL: int = int(os.getenv("SCRAPER_CACHE_TTL", str(7 * 86400)))  # 7 days
+SCRAPER_CACHE_MAX_BYTES: int = int(os.getenv("SCRAPER_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # 256MB
+SCRAPER_CACHE_MODE: str = os.getenv("SCRAPER_CACHE_MODE", "normal").lower()  # normal, offline (replay only) or off
 
 # Ollama settings (for local LLM pattern learning)
 OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
@@ -87,6 +98,12 @@ OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3.2:3b")  # Default to llama3.2:3b for optimal speed/quality balance
 ENABLE_OLLAMA: bool = os.getenv("ENABLE_OLLAMA", "true").lower() == "true"
 
+# HRD incident extraction
+HRD_MAP_REDUCE: bool = os.getenv("HRD_MAP_REDUCE", "true").lower() == "true"  # Extract whole reports chunk by chunk instead of truncating
+HRD_CHUNK_TOKENS: int = int(os.getenv("HRD_CHUNK_TOKENS", "600"))  # ~2400 chars, close to the old single-pass window
+HRD_TOKEN_BUDGET: int = int(os.getenv("HRD_TOKEN_BUDGET", "3500"))  # Prompt tokens in flight across workers
+HRD_EXTRACTION_WORKERS: int = int(os.getenv("HRD_EXTRACTION_WORKERS", "4"))
+
 # Admin layer names
 LAYER_NAMES = {
     "admin1": "admin1_state",
@@ -102,6 +119,8 @@ LOG_DIR: Path = DATA_DIR / "logs"
 LOG_FILE: Optional[Path] = Path(os.getenv("LOG_FILE", str(LOG_DIR / "app.log"))) if os.getenv("LOG_FILE") else LOG_DIR / "app.log"
 LOG_MAX_BYTES: int = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))  # 10MB
 LOG_BACKUP_COUNT: int = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+ERROR_LOG_DB_PATH: Path = Path(os.getenv("ERROR_LOG_DB_PATH", LOG_DIR / "error_logs.duckdb"))  # Indexed ERROR/CRITICAL records
+LOG_ASYNC: bool = os.getenv("LOG_ASYNC", "true").lower() == "true"  # Write logs from a background thread
 
 # Ensure log directory exists
 LOG_DIR.mkdir(parents=True, exist_ok=True)
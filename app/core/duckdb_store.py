@@ -1,30 +1,140 @@
 """DuckDB storage layer for geocoding data."""
 import duckdb
+import hashlib
+import os
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import shapely
 from shapely import wkb
 from shapely.geometry import Point
 import json
+import threading
+import time
 from datetime import datetime
 from app.core.config import DUCKDB_PATH, LAYER_NAMES
-from app.core.normalization import normalize_text
+from app.core.centroids import compute_centroids
+from app.core.normalization import normalize_text, phonetic_key
+from app.core.candidate_pruning import CandidatePruner
+from app.core.qgram_index import QGramIndex, QGRAM_SCAN_LIMIT, StringEntries
 from app.core.security import sanitize_layer_name, validate_feature_id
+from app.utils.logging import log_structured
+from app.utils.metrics import timed, inc, record_ns
+
+# Admin levels carried on each village, coarsest first
+ADMIN_LEVELS = ("state", "county", "payam", "boma")
+
+# name_index columns in table order (excluding created_at)
+NAME_INDEX_COLUMNS = (
+    "id", "layer", "feature_id", "canonical_name", "normalized_name",
+    "alias", "normalized_alias", "admin_codes"
+)
+
+# Searchable names that have no qgram_strings row yet
+QGRAM_UNINDEXED_NAMES_SQL = """
+    SELECT name FROM (
+        SELECT normalized_name AS name FROM villages
+        UNION SELECT normalized_alternate_name FROM village_alternate_names
+        UNION SELECT normalized_name FROM name_index
+        UNION SELECT normalized_alias FROM name_index
+    )
+    WHERE name IS NOT NULL AND name <> ''
+      AND name NOT IN (SELECT normalized_text FROM qgram_strings)
+"""
+
+
+def _admin_code(value: Optional[str], level: str) -> Optional[str]:
+    """
+    Canonical code for an admin unit name.
+    
+    Normalizes the name and drops a trailing level keyword, so "Unity State",
+    "unity" and "UNITY" all map to "unity".
+    
+    Args:
+        value: Admin unit name
+        level: Admin level ("state", "county", "payam" or "boma")
+    
+    Returns:
+        Canonical code or None if the name is empty
+    """
+    if not value:
+        return None
+    code = normalize_text(value)
+    suffix = f" {level}"
+    if code.endswith(suffix):
+        code = code[:-len(suffix)].strip()
+    return code or None
+
+
+def _parse_flag(value: Any) -> bool:
+    """Boolean from a flag stored as bool, number or text ("True", "0", "yes")."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes", "y")
+    return bool(value)
 
 
 class DuckDBStore:
     """DuckDB storage manager for geocoding data."""
     
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        shared: bool = False,
+        read_only: bool = False,
+        spool_dir: Optional[Path] = None
+    ):
         """
         Initialize DuckDB connection.
         
         Args:
             db_path: Path to DuckDB database file
+            shared: Store is used from several threads (Streamlit sessions);
+                each thread then gets its own cursor on the database
+            read_only: Open the file read-only, e.g. a snapshot replica (see
+                app.core.store_replica); the schema is not created
+            spool_dir: For read-only stores, directory where cache writes are
+                queued for the writer instead of executed
         """
         self.db_path = db_path or DUCKDB_PATH
-        self.conn = duckdb.connect(str(self.db_path))
-        self._init_schema()
+        self.shared = shared
+        self.read_only = read_only
+        self.spool_dir = spool_dir
+        self._conn = duckdb.connect(str(self.db_path), read_only=read_only)
+        self._local = threading.local()
+        self._spool_lock = threading.Lock()
+        # Serializes lazy (re)builds of the in-memory indexes below; readers
+        # take the built objects without it, and builds swap in new objects
+        self._index_lock = threading.RLock()
+        self._village_partitions: Optional[Dict[str, Any]] = None
+        self._name_index_entries: Optional[List[tuple]] = None
+        self._name_index_views: Dict[str, Dict[str, Any]] = {}
+        self._candidate_pruner: Optional[CandidatePruner] = None
+        self._qgram_index: Optional[QGramIndex] = None
+        # Replicas cannot write postings; they load what the writer built
+        self._qgram_stale = not read_only
+        self._admin_hierarchy: Optional[Dict[str, Any]] = None
+        if not read_only:
+            self._init_schema()
+    
+    @property
+    def conn(self) -> duckdb.DuckDBPyConnection:
+        """
+        Connection for the calling thread.
+        
+        A shared store hands each thread its own cursor on the one database
+        instance, so concurrent sessions never interleave statements on a
+        single connection while the in-memory indexes stay shared.
+        """
+        if not self.shared:
+            return self._conn
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._conn.cursor()
+            self._local.cursor = cursor
+        return cursor
     
     def _init_schema(self):
         """Initialize database schema."""
@@ -59,6 +169,39 @@ class DuckDBStore:
         """)
         # Note: DuckDB does NOT auto-increment INTEGER PRIMARY KEY - IDs must be generated manually
         
+        # Change log of features whose names need re-indexing (feature_id NULL
+        # means the whole layer was replaced) and the last applied position
+        self.conn.execute("CREATE SEQUENCE IF NOT EXISTS name_index_change_seq")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS name_index_changes (
+                seq BIGINT PRIMARY KEY DEFAULT nextval('name_index_change_seq'),
+                layer VARCHAR NOT NULL,
+                feature_id VARCHAR,
+                changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS index_watermarks (
+                index_name VARCHAR PRIMARY KEY,
+                last_seq BIGINT NOT NULL,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Trigram inverted index over distinct normalized names (see qgram_index)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS qgram_strings (
+                string_id INTEGER PRIMARY KEY,
+                normalized_text VARCHAR UNIQUE NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS qgram_postings (
+                gram VARCHAR NOT NULL,
+                string_id INTEGER NOT NULL
+            )
+        """)
+        
         # Geocode cache
         self.conn.execute("""
             CREATE TABLE IF NOT EXISTS geocode_cache (
@@ -94,6 +237,15 @@ class DuckDBStore:
         # Initialize OSM features schema
         self._init_osm_features_schema()
         
+        # Initialize Overpass harvest schema
+        self._init_harvest_schema()
+        
+        # Initialize boundary tiles schema
+        self._init_boundary_tiles_schema()
+        
+        # Initialize admin hierarchy schema
+        self._init_admin_hierarchy_schema()
+        
         # DuckDB is autocommit, no need for commit()
     
     def _get_next_id(self, table_name: str, id_column: str = "id") -> int:
@@ -164,6 +316,14 @@ class DuckDBStore:
             )
         """)
         
+        # Canonical admin codes (resolved once when a village is written)
+        for level in ADMIN_LEVELS:
+            self.conn.execute(f"ALTER TABLE villages ADD COLUMN IF NOT EXISTS {level}_code VARCHAR")
+        
+        # Transliteration-tolerant name keys (normalization.phonetic_key)
+        self.conn.execute("ALTER TABLE villages ADD COLUMN IF NOT EXISTS phonetic_key VARCHAR")
+        self.conn.execute("ALTER TABLE village_alternate_names ADD COLUMN IF NOT EXISTS phonetic_key VARCHAR")
+        
         # Create indexes for villages
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_villages_bbox ON villages(lon, lat)")
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_villages_name ON villages(normalized_name)")
@@ -171,10 +331,12 @@ class DuckDBStore:
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_villages_county ON villages(county)")
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_villages_payam ON villages(payam)")
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_villages_boma ON villages(boma)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_villages_phonetic_key ON villages(phonetic_key)")
         
         # Create indexes for alternate names
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alternate_names_normalized ON village_alternate_names(normalized_alternate_name)")
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alternate_names_village ON village_alternate_names(village_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_alternate_names_phonetic_key ON village_alternate_names(phonetic_key)")
     
     def _init_feedback_schema(self):
         """Initialize feedback and pattern performance tables."""
@@ -258,6 +420,65 @@ class DuckDBStore:
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_osm_pois_category ON osm_pois(category)")
         self.conn.execute("CREATE INDEX IF NOT EXISTS idx_osm_pois_name ON osm_pois(name)")
     
+    def _init_harvest_schema(self):
+        """Initialize Overpass harvest checkpoint tables (app.core.scrapers.overpass_harvester)."""
+        # Finished/split tiles of tiled Overpass harvests, so runs can resume
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS osm_harvest_tiles (
+                run_id VARCHAR NOT NULL,
+                tile_key VARCHAR NOT NULL,
+                status VARCHAR NOT NULL,
+                element_count INTEGER,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (run_id, tile_key)
+            )
+        """)
+    
+    def _init_boundary_tiles_schema(self):
+        """Initialize simplified admin boundary tables (app.core.boundary_tiles)."""
+        # Simplified admin boundaries per level of detail
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS boundary_tiles (
+                layer VARCHAR NOT NULL,
+                level VARCHAR NOT NULL,
+                feature_id VARCHAR NOT NULL,
+                name VARCHAR,
+                min_lon DOUBLE,
+                min_lat DOUBLE,
+                max_lon DOUBLE,
+                max_lat DOUBLE,
+                geojson TEXT,
+                PRIMARY KEY (layer, level, feature_id)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS boundary_tile_versions (
+                layer VARCHAR PRIMARY KEY,
+                version VARCHAR NOT NULL,
+                built_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    
+    def _init_admin_hierarchy_schema(self):
+        """Initialize cascading admin dropdown tables (app.core.admin_hierarchy)."""
+        # Materialized parent → children names
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS admin_hierarchy (
+                level VARCHAR NOT NULL,
+                parent VARCHAR NOT NULL,
+                child VARCHAR NOT NULL,
+                source VARCHAR NOT NULL,
+                PRIMARY KEY (level, parent, child, source)
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS admin_hierarchy_versions (
+                source VARCHAR PRIMARY KEY,
+                version VARCHAR NOT NULL,
+                built_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    
     def ingest_geojson(
         self,
         layer_name: str,
@@ -286,68 +507,148 @@ class DuckDBStore:
         if gdf.crs != "EPSG:4326":
             gdf = gdf.to_crs("EPSG:4326")
         
-        # Clear existing data (layer_name is now validated)
-        self.conn.execute(f"DELETE FROM {layer_name}")
+        # Feature IDs: explicit feature_id column, then id, then the index
+        if "feature_id" in gdf.columns:
+            feature_ids = gdf["feature_id"].astype(str)
+        elif "id" in gdf.columns:
+            feature_ids = gdf["id"].astype(str)
+        else:
+            feature_ids = pd.Series(gdf.index.astype(str), index=gdf.index)
         
-        # Prepare data
-        from app.core.centroids import compute_centroid
+        names = gdf[name_field] if name_field in gdf.columns else pd.Series("", index=gdf.index)
         
-        rows = []
-        for idx, row in gdf.iterrows():
-            # Try to get feature_id from row, otherwise use index
-            if "feature_id" in row:
-                feature_id = str(row["feature_id"])
-            elif "id" in row:
-                feature_id = str(row["id"])
-            else:
-                feature_id = str(idx)
-            name = row.get(name_field, "")
-            geometry = row.geometry
-            
-            # Convert to WKB
-            geometry_wkb = wkb.dumps(geometry, hex=True)
-            
-            # Create GeoJSON feature
-            feature_dict = {
-                "type": "Feature",
-                "geometry": json.loads(gpd.GeoSeries([geometry]).to_json())["features"][0]["geometry"],
-                "properties": {k: str(v) for k, v in row.items() if k != "geometry"}
-            }
-            geometry_geojson = json.dumps(feature_dict)
-            
-            # Compute centroid for polygons
-            centroid_lon, centroid_lat = None, None
-            if geometry.geom_type in ["Polygon", "MultiPolygon"]:
-                try:
-                    centroid_lon, centroid_lat = compute_centroid(geometry)
-                except Exception:
-                    pass
-            
-            properties = json.dumps({k: str(v) for k, v in row.items() if k != "geometry"})
-            
-            rows.append((
-                feature_id,
-                name,
-                geometry_wkb,
-                geometry_geojson,
-                centroid_lon,
-                centroid_lat,
-                properties,
-                datetime.now()
-            ))
+        frame = self._feature_frame(gdf)
+        frame.insert(0, "feature_id", feature_ids.to_numpy())
+        frame.insert(1, "name", names.to_numpy())
+        frame["centroid_lon"], frame["centroid_lat"] = self._polygon_centroids(gdf.geometry)
         
-        # Insert
-        self.conn.executemany(
-            f"""
-            INSERT INTO {layer_name} 
-            (feature_id, name, geometry_wkb, geometry_geojson, centroid_lon, centroid_lat, properties, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            rows
+        # Clear existing data (layer_name is now validated)
+        self.conn.execute(f"DELETE FROM {layer_name}")
+        
+        self._insert_frame(
+            layer_name,
+            frame,
+            ["feature_id", "name", "geometry_wkb", "geometry_geojson",
+             "centroid_lon", "centroid_lat", "properties", "created_at"]
         )
+        self._record_name_changes(layer_name)
+        # Cascading dropdowns reload the hierarchy (rebuilt for the new layer)
+        self._admin_hierarchy = None
         
         # DuckDB is autocommit
     
+    @staticmethod
+    def _feature_frame(gdf: gpd.GeoDataFrame) -> pd.DataFrame:
+        """
+        Build the geometry and properties columns shared by all feature tables.
+        
+        WKB and GeoJSON are produced with shapely's array functions and the
+        properties (every non-geometry column, stringified) are serialized by
+        pandas in one pass.
+        
+        Args:
+            gdf: GeoDataFrame in EPSG:4326
+        
+        Returns:
+            DataFrame with geometry_wkb, geometry_geojson, properties and
+            created_at columns, aligned with gdf
+        """
+        geometries = gdf.geometry.to_numpy()
+        attributes = pd.DataFrame(gdf.drop(columns=gdf.geometry.name)).astype(str)
+        if len(attributes.columns) and len(attributes):
+            properties = attributes.to_json(orient="records", lines=True).rstrip("\n").split("\n")
+        else:
+            properties = ["{}"] * len(gdf)
+        
+        geometry_json = shapely.to_geojson(geometries)
+        geometry_geojson = [
+            f'{{"type": "Feature", "geometry": {geom}, "properties": {props}}}'
+            for geom, props in zip(geometry_json, properties)
+        ]
+        
+        return pd.DataFrame({
+            "geometry_wkb": shapely.to_wkb(geometries, hex=True),
+            "geometry_geojson": geometry_geojson,
+            "properties": properties,
+            "created_at": datetime.now(),
+        })
+    
+    @staticmethod
+    def _polygon_centroids(geometries: gpd.GeoSeries):
+        """
+        Centroids of polygon features computed in the projected centroid CRS.
+        
+        The whole layer is projected in one batch (one UTM zone per layer
+        when CENTROID_CRS is "auto").
+        
+        Args:
+            geometries: GeoSeries in EPSG:4326
+        
+        Returns:
+            Tuple of (lon, lat) arrays; non-polygon features get NaN
+        """
+        lon = np.full(len(geometries), np.nan)
+        lat = np.full(len(geometries), np.nan)
+        
+        is_polygon = geometries.geom_type.isin(["Polygon", "MultiPolygon"]).to_numpy()
+        if is_polygon.any():
+            lon[is_polygon], lat[is_polygon] = compute_centroids(geometries[is_polygon])
+        
+        return lon, lat
+    
+    def _insert_frame(
+        self,
+        table_name: str,
+        frame: pd.DataFrame,
+        columns: List[str],
+        on_conflict: str = ""
+    ) -> int:
+        """
+        Load a DataFrame into a table with a single INSERT ... SELECT.
+        
+        The frame is registered with DuckDB as an Arrow table, so rows are
+        copied column by column instead of bound one at a time.
+        
+        Args:
+            table_name: Validated target table name
+            frame: Rows to insert
+            columns: Target columns (taken from the frame in this order)
+            on_conflict: Optional ON CONFLICT clause
+        
+        Returns:
+            Number of rows inserted
+        """
+        if frame.empty:
+            return 0
+        
+        start = time.perf_counter_ns()
+        view_name = f"_ingest_{table_name}"
+        column_sql = ", ".join(columns)
+        self.conn.register(view_name, pa.Table.from_pandas(frame[columns], preserve_index=False))
+        try:
+            self.conn.execute(f"""
+                INSERT INTO {table_name} ({column_sql})
+                SELECT {column_sql} FROM {view_name}
+                {on_conflict}
+            """)
+        finally:
+            self.conn.unregister(view_name)
+        elapsed_ns = time.perf_counter_ns() - start
+        
+        row_count = len(frame)
+        inc("ingest_rows_total", row_count, table=table_name)
+        record_ns("ingest_seconds", elapsed_ns, table=table_name)
+        log_structured(
+            "info",
+            f"Ingested {row_count} rows into {table_name}",
+            log_key="ingest_rows",
+            table=table_name,
+            rows=row_count,
+            elapsed_seconds=elapsed_ns / 1e9,
+            rows_per_second=round(row_count / max(elapsed_ns / 1e9, 1e-9), 1)
+        )
+        return row_count
+    
     def ingest_settlements_csv(
         self,
         csv_path: Path,
@@ -409,147 +710,560 @@ class DuckDBStore:
             """,
             rows
         )
+        self._record_name_changes("settlements")
         
         # DuckDB is autocommit
     
-    def build_name_index(self):
-        """Build name index from all layers and villages."""
-        # Clear existing index
-        self.conn.execute("DELETE FROM name_index")
+    @timed("duckdb_query_seconds", method="build_name_index")
+    def build_name_index(self, incremental: bool = False):
+        """
+        Build name index from all layers and villages.
         
-        # Index all layers
-        for layer_name in LAYER_NAMES.values():
-            result = self.conn.execute(f"""
-                SELECT feature_id, name, properties
-                FROM {layer_name}
-            """).fetchall()
+        Sessions of a shared store build under the index lock, and the SQL
+        side runs in one transaction, so a change-log delta is applied once
+        and the watermark only advances with it.
+        
+        Args:
+            incremental: Only re-index the features recorded in the change log
+                since the last build. Falls back to a full rebuild if the index
+                has never been built with change tracking.
+        """
+        with self._index_lock:
+            self.conn.execute("BEGIN TRANSACTION")
+            try:
+                self._build_name_index(incremental)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                # In-memory indexes may already hold the rolled-back rows
+                self._name_index_entries = None
+                self._name_index_views = {}
+                self._candidate_pruner = None
+                self._qgram_index = None
+                self._qgram_stale = True
+                raise
+    
+    def _build_name_index(self, incremental: bool):
+        """Body of build_name_index; runs inside its lock and transaction."""
+        last_seq = self.conn.execute(
+            "SELECT last_seq FROM index_watermarks WHERE index_name = 'name_index'"
+        ).fetchone()
+        max_seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM name_index_changes").fetchone()[0]
+        
+        if incremental and last_seq is not None:
+            self._apply_name_index_changes(last_seq[0], max_seq)
+        else:
+            # Clear existing index
+            self.conn.execute("DELETE FROM name_index")
             
-            rows = []
-            for feature_id, name, properties_str in result:
-                if not name:
-                    continue
-                
-                props = json.loads(properties_str) if properties_str else {}
-                
-                # Normalize name
-                from app.core.normalization import normalize_text
-                normalized_name = normalize_text(name)
-                
-                # Add canonical entry
-                rows.append((
-                    layer_name,
-                    feature_id,
-                    name,
-                    normalized_name,
-                    None,  # alias
-                    None,  # normalized_alias
-                    json.dumps({}),  # admin_codes
-                    datetime.now()
-                ))
-                
-                # Add alias entries if present
-                for alias_field in ["aliases", "alias", "alternate_name", "alt_name"]:
-                    if alias_field in props:
-                        alias_value = props[alias_field]
-                        if isinstance(alias_value, str):
-                            alias_list = [a.strip() for a in alias_value.split(",")]
-                        elif isinstance(alias_value, list):
-                            alias_list = alias_value
-                        else:
-                            continue
-                        
-                        for alias in alias_list:
-                            if alias:
-                                rows.append((
-                                    layer_name,
-                                    feature_id,
-                                    name,
-                                    normalized_name,
-                                    alias,
-                                    normalize_text(alias),
-                                    json.dumps({}),
-                                    datetime.now()
-                                ))
+            # Index all layers, then villages and their alternate names
+            for layer_name in LAYER_NAMES.values():
+                self._write_name_index(self._layer_index_frame(layer_name))
+            self._write_name_index(self._village_index_frame())
             
-            if rows:
-                # Get the next ID to start from
-                next_id = self._get_next_id("name_index")
-                
-                # Prepend ID to each row
-                rows_with_ids = [(next_id + i,) + row for i, row in enumerate(rows)]
+            # In-memory matcher is reloaded on the next search
+            self._name_index_entries = None
+            self._name_index_views = {}
+            self._candidate_pruner = None
+        
+        # New names get q-grams; a full build also drops names that are gone
+        self.build_qgram_index(rebuild=not incremental)
+        
+        # Advance the watermark and drop applied changes
+        self.conn.execute("""
+            INSERT INTO index_watermarks (index_name, last_seq, updated_at)
+            VALUES ('name_index', ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (index_name) DO UPDATE SET last_seq = EXCLUDED.last_seq, updated_at = EXCLUDED.updated_at
+        """, [max_seq])
+        self.conn.execute("DELETE FROM name_index_changes WHERE seq <= ?", [max_seq])
+    
+    def _get_name_index_entries(self) -> List[tuple]:
+        """
+        In-memory copy of name_index rows, in NAME_INDEX_COLUMNS order.
+        
+        Loaded on first use; incremental index builds swap in an updated list.
+        """
+        entries = self._name_index_entries
+        if entries is not None:
+            return entries
+        with self._index_lock:
+            if self._name_index_entries is None:
+                self._name_index_entries = self.conn.execute(f"""
+                    SELECT {", ".join(NAME_INDEX_COLUMNS)} FROM name_index
+                """).fetchall()
+            return self._name_index_entries
+    
+    def get_candidate_pruner(self) -> CandidatePruner:
+        """
+        Pruner over the tokens of all indexed names and village names.
+        
+        Rebuilt after the name index or the village partitions change.
+        
+        Returns:
+            CandidatePruner instance
+        """
+        pruner = self._candidate_pruner
+        if pruner is not None:
+            return pruner
+        with self._index_lock:
+            if self._candidate_pruner is None:
+                names = [row[4] for row in self._get_name_index_entries()]
+                names += [row[6] for row in self._get_name_index_entries() if row[6]]
+                names += [entry[1] for entry in self._get_village_partitions()["entries"]]
+                self._candidate_pruner = CandidatePruner(names)
+            return self._candidate_pruner
+    
+    def build_qgram_index(self, rebuild: bool = False) -> int:
+        """
+        Add trigram postings for names that are not indexed yet.
+        
+        Covers village names, alternate names and name_index names and
+        aliases. Names are never removed incrementally (a stale name just
+        maps to no entry); a rebuild starts from scratch.
+        
+        Args:
+            rebuild: Clear the index first
+        
+        Returns:
+            Number of names added
+        """
+        with self._index_lock:
+            start = time.perf_counter_ns()
+            if rebuild:
+                self.conn.execute("DELETE FROM qgram_postings")
+                self.conn.execute("DELETE FROM qgram_strings")
+                self._qgram_index = None
+            
+            added = self.conn.execute(f"""
+                INSERT INTO qgram_strings (string_id, normalized_text)
+                SELECT (SELECT COALESCE(MAX(string_id), -1) FROM qgram_strings) + ROW_NUMBER() OVER (ORDER BY name), name
+                FROM ({QGRAM_UNINDEXED_NAMES_SQL})
+                RETURNING string_id, normalized_text
+            """).fetchall()
+            
+            if added:
+                # Same grams as qgram_index.qgrams
+                self.conn.execute("""
+                    INSERT INTO qgram_postings (gram, string_id)
+                    SELECT DISTINCT substr(' ' || normalized_text || ' ', i, 3), string_id
+                    FROM (
+                        SELECT string_id, normalized_text, UNNEST(range(1, length(normalized_text) + 1)) AS i
+                        FROM qgram_strings
+                        WHERE string_id >= ?
+                    )
+                """, [min(row[0] for row in added)])
+                if self._qgram_index is not None:
+                    # Copy on write: concurrent searches keep the old index
+                    self._qgram_index = self._qgram_index.extended(added)
                 
-                self.conn.executemany(
-                    """
-                    INSERT INTO name_index 
-                    (id, layer, feature_id, canonical_name, normalized_name, alias, normalized_alias, admin_codes, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    rows_with_ids
+                elapsed = time.perf_counter_ns() - start
+                record_ns("ingest_seconds", elapsed, table="qgram_postings")
+                log_structured(
+                    "info",
+                    "Updated q-gram index",
+                    log_key="qgram_index_update",
+                    strings_added=len(added),
+                    rebuild=rebuild,
+                    seconds=round(elapsed / 1e9, 3)
                 )
+            
+            self._qgram_stale = False
+            return len(added)
+    
+    def _get_qgram_index(self) -> QGramIndex:
+        """
+        In-memory q-gram index, brought up to date with any new names.
         
-        # Index villages and their alternate names
-        from app.core.normalization import normalize_text
+        A read-only replica never writes postings: names its snapshot has
+        not indexed yet are added to the in-memory index only.
+        """
+        index = self._qgram_index
+        if index is not None and not self._qgram_stale:
+            return index
+        with self._index_lock:
+            if self._qgram_stale and not self.read_only:
+                self.build_qgram_index()
+            if self._qgram_index is None:
+                strings = self.conn.execute("SELECT string_id, normalized_text FROM qgram_strings").fetchall()
+                postings = self.conn.execute(
+                    "SELECT gram, string_id FROM qgram_postings ORDER BY gram, string_id"
+                ).fetchnumpy()
+                index = QGramIndex(strings, postings["gram"], postings["string_id"])
+                if self.read_only:
+                    missing = self.conn.execute(
+                        f"SELECT name FROM ({QGRAM_UNINDEXED_NAMES_SQL}) ORDER BY name"
+                    ).fetchall()
+                    index.add((len(index) + i, name) for i, (name,) in enumerate(missing))
+                self._qgram_index = index
+            return self._qgram_index
+    
+    def _shortlist_groups(
+        self,
+        pool: Dict[str, Any],
+        pool_size: int,
+        normalized_query: str,
+        pool_mask: Optional[np.ndarray] = None
+    ) -> Optional[List[Tuple[str, List[int]]]]:
+        """
+        Shortlisted names of a pool with the entries that carry them.
         
-        villages_result = self.conn.execute("""
-            SELECT village_id, name, normalized_name
-            FROM villages
-        """).fetchall()
+        The shortlist is expanded to entries and filtered by the pool mask
+        with array operations, so callers only score the (at most
+        QGRAM_SHORTLIST_SIZE) distinct names, however many entries share one.
+        
+        Args:
+            pool: Name index view or village partitions (search_strings is
+                used, and the packed string map is cached on it)
+            pool_size: Number of entries the caller would otherwise scan
+            normalized_query: Normalized query
+            pool_mask: Entries the caller searches (default: all)
         
-        village_rows = []
-        for village_id, name, normalized_name in villages_result:
+        Returns:
+            (name, entry indexes) pairs ordered by their first entry, or None
+            if the pool is small enough to scan
+        """
+        if pool_size <= QGRAM_SCAN_LIMIT:
+            return None
+        
+        index = self._get_qgram_index()
+        string_entries = pool.get("string_entries")
+        if string_entries is None or string_entries.index is not index:
+            # Built once per pool and index; a racing thread builds the same map
+            string_entries = StringEntries(index, pool["search_strings"])
+            pool["string_entries"] = string_entries
+        
+        string_ids = index.shortlist_ids(normalized_query)
+        indexes, positions = string_entries.lookup(string_ids)
+        if pool_mask is not None:
+            keep = pool_mask[indexes]
+            indexes, positions = indexes[keep], positions[keep]
+        inc("qgram_shortlist_total", len(indexes))
+        if not len(indexes):
+            return []
+        
+        # Cut the entries into one run per string
+        cuts = [0] + (np.flatnonzero(np.diff(positions)) + 1).tolist() + [len(indexes)]
+        names = [index.strings[i] for i in string_ids[positions[cuts[:-1]]].tolist()]
+        indexes = indexes.tolist()
+        groups = [(name, indexes[start:end]) for name, start, end in zip(names, cuts, cuts[1:])]
+        groups.sort(key=lambda item: item[1][0])
+        return groups
+    
+    def _get_name_index_view(self, layer: Optional[str]) -> Dict[str, Any]:
+        """
+        Name index entries for one layer with their search strings and centroids.
+        
+        Centroids are preloaded from the layer table (village coordinates for
+        villages) into arrays aligned with the entries. Layer None gives all
+        entries, without centroids.
+        
+        Returns:
+            Dictionary with entries, search_strings, by_string, lon and lat
+        """
+        view = self._name_index_views.get(layer)
+        if view is not None:
+            return view
+        with self._index_lock:
+            views = self._name_index_views
+            view = views.get(layer)
+            if view is None:
+                view = self._build_name_index_view(layer)
+                views[layer] = view
+            return view
+    
+    def _build_name_index_view(self, layer: Optional[str]) -> Dict[str, Any]:
+        """Load the view _get_name_index_view caches for a layer."""
+        entries = [row for row in self._get_name_index_entries() if layer is None or row[1] == layer]
+        
+        centroids: Dict[str, tuple] = {}
+        if layer == "villages":
+            centroids = {
+                feature_id: (lon, lat)
+                for feature_id, lon, lat in self.conn.execute("SELECT village_id, lon, lat FROM villages").fetchall()
+            }
+        elif sanitize_layer_name(layer):
+            centroids = {
+                feature_id: (lon, lat)
+                for feature_id, lon, lat in self.conn.execute(
+                    f"SELECT feature_id, centroid_lon, centroid_lat FROM {sanitize_layer_name(layer)}"
+                ).fetchall()
+            }
+        
+        coords = np.array(
+            [centroids.get(row[2], (None, None)) for row in entries], dtype=np.float64
+        ).reshape(-1, 2)
+        # Alias rows match on the alias, canonical rows on the name
+        search_strings = [row[6] if row[5] else (row[4] or "") for row in entries]
+        by_string: Dict[str, List[int]] = {}
+        for idx, search_string in enumerate(search_strings):
+            by_string.setdefault(search_string, []).append(idx)
+        view = {
+            "entries": entries,
+            "search_strings": search_strings,
+            "by_string": by_string,
+            "feature_exists": [row[2] in centroids for row in entries],
+            "lon": coords[:, 0],
+            "lat": coords[:, 1],
+        }
+        return view
+    
+    @timed("duckdb_query_seconds", method="search_name_index_many")
+    def search_name_index_many(
+        self,
+        queries: List[str],
+        layer: str,
+        threshold: float = 0.7,
+        limit: int = 10
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search the name index for several queries in one pass.
+        
+        All queries are scored against the layer's entries together and each
+        match carries the feature centroid, so no per-match lookups are needed.
+        
+        Args:
+            queries: Query strings
+            layer: Layer to search
+            threshold: Minimum similarity score
+            limit: Maximum results per query
+            
+        Returns:
+            Dictionary mapping each query to its matches (best first), each with
+            layer, feature_id, canonical_name, alias, score, lon and lat
+        """
+        from app.core.fuzzy import fuzzy_match_many
+        
+        queries = list(dict.fromkeys(q for q in queries if q))
+        view = self._get_name_index_view(layer)
+        normalized_queries = [normalize_text(q) for q in queries]
+        
+        # Score the distinct names of the union of the queries' q-gram shortlists
+        selected: Optional[Dict[str, List[int]]] = {}
+        for normalized_query in normalized_queries:
+            groups = self._shortlist_groups(view, len(view["entries"]), normalized_query)
+            if groups is None:
+                selected = None
+                break
+            selected.update(groups)
+        groups = list(view["by_string"].items()) if selected is None else sorted(
+            selected.items(), key=lambda item: item[1][0]
+        )
+        choices = [name for name, _ in groups]
+        all_matches = fuzzy_match_many(normalized_queries, choices, threshold, limit)
+        
+        results = {}
+        for query, matches in zip(queries, all_matches):
+            query_results = []
+            for _, score, choice_idx in matches:
+                for idx in groups[choice_idx][1]:
+                    row = view["entries"][idx]
+                    if not view["feature_exists"][idx]:
+                        continue
+                    lon, lat = view["lon"][idx], view["lat"][idx]
+                    query_results.append({
+                        "layer": row[1],
+                        "feature_id": row[2],
+                        "canonical_name": row[3],
+                        "alias": row[5],
+                        "score": score,
+                        "lon": None if np.isnan(lon) else float(lon),
+                        "lat": None if np.isnan(lat) else float(lat),
+                    })
+            results[query] = query_results[:limit]
+        return results
+    
+    def _record_name_changes(self, layer: str, feature_ids: Optional[List[str]] = None):
+        """
+        Record features whose names need re-indexing.
+        
+        Args:
+            layer: Layer name ("villages" for villages and alternate names)
+            feature_ids: Changed features, or None if the whole layer was replaced
+        """
+        # Names or coordinates may have changed
+        self._name_index_views = {}
+        self._qgram_stale = True
+        if feature_ids is None:
+            self.conn.execute("INSERT INTO name_index_changes (layer, feature_id) VALUES (?, NULL)", [layer])
+        elif feature_ids:
+            self.conn.execute("""
+                INSERT INTO name_index_changes (layer, feature_id)
+                SELECT ?, UNNEST(?::VARCHAR[])
+            """, [layer, list(feature_ids)])
+    
+    def _apply_name_index_changes(self, last_seq: int, max_seq: int):
+        """Re-index the features changed between two change-log positions."""
+        changes = self.conn.execute("""
+            SELECT DISTINCT layer, feature_id FROM name_index_changes
+            WHERE seq > ? AND seq <= ?
+        """, [last_seq, max_seq]).fetchall()
+        if not changes:
+            return
+        
+        replaced_layers = {layer for layer, feature_id in changes if feature_id is None}
+        changed_features: Dict[str, List[str]] = {}
+        for layer, feature_id in changes:
+            if feature_id is not None and layer not in replaced_layers:
+                changed_features.setdefault(layer, []).append(feature_id)
+        
+        frames = []
+        for layer in replaced_layers:
+            self.conn.execute("DELETE FROM name_index WHERE layer = ?", [layer])
+            frames.append(self._index_frame(layer))
+        for layer, feature_ids in changed_features.items():
+            self.conn.execute("""
+                DELETE FROM name_index
+                WHERE layer = ? AND feature_id IN (SELECT UNNEST(?::VARCHAR[]))
+            """, [layer, feature_ids])
+            frames.append(self._index_frame(layer, feature_ids))
+        
+        added = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        added = self._write_name_index(added)
+        
+        # Refresh the in-memory matcher in place
+        if self._name_index_entries is not None:
+            changed_keys = {(layer, feature_id) for layer, ids in changed_features.items() for feature_id in ids}
+            entries = [
+                entry for entry in self._name_index_entries
+                if entry[1] not in replaced_layers and (entry[1], entry[2]) not in changed_keys
+            ]
+            entries.extend(added[list(NAME_INDEX_COLUMNS)].itertuples(index=False, name=None))
+            self._name_index_entries = entries
+            self._name_index_views = {}
+            self._candidate_pruner = None
+        
+        log_structured(
+            "info",
+            "Applied name index changes",
+            replaced_layers=sorted(replaced_layers),
+            changed_features=sum(len(ids) for ids in changed_features.values()),
+            rows_written=len(added)
+        )
+    
+    def _index_frame(self, layer: str, feature_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """Name index rows for a layer or for villages."""
+        if layer == "villages":
+            return self._village_index_frame(feature_ids)
+        sanitized_layer = sanitize_layer_name(layer)
+        if not sanitized_layer:
+            return pd.DataFrame()
+        return self._layer_index_frame(sanitized_layer, feature_ids)
+    
+    def _layer_index_frame(self, layer_name: str, feature_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Name index rows (canonical names and property aliases) for an admin layer.
+        
+        Args:
+            layer_name: Validated layer name
+            feature_ids: Only index these features (default: all)
+        
+        Returns:
+            DataFrame of name index rows without IDs
+        """
+        if feature_ids is None:
+            result = self.conn.execute(f"SELECT feature_id, name, properties FROM {layer_name}").fetchall()
+        else:
+            result = self.conn.execute(f"""
+                SELECT feature_id, name, properties FROM {layer_name}
+                WHERE feature_id IN (SELECT UNNEST(?::VARCHAR[]))
+            """, [feature_ids]).fetchall()
+        
+        normalized_cache: Dict[str, str] = {}
+        
+        def normalize(value: str) -> str:
+            if value not in normalized_cache:
+                normalized_cache[value] = normalize_text(value)
+            return normalized_cache[value]
+        
+        rows = []
+        for feature_id, name, properties_str in result:
             if not name:
                 continue
             
-            # Add primary name entry
-            village_rows.append((
-                "villages",
-                village_id,
-                name,
-                normalized_name if normalized_name else normalize_text(name),
-                None,  # alias
-                None,  # normalized_alias
-                json.dumps({}),  # admin_codes
-                datetime.now()
-            ))
+            normalized_name = normalize(name)
+            
+            # Add canonical entry
+            rows.append((layer_name, feature_id, name, normalized_name, None, None))
+            
+            # Add alias entries if present (only parse properties that can have one)
+            if not properties_str or not ('"alias' in properties_str or '"alt' in properties_str):
+                continue
+            props = json.loads(properties_str)
+            for alias_field in ["aliases", "alias", "alternate_name", "alt_name"]:
+                if alias_field in props:
+                    alias_value = props[alias_field]
+                    if isinstance(alias_value, str):
+                        alias_list = [a.strip() for a in alias_value.split(",")]
+                    elif isinstance(alias_value, list):
+                        alias_list = alias_value
+                    else:
+                        continue
+                    
+                    for alias in alias_list:
+                        if alias:
+                            rows.append((layer_name, feature_id, name, normalized_name, alias, normalize(alias)))
+        
+        return pd.DataFrame(rows, columns=list(NAME_INDEX_COLUMNS[1:7]))
+    
+    def _village_index_frame(self, village_ids: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Name index rows for villages and their alternate names.
         
-        # Add alternate names
-        alternate_names_result = self.conn.execute("""
-            SELECT van.village_id, van.alternate_name, van.normalized_alternate_name, v.name
+        Args:
+            village_ids: Only index these villages (default: all)
+        
+        Returns:
+            DataFrame of name index rows without IDs
+        """
+        village_filter = ""
+        params: List[Any] = []
+        if village_ids is not None:
+            village_filter = "AND v.village_id IN (SELECT UNNEST(?::VARCHAR[]))"
+            params = [village_ids]
+        
+        villages = self.conn.execute(f"""
+            SELECT v.village_id, v.name, v.normalized_name, NULL AS alias, NULL AS normalized_alias
+            FROM villages v
+            WHERE v.name IS NOT NULL AND v.name <> '' {village_filter}
+            UNION ALL
+            SELECT v.village_id, v.name, v.normalized_name, van.alternate_name, van.normalized_alternate_name
             FROM village_alternate_names van
             JOIN villages v ON van.village_id = v.village_id
-        """).fetchall()
+            WHERE van.alternate_name IS NOT NULL AND van.alternate_name <> '' {village_filter}
+        """, params * 2).df()
         
-        for village_id, alt_name, norm_alt_name, primary_name in alternate_names_result:
-            if alt_name:
-                village_rows.append((
-                    "villages",
-                    village_id,
-                    primary_name,  # canonical name
-                    normalize_text(primary_name) if primary_name else "",
-                    alt_name,  # alias
-                    norm_alt_name if norm_alt_name else normalize_text(alt_name),
-                    json.dumps({}),
-                    datetime.now()
-                ))
-        
-        if village_rows:
-            # Get the next ID to start from
-            next_id = self._get_next_id("name_index")
-            
-            # Prepend ID to each row
-            village_rows_with_ids = [(next_id + i,) + row for i, row in enumerate(village_rows)]
-            
-            self.conn.executemany(
-                """
-                INSERT INTO name_index 
-                (id, layer, feature_id, canonical_name, normalized_name, alias, normalized_alias, admin_codes, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                village_rows_with_ids
-            )
+        if villages.empty:
+            return pd.DataFrame(columns=list(NAME_INDEX_COLUMNS[1:7]))
         
-        # DuckDB is autocommit
+        # Fill in normalized forms that were not stored at write time
+        for column, source in (("normalized_name", "name"), ("normalized_alias", "alias")):
+            missing = villages[column].isna() & villages[source].notna()
+            if missing.any():
+                villages.loc[missing, column] = villages.loc[missing, source].map(normalize_text)
+        villages["normalized_name"] = villages["normalized_name"].fillna("")
+        
+        villages.insert(0, "layer", "villages")
+        return villages.rename(columns={"village_id": "feature_id", "name": "canonical_name"})
+    
+    def _write_name_index(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Assign IDs to name index rows and insert them.
+        
+        Returns:
+            The rows as written, with id, admin_codes and created_at columns
+        """
+        if frame.empty:
+            return pd.DataFrame(columns=list(NAME_INDEX_COLUMNS) + ["created_at"])
+        
+        frame = frame.reset_index(drop=True)
+        frame.insert(0, "id", self._get_next_id("name_index") + frame.index)
+        frame["admin_codes"] = json.dumps({})
+        frame["created_at"] = datetime.now()
+        frame = frame.astype(object).where(frame.notna(), None)
+        self._insert_frame("name_index", frame, list(NAME_INDEX_COLUMNS) + ["created_at"])
+        return frame
     
+    @timed("duckdb_query_seconds", method="search_name_index")
     def search_name_index(
         self,
         query: str,
@@ -578,38 +1292,34 @@ class DuckDBStore:
         
         normalized_query = normalize_text(query)
         
-        # Get all candidates (constraints will be applied after fuzzy matching)
+        # Get candidates (constraints will be applied after fuzzy matching)
         # This is because name_index doesn't directly store hierarchical info
         # We'll filter results by checking actual feature properties
-        if layer:
-            candidates = self.conn.execute("""
-                SELECT id, layer, feature_id, canonical_name, normalized_name, 
-                       alias, normalized_alias, admin_codes
-                FROM name_index
-                WHERE layer = ?
-            """, [layer]).fetchall()
-        else:
-            candidates = self.conn.execute("""
-                SELECT id, layer, feature_id, canonical_name, normalized_name,
-                       alias, normalized_alias, admin_codes
-                FROM name_index
-            """).fetchall()
-        
-        # Extract searchable strings
-        search_strings = []
-        for row in candidates:
-            # Try normalized_name first
-            search_strings.append(row[4])  # normalized_name
-            # Also try normalized_alias if present
-            if row[6]:  # normalized_alias
-                search_strings.append(row[6])
-        
-        # Use progressive fuzzy matching
-        matches = progressive_fuzzy_match(normalized_query, search_strings, threshold, limit)
-        
-        # Prepare match data for context boosting
-        match_data = []
-        for idx, row in enumerate(candidates):
+        view = self._get_name_index_view(layer)
+        groups = self._shortlist_groups(view, len(view["entries"]), normalized_query)
+        if groups is None:
+            groups = list(view["by_string"].items())
+        
+        # Score each distinct search string once (the alias for alias rows,
+        # else the name), then expand the matches to their entries
+        name_matches = progressive_fuzzy_match(normalized_query, [name for name, _ in groups], threshold, limit)
+        candidates = []
+        matches = []
+        for name, score, group_idx in name_matches:
+            for i in groups[group_idx][1]:
+                matches.append((name, score, len(candidates)))
+                candidates.append(view["entries"][i])
+        
+        # Prepare match data for context boosting (only matched features are looked up)
+        constraints = {
+            "state": state_constraint,
+            "county": county_constraint,
+            "payam": payam_constraint,
+            "boma": boma_constraint,
+        }
+        match_data = [{} for _ in candidates] if any(constraints.values()) else []
+        for _, _, idx in (matches if match_data else []):
+            row = candidates[idx]
             # Extract match info from row
             match_info = {
                 "layer": row[1],
@@ -628,40 +1338,30 @@ class DuckDBStore:
                         match_info["boma"] = props.get("admin4Name") or props.get("boma") or props.get("BOMA")
             except:
                 pass
-            match_data.append(match_info)
+            match_data[idx] = match_info
         
         # Apply context-aware scoring boost
-        constraints = {
-            "state": state_constraint,
-            "county": county_constraint,
-            "payam": payam_constraint,
-            "boma": boma_constraint,
-        }
         boosted_matches = apply_context_boost(matches, match_data, constraints)
         
         # Map back to entries
         results = []
-        matched_indices = {match[2] for match in boosted_matches}
-        
-        for idx, row in enumerate(candidates):
-            if idx in matched_indices:
-                # Find matching score from boosted matches
-                score = next((m[1] for m in boosted_matches if m[2] == idx), 0.0)
-                
-                results.append({
-                    "id": row[0],
-                    "layer": row[1],
-                    "feature_id": row[2],
-                    "canonical_name": row[3],
-                    "normalized_name": row[4],
-                    "alias": row[5],
-                    "normalized_alias": row[6],
-                    "admin_codes": json.loads(row[7]) if row[7] else {},
-                    "score": score
-                })
+        for _, score, idx in boosted_matches:
+            row = candidates[idx]
+            results.append({
+                "id": row[0],
+                "layer": row[1],
+                "feature_id": row[2],
+                "canonical_name": row[3],
+                "normalized_name": row[4],
+                "alias": row[5],
+                "normalized_alias": row[6],
+                "admin_codes": json.loads(row[7]) if row[7] else {},
+                "score": score
+            })
         
         return sorted(results, key=lambda x: x["score"], reverse=True)[:limit]
     
+    @timed("duckdb_query_seconds", method="get_cache")
     def get_cache(self, normalized_text: str) -> Optional[Dict[str, Any]]:
         """Get cached geocode result."""
         result = self.conn.execute("""
@@ -690,7 +1390,10 @@ class DuckDBStore:
         return None
     
     def set_cache(self, result: Dict[str, Any]):
-        """Cache geocode result."""
+        """Cache geocode result (queued for the writer on a read-only replica)."""
+        if self.read_only:
+            self._spool_write("geocode_cache", result)
+            return
         try:
             # Get the next ID using helper method
             next_id = self._get_next_id("geocode_cache")
@@ -724,6 +1427,47 @@ class DuckDBStore:
             logger.error(f"Failed to cache geocode result: {e}")
         # DuckDB is autocommit
     
+    def _spool_write(self, table: str, record: Dict[str, Any]):
+        """
+        Queue a write of a read-only store for the process holding the database.
+        
+        Each process appends to its own JSONL file in spool_dir; the writer
+        drains them (app.core.store_replica.drain_spool).
+        """
+        if self.spool_dir is None:
+            inc("duckdb_replica_writes_total", table=table, result="dropped")
+            return
+        line = json.dumps({"table": table, "record": record}, default=str)
+        with self._spool_lock:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.spool_dir / f"{os.getpid()}.jsonl", "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        inc("duckdb_replica_writes_total", table=table, result="spooled")
+    
+    def layer_version(self, layer_name: str) -> str:
+        """
+        Version of a layer's contents: row count and last ingest time.
+        
+        Tables derived from a layer (boundary tiles, admin hierarchy) store
+        the version they were built from and rebuild when it changes.
+        
+        Args:
+            layer_name: Admin layer (validated against the whitelist)
+        
+        Returns:
+            Version string
+        
+        Raises:
+            ValueError: If layer_name is not an allowed layer
+        """
+        layer = sanitize_layer_name(layer_name)
+        if not layer:
+            raise ValueError(f"Invalid layer name: {layer_name}")
+        count, created = self.conn.execute(
+            f"SELECT COUNT(*), MAX(created_at) FROM {layer}"
+        ).fetchone()
+        return f"{count}:{created}"
+    
     def get_geometry(self, layer: str, feature_id: str) -> Optional[Any]:
         """
         Get geometry for a feature.
@@ -788,6 +1532,7 @@ class DuckDBStore:
             }
         return None
     
+    @timed("duckdb_query_seconds", method="get_admin_hierarchy_with_ids")
     def get_admin_hierarchy_with_ids(self, lon: float, lat: float) -> Dict[str, Optional[str]]:
         """
         Get administrative hierarchy with feature IDs for a point using spatial queries.
@@ -919,7 +1664,6 @@ class DuckDBStore:
         Returns:
             village_id
         """
-        import hashlib
         from shapely.geometry import Point
         from app.core.normalization import normalize_text
         
@@ -942,15 +1686,20 @@ class DuckDBStore:
         # Insert village
         self.conn.execute("""
             INSERT OR REPLACE INTO villages
-            (village_id, name, normalized_name, lon, lat, geometry_wkb,
+            (village_id, name, normalized_name, phonetic_key, lon, lat, geometry_wkb,
              state, county, payam, boma, state_id, county_id, payam_id, boma_id,
+             state_code, county_code, payam_code, boma_code,
              data_source, source_id, confidence_score, verified, created_by, properties, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
         """, [
-            village_id, name, normalized_name, lon, lat, geometry_wkb,
+            village_id, name, normalized_name, phonetic_key(normalized_name), lon, lat, geometry_wkb,
             state, county, payam, boma, state_id, county_id, payam_id, boma_id,
+            _admin_code(state, "state"), _admin_code(county, "county"),
+            _admin_code(payam, "payam"), _admin_code(boma, "boma"),
             data_source, source_id, confidence_score, verified, created_by, properties_json
         ])
+        self._record_name_changes("villages", [village_id])
+        self.invalidate_village_partitions()
         
         return village_id
     
@@ -982,12 +1731,356 @@ class DuckDBStore:
         
         self.conn.execute("""
             INSERT INTO village_alternate_names
-            (id, village_id, alternate_name, normalized_alternate_name, name_type, source)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, [next_id, village_id, alternate_name, normalized_alternate_name, name_type, source])
+            (id, village_id, alternate_name, normalized_alternate_name, phonetic_key, name_type, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            next_id, village_id, alternate_name, normalized_alternate_name,
+            phonetic_key(normalized_alternate_name), name_type, source
+        ])
+        self._record_name_changes("villages", [village_id])
+        self.invalidate_village_partitions()
         
         return next_id
     
+    def bulk_upsert_villages(self, df: pd.DataFrame) -> List[str]:
+        """
+        Insert or update many villages in one statement.
+        
+        IDs, normalized names, admin codes and point geometries are computed
+        for the whole frame and the rows are loaded through a single
+        Arrow-registered relation. Existing villages (same village_id) are
+        updated in place, like add_village.
+        
+        Args:
+            df: DataFrame with name, lon and lat columns, plus any of the optional
+                add_village fields (state, county, payam, boma, state_id,
+                county_id, payam_id, boma_id, data_source, source_id,
+                confidence_score, verified, created_by, properties, village_id)
+        
+        Returns:
+            village_ids in the order of the input rows
+        
+        Raises:
+            ValueError: If a row has no name or coordinates
+        """
+        if df.empty:
+            return []
+        
+        df = df.reset_index(drop=True)
+        for column in ("name", "lon", "lat"):
+            if column not in df.columns or df[column].isna().any():
+                raise ValueError(f"Every village needs a {column}")
+        
+        def column(name: str, default: Any = None) -> pd.Series:
+            if name in df.columns:
+                return df[name].astype(object).where(df[name].notna(), default)
+            return pd.Series([default] * len(df), dtype=object)
+        
+        names = df["name"].astype(str).tolist()
+        lons = df["lon"].astype(float).tolist()
+        lats = df["lat"].astype(float).tolist()
+        
+        # Same ID scheme as add_village: hash of name + coordinates
+        village_ids = column("village_id").tolist()
+        village_ids = [
+            village_id or hashlib.md5(f"{name}_{lon}_{lat}".encode()).hexdigest()
+            for village_id, name, lon, lat in zip(village_ids, names, lons, lats)
+        ]
+        
+        normalized = {name: normalize_text(name) for name in set(names)}
+        keys = {value: phonetic_key(value) for value in set(normalized.values())}
+        properties = [
+            json.dumps(value) if isinstance(value, dict) else value
+            for value in column("properties").tolist()
+        ]
+        
+        frame = pd.DataFrame({
+            "village_id": village_ids,
+            "name": names,
+            "normalized_name": [normalized[name] for name in names],
+            "phonetic_key": [keys[normalized[name]] for name in names],
+            "lon": lons,
+            "lat": lats,
+            "geometry_wkb": shapely.to_wkb(shapely.points(lons, lats), hex=True),
+            "data_source": column("data_source", "manual"),
+            "source_id": column("source_id"),
+            "confidence_score": pd.to_numeric(column("confidence_score"), errors="coerce"),
+            "verified": column("verified", False).map(_parse_flag).astype(bool),
+            "created_by": column("created_by"),
+            "properties": properties,
+            "updated_at": datetime.now(),
+        })
+        for level in ADMIN_LEVELS:
+            values = column(level)
+            codes = {value: _admin_code(value, level) for value in set(values.dropna())}
+            frame[level] = values
+            frame[f"{level}_id"] = column(f"{level}_id")
+            frame[f"{level}_code"] = values.map(codes)
+        
+        columns = [
+            "village_id", "name", "normalized_name", "phonetic_key", "lon", "lat", "geometry_wkb",
+            "state", "county", "payam", "boma", "state_id", "county_id", "payam_id", "boma_id",
+            "state_code", "county_code", "payam_code", "boma_code",
+            "data_source", "source_id", "confidence_score", "verified", "created_by", "properties", "updated_at"
+        ]
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != "village_id")
+        self._insert_frame(
+            "villages",
+            frame.drop_duplicates("village_id", keep="last"),
+            columns,
+            on_conflict=f"ON CONFLICT (village_id) DO UPDATE SET {updates}"
+        )
+        self._record_name_changes("villages", list(dict.fromkeys(village_ids)))
+        self.invalidate_village_partitions()
+        
+        return village_ids
+    
+    def bulk_add_alternate_names(self, df: pd.DataFrame) -> int:
+        """
+        Add many alternate names in one statement.
+        
+        Names a village already has (same normalized spelling) are skipped, so
+        re-running an import does not create duplicates.
+        
+        Args:
+            df: DataFrame with village_id and alternate_name columns, and
+                optional name_type (default 'alias') and source columns
+        
+        Returns:
+            Number of alternate names added
+        """
+        if df.empty:
+            return 0
+        
+        names = df["alternate_name"].astype(str).str.strip()
+        frame = pd.DataFrame({
+            "village_id": df["village_id"].astype(str).to_numpy(),
+            "alternate_name": names.to_numpy(),
+            "name_type": df["name_type"].to_numpy() if "name_type" in df.columns else "alias",
+            "source": df["source"].to_numpy() if "source" in df.columns else None,
+        })
+        frame = frame[frame["alternate_name"] != ""]
+        normalized = {name: normalize_text(name) for name in set(frame["alternate_name"])}
+        frame["normalized_alternate_name"] = frame["alternate_name"].map(normalized)
+        keys = {value: phonetic_key(value) for value in set(normalized.values())}
+        frame["phonetic_key"] = frame["normalized_alternate_name"].map(keys)
+        frame = frame.drop_duplicates(["village_id", "normalized_alternate_name"])
+        if frame.empty:
+            return 0
+        
+        start = time.perf_counter_ns()
+        next_id = self._get_next_id("village_alternate_names")
+        self.conn.register("_ingest_alternate_names", pa.Table.from_pandas(frame, preserve_index=False))
+        try:
+            row_count = self.conn.execute("""
+                INSERT INTO village_alternate_names
+                (id, village_id, alternate_name, normalized_alternate_name, phonetic_key, name_type, source)
+                SELECT ? + ROW_NUMBER() OVER () - 1, n.village_id, n.alternate_name,
+                       n.normalized_alternate_name, n.phonetic_key, n.name_type, n.source
+                FROM _ingest_alternate_names n
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM village_alternate_names existing
+                    WHERE existing.village_id = n.village_id
+                      AND existing.normalized_alternate_name = n.normalized_alternate_name
+                )
+            """, [next_id]).fetchone()[0]
+        finally:
+            self.conn.unregister("_ingest_alternate_names")
+        if row_count:
+            self._record_name_changes("villages", frame["village_id"].unique().tolist())
+        self.invalidate_village_partitions()
+        
+        inc("ingest_rows_total", row_count, table="village_alternate_names")
+        record_ns("ingest_seconds", time.perf_counter_ns() - start, table="village_alternate_names")
+        return row_count
+    
+    def invalidate_village_partitions(self):
+        """Drop the in-memory village partitions so the next search reloads them."""
+        self._village_partitions = None
+        self._candidate_pruner = None
+        self._qgram_stale = True
+    
+    def _backfill_admin_codes(self):
+        """Fill in admin codes for villages written without them (e.g. bulk loads)."""
+        for level in ADMIN_LEVELS:
+            names = self.conn.execute(f"""
+                SELECT DISTINCT {level} FROM villages
+                WHERE {level} IS NOT NULL AND {level}_code IS NULL
+            """).fetchall()
+            if names:
+                self.conn.executemany(
+                    f"UPDATE villages SET {level}_code = ? WHERE {level} = ? AND {level}_code IS NULL",
+                    [[_admin_code(name, level), name] for (name,) in names]
+                )
+    
+    def _backfill_phonetic_keys(self):
+        """Fill in phonetic keys for names stored before keys were computed at ingest."""
+        for table, name_column in (
+            ("villages", "normalized_name"),
+            ("village_alternate_names", "normalized_alternate_name"),
+        ):
+            names = [name for (name,) in self.conn.execute(f"""
+                SELECT DISTINCT {name_column} FROM {table}
+                WHERE {name_column} IS NOT NULL AND phonetic_key IS NULL
+            """).fetchall()]
+            if not names:
+                continue
+            keys = pd.DataFrame({"name": names, "phonetic_key": [phonetic_key(name) for name in names]})
+            self.conn.register("_phonetic_keys", pa.Table.from_pandas(keys, preserve_index=False))
+            try:
+                self.conn.execute(f"""
+                    UPDATE {table} SET phonetic_key = k.phonetic_key
+                    FROM _phonetic_keys k
+                    WHERE {table}.{name_column} = k.name AND {table}.phonetic_key IS NULL
+                """)
+            finally:
+                self.conn.unregister("_phonetic_keys")
+    
+    def _get_village_partitions(self) -> Dict[str, Any]:
+        """
+        Load villages and alternate names into per-admin-unit partitions.
+        
+        Each entry is (search_string, normalized_string, alternate_name, village_data).
+        Village entries come first, then alternate-name entries, by_level
+        maps each level to {admin_code: [entry indexes]}, search_strings
+        holds each entry's search string and by_key maps phonetic keys to
+        entry indexes.
+        
+        Returns:
+            Dictionary with entries, villages, alternates, by_level,
+            search_strings, by_key and a cache of resolved constraint codes
+        """
+        partitions = self._village_partitions
+        if partitions is not None:
+            return partitions
+        with self._index_lock:
+            if self._village_partitions is None:
+                self._village_partitions = self._load_village_partitions()
+            return self._village_partitions
+    
+    def _load_village_partitions(self) -> Dict[str, Any]:
+        """Read villages and alternate names into the partitions _get_village_partitions caches."""
+        # Replicas fill in missing codes and keys in memory below instead
+        if not self.read_only:
+            self._backfill_admin_codes()
+            self._backfill_phonetic_keys()
+        
+        villages = self.conn.execute("""
+            SELECT village_id, name, normalized_name, lon, lat,
+                   state, county, payam, boma, data_source, verified, phonetic_key,
+                   state_code, county_code, payam_code, boma_code
+            FROM villages
+        """).fetchall()
+        alternates = self.conn.execute("""
+            SELECT van.alternate_name, van.normalized_alternate_name, v.village_id, van.phonetic_key
+            FROM village_alternate_names van
+            JOIN villages v ON van.village_id = v.village_id
+        """).fetchall()
+        
+        entries = []
+        by_level: Dict[str, Dict[str, List[int]]] = {level: {} for level in ADMIN_LEVELS}
+        by_key: Dict[str, List[int]] = {}
+        village_data_by_id = {}
+        normalized_cache: Dict[str, str] = {}
+        
+        def add_entry(search_string, alternate_name, village_data, key, codes):
+            search_string = search_string or ""
+            normalized = normalized_cache.get(search_string)
+            if normalized is None:
+                normalized = normalize_text(search_string)
+                normalized_cache[search_string] = normalized
+            idx = len(entries)
+            entries.append((search_string, normalized, alternate_name, village_data))
+            if key:
+                by_key.setdefault(key, []).append(idx)
+            for level, code in zip(ADMIN_LEVELS, codes):
+                if code:
+                    by_level[level].setdefault(code, []).append(idx)
+        
+        codes_by_id = {}
+        for (v_id, name, norm_name, lon, lat, state, county, payam, boma, source, verified, key, *codes) in villages:
+            codes = [
+                code or _admin_code(value, level)
+                for code, value, level in zip(codes, (state, county, payam, boma), ADMIN_LEVELS)
+            ]
+            codes_by_id[v_id] = codes
+            if key is None and norm_name:
+                key = phonetic_key(norm_name)
+            village_data = {
+                "village_id": v_id,
+                "name": name,
+                "normalized_name": norm_name,
+                "lon": lon,
+                "lat": lat,
+                "state": state,
+                "county": county,
+                "payam": payam,
+                "boma": boma,
+                "data_source": source,
+                "verified": verified
+            }
+            village_data_by_id[v_id] = village_data
+            add_entry(norm_name, None, village_data, key, codes)
+        village_count = len(entries)
+        
+        for (alt_name, norm_alt_name, v_id, key) in alternates:
+            village_data = dict(village_data_by_id[v_id], matched_alternate_name=alt_name)
+            if key is None and norm_alt_name:
+                key = phonetic_key(norm_alt_name)
+            add_entry(norm_alt_name, alt_name, village_data, key, codes_by_id[v_id])
+        
+        return {
+            "entries": entries,
+            "villages": list(range(village_count)),
+            "alternates": list(range(village_count, len(entries))),
+            "by_level": by_level,
+            "search_strings": [entry[0] for entry in entries],
+            "by_key": by_key,
+            "resolved": {},
+        }
+    
+    @staticmethod
+    def _partition_candidates(
+        partitions: Dict[str, Any],
+        constraints: Dict[str, Optional[str]]
+    ) -> Optional[List[int]]:
+        """
+        Entry indexes that satisfy all admin constraints.
+        
+        A constraint selects the partition with the same admin code, or failing
+        that every partition whose code contains it ("Unity" matches "unity",
+        "Bor" matches "bor south" when there is no "bor").
+        
+        Args:
+            partitions: Partitions from _get_village_partitions
+            constraints: Mapping of admin level to constraint name
+        
+        Returns:
+            Sorted entry indexes, or None if there are no constraints
+        """
+        candidates = None
+        for level in ADMIN_LEVELS:
+            code = _admin_code(constraints.get(level), level)
+            if not code:
+                continue
+            
+            level_partitions = partitions["by_level"][level]
+            matched_codes = partitions["resolved"].get((level, code))
+            if matched_codes is None:
+                if code in level_partitions:
+                    matched_codes = [code]
+                else:
+                    matched_codes = [key for key in level_partitions if code in key]
+                partitions["resolved"][(level, code)] = matched_codes
+            
+            indexes = set()
+            for matched_code in matched_codes:
+                indexes.update(level_partitions[matched_code])
+            candidates = indexes if candidates is None else candidates & indexes
+        
+        return sorted(candidates) if candidates is not None else None
+    
+    @timed("duckdb_query_seconds", method="search_villages")
     def search_villages(
         self,
         query: str,
@@ -1012,183 +2105,118 @@ class DuckDBStore:
             List of matching villages
         """
         from app.core.normalization import normalize_text
-        from app.core.fuzzy import progressive_fuzzy_match, apply_context_boost
+        from app.core.fuzzy import fuzzy_match, progressive_fuzzy_match
         
         normalized_query = normalize_text(query)
         
-        # Build WHERE clause for hierarchical constraints
-        where_clauses = []
-        params = []
+        # Constrained searches only look at the villages (and alternate names)
+        # in the matching admin-unit partitions - no SQL round trip per query
+        partitions = self._get_village_partitions()
+        entries = partitions["entries"]
+        constraints = {
+            "state": state_constraint,
+            "county": county_constraint,
+            "payam": payam_constraint,
+            "boma": boma_constraint,
+        }
         
         # STRICT constraint filtering - CRITICAL: Only search villages within specified boundaries
         # If constraints are specified, we MUST only return villages that match them
         # This prevents wrong matches across states/counties
-        if state_constraint:
-            # STRICT: Only match villages where state field matches (case-insensitive)
-            # Use LIKE with % for partial matching (handles "Unity" vs "Unity State")
-            where_clauses.append("LOWER(state) LIKE LOWER(?)")
-            # Try with and without "state" suffix
-            state_param = state_constraint.replace(" state", "").strip()
-            params.append(f"%{state_param}%")
-        
-        if county_constraint:
-            # STRICT: Only match villages where county field matches
-            # Try both exact match and LIKE match
-            county_param = county_constraint.replace(" county", "").strip()
-            # Use OR to match both exact and partial
-            where_clauses.append("(LOWER(county) = LOWER(?) OR LOWER(county) LIKE LOWER(?))")
-            params.append(county_param)  # Exact match
-            params.append(f"%{county_param}%")  # Partial match
-        
-        if payam_constraint:
-            # STRICT: Only match villages where payam field matches
-            where_clauses.append("LOWER(payam) LIKE LOWER(?)")
-            payam_param = payam_constraint.replace(" payam", "").strip()
-            params.append(f"%{payam_param}%")
-        
-        if boma_constraint:
-            # STRICT: Only match villages where boma field matches
-            where_clauses.append("LOWER(boma) LIKE LOWER(?)")
-            boma_param = boma_constraint.replace(" boma", "").strip()
-            params.append(f"%{boma_param}%")
-        
-        where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
-        
-        # Get all village names and normalized names (filtered by constraints)
-        villages = self.conn.execute(f"""
-            SELECT village_id, name, normalized_name, lon, lat,
-                   state, county, payam, boma, data_source, verified
-            FROM villages
-            WHERE {where_sql}
-        """, params).fetchall()
+        candidates = self._partition_candidates(partitions, constraints)
+        if candidates is None:
+            village_candidates = partitions["villages"]
+            alternate_candidates = partitions["alternates"]
+        else:
+            village_candidates = [i for i in candidates if entries[i][2] is None]
+            alternate_candidates = [i for i in candidates if entries[i][2] is not None]
         
         # If no villages found with constraints, try fallback strategies
-        if len(villages) == 0:
+        if len(village_candidates) == 0:
             # Strategy 1: If we have county constraint, try exact match on county (ignore state)
             if county_constraint:
-                county_param = county_constraint.replace(" county", "").strip()
-                villages = self.conn.execute("""
-                    SELECT village_id, name, normalized_name, lon, lat,
-                           state, county, payam, boma, data_source, verified
-                    FROM villages
-                    WHERE LOWER(county) = LOWER(?)
-                """, [county_param]).fetchall()
+                code = _admin_code(county_constraint, "county")
+                village_candidates = [
+                    i for i in partitions["by_level"]["county"].get(code, []) if entries[i][2] is None
+                ]
             
             # Strategy 2: If still no results and we have state constraint, try state only (ignore county)
-            if len(villages) == 0 and state_constraint:
-                state_param = state_constraint.replace(" state", "").strip()
-                villages = self.conn.execute("""
-                    SELECT village_id, name, normalized_name, lon, lat,
-                           state, county, payam, boma, data_source, verified
-                    FROM villages
-                    WHERE LOWER(state) LIKE LOWER(?)
-                """, [f"%{state_param}%"]).fetchall()
+            if len(village_candidates) == 0 and state_constraint:
+                candidates = self._partition_candidates(partitions, {"state": state_constraint})
+                village_candidates = [i for i in candidates if entries[i][2] is None]
             
             # Strategy 3: If still no results, search all villages (no constraints)
             # This is a last resort - we'll filter by constraints later in the matching logic
-            if len(villages) == 0:
-                villages = self.conn.execute("""
-                    SELECT village_id, name, normalized_name, lon, lat,
-                           state, county, payam, boma, data_source, verified
-                    FROM villages
-                """).fetchall()
-        
-        # Build search strings list
-        search_strings = []
-        village_map = {}  # Map index to village data
-        
-        for idx, (v_id, name, norm_name, lon, lat, state, county, payam, boma, source, verified) in enumerate(villages):
-            search_strings.append(norm_name)
-            village_map[idx] = {
-                "village_id": v_id,
-                "name": name,
-                "normalized_name": norm_name,
-                "lon": lon,
-                "lat": lat,
-                "state": state,
-                "county": county,
-                "payam": payam,
-                "boma": boma,
-                "data_source": source,
-                "verified": verified
-            }
-        
-        # Search alternate names if requested (with constraints)
-        if include_alternates:
-            alt_where_clauses = []
-            alt_params = []
-            
-            # STRICT constraint filtering for alternate names too
-            if state_constraint:
-                alt_where_clauses.append("LOWER(v.state) LIKE LOWER(?)")
-                state_param = state_constraint.replace(" state", "").strip()
-                alt_params.append(f"%{state_param}%")
-            if county_constraint:
-                alt_where_clauses.append("LOWER(v.county) LIKE LOWER(?)")
-                county_param = county_constraint.replace(" county", "").strip()
-                alt_params.append(f"%{county_param}%")
-            if payam_constraint:
-                alt_where_clauses.append("LOWER(v.payam) LIKE LOWER(?)")
-                payam_param = payam_constraint.replace(" payam", "").strip()
-                alt_params.append(f"%{payam_param}%")
-            if boma_constraint:
-                alt_where_clauses.append("LOWER(v.boma) LIKE LOWER(?)")
-                boma_param = boma_constraint.replace(" boma", "").strip()
-                alt_params.append(f"%{boma_param}%")
-            
-            alt_where_sql = " AND ".join(alt_where_clauses) if alt_where_clauses else "1=1"
-            
-            alternates = self.conn.execute(f"""
-                SELECT van.village_id, van.alternate_name, van.normalized_alternate_name,
-                       v.village_id, v.name, v.normalized_name, v.lon, v.lat,
-                       v.state, v.county, v.payam, v.boma, v.data_source, v.verified
-                FROM village_alternate_names van
-                JOIN villages v ON van.village_id = v.village_id
-                WHERE {alt_where_sql}
-            """, alt_params).fetchall()
-            
-            alt_start_idx = len(search_strings)
-            for idx, (v_id, alt_name, norm_alt_name, v_id2, name, norm_name, lon, lat, state, county, payam, boma, source, verified) in enumerate(alternates):
-                search_idx = alt_start_idx + idx
-                search_strings.append(norm_alt_name)
-                village_map[search_idx] = {
-                    "village_id": v_id,
-                    "name": name,
-                    "normalized_name": norm_name,
-                    "lon": lon,
-                    "lat": lat,
-                    "state": state,
-                    "county": county,
-                    "payam": payam,
-                    "boma": boma,
-                    "data_source": source,
-                    "verified": verified,
-                    "matched_alternate_name": alt_name
-                }
+            if len(village_candidates) == 0:
+                village_candidates = partitions["villages"]
+        
+        # Entries searched, as a mask over all entries (None: every entry)
+        pool_size = len(village_candidates) + (len(alternate_candidates) if include_alternates else 0)
+        pool_mask = None
+        if pool_size < len(entries):
+            pool_mask = np.zeros(len(entries), dtype=bool)
+            if village_candidates is partitions["villages"]:
+                pool_mask[:len(village_candidates)] = True
+            else:
+                pool_mask[village_candidates] = True
+            if include_alternates and alternate_candidates is partitions["alternates"]:
+                pool_mask[len(partitions["villages"]):] = True
+            elif include_alternates:
+                pool_mask[alternate_candidates] = True
+        
+        # Distinct search strings with their entries (villages first, then
+        # alternate names); large pools only keep the q-gram shortlist
+        groups = self._shortlist_groups(partitions, pool_size, normalized_query, pool_mask)
+        if groups is None:
+            selected = list(village_candidates)
+            if include_alternates:
+                selected.extend(alternate_candidates)
+            by_string: Dict[str, List[int]] = {}
+            for i in selected:
+                by_string.setdefault(entries[i][0], []).append(i)
+            groups = list(by_string.items())
+        
+        search_strings = [name for name, _ in groups]
+        normalized_strings = [entries[group[0]][1] for _, group in groups]
         
         # FIRST: Try exact match (case-insensitive, normalized)
         # This is critical - if the village name exactly matches, use it immediately
         exact_match_idx = None
-        for idx, search_str in enumerate(search_strings):
-            # search_str is already normalized_name from DB, but normalize again to be safe
-            norm_search = normalize_text(search_str)
+        for idx, norm_search in enumerate(normalized_strings):
             if norm_search == normalized_query:
                 exact_match_idx = idx
                 break
         
-        if exact_match_idx is not None and exact_match_idx in village_map:
+        if exact_match_idx is not None:
             # Found exact match - return it immediately with high score
-            village_data = village_map[exact_match_idx].copy()
+            village_data = entries[groups[exact_match_idx][1][0]][3].copy()
             village_data["score"] = 1.0  # Perfect match
             return [village_data]
         
-        # SECOND: Try substring exact match (e.g., "abiemnom" in "abiemnom town")
+        # SECOND: Probe the phonetic key - spelling variants of the same name
+        # (Bentui/Bentiu, Abiemnom/Abiemnhom) share it, so only those need scoring
+        key_hits = [
+            i for i in partitions["by_key"].get(phonetic_key(normalized_query), ())
+            if pool_mask is None or pool_mask[i]
+        ]
+        if key_hits:
+            key_strings = [entries[i][0] for i in key_hits]
+            key_matches = fuzzy_match(normalized_query, key_strings, threshold, limit * 2)
+            if key_matches:
+                inc("village_key_probe_total", result="hit")
+                return self._village_results(
+                    key_matches, [entries[i][3] for i in key_hits], constraints, limit
+                )
+        inc("village_key_probe_total", result="miss")
+        
+        # THIRD: Try substring exact match (e.g., "abiemnom" in "abiemnom town")
         # Prioritize matches where query is contained in name (query is the core name)
         substring_match_idx = None
         best_substring_score = 0.0
         
-        for idx, search_str in enumerate(search_strings):
-            norm_search = normalize_text(search_str)
+        for idx, norm_search in enumerate(normalized_strings):
+            if not norm_search:
+                continue
             
             # Case 1: Query is contained in name (e.g., "abiemnom" in "abiemnom town")
             # This is the GOOD case - query is the core name, name has suffix
@@ -1214,31 +2242,47 @@ class DuckDBStore:
                         substring_match_idx = idx
         
         # Only use substring match if it's a good quality match
-        if substring_match_idx is not None and best_substring_score >= 0.5 and substring_match_idx in village_map:
+        if substring_match_idx is not None and best_substring_score >= 0.5:
             # Found good substring match - return it with high score
-            village_data = village_map[substring_match_idx].copy()
+            village_data = entries[groups[substring_match_idx][1][0]][3].copy()
             # Score based on how much of the name matches (0.85 to 0.95 range)
             village_data["score"] = 0.85 + (best_substring_score * 0.1)  # Scale to 0.85-0.95
             return [village_data]
         
-        # THIRD: Use progressive fuzzy matching for better accuracy
-        matches = progressive_fuzzy_match(normalized_query, search_strings, threshold, limit * 2)
+        # FOURTH: Use progressive fuzzy matching for better accuracy
+        name_matches = progressive_fuzzy_match(normalized_query, search_strings, threshold, limit * 2)
         
-        # Prepare match data for context boosting
+        # Prepare match data for context boosting: every entry of a matched name
+        matches = []
         match_data = []
-        for match_idx in range(len(search_strings)):
-            if match_idx in village_map:
-                match_data.append(village_map[match_idx])
-            else:
-                match_data.append({})
+        for name, score, group_idx in name_matches:
+            for i in groups[group_idx][1]:
+                matches.append((name, score, len(match_data)))
+                match_data.append(entries[i][3])
+        return self._village_results(matches, match_data, constraints, limit)
+    
+    @staticmethod
+    def _village_results(
+        matches: List[tuple],
+        match_data: List[Dict[str, Any]],
+        constraints: Dict[str, Optional[str]],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Boost, deduplicate and rank village matches.
+        
+        Args:
+            matches: (matched_string, score, index) tuples from the fuzzy scorers
+            match_data: Village data aligned with the scored strings
+            constraints: Admin constraints used for the context boost
+            limit: Maximum results
+        
+        Returns:
+            Villages with scores, best first
+        """
+        from app.core.fuzzy import apply_context_boost
         
         # Apply context-aware scoring boost
-        constraints = {
-            "state": state_constraint,
-            "county": county_constraint,
-            "payam": payam_constraint,
-            "boma": boma_constraint,
-        }
         boosted_matches = apply_context_boost(matches, match_data, constraints)
         
         # Map back to villages and deduplicate
@@ -1249,8 +2293,8 @@ class DuckDBStore:
             match_idx = match[2]
             score = match[1]
             
-            if match_idx in village_map:
-                village_data = village_map[match_idx].copy()
+            if match_idx < len(match_data):
+                village_data = match_data[match_idx].copy()
                 village_data["score"] = score
                 
                 # Deduplicate by village_id, keeping highest score
@@ -1358,9 +2402,19 @@ class DuckDBStore:
                 county_id = COALESCE(?, county_id),
                 payam_id = COALESCE(?, payam_id),
                 boma_id = COALESCE(?, boma_id),
+                state_code = COALESCE(?, state_code),
+                county_code = COALESCE(?, county_code),
+                payam_code = COALESCE(?, payam_code),
+                boma_code = COALESCE(?, boma_code),
                 updated_at = CURRENT_TIMESTAMP
             WHERE village_id = ?
-        """, [state, county, payam, boma, state_id, county_id, payam_id, boma_id, village_id])
+        """, [
+            state, county, payam, boma, state_id, county_id, payam_id, boma_id,
+            _admin_code(state, "state"), _admin_code(county, "county"),
+            _admin_code(payam, "payam"), _admin_code(boma, "boma"),
+            village_id
+        ])
+        self.invalidate_village_partitions()
         
         return result.rowcount > 0
     
@@ -1429,6 +2483,8 @@ class DuckDBStore:
         
         # Delete village
         result = self.conn.execute("DELETE FROM villages WHERE village_id = ?", [village_id])
+        self._record_name_changes("villages", [village_id])
+        self.invalidate_village_partitions()
         
         return result.rowcount > 0
     
@@ -1574,64 +2630,58 @@ class DuckDBStore:
         Args:
             gdf: GeoDataFrame with roads (must have 'osm_id', 'osm_type', 'geometry' columns)
         """
-        import hashlib
-        
         # Ensure WGS84
         if gdf.crs != "EPSG:4326":
             gdf = gdf.to_crs("EPSG:4326")
         
-        rows = []
-        for idx, row in gdf.iterrows():
-            osm_id = row.get("osm_id", idx)
-            osm_type = row.get("osm_type", "way")
-            feature_id = f"{osm_type}_{osm_id}"
-            
-            geometry = row.geometry
-            geometry_wkb = wkb.dumps(geometry, hex=True)
-            
-            # Create GeoJSON
-            feature_dict = {
-                "type": "Feature",
-                "geometry": json.loads(gpd.GeoSeries([geometry]).to_json())["features"][0]["geometry"],
-                "properties": {k: str(v) for k, v in row.items() if k != "geometry"}
-            }
-            geometry_geojson = json.dumps(feature_dict)
-            
-            # Compute centroid
-            centroid_lon, centroid_lat = None, None
-            if hasattr(geometry, 'centroid'):
-                centroid = geometry.centroid
-                centroid_lon = centroid.x
-                centroid_lat = centroid.y
-            
-            properties = json.dumps({k: str(v) for k, v in row.items() if k != "geometry"})
-            
-            rows.append((
-                feature_id,
-                int(osm_id),
-                osm_type,
-                row.get("name"),
-                row.get("highway"),
-                row.get("surface"),
-                geometry_wkb,
-                geometry_geojson,
-                centroid_lon,
-                centroid_lat,
-                properties,
-                datetime.now()
-            ))
+        frame = self._feature_frame(gdf)
+        frame = pd.concat([frame, self._osm_columns(gdf, "way", ["name", "highway", "surface"])], axis=1)
+        
+        centroids = shapely.centroid(gdf.geometry.to_numpy())
+        frame["centroid_lon"] = shapely.get_x(centroids)
+        frame["centroid_lat"] = shapely.get_y(centroids)
+        
+        # Upsert on feature_id to handle duplicates (the table has two
+        # unique constraints, so the conflict target must be explicit)
+        self._insert_frame(
+            "osm_roads",
+            frame.drop_duplicates("feature_id", keep="last"),
+            ["feature_id", "osm_id", "osm_type", "name", "highway", "surface", "geometry_wkb",
+             "geometry_geojson", "centroid_lon", "centroid_lat", "properties", "created_at"],
+            on_conflict="""
+                ON CONFLICT (feature_id) DO UPDATE SET
+                    name = EXCLUDED.name, highway = EXCLUDED.highway, surface = EXCLUDED.surface,
+                    geometry_wkb = EXCLUDED.geometry_wkb, geometry_geojson = EXCLUDED.geometry_geojson,
+                    centroid_lon = EXCLUDED.centroid_lon, centroid_lat = EXCLUDED.centroid_lat,
+                    properties = EXCLUDED.properties, created_at = EXCLUDED.created_at
+            """
+        )
+    
+    @staticmethod
+    def _osm_columns(gdf: gpd.GeoDataFrame, default_osm_type: str, fields: List[str]) -> pd.DataFrame:
+        """
+        Build the OSM identity columns and optional attribute fields.
         
-        if rows:
-            # Use INSERT OR REPLACE to handle duplicates
-            self.conn.executemany(
-                """
-                INSERT OR REPLACE INTO osm_roads 
-                (feature_id, osm_id, osm_type, name, highway, surface, geometry_wkb, 
-                 geometry_geojson, centroid_lon, centroid_lat, properties, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                rows
-            )
+        Args:
+            gdf: OSM features
+            default_osm_type: osm_type to use when the column is missing
+            fields: Attribute columns to copy (None where missing)
+        
+        Returns:
+            DataFrame with feature_id, osm_id, osm_type and the fields, aligned with gdf
+        """
+        osm_ids = gdf["osm_id"] if "osm_id" in gdf.columns else pd.Series(gdf.index, index=gdf.index)
+        osm_ids = osm_ids.astype("int64")
+        osm_types = gdf["osm_type"] if "osm_type" in gdf.columns else pd.Series(default_osm_type, index=gdf.index)
+        
+        columns = pd.DataFrame({
+            "feature_id": osm_types.astype(str) + "_" + osm_ids.astype(str),
+            "osm_id": osm_ids,
+            "osm_type": osm_types,
+        })
+        for field in fields:
+            columns[field] = gdf[field] if field in gdf.columns else None
+        return columns.reset_index(drop=True)
     
     def ingest_osm_pois(self, gdf: gpd.GeoDataFrame):
         """
@@ -1640,66 +2690,35 @@ class DuckDBStore:
         Args:
             gdf: GeoDataFrame with POIs (must have 'osm_id', 'osm_type', 'category', 'geometry' columns)
         """
-        import hashlib
-        
         # Ensure WGS84
         if gdf.crs != "EPSG:4326":
             gdf = gdf.to_crs("EPSG:4326")
         
-        rows = []
-        for idx, row in gdf.iterrows():
-            osm_id = row.get("osm_id", idx)
-            osm_type = row.get("osm_type", "node")
-            feature_id = f"{osm_type}_{osm_id}"
-            
-            geometry = row.geometry
-            geometry_wkb = wkb.dumps(geometry, hex=True)
-            
-            # Create GeoJSON
-            feature_dict = {
-                "type": "Feature",
-                "geometry": json.loads(gpd.GeoSeries([geometry]).to_json())["features"][0]["geometry"],
-                "properties": {k: str(v) for k, v in row.items() if k != "geometry"}
-            }
-            geometry_geojson = json.dumps(feature_dict)
-            
-            # Get coordinates (for points, use directly; for others, use centroid)
-            if isinstance(geometry, Point):
-                lon = geometry.x
-                lat = geometry.y
-            else:
-                centroid = geometry.centroid
-                lon = centroid.x
-                lat = centroid.y
-            
-            properties = json.dumps({k: str(v) for k, v in row.items() if k != "geometry"})
-            
-            rows.append((
-                feature_id,
-                int(osm_id),
-                osm_type,
-                row.get("name"),
-                row.get("category"),
-                lon,
-                lat,
-                geometry_wkb,
-                geometry_geojson,
-                properties,
-                datetime.now()
-            ))
-        
-        if rows:
-            # Use INSERT OR REPLACE to handle duplicates
-            self.conn.executemany(
-                """
-                INSERT OR REPLACE INTO osm_pois 
-                (feature_id, osm_id, osm_type, name, category, lon, lat, geometry_wkb, 
-                 geometry_geojson, properties, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                rows
-            )
+        frame = self._feature_frame(gdf)
+        frame = pd.concat([frame, self._osm_columns(gdf, "node", ["name", "category"])], axis=1)
+        
+        # Points use their own coordinates; other geometries use the centroid
+        centroids = shapely.centroid(gdf.geometry.to_numpy())
+        frame["lon"] = shapely.get_x(centroids)
+        frame["lat"] = shapely.get_y(centroids)
+        
+        # Upsert on feature_id to handle duplicates (the table has two
+        # unique constraints, so the conflict target must be explicit)
+        self._insert_frame(
+            "osm_pois",
+            frame.drop_duplicates("feature_id", keep="last"),
+            ["feature_id", "osm_id", "osm_type", "name", "category", "lon", "lat", "geometry_wkb",
+             "geometry_geojson", "properties", "created_at"],
+            on_conflict="""
+                ON CONFLICT (feature_id) DO UPDATE SET
+                    name = EXCLUDED.name, category = EXCLUDED.category,
+                    lon = EXCLUDED.lon, lat = EXCLUDED.lat,
+                    geometry_wkb = EXCLUDED.geometry_wkb, geometry_geojson = EXCLUDED.geometry_geojson,
+                    properties = EXCLUDED.properties, created_at = EXCLUDED.created_at
+            """
+        )
     
+    @timed("duckdb_query_seconds", method="get_nearby_osm_pois")
     def get_nearby_osm_pois(
         self,
         lon: float,
@@ -1783,6 +2802,7 @@ class DuckDBStore:
         
         return poi_list
     
+    @timed("duckdb_query_seconds", method="get_nearby_osm_roads")
     def get_nearby_osm_roads(
         self,
         lon: float,
@@ -1954,7 +2974,55 @@ class DuckDBStore:
         
         return gpd.GeoDataFrame(features, crs="EPSG:4326")
     
+    def get_harvest_tiles(self, run_id: str) -> Dict[str, str]:
+        """
+        Get checkpointed tiles of an Overpass harvest run.
+        
+        Args:
+            run_id: Harvest run identifier
+        
+        Returns:
+            Dictionary mapping tile keys to status ("done", "split" or "failed")
+        """
+        rows = self.conn.execute(
+            "SELECT tile_key, status FROM osm_harvest_tiles WHERE run_id = ?", [run_id]
+        ).fetchall()
+        return dict(rows)
+    
+    def mark_harvest_tile(
+        self,
+        run_id: str,
+        tile_key: str,
+        status: str,
+        element_count: Optional[int] = None
+    ):
+        """
+        Checkpoint a tile of an Overpass harvest run.
+        
+        Args:
+            run_id: Harvest run identifier
+            tile_key: Tile key
+            status: "done", "split" or "failed"
+            element_count: Number of elements harvested from the tile
+        """
+        self.conn.execute("""
+            INSERT INTO osm_harvest_tiles (run_id, tile_key, status, element_count, updated_at)
+            VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (run_id, tile_key) DO UPDATE SET
+                status = EXCLUDED.status, element_count = EXCLUDED.element_count,
+                updated_at = EXCLUDED.updated_at
+        """, [run_id, tile_key, status, element_count])
+    
+    def clear_harvest_run(self, run_id: str):
+        """
+        Forget all checkpoints of a harvest run so it starts over.
+        
+        Args:
+            run_id: Harvest run identifier
+        """
+        self.conn.execute("DELETE FROM osm_harvest_tiles WHERE run_id = ?", [run_id])
+    
     def close(self):
         """Close database connection."""
-        self.conn.close()
+        self._conn.close()
 
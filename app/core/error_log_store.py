@@ -0,0 +1,255 @@
+"""Indexed store of ERROR/CRITICAL log records for the Error Logs page.
+
+Records are ingested incrementally from the rotating JSON log: each file
+is tracked by inode with the byte offset read so far, so a rerun only
+parses lines appended since the last one, and a file keeps its offset
+when RotatingFileHandler renames it to app.log.1. Level/module filters,
+paging and statistics are then DuckDB queries over every rotated file
+instead of a re-read of the log on each Streamlit rerun.
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import duckdb
+import pandas as pd
+import pyarrow as pa
+from app.core.config import ERROR_LOG_DB_PATH
+from app.utils.log_reader import rotated_log_files
+from app.utils.metrics import inc
+
+
+ERROR_LEVELS = ("ERROR", "CRITICAL")
+
+# Bytes parsed per read while catching up on a file
+READ_CHUNK_SIZE = 4 * 1024 * 1024
+
+_MARKERS = tuple(f'"level": "{level}"'.encode("utf-8") for level in ERROR_LEVELS)
+
+
+def _file_head(path: Path) -> str:
+    """Digest of the first line, to tell a reused inode from the same file."""
+    with open(path, "rb") as f:
+        first_line = f.readline()
+    return hashlib.sha1(first_line).hexdigest() if first_line.endswith(b"\n") else ""
+
+
+def _parse_errors(data: bytes, file_id: int, start: int) -> List[Dict[str, Any]]:
+    """Rows for the error records among complete lines of data."""
+    rows = []
+    offset = start
+    for line in data.splitlines(keepends=True):
+        line_offset = offset
+        offset += len(line)
+        if not any(marker in line for marker in _MARKERS):
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(record, dict) or record.get("level") not in ERROR_LEVELS:
+            continue
+        rows.append({
+            "file_id": file_id,
+            "offset": line_offset,
+            "ts": record.get("timestamp"),
+            "level": record.get("level"),
+            "module": record.get("module", "unknown"),
+            "function": record.get("function"),
+            "error_type": record.get("error_type", "Unknown"),
+            "message": record.get("error_message", record.get("message")),
+            "record": line.decode("utf-8", errors="replace").strip(),
+        })
+    return rows
+
+
+class ErrorLogStore:
+    """DuckDB table of error records ingested from the rotating log files."""
+    
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Open (or create) the error log database.
+        
+        Args:
+            db_path: DuckDB file (default from config)
+        """
+        self.db_path = db_path or ERROR_LOG_DB_PATH
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = duckdb.connect(str(self.db_path))
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS error_logs (
+                file_id BIGINT,
+                "offset" BIGINT,
+                ts TIMESTAMP,
+                level VARCHAR,
+                module VARCHAR,
+                function VARCHAR,
+                error_type VARCHAR,
+                message VARCHAR,
+                record VARCHAR
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS error_log_files (
+                file_id BIGINT PRIMARY KEY,
+                head VARCHAR,
+                "offset" BIGINT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_error_logs_level ON error_logs(level)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_error_logs_module ON error_logs(module)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_error_logs_ts ON error_logs(ts)")
+    
+    def ingest(self, log_file: Path) -> int:
+        """
+        Ingest error records appended to the log and its backups since the last call.
+        
+        Rows of files that rotated out of existence are dropped.
+        
+        Args:
+            log_file: Active log file
+        
+        Returns:
+            Number of records ingested
+        """
+        ingested = 0
+        with self._lock:
+            seen = []
+            for path in rotated_log_files(log_file):
+                try:
+                    file_id = path.stat().st_ino
+                    head = _file_head(path)
+                except OSError:
+                    continue
+                seen.append(file_id)
+                ingested += self._ingest_file(path, file_id, head)
+            
+            if seen:
+                placeholders = ", ".join("?" for _ in seen)
+                self.conn.execute(f"DELETE FROM error_logs WHERE file_id NOT IN ({placeholders})", seen)
+                self.conn.execute(f"DELETE FROM error_log_files WHERE file_id NOT IN ({placeholders})", seen)
+            else:
+                self.conn.execute("DELETE FROM error_logs")
+                self.conn.execute("DELETE FROM error_log_files")
+        inc("error_log_ingested_total", ingested)
+        return ingested
+    
+    def _ingest_file(self, path: Path, file_id: int, head: str) -> int:
+        """Parse one file from its stored offset; caller holds the lock."""
+        row = self.conn.execute(
+            'SELECT head, "offset" FROM error_log_files WHERE file_id = ?', [file_id]
+        ).fetchone()
+        offset = 0
+        if row is not None:
+            stored_head, offset = row
+            # A different first line or a shorter file means the inode was reused
+            if stored_head != head or path.stat().st_size < offset:
+                self.conn.execute("DELETE FROM error_logs WHERE file_id = ?", [file_id])
+                offset = 0
+        
+        ingested = 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                data = f.read(READ_CHUNK_SIZE)
+                end = data.rfind(b"\n") + 1
+                if end == 0:
+                    break
+                # Partial last line is read again next time
+                f.seek(offset + end)
+                rows = _parse_errors(data[:end], file_id, offset)
+                offset += end
+                if rows:
+                    self._insert(rows)
+                    ingested += len(rows)
+        
+        self.conn.execute(
+            'INSERT OR REPLACE INTO error_log_files (file_id, head, "offset") VALUES (?, ?, ?)',
+            [file_id, head, offset]
+        )
+        return ingested
+    
+    def _insert(self, rows: List[Dict[str, Any]]):
+        frame = pd.DataFrame(rows)
+        frame["ts"] = pd.to_datetime(frame["ts"], errors="coerce")
+        self.conn.register("_error_log_rows", pa.Table.from_pandas(frame, preserve_index=False))
+        try:
+            self.conn.execute("""
+                INSERT INTO error_logs (file_id, "offset", ts, level, module, function, error_type, message, record)
+                SELECT file_id, "offset", ts, level, module, function, error_type, message, record
+                FROM _error_log_rows
+            """)
+        finally:
+            self.conn.unregister("_error_log_rows")
+    
+    @staticmethod
+    def _where(level: Optional[str], module: Optional[str]) -> tuple:
+        clauses, params = [], []
+        if level:
+            clauses.append("level = ?")
+            params.append(level)
+        if module:
+            clauses.append("module = ?")
+            params.append(module)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+    
+    def query_errors(
+        self,
+        level: Optional[str] = None,
+        module: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        A page of error records, newest first.
+        
+        Args:
+            level: Only this level (None for all)
+            module: Only this module (None for all)
+            limit: Page size
+            offset: Records to skip
+        
+        Returns:
+            Parsed log records
+        """
+        where, params = self._where(level, module)
+        with self._lock:
+            rows = self.conn.execute(
+                f'SELECT record FROM error_logs{where} ORDER BY ts DESC NULLS LAST, "offset" DESC LIMIT ? OFFSET ?',
+                params + [limit, offset]
+            ).fetchall()
+        return [json.loads(record) for (record,) in rows]
+    
+    def count_errors(self, level: Optional[str] = None, module: Optional[str] = None) -> int:
+        """
+        Number of error records matching the filters.
+        
+        Args:
+            level: Only this level (None for all)
+            module: Only this module (None for all)
+        
+        Returns:
+            Record count
+        """
+        where, params = self._where(level, module)
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM error_logs{where}", params).fetchone()[0]
+    
+    def statistics(self) -> Dict[str, Any]:
+        """Totals by level, module and error type."""
+        stats = {"total_errors": 0, "by_level": {}, "by_module": {}, "by_error_type": {}}
+        with self._lock:
+            for key, column in (("by_level", "level"), ("by_module", "module"), ("by_error_type", "error_type")):
+                rows = self.conn.execute(
+                    f"SELECT {column}, COUNT(*) AS n FROM error_logs GROUP BY {column} ORDER BY n DESC"
+                ).fetchall()
+                stats[key] = {name: count for name, count in rows}
+        stats["total_errors"] = sum(stats["by_level"].values())
+        return stats
+    
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self.conn.close()
@@ -1,5 +1,6 @@
 """Fuzzy matching utilities using RapidFuzz."""
 from typing import List, Tuple, Optional, Dict, Any
+import numpy as np
 from rapidfuzz import fuzz, process
 from rapidfuzz.utils import default_process
 from app.core.normalization import normalize_text
@@ -89,6 +90,58 @@ def fuzzy_match(
     return sorted_results[:limit]
 
 
+def fuzzy_match_many(
+    queries: List[str],
+    choices: List[str],
+    threshold: float = 0.7,
+    limit: int = 5
+) -> List[List[Tuple[str, float, int]]]:
+    """
+    Fuzzy match several normalized queries against the same choices at once.
+    
+    Scores every query against every choice in one matrix pass per scorer
+    (token sort ratio, partial ratio, WRatio), keeps the best of the three
+    and applies the same substring length penalty as fuzzy_match. Queries
+    and choices are expected to be normalized already.
+    
+    Args:
+        queries: Normalized query strings
+        choices: Normalized candidate strings
+        threshold: Minimum similarity score (0-1)
+        limit: Maximum number of results per query
+        
+    Returns:
+        One list of (matched_string, score, index) tuples per query, sorted
+        by score descending
+    """
+    if not queries or not choices:
+        return [[] for _ in queries]
+    
+    score_cutoff = int(threshold * 100)
+    scores = None
+    for scorer in (fuzz.token_sort_ratio, fuzz.partial_ratio, fuzz.WRatio):
+        matrix = process.cdist(
+            queries, choices, scorer=scorer, score_cutoff=score_cutoff, dtype=np.float64, workers=-1
+        )
+        scores = matrix if scores is None else np.maximum(scores, matrix)
+    scores = scores / 100.0
+    
+    # Penalize substring matches where one side is much shorter
+    choice_lengths = np.fromiter((len(c) for c in choices), dtype=np.float64, count=len(choices))
+    for query_idx, choice_idx in zip(*np.nonzero(scores)):
+        query, choice = queries[query_idx], choices[choice_idx]
+        if query in choice or choice in query:
+            query_len, choice_len = len(query), choice_lengths[choice_idx]
+            if min(query_len, choice_len) / max(query_len, choice_len, 1) < 0.8:
+                scores[query_idx, choice_idx] *= 0.3 if query_len > choice_len else 0.5
+    
+    results = []
+    for row in scores:
+        top = np.argsort(-row, kind="stable")[:limit]
+        results.append([(choices[idx], float(row[idx]), int(idx)) for idx in top if row[idx] > 0])
+    return results
+
+
 def progressive_fuzzy_match(
     query: str,
     choices: List[str],
@@ -1,4 +1,5 @@
 """Core geocoding engine with hierarchical resolution."""
+import threading
 from typing import Optional, List, Dict, Any
 from shapely.geometry import Point
 import geopandas as gpd
@@ -9,8 +10,10 @@ from app.core.fuzzy import fuzzy_match, progressive_fuzzy_match, apply_context_b
 from app.core.spatial import get_admin_hierarchy
 from app.core.centroids import compute_centroid
 from app.core.azure_ai import AzureAIParser
-from app.core.config import FUZZY_THRESHOLD, LAYER_NAMES
+from app.core.config import FUZZY_THRESHOLD, LAYER_NAMES, CANDIDATE_PRUNING
 from app.core.security import sanitize_layer_name
+from app.utils.logging import log_structured
+from app.utils.metrics import observe, inc, timed
 
 
 class Geocoder:
@@ -26,12 +29,33 @@ class Geocoder:
         self.db_store = db_store
         self.azure_parser = AzureAIParser()
         self.admin_layers = {}  # Cache for loaded admin layers
+        self._admin_layers_lock = threading.Lock()
+    
+    def preload(self):
+        """
+        Load the admin layers and the store's name indexes up front.
+        
+        Used for the process-wide geocoder so concurrent sessions read
+        fully built indexes instead of racing to build them.
+        """
+        self._load_admin_layers()
+        self.db_store._get_name_index_entries()
+        self.db_store.get_candidate_pruner()
+        self.db_store._get_qgram_index()
     
     def _load_admin_layers(self):
         """Load admin layers from DuckDB into memory."""
         if self.admin_layers:
             return
-        
+        with self._admin_layers_lock:
+            if self.admin_layers:
+                return
+            # Published in one assignment, so readers never see a partial dict
+            self.admin_layers = self._read_admin_layers()
+    
+    def _read_admin_layers(self) -> Dict[str, gpd.GeoDataFrame]:
+        """Read every admin layer from DuckDB as a GeoDataFrame."""
+        admin_layers = {}
         for layer_name in LAYER_NAMES.values():
             # Validate layer name (defense in depth)
             sanitized_layer = sanitize_layer_name(layer_name)
@@ -69,9 +93,11 @@ class Geocoder:
                 # Set feature_id as index for easier lookup
                 if "feature_id" in gdf.columns:
                     gdf = gdf.set_index("feature_id")
-                self.admin_layers[layer_name] = gdf
+                admin_layers[layer_name] = gdf
+        return admin_layers
     
-    def geocode(self, text: str, use_cache: bool = True) -> GeocodeResult:
+    @timed("geocode_seconds")
+    def geocode(self, text: str, use_cache: bool = True, include_alternatives: bool = False) -> GeocodeResult:
         """
         Geocode a free text location string.
         
@@ -84,24 +110,33 @@ class Geocoder:
         Args:
             text: Free text location string
             use_cache: Whether to use cache
+            include_alternatives: Also compute alternative matches (see
+                get_alternatives, which can be called later instead)
             
         Returns:
             GeocodeResult object
         """
-        normalized = normalize_text(text)
-        
-        # Check cache - BUT skip cache if constraints are specified (to avoid stale wrong results)
-        constraints = parse_hierarchical_constraints(text)
-        has_constraints = any(constraints.values())
+        with observe("geocode_stage_seconds", stage="normalize"):
+            normalized = normalize_text(text)
+            
+            # Check cache - BUT skip cache if constraints are specified (to avoid stale wrong results)
+            constraints = parse_hierarchical_constraints(text)
+            has_constraints = any(constraints.values())
         
         if use_cache and not has_constraints:
-            cached = self.db_store.get_cache(normalized)
+            with observe("geocode_stage_seconds", stage="cache"):
+                cached = self.db_store.get_cache(normalized)
             if cached:
-                return GeocodeResult(
+                inc("geocode_cache_total", result="hit")
+                result = GeocodeResult(
                     input_text=text,
                     normalized_text=normalized,
                     **cached
                 )
+                if include_alternatives:
+                    self.get_alternatives(result)
+                return result
+            inc("geocode_cache_total", result="miss")
         
         # Load admin layers if needed
         self._load_admin_layers()
@@ -116,7 +151,8 @@ class Geocoder:
         
         # Optionally use Azure AI for extraction
         if self.azure_parser.enabled:
-            ai_candidates = self.azure_parser.extract_candidates(text)
+            with observe("geocode_stage_seconds", stage="ai_extraction"):
+                ai_candidates = self.azure_parser.extract_candidates(text)
             # Merge AI candidates into deterministic candidates
             for level_candidates in ai_candidates.values():
                 if isinstance(level_candidates, list):
@@ -134,15 +170,57 @@ class Geocoder:
             if ai_candidates.get("village_candidates"):
                 constraints["village"] = constraints["village"] or normalize_text(ai_candidates["village_candidates"][0])
         
+        # Only score candidates that can reach the match threshold
+        with observe("geocode_stage_seconds", stage="prune"):
+            scored_candidates = self._prune_candidates(candidates)
+        
         # Try resolution in order: village -> boma -> payam (with constraints)
-        result = self._resolve_hierarchical(candidates, text, normalized, constraints)
+        result = self._resolve_hierarchical(scored_candidates, text, normalized, constraints)
+        inc("geocode_results_total", layer=result.resolved_layer or "none")
         
         # Cache result
         if use_cache:
             self.db_store.set_cache(result.to_dict())
         
+        if include_alternatives:
+            self.get_alternatives(result, candidates)
+        
         return result
     
+    def _prune_candidates(self, candidates: set) -> set:
+        """
+        Drop candidates that cannot plausibly match any gazetteer name.
+        
+        Each candidate costs one fuzzy search per resolution stage, so the
+        number pruned is recorded per query.
+        
+        Args:
+            candidates: Set of candidate place name strings
+            
+        Returns:
+            Set of candidates to fuzzy-score
+        """
+        if not CANDIDATE_PRUNING or not candidates:
+            return candidates
+        
+        pruner = self.db_store.get_candidate_pruner()
+        if not len(pruner):
+            # Nothing indexed yet; let the searches decide
+            return candidates
+        
+        kept = pruner.prune(candidates)
+        inc("geocode_candidates_total", len(candidates), stage="extracted")
+        inc("geocode_candidates_total", len(kept), stage="scored")
+        log_structured(
+            "debug",
+            "Pruned geocode candidates",
+            log_key="geocode_candidate_pruning",
+            extracted=len(candidates),
+            scored=len(kept),
+            pruned=len(candidates) - len(kept)
+        )
+        return kept
+    
     def _resolve_hierarchical(
         self,
         candidates: set,
@@ -166,29 +244,34 @@ class Geocoder:
             constraints = {}
         
         # 1. Try village/settlement point match (with constraints)
-        village_result = self._try_settlement_match(candidates, constraints)
+        with observe("geocode_stage_seconds", stage="settlement"):
+            village_result = self._try_settlement_match(candidates, constraints)
         if village_result:
             village_result.input_text = original_text
             village_result.normalized_text = normalized_text
             return village_result
         
         # 2. Try Boma polygon match (with constraints)
-        boma_result = self._try_polygon_match("admin4_boma", candidates, constraints=constraints)
+        with observe("geocode_stage_seconds", stage="polygon", layer="admin4_boma"):
+            boma_result = self._try_polygon_match("admin4_boma", candidates, constraints=constraints)
         if boma_result:
             boma_result.input_text = original_text
             boma_result.normalized_text = normalized_text
             return boma_result
         
         # 3. Try Payam polygon match (with constraints)
-        payam_result = self._try_polygon_match("admin3_payam", candidates, constraints=constraints)
+        with observe("geocode_stage_seconds", stage="polygon", layer="admin3_payam"):
+            payam_result = self._try_polygon_match("admin3_payam", candidates, constraints=constraints)
         if payam_result:
             payam_result.input_text = original_text
             payam_result.normalized_text = normalized_text
             return payam_result
         
         # 4. Check for County or State only (do not return coordinates, with constraints)
-        county_result = self._try_polygon_match("admin2_county", candidates, return_coords=False, constraints=constraints)
-        state_result = self._try_polygon_match("admin1_state", candidates, return_coords=False, constraints=constraints)
+        with observe("geocode_stage_seconds", stage="polygon", layer="admin2_county"):
+            county_result = self._try_polygon_match("admin2_county", candidates, return_coords=False, constraints=constraints)
+        with observe("geocode_stage_seconds", stage="polygon", layer="admin1_state"):
+            state_result = self._try_polygon_match("admin1_state", candidates, return_coords=False, constraints=constraints)
         
         if county_result or state_result:
             # Return best match suggestions without coordinates
@@ -349,9 +432,6 @@ class Geocoder:
         # Get admin hierarchy
         hierarchy = get_admin_hierarchy(point, self.admin_layers)
         
-        # Get alternatives
-        alternatives = self._get_alternatives("settlements", candidates, limit=5)
-        
         return GeocodeResult(
             input_text="",  # Set by caller
             normalized_text="",  # Set by caller
@@ -365,8 +445,7 @@ class Geocoder:
             county=hierarchy.get("county"),
             payam=hierarchy.get("payam"),
             boma=hierarchy.get("boma"),
-            village=best_match["canonical_name"],
-            alternatives=alternatives
+            village=best_match["canonical_name"]
         )
     
     def _try_polygon_match(
@@ -420,13 +499,15 @@ class Geocoder:
         if not geometry:
             return None
         
-        # Compute centroid if returning coordinates
+        # Compute centroid if returning coordinates (stored at ingest when available)
         lon, lat = None, None
         if return_coords:
-            try:
-                lon, lat = compute_centroid(geometry)
-            except Exception:
-                pass
+            lon, lat = feature.get("centroid_lon"), feature.get("centroid_lat")
+            if lon is None or lat is None:
+                try:
+                    lon, lat = compute_centroid(geometry)
+                except Exception:
+                    lon, lat = None, None
         
         # Get admin hierarchy
         if lon and lat:
@@ -475,9 +556,6 @@ class Geocoder:
         if hierarchy_field:
             hierarchy[hierarchy_field] = best_match["canonical_name"]
         
-        # Get alternatives
-        alternatives = self._get_alternatives(layer_name, candidates, limit=5)
-        
         return GeocodeResult(
             input_text="",  # Set by caller
             normalized_text="",  # Set by caller
@@ -490,10 +568,42 @@ class Geocoder:
             state=hierarchy.get("state"),
             county=hierarchy.get("county"),
             payam=hierarchy.get("payam"),
-            boma=hierarchy.get("boma"),
-            alternatives=alternatives
+            boma=hierarchy.get("boma")
         )
     
+    def get_alternatives(
+        self,
+        result: GeocodeResult,
+        candidates: Optional[set] = None,
+        limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        """
+        Compute alternative matches for a geocode result on demand.
+        
+        Alternatives are only computed when asked for, since they need a
+        second fuzzy search. The list is stored on result.alternatives.
+        
+        Args:
+            result: Result returned by geocode
+            candidates: Candidate strings used for the match (re-extracted from
+                the input text if not given)
+            limit: Maximum alternatives
+            
+        Returns:
+            List of alternatives (layer, feature_id, name, score, lon, lat)
+        """
+        # Village matches are final; alternatives come from the name index layers
+        if not result.resolved_layer or result.resolved_layer == "villages":
+            result.alternatives = []
+            return result.alternatives
+        
+        if candidates is None:
+            candidates = extract_candidates(result.input_text)
+        
+        with observe("geocode_stage_seconds", stage="alternatives"):
+            result.alternatives = self._get_alternatives(result.resolved_layer, candidates, limit=limit)
+        return result.alternatives
+    
     def _get_alternatives(
         self,
         layer: str,
@@ -503,26 +613,24 @@ class Geocoder:
         """Get alternative matches for a layer."""
         alternatives = []
         
-        for candidate in candidates:
-            matches = self.db_store.search_name_index(
-                candidate,
-                layer=layer,
-                threshold=FUZZY_THRESHOLD * 0.8,  # Lower threshold for alternatives
-                limit=limit
-            )
-            
+        # Score every candidate against the layer in one pass
+        all_matches = self.db_store.search_name_index_many(
+            list(candidates),
+            layer=layer,
+            threshold=FUZZY_THRESHOLD * 0.8,  # Lower threshold for alternatives
+            limit=limit
+        )
+        
+        for matches in all_matches.values():
             for match in matches:
-                feature = self.db_store.get_feature(layer, match["feature_id"])
-                if feature:
-                    alt = {
-                        "layer": layer,
-                        "feature_id": match["feature_id"],
-                        "name": match["canonical_name"],
-                        "score": match["score"],
-                        "lon": feature.get("centroid_lon"),
-                        "lat": feature.get("centroid_lat"),
-                    }
-                    alternatives.append(alt)
+                alternatives.append({
+                    "layer": layer,
+                    "feature_id": match["feature_id"],
+                    "name": match["canonical_name"],
+                    "score": match["score"],
+                    "lon": match["lon"],
+                    "lat": match["lat"],
+                })
         
         # Deduplicate and sort
         seen = set()
@@ -1,14 +1,18 @@
 """HRD Incident Extraction from Field Office Daily Reports using LLM."""
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 import requests
+from app.core.config import HRD_CHUNK_TOKENS, HRD_EXTRACTION_WORKERS, HRD_MAP_REDUCE, HRD_TOKEN_BUDGET
+from app.core.hrd_map_reduce import CHARS_PER_TOKEN, TokenBudget, estimate_tokens, merge_incidents, split_report
 from app.core.ollama_location_extractor import OllamaLocationExtractor
 from app.core.azure_ai import AzureAIParser
 from app.core.geocoder import Geocoder
 from app.core.duckdb_store import DuckDBStore
 from app.utils.logging import log_error
+from app.utils.metrics import inc, observe
 
 
 class HRDIncident:
@@ -66,6 +70,33 @@ class HRDIncident:
             "Lat": self.lat,
             "long": self.lon,
         }
+    
+    def to_record(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict keyed by attribute name (dates as ISO strings)."""
+        return {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in vars(self).items()
+        }
+    
+    @classmethod
+    def from_record(cls, record: Dict[str, Any]) -> "HRDIncident":
+        """
+        Rebuild an incident from to_record output.
+        
+        Args:
+            record: Dict produced by to_record
+            
+        Returns:
+            HRDIncident with the recorded values (unknown keys are ignored)
+        """
+        incident = cls()
+        for key, value in record.items():
+            if not hasattr(incident, key):
+                continue
+            if key in ("date_of_incident", "date_of_interview") and value:
+                value = datetime.fromisoformat(value)
+            setattr(incident, key, value)
+        return incident
 
 
 class HRDIncidentExtractor:
@@ -73,7 +104,11 @@ class HRDIncidentExtractor:
     
     def __init__(self, ollama_extractor: Optional[OllamaLocationExtractor] = None, 
                  azure_parser: Optional[AzureAIParser] = None,
-                 geocoder: Optional[Geocoder] = None):
+                 geocoder: Optional[Geocoder] = None,
+                 map_reduce: bool = HRD_MAP_REDUCE,
+                 chunk_tokens: int = HRD_CHUNK_TOKENS,
+                 token_budget: int = HRD_TOKEN_BUDGET,
+                 max_workers: int = HRD_EXTRACTION_WORKERS):
         """
         Initialize incident extractor.
         
@@ -81,9 +116,18 @@ class HRDIncidentExtractor:
             ollama_extractor: Ollama location extractor
             azure_parser: Azure AI parser
             geocoder: Geocoder for location resolution
+            map_reduce: Extract every chunk of a report and merge the results,
+                instead of a single pass over the truncated report
+            chunk_tokens: Report tokens per chunk
+            token_budget: Prompt tokens in flight across concurrent chunks
+            max_workers: Chunks extracted concurrently
         """
         self.ollama_extractor = ollama_extractor or OllamaLocationExtractor()
         self.azure_parser = azure_parser or AzureAIParser()
+        self.map_reduce = map_reduce
+        self.chunk_chars = chunk_tokens * CHARS_PER_TOKEN
+        self.token_budget = TokenBudget(token_budget)
+        self.max_workers = max_workers
         self.geocoder = geocoder
         if not geocoder:
             try:
@@ -106,13 +150,53 @@ class HRDIncidentExtractor:
         if not text or len(text.strip()) < 50:
             return []
         
-        # Use LLM to extract structured incidents
+        if not self.map_reduce:
+            return self._extract_chunk(text, field_office)
+        
+        chunks = split_report(text, self.chunk_chars)
+        inc("hrd_extraction_chunks_total", len(chunks))
+        
+        # Map: chunks are extracted concurrently within the token budget. The
+        # geocoder's DuckDB connection is not thread-safe, so workers skip
+        # geocoding and the merged incidents are geocoded here.
+        workers = max(1, min(self.max_workers, len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda chunk: self._extract_budgeted(chunk, field_office), chunks))
+        
+        # Reduce: incidents repeated across chunks (highlights vs body) are merged
+        extracted = [incident for result in results for incident in result]
+        incidents = merge_incidents(extracted)
+        inc("hrd_extraction_duplicates_total", len(extracted) - len(incidents))
+        
+        for incident in incidents:
+            self._geocode_incident(incident)
+        return incidents
+    
+    def _extract_budgeted(self, chunk: str, field_office: Optional[str]) -> List[HRDIncident]:
+        """Extract one chunk once its tokens fit in the budget."""
+        with self.token_budget.reserve(estimate_tokens(chunk)):
+            return self._extract_chunk(chunk, field_office, max_chars=len(chunk), geocode=False)
+    
+    def _extract_chunk(self, text: str, field_office: Optional[str],
+                       max_chars: Optional[int] = None, geocode: bool = True) -> List[HRDIncident]:
+        """
+        Single extraction pass over text: Ollama first, Azure AI as fallback.
+        
+        Args:
+            text: Report text or chunk
+            field_office: Field office name (if known)
+            max_chars: Characters sent to the LLM (default: each provider's own limit)
+            geocode: Geocode incident locations while parsing
+        
+        Returns:
+            List of HRDIncident objects
+        """
         incidents = []
         
         # Try Ollama first (fast, local)
         if self.ollama_extractor.enabled:
             try:
-                incidents = self._extract_with_ollama(text, field_office)
+                incidents = self._extract_with_ollama(text, field_office, max_chars or 2000, geocode)
                 if incidents:
                     return incidents
             except Exception as e:
@@ -121,7 +205,7 @@ class HRDIncidentExtractor:
         # Fallback to Azure AI
         if self.azure_parser.enabled:
             try:
-                incidents = self._extract_with_azure(text, field_office)
+                incidents = self._extract_with_azure(text, field_office, max_chars or 3000, geocode)
                 if incidents:
                     return incidents
             except Exception as e:
@@ -129,10 +213,11 @@ class HRDIncidentExtractor:
         
         return incidents
     
-    def _extract_with_ollama(self, text: str, field_office: Optional[str]) -> List[HRDIncident]:
+    def _extract_with_ollama(self, text: str, field_office: Optional[str],
+                             max_chars: int = 2000, geocode: bool = True) -> List[HRDIncident]:
         """Extract incidents using Ollama."""
         # Truncate text for efficiency
-        text_truncated = text[:2000] if len(text) > 2000 else text
+        text_truncated = text[:max_chars] if len(text) > max_chars else text
         
         prompt = f"""Extract human rights incidents from this UNMISS HRD report.
 
@@ -162,19 +247,20 @@ Return JSON array only, no other text."""
 
         try:
             base_url = self.ollama_extractor.base_url or "http://localhost:11434"
-            response = requests.post(
-                f"{base_url}/api/generate",
-                json={
-                    "model": self.ollama_extractor.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,
-                        "num_predict": 1500,  # Reduced for speed
-                    }
-                },
-                timeout=20  # Reduced timeout
-            )
+            with observe("llm_request_seconds", provider="ollama", operation="_extract_with_ollama"):
+                response = requests.post(
+                    f"{base_url}/api/generate",
+                    json={
+                        "model": self.ollama_extractor.model,
+                        "prompt": prompt,
+                        "stream": False,
+                        "options": {
+                            "temperature": 0.1,
+                            "num_predict": 1500,  # Reduced for speed
+                        }
+                    },
+                    timeout=20  # Reduced timeout
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -204,7 +290,7 @@ Return JSON array only, no other text."""
                         incidents = []
                         for inc in incidents_data:
                             try:
-                                parsed = self._parse_incident_data(inc)
+                                parsed = self._parse_incident_data(inc, geocode)
                                 if parsed.description or parsed.location_of_incident:
                                     incidents.append(parsed)
                             except Exception as e:
@@ -221,7 +307,8 @@ Return JSON array only, no other text."""
         
         return []
     
-    def _extract_with_azure(self, text: str, field_office: Optional[str]) -> List[HRDIncident]:
+    def _extract_with_azure(self, text: str, field_office: Optional[str],
+                            max_chars: int = 3000, geocode: bool = True) -> List[HRDIncident]:
         """Extract incidents using Azure AI."""
         if not self.azure_parser.enabled:
             return []
@@ -234,21 +321,22 @@ Extract each incident and return as JSON array with complete structured data."""
 
 Field Office: {field_office or 'Unknown'}
 
-{text[:3000]}
+{text[:max_chars]}
 
 Return JSON array with incident data. Include all fields."""
         
         try:
-            response = self.azure_parser.client.chat.completions.create(
-                model=self.azure_parser.deployment or "gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"},
-                max_tokens=2000
-            )
+            with observe("llm_request_seconds", provider="azure", operation="_extract_with_azure"):
+                response = self.azure_parser.client.chat.completions.create(
+                    model=self.azure_parser.deployment or "gpt-4.1-mini",
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.1,
+                    response_format={"type": "json_object"},
+                    max_tokens=2000
+                )
             
             content = response.choices[0].message.content
             result = json.loads(content)
@@ -261,13 +349,13 @@ Return JSON array with incident data. Include all fields."""
             else:
                 incidents_data = [result]
             
-            return [self._parse_incident_data(inc) for inc in incidents_data]
+            return [self._parse_incident_data(inc, geocode) for inc in incidents_data]
         
         except Exception as e:
             log_error(e, {"module": "hrd_incident_extractor", "method": "azure"})
             return []
     
-    def _parse_incident_data(self, data: Dict[str, Any]) -> HRDIncident:
+    def _parse_incident_data(self, data: Dict[str, Any], geocode: bool = True) -> HRDIncident:
         """Parse incident data dictionary into HRDIncident object."""
         incident = HRDIncident()
         
@@ -309,7 +397,13 @@ Return JSON array with incident data. Include all fields."""
         incident.minor_male = self._parse_int(data.get("minor_male"))
         incident.minor_female = self._parse_int(data.get("minor_female"))
         
-        # Geocode location if available
+        if geocode:
+            self._geocode_incident(incident)
+        
+        return incident
+    
+    def _geocode_incident(self, incident: HRDIncident):
+        """Fill coordinates and admin units from the incident location."""
         if incident.location_of_incident and self.geocoder:
             try:
                 location_with_state = f"{incident.location_of_incident}, {incident.incident_state}" if incident.incident_state else incident.location_of_incident
@@ -321,8 +415,6 @@ Return JSON array with incident data. Include all fields."""
                     incident.county = geocode_result.county
             except Exception:
                 pass
-        
-        return incident
     
     def _parse_date(self, date_str: Any) -> Optional[datetime]:
         """Parse date string to datetime."""
@@ -0,0 +1,83 @@
+"""Structured incident sidecars for compiled HRD Daily Reports.
+
+HRDReportCompiler writes the incidents behind each compiled report to a
+JSONL file next to the .docx ("<report>.incidents.jsonl"), one
+HRDIncident.to_record() per line. The weekly matrix reads these instead of
+running the LLM over the compiled report a second time.
+"""
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Union
+from app.core.hrd_incident_extractor import HRDIncident
+from app.utils.logging import log_error
+
+
+INCIDENT_STORE_SUFFIX = ".incidents.jsonl"
+
+
+def incident_store_path(report_path: Union[str, Path]) -> Path:
+    """
+    Sidecar path for a compiled report.
+    
+    Args:
+        report_path: Path to the compiled report .docx
+    
+    Returns:
+        Path of the JSONL incident store
+    """
+    report_path = Path(report_path)
+    return report_path.with_name(report_path.stem + INCIDENT_STORE_SUFFIX)
+
+
+def write_incident_store(report_path: Union[str, Path], incidents: List[HRDIncident]) -> Path:
+    """
+    Write the incidents of a compiled report next to it.
+    
+    The file is written to a temporary name and renamed, so readers never
+    see a partial store.
+    
+    Args:
+        report_path: Path to the compiled report .docx
+        incidents: Incidents the report was compiled from
+    
+    Returns:
+        Path of the written store
+    """
+    path = incident_store_path(report_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for incident in incidents:
+            f.write(json.dumps(incident.to_record(), ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_incident_store(report_path: Union[str, Path]) -> Optional[List[HRDIncident]]:
+    """
+    Read the incidents stored next to a compiled report.
+    
+    Args:
+        report_path: Path to the compiled report .docx
+    
+    Returns:
+        List of incidents, or None if there is no usable store (missing,
+        unreadable, or older than the report, e.g. after a manual edit)
+    """
+    report_path = Path(report_path)
+    path = incident_store_path(report_path)
+    if not path.exists():
+        return None
+    if report_path.exists() and report_path.stat().st_mtime > path.stat().st_mtime:
+        return None
+    
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [HRDIncident.from_record(json.loads(line)) for line in f if line.strip()]
+    except Exception as e:
+        log_error(e, {
+            "module": "hrd_incident_store",
+            "function": "read_incident_store",
+            "path": str(path)
+        })
+        return None
@@ -0,0 +1,216 @@
+"""Map-reduce helpers for extracting incidents from long HRD reports.
+
+Field office dailies run to several pages, but each LLM prompt only sees a
+few thousand characters. split_report cuts a report into chunks on
+incident boundaries (a heading run, or a paragraph opening with a date),
+TokenBudget caps how many prompt tokens are in flight across concurrent
+chunk extractions, and merge_incidents folds the per-chunk results back
+together, deduplicating incidents reported in more than one chunk (e.g.
+in both the highlights and the body).
+"""
+import math
+import re
+import threading
+from contextlib import contextmanager
+from itertools import takewhile
+from typing import Iterator, List, Optional, Tuple, TYPE_CHECKING
+from app.core.normalization import normalize_text
+
+if TYPE_CHECKING:
+    from app.core.hrd_incident_extractor import HRDIncident
+
+
+# Rough size of a token for English report text
+CHARS_PER_TOKEN = 4
+
+# Tokens of instructions wrapped around every chunk
+PROMPT_OVERHEAD_TOKENS = 250
+
+# Leading heading lines (office, date) repeated in front of later chunks
+HEADER_CHARS = 300
+
+# Headings are short and do not end a sentence
+_HEADING_MAX_CHARS = 200
+_DATE_LED = re.compile(
+    r"^(On|Between|During the night of)\s+(\d{1,2}(st|nd|rd|th)?\s+[A-Z][a-z]+|[A-Z][a-z]+\s+\d{1,2}|\d{1,2}[/-]\d{1,2})"
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate prompt tokens for a chunk.
+    
+    Args:
+        text: Chunk text
+    
+    Returns:
+        Estimated tokens including the prompt instructions
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN) + PROMPT_OVERHEAD_TOKENS
+
+
+def _is_heading(paragraph: str) -> bool:
+    return len(paragraph) <= _HEADING_MAX_CHARS and not paragraph.rstrip().endswith((".", ";", ","))
+
+
+def _blocks(paragraphs: List[str]) -> List[List[str]]:
+    """Group paragraphs into sections that each start at an incident boundary."""
+    blocks: List[List[str]] = []
+    previous_heading = False
+    for paragraph in paragraphs:
+        heading = _is_heading(paragraph)
+        starts_block = (heading and not previous_heading) or (
+            _DATE_LED.match(paragraph) is not None and not previous_heading
+        )
+        if starts_block or not blocks:
+            blocks.append([])
+        blocks[-1].append(paragraph)
+        previous_heading = heading
+    return blocks
+
+
+def _split_long(paragraph: str, max_chars: int) -> List[str]:
+    """Split an oversized paragraph on sentence ends (hard cut as a last resort)."""
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        while len(sentence) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}".strip()
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_report(text: str, max_chars: int) -> List[str]:
+    """
+    Split report text into chunks of at most max_chars on incident boundaries.
+    
+    Paragraphs are grouped into sections that start at a heading run or a
+    date-led paragraph ("On 7 August ..."), and sections are packed into
+    chunks. A section longer than max_chars is split between paragraphs,
+    and a single oversized paragraph between sentences. Chunks after the
+    first are prefixed with the report header (office and date).
+    
+    Args:
+        text: Report text, one paragraph per line
+        max_chars: Maximum chunk length, header included
+    
+    Returns:
+        List of chunk texts (a single chunk for short reports)
+    """
+    paragraphs = [line.strip() for line in text.splitlines() if line.strip()]
+    if not paragraphs:
+        return []
+    if len(text) <= max_chars:
+        return ["\n".join(paragraphs)]
+    
+    blocks = _blocks(paragraphs)
+    header = "\n".join(takewhile(_is_heading, paragraphs))[:HEADER_CHARS]
+    body_chars = max(max_chars - len(header) - 1, max_chars // 2)
+    
+    # Oversized sections and paragraphs are broken down first
+    units: List[List[str]] = []
+    for block in blocks:
+        if len("\n".join(block)) <= body_chars:
+            units.append(block)
+            continue
+        for paragraph in block:
+            for piece in _split_long(paragraph, body_chars) if len(paragraph) > body_chars else [paragraph]:
+                units.append([piece])
+    
+    chunks: List[str] = []
+    current: List[str] = []
+    for unit in units:
+        if current and len("\n".join(current + unit)) > body_chars:
+            chunks.append("\n".join(current))
+            current = []
+        current.extend(unit)
+    if current:
+        chunks.append("\n".join(current))
+    
+    return [chunks[0]] + [f"{header}\n{chunk}" if header else chunk for chunk in chunks[1:]]
+
+
+class TokenBudget:
+    """Caps the estimated prompt tokens in flight across worker threads."""
+    
+    def __init__(self, tokens: int):
+        """
+        Args:
+            tokens: Maximum tokens reserved at once
+        """
+        self.capacity = tokens
+        self.available = tokens
+        self._condition = threading.Condition()
+    
+    @contextmanager
+    def reserve(self, tokens: int) -> Iterator[None]:
+        """
+        Block until `tokens` are available and hold them for the block.
+        
+        A request larger than the whole budget waits for the budget to be
+        empty and then runs alone.
+        
+        Args:
+            tokens: Tokens to reserve
+        """
+        tokens = min(tokens, self.capacity)
+        with self._condition:
+            self._condition.wait_for(lambda: self.available >= tokens)
+            self.available -= tokens
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.available += tokens
+                self._condition.notify_all()
+
+
+def _incident_key(incident: "HRDIncident") -> Optional[Tuple[str, str, Optional[int]]]:
+    """Dedup key, or None if the incident lacks a date or location to match on."""
+    location = normalize_text(incident.location_of_incident or "")
+    if incident.date_of_incident is None or not location:
+        return None
+    return (incident.date_of_incident.date().isoformat(), location, incident.total_victims)
+
+
+def merge_incidents(incidents: List["HRDIncident"]) -> List["HRDIncident"]:
+    """
+    Deduplicate incidents by date, location and victim count.
+    
+    The first occurrence is kept; fields it lacks are filled from the
+    duplicates, and the longest description wins. Incidents without a
+    date or location are never merged.
+    
+    Args:
+        incidents: Incidents from all chunks, in report order
+    
+    Returns:
+        Deduplicated incidents, in order of first occurrence
+    """
+    merged = {}
+    for position, incident in enumerate(incidents):
+        key = _incident_key(incident)
+        if key is None:
+            merged[position] = incident
+            continue
+        kept = merged.get(key)
+        if kept is None:
+            merged[key] = incident
+            continue
+        for field, value in vars(incident).items():
+            if value in (None, "") or field == "description":
+                continue
+            if getattr(kept, field) in (None, ""):
+                setattr(kept, field, value)
+        if len(incident.description or "") > len(kept.description or ""):
+            kept.description = incident.description
+    return list(merged.values())
@@ -1,10 +1,30 @@
 """Generate Weekly CivCas Matrix from compiled reports or incidents."""
-import pandas as pd
+import pyarrow as pa
+from itertools import count
 from typing import List, Optional
 from datetime import datetime
 from pathlib import Path
+from app.core.columnar_export import ColumnarWriter, export_excel
+from app.core.config import EXPORT_ROW_GROUP_SIZE
 from app.core.hrd_incident_extractor import HRDIncident
+from app.core.hrd_incident_store import read_incident_store
 from app.utils.logging import log_error
+from app.utils.metrics import inc
+
+
+EXCEL_SUFFIXES = {".xlsx", ".xlsm"}
+
+# Matrix columns that are not strings
+MATRIX_COLUMN_TYPES = {
+    "Incident Code": pa.float64(),
+    "Date of Interview": pa.timestamp("us"),
+    "Date of Incident": pa.timestamp("us"),
+    "Total Victims": pa.int64(),
+    "Male (#)": pa.int64(),
+    "Female (#)": pa.int64(),
+    "Minor (M)": pa.int64(),
+    "Minor (F)": pa.int64(),
+}
 
 
 class HRDMatrixGenerator:
@@ -46,53 +66,50 @@ class HRDMatrixGenerator:
                        start_date: datetime,
                        end_date: datetime,
                        output_path: str,
-                       start_incident_code: int = 1) -> str:
+                       start_incident_code: int = 1,
+                       row_group_size: int = EXPORT_ROW_GROUP_SIZE) -> str:
         """
         Generate weekly matrix from incidents.
         
+        Rows are streamed into a Parquet file one row group at a time. The
+        Excel view is written from it only when output_path is an .xlsx
+        file (the Parquet copy is kept next to it); a .parquet or .arrow
+        output_path skips Excel entirely.
+        
         Args:
             incidents: List of HRDIncident objects
             start_date: Week start date
             end_date: Week end date
-            output_path: Path to save Excel file
+            output_path: Path to save the matrix (.xlsx, .parquet or .arrow)
             start_incident_code: Starting incident code
+            row_group_size: Incidents per row group
             
         Returns:
             Path to generated matrix
         """
-        # Convert incidents to DataFrame
-        rows = []
-        incident_code = start_incident_code
+        output_path = Path(output_path)
+        excel = output_path.suffix.lower() in EXCEL_SUFFIXES
+        columnar_path = output_path.with_suffix(".parquet") if excel else output_path
+        month = start_date.strftime("%B")
+        codes = count(start_incident_code)
         
-        for incident in incidents:
+        def matrix_row(incident: HRDIncident) -> tuple:
             row = incident.to_dict()
             
             # Add matrix-specific fields
-            row["Incident Code"] = float(incident_code)
-            row["Month of interview/report"] = start_date.strftime("%B")
+            row["Incident Code"] = float(next(codes))
+            row["Month of interview/report"] = month
             row["Source of the information"] = row.get("Source Information")
-            row["Update"] = None
-            row["Remarks by CMC/CRVT"] = None
-            
-            # Ensure all columns are present
-            for col in self.column_order:
-                if col not in row:
-                    row[col] = None
-            
-            rows.append(row)
-            incident_code += 1
+            return tuple(row.get(col) for col in self.column_order)
         
-        # Create DataFrame
-        df = pd.DataFrame(rows)
+        fields = [(col, MATRIX_COLUMN_TYPES.get(col, pa.string())) for col in self.column_order]
+        with ColumnarWriter(columnar_path, fields, matrix_row, row_group_size=row_group_size) as writer:
+            writer.write_all(incidents)
         
-        # Reorder columns
-        existing_columns = [col for col in self.column_order if col in df.columns]
-        df = df[existing_columns]
+        if excel:
+            export_excel(columnar_path, output_path)
         
-        # Save to Excel
-        df.to_excel(output_path, index=False, engine='openpyxl')
-        
-        return output_path
+        return str(output_path)
     
     def generate_from_compiled_reports(self,
                                       compiled_reports: List[str],
@@ -103,6 +120,10 @@ class HRDMatrixGenerator:
         """
         Generate matrix from compiled HRD Daily Reports.
         
+        Incidents are read from each report's incident store, written when
+        the report was compiled; only reports without one are re-extracted
+        with the LLM.
+        
         Args:
             compiled_reports: List of paths to compiled report DOCX files
             start_date: Week start date
@@ -113,15 +134,23 @@ class HRDMatrixGenerator:
         Returns:
             Path to generated matrix
         """
-        from app.core.hrd_incident_extractor import HRDIncidentExtractor
-        from docx import Document
-        
-        extractor = HRDIncidentExtractor()
+        extractor = None
         all_incidents = []
         
-        # Extract incidents from compiled reports
         for report_path in compiled_reports:
+            incidents = read_incident_store(report_path)
+            if incidents is not None:
+                inc("hrd_incident_store_total", result="hit")
+                all_incidents.extend(incidents)
+                continue
+            
+            # No store (e.g. a report compiled elsewhere): extract from the document
+            inc("hrd_incident_store_total", result="miss")
             try:
+                from app.core.hrd_incident_extractor import HRDIncidentExtractor
+                from docx import Document
+                
+                extractor = extractor or HRDIncidentExtractor()
                 doc = Document(report_path)
                 text = "\n".join([para.text for para in doc.paragraphs])
                 
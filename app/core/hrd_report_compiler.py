@@ -6,6 +6,7 @@ from docx import Document
 from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from app.core.hrd_incident_extractor import HRDIncidentExtractor, HRDIncident
+from app.core.hrd_incident_store import write_incident_store
 from app.utils.logging import log_error
 
 
@@ -28,6 +29,9 @@ class HRDReportCompiler:
         """
         Compile HRD Daily Report from field office dailies.
         
+        The extracted incidents are also written next to the report
+        (see hrd_incident_store) so the weekly matrix can reuse them.
+        
         Args:
             date: Report date
             field_office_dailies: List of dicts with 'file_path' and 'field_office'
@@ -63,6 +67,7 @@ class HRDReportCompiler:
         # Generate compiled report
         doc = self._create_compiled_report(date, all_incidents)
         doc.save(output_path)
+        write_incident_store(output_path, all_incidents)
         
         return output_path
     
@@ -4,9 +4,15 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True)
 class GeocodeResult:
-    """Result of a geocoding operation."""
+    """
+    Result of a geocoding operation.
+    
+    Slotted: batch runs keep tens of thousands of these, and a slot
+    instance is about a third the size of one with a __dict__. For
+    column-wise work use app.core.columnar_export.GeocodeResultBatch.
+    """
     input_text: str
     normalized_text: str
     resolved_layer: Optional[str] = None
@@ -60,9 +66,9 @@ class NameIndexEntry:
     admin_codes: Optional[Dict[str, str]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ExtractedLocation:
-    """A location mention extracted from a document."""
+    """A location mention extracted from a document (slotted, like GeocodeResult)."""
     original_text: str
     context: str
     extraction_method: str  # "regex" or "ai"
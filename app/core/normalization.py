@@ -34,6 +34,23 @@ TRANSLITERATIONS = {
 # Words to preserve (don't remove)
 PRESERVE_WORDS = {"el", "al", "de", "la"}  # Important in "Bahr el Ghazal"
 
+# Word-boundary patterns, compiled once (applied in dict order)
+_ABBREVIATION_PATTERNS = [
+    (re.compile(r'\b' + re.escape(abbrev) + r'\b', re.IGNORECASE), expansion)
+    for abbrev, expansion in SOUTH_SUDAN_ABBREVIATIONS.items()
+]
+_TRANSLITERATION_PATTERNS = [
+    (re.compile(r'\b' + re.escape(variant) + r'\b', re.IGNORECASE), canonical)
+    for variant, canonical in TRANSLITERATIONS.items()
+]
+_PRESERVE_PATTERNS = [
+    (re.compile(r'\b' + re.escape(word) + r'\b', re.IGNORECASE), f"__PRESERVE_{i}__", word)
+    for i, word in enumerate(PRESERVE_WORDS)
+]
+
+# Common words that are never place names on their own
+STOP_WORDS = {"the", "of", "in", "at", "on", "to", "for", "and", "or", "a", "an"}
+
 
 def normalize_text(text: str) -> str:
     """
@@ -57,23 +74,20 @@ def normalize_text(text: str) -> str:
     text = text.lower()
     
     # Handle South Sudan abbreviations BEFORE removing punctuation
-    for abbrev, expansion in SOUTH_SUDAN_ABBREVIATIONS.items():
+    for pattern, expansion in _ABBREVIATION_PATTERNS:
         # Match whole word or at word boundary
-        pattern = r'\b' + re.escape(abbrev) + r'\b'
-        text = re.sub(pattern, expansion, text, flags=re.IGNORECASE)
+        text = pattern.sub(expansion, text)
     
     # Handle transliterations
-    for variant, canonical in TRANSLITERATIONS.items():
-        pattern = r'\b' + re.escape(variant) + r'\b'
-        text = re.sub(pattern, canonical, text, flags=re.IGNORECASE)
+    for pattern, canonical in _TRANSLITERATION_PATTERNS:
+        text = pattern.sub(canonical, text)
     
     # Remove punctuation except spaces (but preserve important words)
     # First, protect preserve words
     protected = {}
-    for i, word in enumerate(PRESERVE_WORDS):
-        placeholder = f"__PRESERVE_{i}__"
+    for pattern, placeholder, word in _PRESERVE_PATTERNS:
         protected[placeholder] = word
-        text = re.sub(r'\b' + re.escape(word) + r'\b', placeholder, text, flags=re.IGNORECASE)
+        text = pattern.sub(placeholder, text)
     
     # Remove punctuation
     text = re.sub(r'[^\w\s]', ' ', text)
@@ -91,6 +105,50 @@ def normalize_text(text: str) -> str:
     return text
 
 
+# Spellings that transliterations of the same sound produce, folded before
+# building a phonetic key (applied in order)
+PHONETIC_FOLDS = [
+    ("ng", "n"), ("nh", "n"), ("ny", "n"), ("gn", "n"),
+    ("dh", "d"), ("th", "t"), ("kh", "k"), ("gh", "g"), ("sh", "s"), ("ph", "p"),
+    ("ch", "c"), ("ck", "k"), ("c", "k"), ("q", "k"),
+]
+
+# Letters dropped after the first: vowels, semivowels and h, which vary most
+# between transliterations (Bentiu/Bentui, Kuajok/Kwajok, Abiemnom/Abiemnhom)
+_PHONETIC_DROPPED = set("aeiouwyh")
+
+
+def phonetic_key(text: str) -> str:
+    """
+    Build a consonant skeleton key for transliteration-tolerant matching.
+    
+    The text is normalized and its spaces removed, common digraph spellings
+    are folded, then the first letter is kept and vowels, semivowels and h
+    are dropped from the rest, and repeated letters are collapsed. Spelling
+    variants of the same place name usually share a key, e.g.
+    "Abiemnom" and "Abiemnhom" both give "abmnm".
+    
+    Args:
+        text: Place name (raw or normalized)
+        
+    Returns:
+        Phonetic key, or an empty string for empty input
+    """
+    folded = normalize_text(text).replace(" ", "")
+    if not folded:
+        return ""
+    
+    for spelling, replacement in PHONETIC_FOLDS:
+        folded = folded.replace(spelling, replacement)
+    
+    key = [folded[0]]
+    for char in folded[1:]:
+        if char in _PHONETIC_DROPPED or char == key[-1]:
+            continue
+        key.append(char)
+    return "".join(key)
+
+
 def generate_ngrams(text: str, min_length: int = 2, max_length: int = 5) -> List[str]:
     """
     Generate n-grams from normalized text for candidate extraction.
@@ -143,8 +201,7 @@ def extract_candidates(text: str) -> Set[str]:
     ngrams = generate_ngrams(normalized)
     
     # Filter out very short candidates and common words
-    stop_words = {"the", "of", "in", "at", "on", "to", "for", "and", "or", "a", "an"}
-    candidates = {ng for ng in ngrams if len(ng) >= 3 and ng not in stop_words}
+    candidates = {ng for ng in ngrams if len(ng) >= 3 and ng not in STOP_WORDS}
     
     return candidates
 
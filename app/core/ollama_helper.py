@@ -5,6 +5,7 @@ import requests
 from app.core.config import OLLAMA_BASE_URL, OLLAMA_MODEL, ENABLE_OLLAMA
 from app.core.models import ExtractedLocation
 from app.utils.logging import log_error
+from app.utils.metrics import observe
 
 
 class OllamaHelper:
@@ -70,15 +71,16 @@ Generate a single Python regex pattern (as a raw string, e.g., r"...") that matc
 Return ONLY the regex pattern, nothing else."""
 
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30
-            )
+            with observe("llm_request_seconds", provider="ollama", operation="generate_regex_pattern"):
+                response = requests.post(
+                    f"{self.base_url}/api/generate",
+                    json={
+                        "model": self.model,
+                        "prompt": prompt,
+                        "stream": False
+                    },
+                    timeout=30
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -144,16 +146,17 @@ Provide analysis in JSON format with:
 Return ONLY valid JSON, no other text."""
 
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "format": "json"
-                },
-                timeout=60
-            )
+            with observe("llm_request_seconds", provider="ollama", operation="analyze_feedback_patterns"):
+                response = requests.post(
+                    f"{self.base_url}/api/generate",
+                    json={
+                        "model": self.model,
+                        "prompt": prompt,
+                        "stream": False,
+                        "format": "json"
+                    },
+                    timeout=60
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -238,16 +241,17 @@ Extract locations in formats like:
 Only extract actual location mentions, not general references. Return empty array if no locations found."""
         
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": f"{system_prompt}\n\nExtract all location mentions from this text:\n\n{text}",
-                    "stream": False,
-                    "format": "json"
-                },
-                timeout=30
-            )
+            with observe("llm_request_seconds", provider="ollama", operation="_extract_from_text"):
+                response = requests.post(
+                    f"{self.base_url}/api/generate",
+                    json={
+                        "model": self.model,
+                        "prompt": f"{system_prompt}\n\nExtract all location mentions from this text:\n\n{text}",
+                        "stream": False,
+                        "format": "json"
+                    },
+                    timeout=30
+                )
             
             # Check for timeout or connection errors
             if response.status_code != 200:
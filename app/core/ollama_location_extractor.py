@@ -5,6 +5,7 @@ import requests
 from app.core.config import OLLAMA_BASE_URL, OLLAMA_MODEL, ENABLE_OLLAMA
 from app.core.models import ExtractedLocation
 from app.utils.logging import log_error
+from app.utils.metrics import observe
 
 
 class OllamaLocationExtractor:
@@ -67,19 +68,20 @@ If location includes Boma, include it: "Boma Name, Payam Name, County Name"
 Extract the most specific location where the incident happened. Return only the location, nothing else."""
 
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,  # Low temperature for consistent results
-                        "num_predict": 100,  # Limit response length for speed
-                    }
-                },
-                timeout=15  # Short timeout for efficiency
-            )
+            with observe("llm_request_seconds", provider="ollama", operation="extract_primary_location"):
+                response = requests.post(
+                    f"{self.base_url}/api/generate",
+                    json={
+                        "model": self.model,
+                        "prompt": prompt,
+                        "stream": False,
+                        "options": {
+                            "temperature": 0.1,  # Low temperature for consistent results
+                            "num_predict": 100,  # Limit response length for speed
+                        }
+                    },
+                    timeout=15  # Short timeout for efficiency
+                )
             
             if response.status_code == 200:
                 result = response.json()
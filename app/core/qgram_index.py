@@ -0,0 +1,262 @@
+"""In-memory q-gram inverted index for fuzzy name lookups.
+
+Every distinct normalized name gets a string id; each padded trigram of the
+name maps to the sorted ids of the names that contain it. A lookup counts
+shared trigrams per name and returns a short list of the most similar
+names, which are then scored with the regular fuzzy scorers instead of
+scanning the whole gazetteer.
+
+The index is persisted by DuckDBStore (qgram_strings / qgram_postings) and
+loaded here as packed posting arrays. A StringEntries map packs the entry
+indexes of a search pool by string id, so a shortlist expands to entries
+with array operations however many entries share a name.
+"""
+import copy
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+QGRAM_SIZE = 3
+
+# Pools of at most this many names are scanned in full
+QGRAM_SCAN_LIMIT = 2000
+
+# A name is shortlisted if it shares this fraction of the smaller gram set
+QGRAM_MIN_OVERLAP = 0.4
+
+# Maximum shortlist size per query
+QGRAM_SHORTLIST_SIZE = 200
+
+# Postings read to seed candidates, rarest grams first. Lists past the
+# budget (common grams such as " ka" or "ng ") only add to the counts of
+# names already found, so the work per query does not grow with the gazetteer
+QGRAM_SEED_POSTINGS = 2000
+
+
+def qgrams(text: str) -> List[str]:
+    """
+    Padded trigrams of a normalized string.
+    
+    Must match the grams DuckDBStore.build_qgram_index writes:
+    substr(' ' || text || ' ', i, 3) for i in 1..length(text).
+    
+    Args:
+        text: Normalized string
+    
+    Returns:
+        List of trigrams (may contain duplicates)
+    """
+    padded = f" {text} "
+    return [padded[i:i + QGRAM_SIZE] for i in range(len(text))]
+
+
+class QGramIndex:
+    """Trigram posting lists over distinct normalized names."""
+    
+    def __init__(
+        self,
+        strings: Iterable[Tuple[int, str]],
+        grams: np.ndarray,
+        string_ids: np.ndarray
+    ):
+        """
+        Pack postings into one array with per-gram offsets.
+        
+        Args:
+            strings: (string_id, normalized_text) pairs
+            grams: Gram of each posting, sorted by gram then string id
+            string_ids: String id of each posting, aligned with grams
+                (ids of one gram ascending, as shortlist binary-searches them)
+        """
+        strings = list(strings)
+        size = max((string_id for string_id, _ in strings), default=-1) + 1
+        self.strings: List[str] = [""] * size
+        self.ids: Dict[str, int] = {}
+        for string_id, text in strings:
+            self.strings[string_id] = text
+            self.ids[text] = string_id
+        
+        string_ids = np.asarray(string_ids, dtype=np.int64)
+        self.gram_counts = np.bincount(string_ids, minlength=size).astype(np.int32)
+        
+        # Smallest unsigned type that holds every id
+        self.postings = string_ids.astype(np.min_scalar_type(max(size - 1, 0)))
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+        if len(grams):
+            keys, starts = np.unique(np.asarray(grams, dtype=object), return_index=True)
+            ends = np.append(starts[1:], len(grams))
+            self.offsets = {key: (int(start), int(end)) for key, start, end in zip(keys, starts, ends)}
+        
+        # Names added since loading, kept outside the packed arrays
+        self.extra: Dict[str, List[int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self.strings)
+    
+    def add(self, strings: Iterable[Tuple[int, str]]):
+        """
+        Add newly indexed names without reloading.
+        
+        Args:
+            strings: (string_id, normalized_text) pairs
+        """
+        strings = list(strings)
+        if not strings:
+            return
+        
+        size = max(len(self.strings), max(string_id for string_id, _ in strings) + 1)
+        self.strings.extend([""] * (size - len(self.strings)))
+        counts = np.zeros(size, dtype=np.int32)
+        counts[:len(self.gram_counts)] = self.gram_counts
+        for string_id, text in strings:
+            self.strings[string_id] = text
+            self.ids[text] = string_id
+            grams = set(qgrams(text))
+            counts[string_id] = len(grams)
+            for gram in grams:
+                self.extra.setdefault(gram, []).append(string_id)
+        self.gram_counts = counts
+    
+    def extended(self, strings: Iterable[Tuple[int, str]]) -> "QGramIndex":
+        """
+        Copy of the index with names added, leaving this one untouched.
+        
+        The packed postings are shared; only the names and the postings
+        added since loading are copied. Lets a shared store swap in the new
+        index while other threads still search the old one.
+        
+        Args:
+            strings: (string_id, normalized_text) pairs
+        
+        Returns:
+            New QGramIndex
+        """
+        index = copy.copy(self)
+        index.strings = list(self.strings)
+        index.ids = dict(self.ids)
+        index.extra = {gram: list(ids) for gram, ids in self.extra.items()}
+        index.add(strings)
+        return index
+    
+    def shortlist(
+        self,
+        text: str,
+        min_overlap: float = QGRAM_MIN_OVERLAP,
+        limit: int = QGRAM_SHORTLIST_SIZE
+    ) -> List[str]:
+        """
+        Names sharing the most trigrams with a query.
+        
+        Args:
+            text: Normalized query
+            min_overlap: Minimum shared grams as a fraction of the smaller gram set
+            limit: Maximum names to return
+        
+        Returns:
+            Normalized names, most similar (Dice coefficient) first
+        """
+        return [self.strings[i] for i in self.shortlist_ids(text, min_overlap, limit)]
+    
+    def shortlist_ids(
+        self,
+        text: str,
+        min_overlap: float = QGRAM_MIN_OVERLAP,
+        limit: int = QGRAM_SHORTLIST_SIZE
+    ) -> np.ndarray:
+        """
+        String ids of the names sharing the most trigrams with a query.
+        
+        Candidates come from the query's rarest posting lists, up to
+        QGRAM_SEED_POSTINGS postings (always at least one list). The other
+        lists are binary-searched for those candidates only, so a name is
+        missed only if every gram it shares with the query is a common one.
+        
+        Args:
+            text: Normalized query
+            min_overlap: Minimum shared grams as a fraction of the smaller gram set
+            limit: Maximum names to return
+        
+        Returns:
+            String ids, most similar (Dice coefficient) first
+        """
+        grams = set(qgrams(text))
+        if not grams:
+            return np.empty(0, dtype=np.int64)
+        
+        lists = []
+        for gram in grams:
+            start, end = self.offsets.get(gram, (0, 0))
+            extra = self.extra.get(gram, [])
+            if end > start or extra:
+                lists.append((end - start + len(extra), self.postings[start:end], extra))
+        if not lists:
+            return np.empty(0, dtype=np.int64)
+        lists.sort(key=lambda item: item[0])
+        seeded, budget = 1, QGRAM_SEED_POSTINGS - lists[0][0]
+        while seeded < len(lists) and lists[seeded][0] <= budget:
+            budget -= lists[seeded][0]
+            seeded += 1
+        seeds = lists[:seeded]
+        
+        arrays = [array for _, posting, extra in seeds for array in (posting, np.asarray(extra, dtype=np.int64))]
+        ids, shared = np.unique(np.concatenate(arrays).astype(np.int64), return_counts=True)
+        # Same dtype as the postings, or searchsorted converts the whole list
+        # (names added since loading may not fit it)
+        fits = not len(ids) or ids[-1] <= np.iinfo(self.postings.dtype).max
+        keys = ids.astype(self.postings.dtype) if fits else ids
+        for _, posting, extra in lists[len(seeds):]:
+            found = np.searchsorted(posting, keys)
+            hit = found < len(posting)
+            hit[hit] = posting[found[hit]] == ids[hit]
+            shared += hit
+            if extra:
+                shared += np.isin(ids, extra)
+        sizes = self.gram_counts[ids]
+        keep = shared >= min_overlap * np.minimum(sizes, len(grams))
+        ids, shared, sizes = ids[keep], shared[keep], sizes[keep]
+        
+        dice = 2.0 * shared / (sizes + len(grams))
+        if len(ids) > limit:
+            top = np.argpartition(-dice, limit)[:limit]
+            ids, dice = ids[top], dice[top]
+        order = np.argsort(-dice, kind="stable")
+        return ids[order]
+
+
+class StringEntries:
+    """Entry indexes of a search pool grouped by QGramIndex string id."""
+    
+    def __init__(self, index: QGramIndex, search_strings: List[str]):
+        """
+        Pack the entries of each string id into one array with offsets.
+        
+        Args:
+            index: Index the string ids come from
+            search_strings: Search string of each entry (strings the index
+                does not hold are never returned)
+        """
+        self.index = index
+        string_ids = np.fromiter(
+            (index.ids.get(text, -1) for text in search_strings), dtype=np.int64, count=len(search_strings)
+        )
+        self.order = np.argsort(string_ids, kind="stable")
+        self.starts = np.searchsorted(string_ids[self.order], np.arange(len(index) + 1))
+    
+    def lookup(self, string_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Entries of several string ids at once.
+        
+        Args:
+            string_ids: Ids from index.shortlist_ids
+        
+        Returns:
+            (entry indexes, position in string_ids of each entry's string);
+            the entries of one string are ascending
+        """
+        starts, ends = self.starts[string_ids], self.starts[string_ids + 1]
+        counts = ends - starts
+        total = int(counts.sum())
+        # Offset of every output slot inside its string's run of entries
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.order[np.repeat(starts, counts) + within], np.repeat(np.arange(len(string_ids)), counts)
@@ -0,0 +1,195 @@
+"""Process-wide store and geocoder shared by all Streamlit sessions.
+
+Each browser session used to open its own DuckDBStore and build its own
+Geocoder in st.session_state, loading a private copy of the admin layers
+and name indexes, so memory grew with every concurrent user. The app and
+pages now take both from this registry: one store (each session thread
+gets its own cursor, see DuckDBStore.shared) and one Geocoder whose
+indexes are preloaded once and then only read.
+
+The process holding the shared store also publishes its read-only
+snapshot for other processes (see app.core.store_replica).
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+import pandas as pd
+import shapely
+from app.core.config import DUCKDB_PATH, DUCKDB_SNAPSHOT_INTERVAL
+from app.core.duckdb_store import DuckDBStore
+from app.core.geocoder import Geocoder
+from app.core.store_replica import SnapshotPublisher
+from app.utils.logging import log_structured
+
+
+# Sessions seen within this many seconds count as active
+SESSION_WINDOW_SECONDS = 30 * 60
+
+_lock = threading.Lock()
+_store: Optional[DuckDBStore] = None
+_geocoder: Optional[Geocoder] = None
+_publisher: Optional[SnapshotPublisher] = None
+_sessions: Dict[str, float] = {}
+
+
+def get_shared_store(db_path: Optional[Path] = None) -> DuckDBStore:
+    """
+    The process-wide store.
+    
+    Args:
+        db_path: Database file, only used by the first call (default from config)
+    
+    Returns:
+        Shared DuckDBStore
+    """
+    global _store, _publisher
+    with _lock:
+        if _store is None:
+            _store = DuckDBStore(db_path or DUCKDB_PATH, shared=True)
+            log_structured("info", "Shared database store initialized",
+                           module="resources", function="get_shared_store",
+                           db_path=str(_store.db_path))
+            if DUCKDB_SNAPSHOT_INTERVAL > 0:
+                _publisher = SnapshotPublisher(_store, DUCKDB_SNAPSHOT_INTERVAL).start()
+        return _store
+
+
+def get_shared_geocoder() -> Geocoder:
+    """
+    The process-wide geocoder, with admin layers and indexes preloaded.
+    
+    Returns:
+        Shared Geocoder
+    """
+    global _geocoder
+    store = get_shared_store()
+    with _lock:
+        if _geocoder is None:
+            start = time.perf_counter()
+            geocoder = Geocoder(store)
+            geocoder.preload()
+            _geocoder = geocoder
+            log_structured("info", "Shared geocoder initialized",
+                           module="resources", function="get_shared_geocoder",
+                           seconds=round(time.perf_counter() - start, 3))
+        return _geocoder
+
+
+def reset_shared_resources():
+    """Close and forget the shared store and geocoder (tests, database swaps)."""
+    global _store, _geocoder, _publisher
+    with _lock:
+        if _publisher is not None:
+            _publisher.stop()
+        if _store is not None:
+            _store.close()
+        _publisher = None
+        _store = None
+        _geocoder = None
+        _sessions.clear()
+
+
+def touch_session(session_id: str):
+    """
+    Record that a session is active.
+    
+    Args:
+        session_id: Streamlit session id
+    """
+    with _lock:
+        _sessions[session_id] = time.time()
+
+
+def active_sessions(window: float = SESSION_WINDOW_SECONDS) -> int:
+    """
+    Number of sessions seen within the window.
+    
+    Args:
+        window: Seconds since a session's last run
+    
+    Returns:
+        Active session count
+    """
+    cutoff = time.time() - window
+    with _lock:
+        for session_id in [sid for sid, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[session_id]
+        return len(_sessions)
+
+
+def process_rss_bytes() -> Optional[int]:
+    """Resident memory of this process, if the platform exposes it."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        import os
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Peak, not current: kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+
+def object_bytes(value: Any) -> int:
+    """
+    Approximate memory held by a value (frames and geometries deep, others shallow).
+    
+    Args:
+        value: Object to size
+    
+    Returns:
+        Size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        size = int(value.memory_usage(deep=True).sum())
+        if "geometry" in value.columns:
+            # memory_usage only counts the pointers to shapely geometries
+            size += int(shapely.get_num_coordinates(value["geometry"].values).sum()) * 16
+        return size
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(object_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def memory_report(session_state: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Process memory split into shared resources and per-session share.
+    
+    Args:
+        session_state: The current session's state, sized on its own
+    
+    Returns:
+        rss_bytes, shared_bytes (admin layers and name index rows),
+        active_sessions, bytes_per_session (RSS over active sessions) and
+        session_state_bytes
+    """
+    shared = 0
+    with _lock:
+        geocoder, store = _geocoder, _store
+    if geocoder is not None:
+        shared += object_bytes(geocoder.admin_layers)
+    if store is not None and store._name_index_entries is not None:
+        shared += object_bytes(store._name_index_entries)
+    
+    rss = process_rss_bytes()
+    sessions = active_sessions()
+    return {
+        "rss_bytes": rss,
+        "shared_bytes": shared,
+        "active_sessions": sessions,
+        "bytes_per_session": rss // sessions if rss is not None and sessions else None,
+        "session_state_bytes": object_bytes(dict(session_state)) if session_state is not None else None,
+    }
@@ -1,19 +1,50 @@
 """Base scraper class for village location data."""
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Tuple
+from app.core.scrapers.http_cache import CachedResponse, HTTPCache, get_http_cache
 
 
 class BaseScraper(ABC):
     """Base class for village location scrapers."""
     
-    def __init__(self, name: str):
+    def __init__(self, name: str, http_cache: Optional[HTTPCache] = None):
         """
         Initialize scraper.
         
         Args:
             name: Name of the scraper (e.g., 'osm', 'google_maps')
+            http_cache: Response cache (defaults to the shared on-disk cache)
         """
         self.name = name
+        self.http_cache = http_cache or get_http_cache()
+    
+    def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30
+    ) -> CachedResponse:
+        """
+        Send an HTTP request through the shared cache.
+        
+        Identical requests (same endpoint, parameters and body) are answered
+        from disk while fresh; in offline mode only cached responses are used.
+        
+        Args:
+            method: HTTP method
+            url: Endpoint URL
+            params: Query parameters
+            data: Request body
+            headers: Request headers
+            timeout: Request timeout in seconds
+            
+        Returns:
+            Response (check from_cache before rate limiting)
+        """
+        return self.http_cache.request(method, url, params=params, data=data, headers=headers, timeout=timeout)
     
     @abstractmethod
     def search_village(
@@ -1,19 +1,21 @@
 """Google Maps scraper for village locations (requires API key)."""
 from typing import List, Dict, Any, Optional, Tuple
 from app.core.scrapers.base import BaseScraper
+from app.core.scrapers.http_cache import HTTPCache
 
 
 class GoogleMapsScraper(BaseScraper):
     """Scraper for Google Maps/Places API."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_cache: Optional[HTTPCache] = None):
         """
         Initialize Google Maps scraper.
         
         Args:
             api_key: Google Maps API key (required)
+            http_cache: Response cache (defaults to the shared on-disk cache)
         """
-        super().__init__("google_maps")
+        super().__init__("google_maps", http_cache)
         self.api_key = api_key
         self.enabled = api_key is not None
     
@@ -38,7 +40,7 @@ class GoogleMapsScraper(BaseScraper):
         # TODO: Implement Google Places API search
         # This requires:
         # 1. Google Places API key
-        # 2. requests library
+        # 2. Requests sent through self._request so they are cached
         # 3. Proper rate limiting and error handling
         
         # Placeholder implementation
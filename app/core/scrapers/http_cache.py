@@ -0,0 +1,330 @@
+"""On-disk HTTP response cache shared by the scrapers.
+
+Scrapers re-issue identical Overpass/Places queries every time the Village
+Manager scrape button or a script runs. Responses are stored in a SQLite
+file keyed by method, endpoint, parameters and request body, with a TTL
+and a total size bound (least recently used entries are evicted first).
+Expired entries that carry an ETag or Last-Modified validator are kept and
+re-fetched conditionally; a 304 answer renews the entry without
+downloading the body again.
+
+Modes:
+- normal: serve fresh entries from the cache, fetch and store the rest
+- offline: replay from the cache only, ignoring the TTL; a miss raises
+  CacheMiss instead of touching the network, so scrape pipelines can be
+  re-run and benchmarked offline
+- off: always fetch, never store
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+from app.core.config import (
+    SCRAPER_CACHE_MAX_BYTES, SCRAPER_CACHE_MODE, SCRAPER_CACHE_PATH, SCRAPER_CACHE_TTL
+)
+from app.utils.logging import log_structured
+from app.utils.metrics import inc
+
+
+CACHE_MODES = ("normal", "offline", "off")
+
+# Response headers stored with each entry (the last two are the validators)
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class CacheMiss(requests.exceptions.ConnectionError):
+    """Raised in offline mode when a request has no cached response."""
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response built from a cache entry."""
+    
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Dict[str, str], from_cache: bool):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+    
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+    
+    def json(self) -> Any:
+        return json.loads(self.content)
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}")
+
+
+def cache_key(method: str, url: str, params: Optional[Dict[str, Any]] = None, data: Any = None) -> str:
+    """
+    Key of a request: method, endpoint, sorted parameters and body.
+    
+    Args:
+        method: HTTP method
+        url: Endpoint URL
+        params: Query parameters
+        data: Request body (str, bytes or form dict)
+    
+    Returns:
+        Hex digest
+    """
+    if isinstance(data, dict):
+        data = json.dumps(data, sort_keys=True)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    digest = hashlib.sha256()
+    digest.update(f"{method.upper()} {url}\n".encode("utf-8"))
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\n")
+    digest.update(data or b"")
+    return digest.hexdigest()
+
+
+class HTTPCache:
+    """SQLite-backed response cache with TTL, size bound and offline replay."""
+    
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        ttl: int = SCRAPER_CACHE_TTL,
+        max_bytes: int = SCRAPER_CACHE_MAX_BYTES,
+        mode: str = SCRAPER_CACHE_MODE
+    ):
+        """
+        Open (or create) the cache file.
+        
+        Args:
+            path: SQLite file (default from config)
+            ttl: Seconds an entry is served in normal mode
+            max_bytes: Total body size kept before evicting least recently used entries
+            mode: "normal", "offline" or "off"
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode '{mode}'; expected one of {CACHE_MODES}")
+        self.path = path or SCRAPER_CACHE_PATH
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self._lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared by the Streamlit threads; access is serialized by self._lock
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+        """)
+        # Cache files created before conditional re-fetch lack the validator columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE responses ADD COLUMN {column} TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+    
+    def get(self, key: str, allow_expired: bool = False) -> Optional[CachedResponse]:
+        """
+        Look up a stored response.
+        
+        Args:
+            key: Request key from cache_key
+            allow_expired: Also return expired entries (to re-fetch them conditionally)
+        
+        Returns:
+            Cached response, or None if missing or expired (expiry is ignored offline)
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, headers, body, created_at FROM responses WHERE key = ?", [key]
+            ).fetchone()
+            if row is None:
+                return None
+            url, status, headers, body, created_at = row
+            if not allow_expired and self.mode != "offline" and now - created_at > self.ttl:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", [now, key])
+            self._conn.commit()
+        return CachedResponse(url, status, body, json.loads(headers or "{}"), from_cache=True)
+    
+    def put(self, key: str, url: str, status: int, content: bytes, headers: Dict[str, str]):
+        """
+        Store a response and evict least recently used entries over the size bound.
+        
+        Args:
+            key: Request key from cache_key
+            url: Endpoint URL
+            status: HTTP status code
+            content: Response body
+            headers: Response headers to keep (ETag and Last-Modified are the validators)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO responses
+                    (key, url, status, headers, body, size, created_at, accessed_at, etag, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [key, url, status, json.dumps(headers), content, len(content), now, now,
+                  headers.get("ETag"), headers.get("Last-Modified")])
+            self._evict()
+            self._conn.commit()
+    
+    def refresh(self, key: str, headers: Dict[str, str]):
+        """
+        Renew an entry the server reported unchanged (304 Not Modified).
+        
+        Args:
+            key: Request key from cache_key
+            headers: Validators sent with the 304, replacing the stored ones
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT headers FROM responses WHERE key = ?", [key]).fetchone()
+            if row is None:
+                return
+            stored = {**json.loads(row[0] or "{}"), **headers}
+            self._conn.execute("""
+                UPDATE responses SET headers = ?, created_at = ?, accessed_at = ?, etag = ?, last_modified = ?
+                WHERE key = ?
+            """, [json.dumps(stored), now, now, stored.get("ETag"), stored.get("Last-Modified"), key])
+            self._conn.commit()
+    
+    def _evict(self):
+        """Drop expired entries without validators, then the least recently used ones until under max_bytes."""
+        self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ? AND etag IS NULL AND last_modified IS NULL",
+            [time.time() - self.ttl]
+        )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", [key])
+            total -= size
+            evicted += 1
+        inc("http_cache_evictions_total", evicted)
+    
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 30,
+        session: Optional[requests.Session] = None
+    ) -> CachedResponse:
+        """
+        Send a request through the cache.
+        
+        Only 2xx responses are stored. An expired entry with an ETag or
+        Last-Modified validator is re-fetched with If-None-Match /
+        If-Modified-Since; on 304 Not Modified it is renewed and served.
+        
+        Args:
+            method: HTTP method
+            url: Endpoint URL
+            params: Query parameters
+            data: Request body
+            headers: Request headers (not part of the key)
+            timeout: Request timeout in seconds
+            session: Session to send with (default: module-level requests)
+        
+        Returns:
+            Response with a from_cache flag
+        
+        Raises:
+            CacheMiss: In offline mode when nothing is cached
+            requests.RequestException: On network errors
+        """
+        key = cache_key(method, url, params, data)
+        expired = None
+        if self.mode != "off":
+            cached = self.get(key)
+            if cached is not None:
+                inc("http_cache_total", result="hit")
+                return cached
+            if self.mode == "offline":
+                inc("http_cache_total", result="offline_miss")
+                log_structured("warning", "Offline HTTP cache miss", module="http_cache", url=url)
+                raise CacheMiss(f"No cached response for {method.upper()} {url} (offline mode)")
+            expired = self.get(key, allow_expired=True)
+        
+        conditional = {}
+        if expired is not None:
+            if expired.headers.get("ETag"):
+                conditional["If-None-Match"] = expired.headers["ETag"]
+            if expired.headers.get("Last-Modified"):
+                conditional["If-Modified-Since"] = expired.headers["Last-Modified"]
+        if conditional:
+            headers = {**(headers or {}), **conditional}
+        inc("http_cache_total", result="revalidate" if conditional else "miss")
+        
+        response = (session or requests).request(
+            method, url, params=params, data=data, headers=headers, timeout=timeout
+        )
+        kept = {name: response.headers[name] for name in KEPT_HEADERS if response.headers.get(name)}
+        if conditional and response.status_code == 304:
+            self.refresh(key, kept)
+            return expired
+        
+        kept.setdefault("Content-Type", "")
+        result = CachedResponse(url, response.status_code, response.content, kept, from_cache=False)
+        if self.mode != "off" and 200 <= response.status_code < 300:
+            self.put(key, url, response.status_code, response.content, result.headers)
+        return result
+    
+    def clear(self):
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Entry count and total body size."""
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": count, "bytes": size, "mode": self.mode, "path": str(self.path)}
+    
+    def close(self):
+        """Close the cache file."""
+        with self._lock:
+            self._conn.close()
+
+
+_http_cache: Optional[HTTPCache] = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> HTTPCache:
+    """Process-wide cache configured from config."""
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HTTPCache()
+        return _http_cache
@@ -1,11 +1,16 @@
 """OpenStreetMap data extractor for roads, POIs, and infrastructure."""
+import re
 import requests
 import time
 import json
 from typing import List, Dict, Any, Optional, Tuple
 from shapely.geometry import Point, LineString, Polygon
 from shapely.ops import transform
+import pandas as pd
 import geopandas as gpd
+from app.core.scrapers.overpass_harvester import (
+    OverpassHarvester, STREAM_CHUNK_SIZE, TILE_SIZE, harvest_run_id, iter_elements
+)
 from app.utils.logging import log_error, log_structured
 
 
@@ -211,7 +216,8 @@ class OSMDataExtractor:
         self,
         feature_types: List[str],
         bbox: Optional[Tuple[float, float, float, float]] = None,
-        include_roads: bool = True
+        include_roads: bool = True,
+        timeout: int = 300
     ) -> str:
         """
         Build Overpass QL query for extracting features.
@@ -220,6 +226,7 @@ class OSMDataExtractor:
             feature_types: List of POI categories to extract (e.g., ["hospital", "school"])
             bbox: Bounding box (min_lon, min_lat, max_lon, max_lat)
             include_roads: Whether to include roads
+            timeout: Server-side query timeout in seconds
             
         Returns:
             Overpass QL query string
@@ -229,7 +236,7 @@ class OSMDataExtractor:
         
         min_lon, min_lat, max_lon, max_lat = bbox
         
-        query_parts = ["[out:json][timeout:300];", "("]
+        query_parts = [f"[out:json][timeout:{timeout}];", "("]
         
         # Add roads if requested
         if include_roads:
@@ -275,6 +282,139 @@ class OSMDataExtractor:
         
         return "\n".join(query_parts)
     
+    def _categorize(self, element: Dict[str, Any], feature_types: List[str]) -> Optional[str]:
+        """
+        Determine the category of an Overpass element.
+        
+        Args:
+            element: Overpass element
+            feature_types: POI categories being extracted
+            
+        Returns:
+            "roads", a POI category name, or None if the element matches none
+        """
+        tags = element.get("tags", {})
+        if element.get("type") == "way" and "highway" in tags:
+            return "roads"
+        
+        # Check POI categories
+        for cat_name, cat_config in self.POI_CATEGORIES.items():
+            if cat_name not in feature_types:
+                continue
+            for tag_filter in cat_config["tags"]:
+                # Check if all tag conditions in this filter match
+                all_match = True
+                for tag_key, tag_value in tag_filter.items():
+                    if tag_key not in tags:
+                        all_match = False
+                        break
+                    
+                    if tag_value == "*":
+                        # Match any value
+                        continue
+                    elif tag_value.startswith("~"):
+                        # Regex match
+                        if not re.search(tag_value[1:], tags[tag_key], re.IGNORECASE):
+                            all_match = False
+                            break
+                    else:
+                        # Exact match
+                        if tags[tag_key] != tag_value:
+                            all_match = False
+                            break
+                
+                if all_match:
+                    return cat_name
+        return None
+    
+    def element_to_feature(
+        self,
+        element: Dict[str, Any],
+        feature_types: List[str]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Convert an Overpass element into a feature record.
+        
+        Args:
+            element: Overpass element
+            feature_types: POI categories being extracted
+            
+        Returns:
+            Feature record with a "category" key, or None if the element is
+            not wanted or has no usable geometry
+        """
+        category = self._categorize(element, feature_types)
+        if category is None:
+            return None
+        
+        element_type = element.get("type")
+        tags = element.get("tags", {})
+        
+        # Extract geometry
+        geometry = None
+        if element_type == "node":
+            lon = element.get("lon")
+            lat = element.get("lat")
+            if lon is not None and lat is not None:
+                geometry = Point(lon, lat)
+        elif element_type == "way":
+            nodes = element.get("geometry", [])
+            if nodes:
+                coords = [(node.get("lon"), node.get("lat")) for node in nodes]
+                coords = [(lon, lat) for lon, lat in coords if lon is not None and lat is not None]
+                if len(coords) >= 2:
+                    geometry = LineString(coords)
+                elif len(coords) == 1:
+                    geometry = Point(coords[0])
+        
+        if geometry is None:
+            return None
+        
+        # Create feature record
+        feature = {
+            "osm_id": element.get("id"),
+            "osm_type": element_type,
+            "name": tags.get("name", ""),
+            "category": category,
+            "geometry": geometry,
+            "tags": json.dumps(tags),
+            "properties": tags.copy(),
+        }
+        
+        # Add specific fields based on category
+        if category == "roads":
+            feature["highway"] = tags.get("highway", "")
+            feature["surface"] = tags.get("surface", "")
+        elif category in ["hospital", "healthcare"]:
+            feature["amenity"] = tags.get("amenity", "")
+            feature["healthcare"] = tags.get("healthcare", "")
+        
+        # Add coordinates for points; use centroid for lines/polygons
+        point = geometry if isinstance(geometry, Point) else geometry.centroid
+        feature["lon"] = point.x
+        feature["lat"] = point.y
+        
+        return feature
+    
+    @staticmethod
+    def features_to_gdfs(features: List[Dict[str, Any]]) -> Dict[str, gpd.GeoDataFrame]:
+        """
+        Group feature records into one GeoDataFrame per category.
+        
+        Args:
+            features: Records from element_to_feature
+            
+        Returns:
+            Dictionary mapping category names to GeoDataFrames
+        """
+        by_category: Dict[str, List[Dict[str, Any]]] = {}
+        for feature in features:
+            by_category.setdefault(feature["category"], []).append(feature)
+        return {
+            category: gpd.GeoDataFrame(records, crs="EPSG:4326")
+            for category, records in by_category.items()
+        }
+    
     def extract_features(
         self,
         feature_types: Optional[List[str]] = None,
@@ -282,7 +422,9 @@ class OSMDataExtractor:
         include_roads: bool = True
     ) -> Dict[str, gpd.GeoDataFrame]:
         """
-        Extract features from OSM.
+        Extract features from OSM with a single query.
+        
+        Suitable for small areas; use harvest_features for the whole country.
         
         Args:
             feature_types: List of POI categories (None = all)
@@ -305,148 +447,42 @@ class OSMDataExtractor:
         )
         
         try:
-            # Execute query
+            # Execute query, parsing the response as it streams in
             response = requests.post(
                 self.overpass_url,
                 data=query,
                 headers={"Content-Type": "text/plain"},
-                timeout=600  # 10 minutes timeout for large queries
+                timeout=600,  # 10 minutes timeout for large queries
+                stream=True
             )
             response.raise_for_status()
             
-            data = response.json()
-            elements = data.get("elements", [])
+            features = []
+            element_count = 0
+            for element in iter_elements(response.iter_content(STREAM_CHUNK_SIZE)):
+                element_count += 1
+                feature = self.element_to_feature(element, feature_types)
+                if feature is not None:
+                    features.append(feature)
             
             log_structured("info", "OSM query completed",
-                element_count=len(elements)
+                element_count=element_count
             )
             
-            # Process elements
-            results = {
-                "roads": [],
-            }
-            for category in feature_types:
-                results[category] = []
-            
-            # Process each element
-            for element in elements:
-                element_type = element.get("type")
-                tags = element.get("tags", {})
-                
-                # Determine category
-                category = None
-                if element_type == "way" and "highway" in tags:
-                    category = "roads"
-                else:
-                    # Check POI categories
-                    for cat_name, cat_config in self.POI_CATEGORIES.items():
-                        if cat_name in feature_types:
-                            for tag_filter in cat_config["tags"]:
-                                # Check if all tag conditions in this filter match
-                                all_match = True
-                                for tag_key, tag_value in tag_filter.items():
-                                    if tag_key not in tags:
-                                        all_match = False
-                                        break
-                                    
-                                    if tag_value == "*":
-                                        # Match any value
-                                        continue
-                                    elif tag_value.startswith("~"):
-                                        # Regex match
-                                        pattern = tag_value[1:]
-                                        import re
-                                        if not re.search(pattern, tags[tag_key], re.IGNORECASE):
-                                            all_match = False
-                                            break
-                                    else:
-                                        # Exact match
-                                        if tags[tag_key] != tag_value:
-                                            all_match = False
-                                            break
-                                
-                                if all_match:
-                                    category = cat_name
-                                    break
-                            
-                            if category:
-                                break
-                
-                if category is None:
-                    continue
-                
-                # Extract geometry
-                geometry = None
-                lon = None
-                lat = None
-                
-                if element_type == "node":
-                    lon = element.get("lon")
-                    lat = element.get("lat")
-                    if lon is not None and lat is not None:
-                        geometry = Point(lon, lat)
-                elif element_type == "way":
-                    nodes = element.get("geometry", [])
-                    if nodes:
-                        coords = [(node.get("lon"), node.get("lat")) for node in nodes]
-                        coords = [(lon, lat) for lon, lat in coords if lon is not None and lat is not None]
-                        if len(coords) >= 2:
-                            geometry = LineString(coords)
-                        elif len(coords) == 1:
-                            geometry = Point(coords[0])
-                
-                if geometry is None:
-                    continue
-                
-                # Create feature record
-                feature = {
-                    "osm_id": element.get("id"),
-                    "osm_type": element_type,
-                    "name": tags.get("name", ""),
-                    "category": category,
-                    "geometry": geometry,
-                    "tags": json.dumps(tags),
-                    "properties": tags.copy(),
-                }
-                
-                # Add specific fields based on category
-                if category == "roads":
-                    feature["highway"] = tags.get("highway", "")
-                    feature["surface"] = tags.get("surface", "")
-                    feature["name"] = tags.get("name", "")
-                elif category in ["hospital", "healthcare"]:
-                    feature["amenity"] = tags.get("amenity", "")
-                    feature["healthcare"] = tags.get("healthcare", "")
-                
-                # Add coordinates for points
-                if isinstance(geometry, Point):
-                    feature["lon"] = geometry.x
-                    feature["lat"] = geometry.y
-                else:
-                    # Use centroid for lines/polygons
-                    centroid = geometry.centroid
-                    feature["lon"] = centroid.x
-                    feature["lat"] = centroid.y
-                
-                results[category].append(feature)
-            
             # Convert to GeoDataFrames
             gdfs = {}
-            for category, features in results.items():
-                if features:
-                    try:
-                        gdf = gpd.GeoDataFrame(features, crs="EPSG:4326")
-                        gdfs[category] = gdf
-                        log_structured("info", f"Extracted {category} features",
-                            category=category,
-                            count=len(gdf)
-                        )
-                    except Exception as e:
-                        log_error(e, {
-                            "module": "osm_data_extractor",
-                            "function": "extract_features",
-                            "category": category
-                        })
+            try:
+                gdfs = self.features_to_gdfs(features)
+            except Exception as e:
+                log_error(e, {
+                    "module": "osm_data_extractor",
+                    "function": "extract_features"
+                })
+            for category, gdf in gdfs.items():
+                log_structured("info", f"Extracted {category} features",
+                    category=category,
+                    count=len(gdf)
+                )
             
             # Rate limiting
             time.sleep(2)
@@ -468,6 +504,63 @@ class OSMDataExtractor:
             })
             return {}
     
+    def harvest_features(
+        self,
+        db_store,
+        feature_types: Optional[List[str]] = None,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+        include_roads: bool = True,
+        harvester: Optional[OverpassHarvester] = None,
+        tile_size: float = TILE_SIZE,
+        restart: bool = False
+    ) -> Dict[str, int]:
+        """
+        Extract features tile by tile straight into the database.
+        
+        Each finished tile is ingested into osm_roads/osm_pois and
+        checkpointed, so rerunning with the same arguments resumes an
+        interrupted harvest.
+        
+        Args:
+            db_store: DuckDBStore to ingest into (also holds the checkpoints)
+            feature_types: List of POI categories (None = all)
+            bbox: Bounding box (defaults to South Sudan)
+            include_roads: Whether to include roads
+            harvester: Configured harvester (defaults to one for this endpoint)
+            tile_size: Edge of the initial grid tiles in degrees
+            restart: Discard checkpoints of a previous run with the same arguments
+            
+        Returns:
+            Harvest summary (see OverpassHarvester.harvest)
+        """
+        if feature_types is None:
+            feature_types = list(self.POI_CATEGORIES.keys())
+        bbox = bbox or self.SOUTH_SUDAN_BBOX
+        harvester = harvester or OverpassHarvester(db_store, overpass_url=self.overpass_url)
+        run_id = harvest_run_id("osm_features", sorted(feature_types), include_roads, bbox, tile_size)
+        if restart:
+            db_store.clear_harvest_run(run_id)
+        
+        def build_query(tile_bbox, timeout):
+            return self.build_overpass_query(feature_types, tile_bbox, include_roads, timeout=timeout)
+        
+        def handle_tile(tile, features):
+            gdfs = self.features_to_gdfs(features)
+            roads = gdfs.pop("roads", None)
+            if roads is not None:
+                db_store.ingest_osm_roads(roads)
+            if gdfs:
+                db_store.ingest_osm_pois(pd.concat(gdfs.values(), ignore_index=True))
+        
+        return harvester.harvest(
+            run_id,
+            bbox,
+            build_query,
+            handle_tile,
+            parse_element=lambda element: self.element_to_feature(element, feature_types),
+            tile_size=tile_size
+        )
+    
     def get_category_color(self, category: str) -> List[int]:
         """Get color for a category."""
         if category == "roads":
@@ -3,6 +3,7 @@ import requests
 import time
 from typing import List, Dict, Any, Optional, Tuple
 from app.core.scrapers.base import BaseScraper
+from app.core.scrapers.http_cache import HTTPCache
 from app.utils.logging import log_error, log_structured
 
 
@@ -15,14 +16,15 @@ class OSMScraper(BaseScraper):
     # Overpass API endpoint (public instance)
     OVERPASS_URL = "https://overpass-api.de/api/interpreter"
     
-    def __init__(self, overpass_url: Optional[str] = None):
+    def __init__(self, overpass_url: Optional[str] = None, http_cache: Optional[HTTPCache] = None):
         """
         Initialize OSM scraper.
         
         Args:
             overpass_url: Overpass API URL (defaults to public instance)
+            http_cache: Response cache (defaults to the shared on-disk cache)
         """
-        super().__init__("osm")
+        super().__init__("osm", http_cache)
         self.overpass_url = overpass_url or self.OVERPASS_URL
     
     def search_village(
@@ -58,7 +60,8 @@ class OSMScraper(BaseScraper):
         """
         
         try:
-            response = requests.post(
+            response = self._request(
+                "POST",
                 self.overpass_url,
                 data=query,
                 headers={"Content-Type": "text/plain"},
@@ -120,8 +123,9 @@ class OSMScraper(BaseScraper):
                 
                 results.append(self.normalize_result(result))
             
-            # Rate limiting
-            time.sleep(1)
+            # Rate limiting (cached responses never reached the server)
+            if not response.from_cache:
+                time.sleep(1)
             
             return results
         
@@ -170,7 +174,8 @@ class OSMScraper(BaseScraper):
         """
         
         try:
-            response = requests.post(
+            response = self._request(
+                "POST",
                 self.overpass_url,
                 data=query,
                 headers={"Content-Type": "text/plain"},
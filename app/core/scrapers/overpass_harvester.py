@@ -0,0 +1,415 @@
+"""Tiled, resumable harvester for the Overpass API.
+
+A country-sized Overpass query either times out on the server or returns a
+response too large to hold in memory. OverpassHarvester splits the bounding
+box into a grid of tiles and fetches them concurrently, never starting more
+than one request per `min_interval` seconds. A tile whose query times out
+on the server is split into four and fetched again. Responses are parsed
+element by element as they stream in, and each finished tile is
+checkpointed in DuckDB (osm_harvest_tiles), so an interrupted run resumes
+with the tiles it had not finished.
+"""
+import codecs
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+from app.utils.logging import log_error, log_structured
+from app.utils.metrics import inc
+
+
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+
+# Edge length of the initial grid tiles, in degrees
+TILE_SIZE = 2.0
+
+# How many times a tile may be split in four after a server-side timeout
+MAX_TILE_DEPTH = 4
+
+# overpass-api.de grants two concurrent slots per client
+MAX_WORKERS = 2
+
+# Minimum delay between the starts of two requests, in seconds
+MIN_REQUEST_INTERVAL = 1.0
+
+# Overpass [timeout:] per tile query, also used as the read timeout
+TILE_TIMEOUT = 180
+
+MAX_RETRIES = 4
+
+# First retry delay in seconds; doubles on each attempt, with jitter
+BACKOFF_BASE = 5.0
+
+# HTTP statuses Overpass uses when it is busy or rate limiting
+RETRY_STATUSES = {429, 502, 503, 504}
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_ELEMENTS_START = re.compile(r'"elements"\s*:\s*\[')
+_REMARK = re.compile(r'"remark"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_WHITESPACE = " \t\r\n,"
+
+
+class OverpassTimeout(Exception):
+    """The server gave up on a tile's query (timeout or out of memory)."""
+
+
+@dataclass(frozen=True)
+class Tile:
+    """Bounding box of one harvest request."""
+    
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+    depth: int = 0
+    
+    @property
+    def bbox(self) -> Tuple[float, float, float, float]:
+        """(min_lon, min_lat, max_lon, max_lat)"""
+        return (self.min_lon, self.min_lat, self.max_lon, self.max_lat)
+    
+    @property
+    def key(self) -> str:
+        """Stable checkpoint key."""
+        return f"{self.depth}:" + ",".join(f"{value:.6f}" for value in self.bbox)
+    
+    def split(self) -> List["Tile"]:
+        """Split into four quadrants one level deeper."""
+        mid_lon = (self.min_lon + self.max_lon) / 2
+        mid_lat = (self.min_lat + self.max_lat) / 2
+        depth = self.depth + 1
+        return [
+            Tile(self.min_lon, self.min_lat, mid_lon, mid_lat, depth),
+            Tile(mid_lon, self.min_lat, self.max_lon, mid_lat, depth),
+            Tile(self.min_lon, mid_lat, mid_lon, self.max_lat, depth),
+            Tile(mid_lon, mid_lat, self.max_lon, self.max_lat, depth),
+        ]
+
+
+def plan_tiles(bbox: Tuple[float, float, float, float], tile_size: float = TILE_SIZE) -> List[Tile]:
+    """
+    Cover a bounding box with a grid of tiles.
+    
+    Args:
+        bbox: Bounding box (min_lon, min_lat, max_lon, max_lat)
+        tile_size: Maximum tile edge in degrees
+    
+    Returns:
+        List of tiles, row by row from the south-west corner
+    """
+    min_lon, min_lat, max_lon, max_lat = bbox
+    columns = max(1, math.ceil((max_lon - min_lon) / tile_size))
+    rows = max(1, math.ceil((max_lat - min_lat) / tile_size))
+    width = (max_lon - min_lon) / columns
+    height = (max_lat - min_lat) / rows
+    
+    return [
+        Tile(
+            min_lon + col * width,
+            min_lat + row * height,
+            max_lon if col == columns - 1 else min_lon + (col + 1) * width,
+            max_lat if row == rows - 1 else min_lat + (row + 1) * height
+        )
+        for row in range(rows)
+        for col in range(columns)
+    ]
+
+
+def harvest_run_id(*parts: Any) -> str:
+    """
+    Derive a run identifier from everything that shapes the tile queries.
+    
+    Args:
+        *parts: JSON-serializable query parameters
+    
+    Returns:
+        Short hex digest
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def iter_elements(chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+    """
+    Parse an Overpass JSON response element by element.
+    
+    Only the element being decoded is buffered, so memory stays flat no
+    matter how large the response is.
+    
+    Args:
+        chunks: Raw response body chunks
+    
+    Yields:
+        Element dictionaries from the "elements" array
+    
+    Raises:
+        OverpassTimeout: If the response ends with a timeout/out-of-memory remark
+        ValueError: If the response has no elements array or is truncated
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    state = "header"
+    
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        pos = 0
+        while state != "trailer":
+            if state == "header":
+                match = _ELEMENTS_START.search(buffer, pos)
+                if not match:
+                    break
+                pos = match.end()
+                state = "elements"
+                continue
+            
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                pos += 1
+                state = "trailer"
+                break
+            try:
+                element, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element continues in the next chunk
+                break
+            yield element
+        
+        buffer = buffer[pos:]
+    
+    buffer += text_decoder.decode(b"", final=True)
+    if state == "header":
+        raise ValueError("Overpass response has no elements array")
+    if state == "elements":
+        raise ValueError("Overpass response was truncated")
+    
+    remark = _REMARK.search(buffer)
+    if remark:
+        message = json.loads(f'"{remark.group(1)}"')
+        if "timed out" in message or "out of memory" in message:
+            raise OverpassTimeout(message)
+
+
+class OverpassHarvester:
+    """Fetches an Overpass query tile by tile with checkpoints in DuckDB."""
+    
+    def __init__(
+        self,
+        store,
+        overpass_url: Optional[str] = None,
+        max_workers: int = MAX_WORKERS,
+        min_interval: float = MIN_REQUEST_INTERVAL,
+        timeout: int = TILE_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        max_depth: int = MAX_TILE_DEPTH,
+        backoff_base: float = BACKOFF_BASE
+    ):
+        """
+        Initialize harvester.
+        
+        Args:
+            store: DuckDBStore holding the tile checkpoints
+            overpass_url: Overpass API URL (defaults to public instance)
+            max_workers: Concurrent requests
+            min_interval: Minimum seconds between request starts
+            timeout: Overpass query timeout per tile, in seconds
+            max_retries: Retries per tile on busy/rate-limit responses
+            max_depth: How many times a tile may be split after a timeout
+            backoff_base: First retry delay in seconds
+        """
+        self.store = store
+        self.overpass_url = overpass_url or OVERPASS_URL
+        self.max_workers = max_workers
+        self.min_interval = min_interval
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_depth = max_depth
+        self.backoff_base = backoff_base
+        self._turn_lock = threading.Lock()
+        self._next_request_at = 0.0
+        self._local = threading.local()
+    
+    @property
+    def _session(self) -> requests.Session:
+        """One HTTP session per worker thread."""
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+    
+    def _wait_turn(self):
+        """Block until this thread may start a request."""
+        with self._turn_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + self.min_interval
+        time.sleep(max(0.0, start_at - now))
+    
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Delay before retry `attempt`, honouring Retry-After when given."""
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        delay = self.backoff_base * (2 ** attempt)
+        return delay * random.uniform(0.5, 1.0)
+    
+    def fetch_tile(
+        self,
+        query: str,
+        parse_element: Optional[Callable[[Dict[str, Any]], Any]] = None
+    ) -> List[Any]:
+        """
+        Run one tile query, retrying while the server is busy.
+        
+        Args:
+            query: Overpass QL query
+            parse_element: Converts each streamed element; None results are dropped
+        
+        Returns:
+            Parsed elements
+        
+        Raises:
+            OverpassTimeout: If the query is too heavy for the server
+            requests.RequestException: If retries are exhausted
+        """
+        for attempt in range(self.max_retries + 1):
+            self._wait_turn()
+            try:
+                with self._session.post(
+                    self.overpass_url,
+                    data=query,
+                    headers={"Content-Type": "text/plain"},
+                    timeout=(10, self.timeout + 30),
+                    stream=True
+                ) as response:
+                    if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                        delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                        inc("overpass_retries_total", status=response.status_code)
+                        time.sleep(delay)
+                        continue
+                    response.raise_for_status()
+                    
+                    records = []
+                    for element in iter_elements(response.iter_content(STREAM_CHUNK_SIZE)):
+                        record = parse_element(element) if parse_element else element
+                        if record is not None:
+                            records.append(record)
+                    return records
+            except requests.exceptions.ReadTimeout as e:
+                raise OverpassTimeout(str(e)) from e
+            except requests.exceptions.ConnectionError:
+                if attempt >= self.max_retries:
+                    raise
+                inc("overpass_retries_total", status="connection")
+                time.sleep(self._backoff(attempt))
+        raise requests.exceptions.RetryError(f"Overpass still busy after {self.max_retries} retries")
+    
+    def _pending_tiles(self, run_id: str, tiles: List[Tile], summary: Dict[str, int]) -> deque:
+        """Tiles still to fetch, following checkpointed splits."""
+        checkpoints = self.store.get_harvest_tiles(run_id)
+        pending = deque()
+        stack = list(reversed(tiles))
+        while stack:
+            tile = stack.pop()
+            status = checkpoints.get(tile.key)
+            if status == "done":
+                summary["skipped"] += 1
+            elif status == "split":
+                stack.extend(reversed(tile.split()))
+            else:
+                pending.append(tile)
+        return pending
+    
+    def harvest(
+        self,
+        run_id: str,
+        bbox: Tuple[float, float, float, float],
+        build_query: Callable[[Tuple[float, float, float, float], int], str],
+        handle_tile: Callable[[Tile, List[Any]], None],
+        parse_element: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        tile_size: float = TILE_SIZE
+    ) -> Dict[str, int]:
+        """
+        Harvest a bounding box tile by tile.
+        
+        Tiles are fetched on worker threads; handle_tile and the checkpoints
+        run on the calling thread, so they may use the DuckDB connection.
+        Tiles already checkpointed as done for run_id are skipped.
+        
+        Args:
+            run_id: Identifier of this harvest (see harvest_run_id)
+            bbox: Bounding box (min_lon, min_lat, max_lon, max_lat)
+            build_query: Builds the Overpass QL for a tile bbox and timeout
+            handle_tile: Stores a finished tile's parsed elements
+            parse_element: Converts each streamed element; None results are dropped
+            tile_size: Edge of the initial grid tiles in degrees
+        
+        Returns:
+            Counts of done, skipped, split and failed tiles and of elements
+        """
+        summary = {"done": 0, "skipped": 0, "split": 0, "failed": 0, "elements": 0}
+        pending = self._pending_tiles(run_id, plan_tiles(bbox, tile_size), summary)
+        
+        log_structured("info", "Starting Overpass harvest",
+            run_id=run_id, bbox=bbox, pending_tiles=len(pending), skipped_tiles=summary["skipped"]
+        )
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            while pending or running:
+                while pending and len(running) < self.max_workers:
+                    tile = pending.popleft()
+                    query = build_query(tile.bbox, self.timeout)
+                    running[executor.submit(self.fetch_tile, query, parse_element)] = tile
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    tile = running.pop(future)
+                    try:
+                        records = future.result()
+                        handle_tile(tile, records)
+                    except OverpassTimeout as e:
+                        if tile.depth < self.max_depth:
+                            self.store.mark_harvest_tile(run_id, tile.key, "split")
+                            pending.extend(tile.split())
+                            summary["split"] += 1
+                            inc("overpass_tiles_total", status="split")
+                            log_structured("info", "Splitting Overpass tile after timeout",
+                                run_id=run_id, tile=tile.key, reason=str(e)
+                            )
+                            continue
+                        self._fail_tile(run_id, tile, e, summary)
+                    except Exception as e:
+                        self._fail_tile(run_id, tile, e, summary)
+                    else:
+                        self.store.mark_harvest_tile(run_id, tile.key, "done", len(records))
+                        summary["done"] += 1
+                        summary["elements"] += len(records)
+                        inc("overpass_tiles_total", status="done")
+        
+        log_structured("info", "Overpass harvest finished", run_id=run_id, **summary)
+        return summary
+    
+    def _fail_tile(self, run_id: str, tile: Tile, error: Exception, summary: Dict[str, int]):
+        """Checkpoint a failed tile; the next run fetches it again."""
+        self.store.mark_harvest_tile(run_id, tile.key, "failed")
+        summary["failed"] += 1
+        inc("overpass_tiles_total", status="failed")
+        log_error(error, {
+            "module": "overpass_harvester",
+            "function": "harvest",
+            "run_id": run_id,
+            "tile": tile.key
+        })
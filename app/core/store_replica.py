@@ -0,0 +1,257 @@
+"""Read-only snapshot replicas of the DuckDB store.
+
+DuckDB locks the database file for the process that opens it read-write,
+so batch scripts (process_hrd_weekly.py, evaluations) could not open the
+store while the Streamlit app was running. The process holding the
+database is the single writer: it periodically copies the database to a
+snapshot file next to it (<db>.snapshot.duckdb, swapped in atomically).
+Other processes open that snapshot read-only, with a cursor per thread for
+search, cache reads and proximity queries.
+
+Writes made through a replica (geocode cache entries) are not executed;
+each replica process appends them to its own JSONL file in <db>.spool/,
+and the writer applies them before publishing the next snapshot.
+"""
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+import duckdb
+from app.core.config import DUCKDB_PATH, DUCKDB_SNAPSHOT_INTERVAL
+from app.core.duckdb_store import DuckDBStore
+from app.utils.logging import log_error, log_structured
+from app.utils.metrics import inc, timed
+
+
+# One snapshot copy at a time per process
+_publish_lock = threading.Lock()
+
+# One spool drain at a time per process, so leftover claimed files are applied once
+_drain_lock = threading.Lock()
+
+
+def replica_paths(db_path: Optional[Path] = None) -> Tuple[Path, Path]:
+    """
+    Snapshot file and spool directory of a database.
+    
+    Args:
+        db_path: Primary database file (default from config)
+    
+    Returns:
+        (snapshot path, spool directory)
+    """
+    db_path = Path(db_path or DUCKDB_PATH)
+    return (
+        db_path.with_name(f"{db_path.stem}.snapshot{db_path.suffix}"),
+        db_path.with_name(f"{db_path.stem}.spool"),
+    )
+
+
+def _source_version(db_path: Path) -> Tuple[int, ...]:
+    """Modification stamp of a database file and its WAL."""
+    version = []
+    for path in (db_path, db_path.with_name(db_path.name + ".wal")):
+        try:
+            stat = path.stat()
+            version.extend([stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            version.extend([0, 0])
+    return tuple(version)
+
+
+def drain_spool(store: DuckDBStore) -> int:
+    """
+    Apply the writes queued by replica processes.
+    
+    Each spool file is claimed by renaming it first, so a replica that
+    keeps writing starts a new file instead of racing the reader. Claimed
+    files left behind by an interrupted drain are picked up again (cache
+    writes are upserts, so re-applying them is harmless), and a line that
+    cannot be decoded, such as one cut off when a replica was killed
+    mid-append, is logged and skipped.
+    
+    Args:
+        store: Writable store of the primary database
+    
+    Returns:
+        Number of writes applied
+    """
+    _, spool_dir = replica_paths(store.db_path)
+    if not spool_dir.exists():
+        return 0
+    applied = 0
+    with _drain_lock:
+        claimed_files = sorted(spool_dir.glob("*.draining"))
+        for path in sorted(spool_dir.glob("*.jsonl")):
+            claimed = path.with_name(f"{path.stem}.{time.time_ns()}.draining")
+            try:
+                os.replace(path, claimed)
+            except OSError:
+                continue
+            claimed_files.append(claimed)
+        for claimed in claimed_files:
+            applied += _apply_spool_file(store, claimed)
+            claimed.unlink()
+    if applied:
+        inc("duckdb_spool_writes_applied_total", applied)
+    return applied
+
+
+def _apply_spool_file(store: DuckDBStore, path: Path) -> int:
+    """Apply the writes of one claimed spool file; return how many were applied."""
+    applied = 0
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                table, record = entry["table"], entry["record"]
+            except (ValueError, KeyError, TypeError) as e:
+                inc("duckdb_spool_bad_lines_total")
+                log_structured("warning", "Skipping unreadable spool line", module="store_replica",
+                               function="drain_spool", spool_file=str(path),
+                               line_number=line_number, error=str(e))
+                continue
+            if table == "geocode_cache":
+                store.set_cache(record)
+                applied += 1
+    return applied
+
+
+@timed("duckdb_snapshot_seconds")
+def publish_snapshot(store: DuckDBStore, force: bool = False) -> Optional[Path]:
+    """
+    Copy the database to its snapshot file and swap it in atomically.
+    
+    Queued replica writes are applied first. Replicas that already have
+    the old snapshot open keep reading it until they reopen.
+    
+    Args:
+        store: Writable store of the primary database
+        force: Publish even if the database files did not change
+    
+    Returns:
+        Snapshot path, or None if the existing snapshot was still current
+    """
+    if store.read_only:
+        raise ValueError("Snapshots are published from the writable store")
+    snapshot_path, _ = replica_paths(store.db_path)
+    with _publish_lock:
+        drain_spool(store)
+        store.conn.execute("CHECKPOINT")
+        version = _source_version(Path(store.db_path))
+        if not force and snapshot_path.exists() and getattr(store, "_snapshot_version", None) == version:
+            return None
+        
+        tmp_path = snapshot_path.with_name(snapshot_path.name + ".tmp")
+        tmp_path.unlink(missing_ok=True)
+        conn = store.conn
+        database = conn.execute("SELECT current_database()").fetchone()[0]
+        quoted_path = str(tmp_path).replace("'", "''")
+        quoted_database = database.replace('"', '""')
+        conn.execute(f"ATTACH '{quoted_path}' AS snapshot_copy")
+        try:
+            conn.execute(f'COPY FROM DATABASE "{quoted_database}" TO snapshot_copy')
+        finally:
+            conn.execute("DETACH snapshot_copy")
+        os.replace(tmp_path, snapshot_path)
+        store._snapshot_version = version
+    
+    inc("duckdb_snapshots_total")
+    log_structured("info", "Database snapshot published", module="store_replica",
+                   function="publish_snapshot", snapshot=str(snapshot_path),
+                   bytes=snapshot_path.stat().st_size)
+    return snapshot_path
+
+
+def open_replica(db_path: Optional[Path] = None, shared: bool = True) -> DuckDBStore:
+    """
+    Open the latest snapshot of a database read-only.
+    
+    Args:
+        db_path: Primary database file (default from config)
+        shared: Give each thread its own cursor (the read pool)
+    
+    Returns:
+        Read-only DuckDBStore whose cache writes go to the spool
+    
+    Raises:
+        FileNotFoundError: If no snapshot has been published yet
+    """
+    snapshot_path, spool_dir = replica_paths(db_path)
+    if not snapshot_path.exists():
+        raise FileNotFoundError(
+            f"No snapshot at {snapshot_path}; the process holding the database publishes one "
+            f"every DUCKDB_SNAPSHOT_INTERVAL seconds"
+        )
+    return DuckDBStore(snapshot_path, shared=shared, read_only=True, spool_dir=spool_dir)
+
+
+def open_store(db_path: Optional[Path] = None, shared: bool = False) -> DuckDBStore:
+    """
+    Open the database read-write, or its snapshot if another process holds it.
+    
+    Args:
+        db_path: Primary database file (default from config)
+        shared: Store is used from several threads
+    
+    Returns:
+        Writable DuckDBStore, or a read-only replica (store.read_only)
+    """
+    db_path = Path(db_path or DUCKDB_PATH)
+    try:
+        return DuckDBStore(db_path, shared=shared)
+    except duckdb.IOException as e:
+        snapshot_path, _ = replica_paths(db_path)
+        if not snapshot_path.exists():
+            raise
+        log_structured("warning", "Database is locked by another process; using its read-only snapshot",
+                       module="store_replica", function="open_store",
+                       db_path=str(db_path), snapshot=str(snapshot_path), error=str(e))
+        inc("duckdb_replica_opens_total")
+        return open_replica(db_path, shared=True)
+
+
+class SnapshotPublisher:
+    """Background thread that republishes a store's snapshot on an interval."""
+    
+    def __init__(self, store: DuckDBStore, interval: float = DUCKDB_SNAPSHOT_INTERVAL):
+        """
+        Initialize the publisher.
+        
+        Args:
+            store: Writable store of the primary database
+            interval: Seconds between publishes (the first one runs at start)
+        """
+        self.store = store
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="duckdb-snapshot", daemon=True)
+    
+    def start(self) -> "SnapshotPublisher":
+        """Start publishing."""
+        self._thread.start()
+        return self
+    
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop publishing and wait for a copy in progress.
+        
+        Args:
+            timeout: Seconds to wait for the thread
+        """
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                publish_snapshot(self.store)
+            except Exception as e:
+                log_error(e, {"module": "store_replica", "function": "SnapshotPublisher._run",
+                              "db_path": str(self.store.db_path)})
+            self._stop.wait(self.interval)
@@ -1,57 +1,171 @@
 """GeoNames gazetteer provider using local export files."""
+import csv
+import re
+from bisect import bisect_left
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point
 from pathlib import Path
 from typing import List, Dict, Any, Optional
+from app.core.config import GEONAMES_CACHE_DIR
 from app.gazetteers.base import GazetteerProvider
-from app.utils.logging import log_error
+from app.utils.logging import log_structured, log_error
+
+
+# GeoNames TSV format:
+# geonameid, name, asciiname, alternatenames, latitude, longitude,
+# feature class, feature code, country code, cc2, admin1, admin2, admin3, admin4,
+# population, elevation, dem, timezone, modification date
+GEONAMES_COLUMNS = [
+    "geonameid", "name", "asciiname", "alternatenames", "latitude", "longitude",
+    "feature_class", "feature_code", "country_code", "cc2", "admin1", "admin2",
+    "admin3", "admin4", "population", "elevation", "dem", "timezone", "modification_date"
+]
+
+# Columns kept after loading
+KEEP_COLUMNS = [
+    "geonameid", "name", "asciiname", "alternatenames", "latitude", "longitude",
+    "feature_class", "feature_code", "country_code", "admin1", "admin2", "population"
+]
+
+TEXT_COLUMNS = [
+    "name", "asciiname", "alternatenames", "feature_class", "feature_code",
+    "country_code", "admin1", "admin2"
+]
+
+# Rows parsed per chunk when filtering allCountries.txt
+CHUNK_SIZE = 500_000
+
+_TOKEN_SPLIT = re.compile(r"[^\w]+")
+
+
+def _tokens(text: str) -> List[str]:
+    """Word tokens of a lowercased name."""
+    return [token for token in _TOKEN_SPLIT.split(text) if token]
 
 
 class GeoNamesProvider(GazetteerProvider):
     """GeoNames provider using local TSV export files."""
     
-    def __init__(self, data_path: Optional[Path] = None):
+    def __init__(
+        self,
+        data_path: Optional[Path] = None,
+        country_code: str = "SS",
+        cache_dir: Optional[Path] = None
+    ):
         """
         Initialize GeoNames provider.
         
         Args:
             data_path: Path to GeoNames TSV file (allCountries.txt or SS.txt)
+            country_code: Country to keep (default SS, South Sudan)
+            cache_dir: Directory for the Parquet cache (default from config)
         """
         self.data_path = data_path
+        self.country_code = country_code
+        self.cache_dir = cache_dir or GEONAMES_CACHE_DIR
         self.gdf: Optional[gpd.GeoDataFrame] = None
+        # One row per distinct (feature row, lowercased name/alias)
+        self.aliases: pd.DataFrame = pd.DataFrame({"row": [], "alias": []})
+        self._tokens: List[str] = []
+        self._token_alias_ids: np.ndarray = np.array([], dtype=np.int64)
         self._load_data()
     
+    @property
+    def _cache_paths(self) -> tuple:
+        """Parquet files for the filtered features and their alias table."""
+        stem = f"{self.data_path.stem}_{self.country_code}"
+        return (
+            self.cache_dir / f"{stem}.parquet",
+            self.cache_dir / f"{stem}_aliases.parquet"
+        )
+    
+    def _cache_is_fresh(self) -> bool:
+        """Whether both cache files exist and are newer than the TSV."""
+        source_mtime = self.data_path.stat().st_mtime
+        return all(path.exists() and path.stat().st_mtime >= source_mtime for path in self._cache_paths)
+    
+    def _read_tsv(self) -> pd.DataFrame:
+        """Read the TSV in chunks, keeping only the needed columns and country."""
+        usecols = [GEONAMES_COLUMNS.index(column) for column in KEEP_COLUMNS]
+        chunks = pd.read_csv(
+            self.data_path,
+            sep="\t",
+            header=None,
+            names=GEONAMES_COLUMNS,
+            usecols=usecols,
+            dtype={column: str for column in TEXT_COLUMNS},
+            quoting=csv.QUOTE_NONE,
+            keep_default_na=False,
+            na_values={"latitude": [""], "longitude": [""], "population": [""]},
+            chunksize=CHUNK_SIZE
+        )
+        frames = [chunk[chunk["country_code"] == self.country_code] for chunk in chunks]
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=KEEP_COLUMNS)
+        return df[KEEP_COLUMNS]
+    
+    @staticmethod
+    def _build_aliases(df: pd.DataFrame) -> pd.DataFrame:
+        """Explode name, asciiname and alternatenames into a lowercased alias table."""
+        rows = np.arange(len(df))
+        alternates = df["alternatenames"].str.split(",")
+        parts = [
+            pd.DataFrame({"row": rows, "alias": df["name"]}),
+            pd.DataFrame({"row": rows, "alias": df["asciiname"]}),
+            pd.DataFrame({"row": rows, "alias": alternates}).explode("alias"),
+        ]
+        aliases = pd.concat(parts, ignore_index=True)
+        aliases["alias"] = aliases["alias"].fillna("").str.strip().str.lower()
+        aliases = aliases[aliases["alias"] != ""].drop_duplicates()
+        return aliases.sort_values(["row", "alias"]).reset_index(drop=True)
+    
+    def _build_token_index(self):
+        """Sort alias tokens so prefix lookups are two binary searches."""
+        tokens = self.aliases["alias"].map(_tokens).explode().dropna()
+        tokens = tokens.sort_values(kind="stable")
+        self._tokens = tokens.tolist()
+        self._token_alias_ids = tokens.index.to_numpy(dtype=np.int64)
+    
+    def _write_cache(self, df: pd.DataFrame):
+        """Persist the filtered features and alias table as Parquet."""
+        features_path, aliases_path = self._cache_paths
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(features_path, index=False)
+            self.aliases.to_parquet(aliases_path, index=False)
+        except Exception as e:
+            log_error(e, {
+                "module": "geonames",
+                "function": "_write_cache",
+                "cache_dir": str(self.cache_dir)
+            })
+    
     def _load_data(self):
-        """Load GeoNames data from TSV file."""
+        """Load GeoNames data from the Parquet cache, or from the TSV file."""
         if not self.data_path or not self.data_path.exists():
             return
         
-        # GeoNames TSV format:
-        # geonameid, name, asciiname, alternatenames, latitude, longitude,
-        # feature class, feature code, country code, cc2, admin1, admin2, admin3, admin4,
-        # population, elevation, dem, timezone, modification date
         try:
-            df = pd.read_csv(
-                self.data_path,
-                sep="\t",
-                header=None,
-                names=[
-                    "geonameid", "name", "asciiname", "alternatenames", "latitude", "longitude",
-                    "feature_class", "feature_code", "country_code", "cc2", "admin1", "admin2",
-                    "admin3", "admin4", "population", "elevation", "dem", "timezone", "modification_date"
-                ],
-                low_memory=False
-            )
-            
-            # Filter for South Sudan (SS)
-            df = df[df["country_code"] == "SS"]
-            
-            # Create geometry
-            geometry = [Point(lon, lat) for lon, lat in zip(df["longitude"], df["latitude"])]
+            if self._cache_is_fresh():
+                features_path, aliases_path = self._cache_paths
+                df = pd.read_parquet(features_path)
+                self.aliases = pd.read_parquet(aliases_path)
+                source = "parquet"
+            else:
+                df = self._read_tsv()
+                self.aliases = self._build_aliases(df)
+                self._write_cache(df)
+                source = "tsv"
             
+            geometry = gpd.points_from_xy(df["longitude"], df["latitude"])
             self.gdf = gpd.GeoDataFrame(df, geometry=geometry, crs="EPSG:4326")
+            self._build_token_index()
             
+            log_structured("info", "GeoNames data loaded",
+                         module="geonames", function="_load_data",
+                         source=source, row_count=len(self.gdf),
+                         alias_count=len(self.aliases), data_path=str(self.data_path))
+        
         except Exception as e:
             log_error(e, {
                 "module": "geonames",
@@ -60,20 +174,45 @@ class GeoNamesProvider(GazetteerProvider):
             })
             self.gdf = gpd.GeoDataFrame()
     
+    def _lookup(self, query_lower: str) -> np.ndarray:
+        """
+        Feature rows with a name or alias containing the query.
+        
+        Every query token must prefix some alias token; aliases under the
+        narrowest token range are then checked for the full query.
+        
+        Args:
+            query_lower: Lowercased query
+        
+        Returns:
+            Sorted feature row positions
+        """
+        spans = []
+        for token in _tokens(query_lower):
+            start = bisect_left(self._tokens, token)
+            end = bisect_left(self._tokens, token + "\uffff", lo=start)
+            if start == end:
+                return np.array([], dtype=np.int64)
+            spans.append((end - start, start, end))
+        if not spans:
+            return np.array([], dtype=np.int64)
+        
+        _, start, end = min(spans)
+        alias_ids = np.unique(self._token_alias_ids[start:end])
+        candidates = self.aliases.iloc[alias_ids]
+        matched = [query_lower in alias for alias in candidates["alias"]]
+        return np.unique(candidates["row"].to_numpy()[matched])
+    
     def fetch_features(self, query: str, bbox: tuple = None) -> gpd.GeoDataFrame:
         """Fetch features matching query."""
         if self.gdf is None or self.gdf.empty:
             return gpd.GeoDataFrame()
         
-        # Filter by query (simple name matching)
-        query_lower = query.lower()
-        mask = (
-            self.gdf["name"].str.lower().str.contains(query_lower, na=False) |
-            self.gdf["asciiname"].str.lower().str.contains(query_lower, na=False) |
-            self.gdf["alternatenames"].str.lower().str.contains(query_lower, na=False)
-        )
-        
-        result = self.gdf[mask].copy()
+        query_lower = query.lower().strip()
+        if query_lower:
+            result = self.gdf.iloc[self._lookup(query_lower)].copy()
+        else:
+            result = self.gdf.copy()
         
         # Filter by bbox if provided
         if bbox and not result.empty:
@@ -85,4 +224,3 @@ class GeoNamesProvider(GazetteerProvider):
     def get_name(self) -> str:
         """Get provider name."""
         return "GeoNames"
-
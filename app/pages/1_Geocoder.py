@@ -12,58 +12,15 @@ import pydeck as pdk
 import pandas as pd
 import json
 from app.core.geocoder import Geocoder
+from app.core.boundary_tiles import get_boundary_geojson
 from app.core.duckdb_store import DuckDBStore
-from app.core.config import DUCKDB_PATH, FUZZY_THRESHOLD
-from app.core.security import sanitize_layer_name
+from app.utils.session import init_session_resources
+from app.core.config import FUZZY_THRESHOLD
 from app.utils.timing import Timer
 
 
-def load_admin_boundaries(layer_name: str, db_store: DuckDBStore):
-    """
-    Load admin boundary polygons for visualization.
-    
-    Args:
-        layer_name: Layer name (validated against whitelist)
-        db_store: DuckDBStore instance
-        
-    Returns:
-        GeoDataFrame with admin boundaries
-    """
-    from shapely import wkb
-    import json
-    import geopandas as gpd
-    
-    # Validate layer name to prevent SQL injection
-    sanitized_layer = sanitize_layer_name(layer_name)
-    if not sanitized_layer:
-        return gpd.GeoDataFrame()
-    
-    result = db_store.conn.execute(f"""
-        SELECT feature_id, geometry_wkb, name, properties
-        FROM {sanitized_layer}
-    """).fetchall()
-    
-    if not result:
-        return gpd.GeoDataFrame()
-    
-    features = []
-    for feature_id, geometry_wkb, name, properties_str in result:
-        geometry = wkb.loads(geometry_wkb, hex=True)
-        features.append({
-            "feature_id": feature_id,
-            "name": name,
-            "geometry": geometry
-        })
-    
-    return gpd.GeoDataFrame(features, crs="EPSG:4326")
-
-
 # Initialize session state if not already initialized
-if "db_store" not in st.session_state:
-    st.session_state.db_store = DuckDBStore(DUCKDB_PATH)
-
-if "geocoder" not in st.session_state:
-    st.session_state.geocoder = Geocoder(st.session_state.db_store)
+init_session_resources()
 
 st.title("🔍 Geocoder")
 
@@ -342,30 +299,27 @@ if result:
                 st.warning(f"Could not load POIs: {e}")
         
         # Load and display admin boundaries
+        map_zoom = 10
         if show_admin and result.boma and result.resolved_layer != "admin4_boma":
-            boma_gdf = load_admin_boundaries("admin4_boma", db_store)
-            if not boma_gdf.empty:
-                # Filter to matching boma
-                boma_match = boma_gdf[boma_gdf["name"] == result.boma]
-                if not boma_match.empty:
-                    # Convert to GeoJSON for pydeck
-                    geojson = json.loads(boma_match.to_json())
-                    layers.append(
-                        pdk.Layer(
-                            "GeoJsonLayer",
-                            data=geojson,
-                            get_fill_color=[0, 100, 200, 80],
-                            get_line_color=[0, 100, 200, 255],
-                            line_width_min_pixels=2,
-                            pickable=True
-                        )
+            # Simplified outline for the map zoom, from the boundary tile cache
+            geojson = get_boundary_geojson(db_store, "admin4_boma", map_zoom, names=[result.boma])
+            if geojson:
+                layers.append(
+                    pdk.Layer(
+                        "GeoJsonLayer",
+                        data=geojson,
+                        get_fill_color=[0, 100, 200, 80],
+                        get_line_color=[0, 100, 200, 255],
+                        line_width_min_pixels=2,
+                        pickable=True
                     )
+                )
         
         # Create map
         view_state = pdk.ViewState(
             longitude=result.lon,
             latitude=result.lat,
-            zoom=10,
+            zoom=map_zoom,
             pitch=0
         )
         
@@ -451,7 +405,8 @@ if result:
     else:
         st.error("❌ No match found")
     
-    # Alternatives / Similar Locations
+    # Alternatives / Similar Locations (computed only when displayed)
+    geocoder.get_alternatives(result)
     if result.alternatives:
         st.markdown("### 🔍 Similar Locations Found")
         st.info(f"Found {len(result.alternatives)} similar location(s) that might match your query.")
@@ -11,24 +11,23 @@ if str(project_root) not in sys.path:
 import geopandas as gpd
 import pandas as pd
 import io
+from app.core.admin_hierarchy import ensure_admin_hierarchy
+from app.core.columnar_export import GeocodeResultBatch
 from app.core.duckdb_store import DuckDBStore
+from app.utils.session import init_session_resources
 from app.core.geocoder import Geocoder
-from app.core.config import DUCKDB_PATH, LAYER_NAMES, INGESTED_DIR
+from app.core.models import GeocodeResult
+from app.core.config import LAYER_NAMES, INGESTED_DIR
 from app.core.security import sanitize_layer_name
 
 
 # Initialize session state if not already initialized
-if "db_store" not in st.session_state:
-    st.session_state.db_store = DuckDBStore(DUCKDB_PATH)
+init_session_resources()
 
 st.title("📊 Data Manager")
 
 db_store: DuckDBStore = st.session_state.db_store
 
-# Initialize geocoder if not in session state
-if "geocoder" not in st.session_state:
-    st.session_state.geocoder = Geocoder(db_store)
-
 geocoder: Geocoder = st.session_state.geocoder
 
 # Tabs for different operations
@@ -106,66 +105,51 @@ with tab1:
                     status_text = st.empty()
                     results_container = st.container()
                     
-                    # Initialize result columns
-                    result_df = df.copy()
-                    result_df["geocoded_lon"] = None
-                    result_df["geocoded_lat"] = None
-                    result_df["geocoded_state"] = None
-                    result_df["geocoded_county"] = None
-                    result_df["geocoded_payam"] = None
-                    result_df["geocoded_boma"] = None
-                    result_df["geocoded_village"] = None
-                    result_df["geocoded_state_id"] = None
-                    result_df["geocoded_county_id"] = None
-                    result_df["geocoded_payam_id"] = None
-                    result_df["geocoded_boma_id"] = None
-                    result_df["geocoded_score"] = None
-                    result_df["geocoded_match_type"] = None
+                    # Results are collected column-wise and joined to the upload once
+                    batch = GeocodeResultBatch()
+                    admin_ids = []
                     
                     success_count = 0
                     failed_count = 0
                     
-                    for idx, row in df.iterrows():
-                        location_text = str(row[location_column]).strip() if pd.notna(row[location_column]) else ""
-                        
-                        if not location_text or location_text.lower() in ["nan", "none", ""]:
-                            failed_count += 1
-                            continue
+                    for position, location_value in enumerate(df[location_column]):
+                        location_text = str(location_value).strip() if pd.notna(location_value) else ""
+                        result = None
+                        hierarchy_with_ids = {}
                         
-                        try:
-                            # Geocode the location
-                            result = geocoder.geocode(location_text, use_cache=use_cache)
-                            
-                            if result and result.lon and result.lat:
-                                # Add coordinates
-                                result_df.at[idx, "geocoded_lon"] = result.lon
-                                result_df.at[idx, "geocoded_lat"] = result.lat
-                                result_df.at[idx, "geocoded_state"] = result.state
-                                result_df.at[idx, "geocoded_county"] = result.county
-                                result_df.at[idx, "geocoded_payam"] = result.payam
-                                result_df.at[idx, "geocoded_boma"] = result.boma
-                                result_df.at[idx, "geocoded_village"] = result.village
-                                result_df.at[idx, "geocoded_score"] = result.score
-                                result_df.at[idx, "geocoded_match_type"] = result.resolved_layer
-                                
-                                # Get admin IDs using spatial query
-                                if result.lon and result.lat:
+                        if location_text and location_text.lower() not in ["nan", "none", ""]:
+                            try:
+                                # Geocode the location
+                                result = geocoder.geocode(location_text, use_cache=use_cache)
+                                if result and result.lon and result.lat:
+                                    # Get admin IDs using spatial query
                                     hierarchy_with_ids = db_store.get_admin_hierarchy_with_ids(result.lon, result.lat)
-                                    result_df.at[idx, "geocoded_state_id"] = hierarchy_with_ids.get("state_id")
-                                    result_df.at[idx, "geocoded_county_id"] = hierarchy_with_ids.get("county_id")
-                                    result_df.at[idx, "geocoded_payam_id"] = hierarchy_with_ids.get("payam_id")
-                                    result_df.at[idx, "geocoded_boma_id"] = hierarchy_with_ids.get("boma_id")
-                                
-                                success_count += 1
-                            else:
-                                failed_count += 1
-                        except Exception as e:
+                                else:
+                                    result = None
+                            except Exception as e:
+                                result = None
+                        
+                        if result is None:
                             failed_count += 1
+                            result = GeocodeResult(input_text=location_text, normalized_text="")
+                        else:
+                            success_count += 1
+                        batch.append(result)
+                        admin_ids.append(hierarchy_with_ids)
                         
                         # Update progress
-                        progress = (idx + 1) / len(df)
+                        progress = (position + 1) / len(df)
                         progress_bar.progress(progress)
-                        status_text.text(f"Processed {idx + 1}/{len(df)} locations... (✅ {success_count} successful, ❌ {failed_count} failed)")
+                        status_text.text(f"Processed {position + 1}/{len(df)} locations... (✅ {success_count} successful, ❌ {failed_count} failed)")
+                    
+                    geocoded = batch.to_pandas(arrow_dtypes=False)
+                    result_df = df.copy()
+                    for field in ["lon", "lat", "state", "county", "payam", "boma", "village"]:
+                        result_df[f"geocoded_{field}"] = geocoded[field].to_numpy()
+                    for level in ["state", "county", "payam", "boma"]:
+                        result_df[f"geocoded_{level}_id"] = [ids.get(f"{level}_id") for ids in admin_ids]
+                    result_df["geocoded_score"] = geocoded["score"].where(geocoded["lon"].notna()).to_numpy()
+                    result_df["geocoded_match_type"] = geocoded["resolved_layer"].to_numpy()
                     
                     progress_bar.empty()
                     status_text.empty()
@@ -267,6 +251,7 @@ with tab2:
                 else:
                     with st.spinner("Ingesting data..."):
                         db_store.ingest_geojson(layer_name, gdf, name_field)
+                        ensure_admin_hierarchy(db_store)
                     
                     st.success(f"✅ Ingested {len(gdf)} features into {layer_name}")
                     
@@ -312,9 +297,14 @@ with tab3:
     st.subheader("Build Name Index")
     st.markdown("After ingesting data, build the name index for fast fuzzy matching.")
 
+    incremental = st.checkbox(
+        "Only re-index changed features",
+        value=True,
+        help="Apply changes recorded since the last build instead of rebuilding the whole index"
+    )
     if st.button("Build Index", type="primary"):
         with st.spinner("Building name index..."):
-            db_store.build_name_index()
+            db_store.build_name_index(incremental=incremental)
         st.success("✅ Name index built successfully")
 
     # Data status
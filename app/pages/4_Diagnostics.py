@@ -9,14 +9,16 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from app.core.duckdb_store import DuckDBStore
-from app.core.config import DUCKDB_PATH, LAYER_NAMES
+from app.utils.session import init_session_resources
+from app.core.config import LAYER_NAMES
 from app.core.security import sanitize_layer_name
+from app.core.resources import memory_report
+from app.utils.metrics import get_registry
 from datetime import datetime, timedelta
 
 
 # Initialize session state if not already initialized
-if "db_store" not in st.session_state:
-    st.session_state.db_store = DuckDBStore(DUCKDB_PATH)
+init_session_resources(with_geocoder=False)
 
 st.title("🔧 Diagnostics")
 
@@ -91,6 +93,82 @@ index_count = db_store.conn.execute(
 ).fetchone()[0]
 st.metric("Index entries", index_count)
 
+# Memory (the store and geocoder are shared by all sessions)
+st.subheader("Memory Usage")
+memory = memory_report(st.session_state)
+
+
+def _mb(value):
+    return f"{value / 1024 / 1024:.1f} MB" if value is not None else "N/A"
+
+
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Process RSS", _mb(memory["rss_bytes"]))
+with col2:
+    st.metric("Shared indexes", _mb(memory["shared_bytes"]))
+with col3:
+    st.metric("Active sessions", memory["active_sessions"])
+with col4:
+    st.metric("Memory per session", _mb(memory["bytes_per_session"]))
+st.caption(f"This session's state: {_mb(memory['session_state_bytes'])}")
+
+# Performance metrics (in-process, since app start)
+st.subheader("Performance Metrics")
+registry = get_registry()
+metrics = registry.to_dict()
+
+if metrics["histograms"]:
+    import pandas as pd
+    
+    latency_rows = []
+    for entry in metrics["histograms"]:
+        labels = ", ".join(f"{k}={v}" for k, v in entry["labels"].items())
+        latency_rows.append({
+            "Metric": entry["name"],
+            "Labels": labels,
+            "Count": entry["count"],
+            "Mean (ms)": round(entry["mean"] * 1000, 2) if entry["mean"] is not None else None,
+            "p50 (ms)": round(entry["p50"] * 1000, 2) if entry["p50"] is not None else None,
+            "p95 (ms)": round(entry["p95"] * 1000, 2) if entry["p95"] is not None else None,
+            "p99 (ms)": round(entry["p99"] * 1000, 2) if entry["p99"] is not None else None,
+            "Max (ms)": round(entry["max"] * 1000, 2) if entry["max"] is not None else None,
+        })
+    st.dataframe(pd.DataFrame(latency_rows), use_container_width=True)
+    
+    if metrics["counters"]:
+        counter_rows = [
+            {
+                "Counter": entry["name"],
+                "Labels": ", ".join(f"{k}={v}" for k, v in entry["labels"].items()),
+                "Value": entry["value"],
+            }
+            for entry in metrics["counters"]
+        ]
+        st.dataframe(pd.DataFrame(counter_rows), use_container_width=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button(
+            "Download Prometheus text",
+            registry.to_prometheus(),
+            file_name="metrics.prom",
+            mime="text/plain"
+        )
+    with col2:
+        st.download_button(
+            "Download JSON",
+            registry.to_json(),
+            file_name="metrics.json",
+            mime="application/json"
+        )
+    with col3:
+        if st.button("Reset Metrics"):
+            registry.reset()
+            st.rerun()
+else:
+    st.info("No metrics recorded yet")
+
 # Clear cache
 st.subheader("Cache Management")
 if st.button("Clear Cache", type="secondary"):
@@ -16,8 +16,7 @@ from app.core.hrd_report_compiler import HRDReportCompiler
 from app.core.hrd_matrix_generator import HRDMatrixGenerator
 from app.core.ollama_location_extractor import OllamaLocationExtractor
 from app.core.azure_ai import AzureAIParser
-from app.core.geocoder import Geocoder
-from app.core.duckdb_store import DuckDBStore
+from app.core.resources import get_shared_geocoder
 from app.utils.logging import log_structured
 
 
@@ -75,8 +74,7 @@ def initialize_components():
     """Initialize HRD processing components."""
     if "hrd_extractor" not in st.session_state:
         try:
-            db_store = DuckDBStore()
-            geocoder = Geocoder(db_store)
+            geocoder = get_shared_geocoder()
         except Exception:
             geocoder = None
         
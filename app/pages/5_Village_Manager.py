@@ -9,18 +9,12 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 import pandas as pd
-import json
 from shapely.geometry import Point
 from app.core.duckdb_store import DuckDBStore
+from app.utils.session import init_session_resources
 from app.core.spatial import detect_admin_boundaries_from_point
-from app.core.config import DUCKDB_PATH, PROJECT_ROOT
-from app.core.admin_hierarchy import (
-    load_hierarchy_from_csv,
-    get_all_states,
-    get_all_counties,
-    get_all_payams,
-    get_all_bomas
-)
+from app.core.config import PROJECT_ROOT
+from app.core.admin_hierarchy import get_children, get_hierarchy
 from app.core.scrapers import OSMScraper
 # Import scraping function
 sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
@@ -32,8 +26,7 @@ except ImportError:
 
 
 # Initialize session state if not already initialized
-if "db_store" not in st.session_state:
-    st.session_state.db_store = DuckDBStore(DUCKDB_PATH)
+init_session_resources(with_geocoder=False)
 
 st.title("🏘️ Village Manager")
 
@@ -91,25 +84,10 @@ with tab1:
     with col2:
         # Cascading dropdowns for admin boundaries (only in Manual Entry mode)
         if entry_mode == "Manual Entry":
-            # Load hierarchy from CSV (primary source) or database (fallback)
-            hierarchy = load_hierarchy_from_csv()
-            csv_states = get_all_states()
-            
-            # Try to get states from database as fallback
-            db_state_names = []
-            try:
-                states_result = db_store.conn.execute("""
-                    SELECT DISTINCT name 
-                    FROM admin1_state 
-                    WHERE name IS NOT NULL 
-                    ORDER BY name
-                """).fetchall()
-                db_state_names = [row[0] for row in states_result] if states_result else []
-            except Exception:
-                pass
-            
-            # Use CSV states if available, otherwise use database states
-            state_names = csv_states if csv_states else db_state_names
+            # Parent → children lookups come from the materialized hierarchy,
+            # held in memory on the store: no queries per widget interaction
+            hierarchy = get_hierarchy(db_store)
+            state_names = get_children(hierarchy, "state", None)
             
             if not state_names:
                 st.warning("⚠️ No states found. Please ensure the compiled dataset CSV is available or upload state data in the Data Manager page.")
@@ -125,44 +103,7 @@ with tab1:
             selected_state = selected_state_idx if selected_state_idx else None
             
             # County dropdown - filtered by selected state
-            county_names = []
-            if selected_state:
-                # First try to get from CSV hierarchy (most reliable)
-                if hierarchy.get("state_to_counties") and selected_state in hierarchy["state_to_counties"]:
-                    county_names = hierarchy["state_to_counties"][selected_state]
-                else:
-                    # Fallback: try database
-                    try:
-                        all_counties_result = db_store.conn.execute("""
-                            SELECT DISTINCT name, properties
-                            FROM admin2_county
-                            WHERE name IS NOT NULL
-                            ORDER BY name
-                        """).fetchall()
-                        
-                        if all_counties_result:
-                            # Try to filter by parent state from properties
-                            for county_name, properties_str in all_counties_result:
-                                if properties_str:
-                                    try:
-                                        props = json.loads(properties_str)
-                                        parent_state = (props.get("admin1Name") or 
-                                                       props.get("admin1") or 
-                                                       props.get("state") or 
-                                                       props.get("STATE") or
-                                                       props.get("State"))
-                                        if parent_state and parent_state.strip().lower() == selected_state.strip().lower():
-                                            county_names.append(county_name)
-                                    except (json.JSONDecodeError, TypeError, AttributeError):
-                                        continue
-                            
-                            # If no matches, show all counties
-                            if not county_names:
-                                county_names = [row[0] for row in all_counties_result]
-                    except Exception as e:
-                        st.error(f"Error loading counties: {e}")
-                        # Final fallback: get all counties from CSV
-                        county_names = get_all_counties()
+            county_names = get_children(hierarchy, "county", selected_state) if selected_state else []
             
             # Show county dropdown
             if selected_state:
@@ -185,43 +126,7 @@ with tab1:
             selected_county = selected_county_idx if selected_county_idx else None
             
             # Payam dropdown - filtered by selected county
-            payam_names = []
-            if selected_county:
-                # First try to get from CSV hierarchy (most reliable)
-                if hierarchy.get("county_to_payams") and selected_county in hierarchy["county_to_payams"]:
-                    payam_names = hierarchy["county_to_payams"][selected_county]
-                else:
-                    # Fallback: try database
-                    try:
-                        all_payams_result = db_store.conn.execute("""
-                            SELECT DISTINCT name, properties
-                            FROM admin3_payam
-                            WHERE name IS NOT NULL
-                            ORDER BY name
-                        """).fetchall()
-                        
-                        if all_payams_result:
-                            for payam_name, properties_str in all_payams_result:
-                                if properties_str:
-                                    try:
-                                        props = json.loads(properties_str)
-                                        parent_county = (props.get("admin2Name") or 
-                                                        props.get("admin2") or 
-                                                        props.get("county") or 
-                                                        props.get("COUNTY") or
-                                                        props.get("County"))
-                                        if parent_county and parent_county.strip().lower() == selected_county.strip().lower():
-                                            payam_names.append(payam_name)
-                                    except (json.JSONDecodeError, TypeError, AttributeError):
-                                        continue
-                            
-                            # If no matches, show all payams
-                            if not payam_names:
-                                payam_names = [row[0] for row in all_payams_result]
-                    except Exception as e:
-                        st.error(f"Error loading payams: {e}")
-                        # Final fallback: get all payams from CSV
-                        payam_names = get_all_payams()
+            payam_names = get_children(hierarchy, "payam", selected_county) if selected_county else []
             
             if selected_county:
                 if not payam_names:
@@ -243,43 +148,7 @@ with tab1:
             selected_payam = selected_payam_idx if selected_payam_idx else None
             
             # Boma dropdown - filtered by selected payam
-            boma_names = []
-            if selected_payam:
-                # First try to get from CSV hierarchy (most reliable)
-                if hierarchy.get("payam_to_bomas") and selected_payam in hierarchy["payam_to_bomas"]:
-                    boma_names = hierarchy["payam_to_bomas"][selected_payam]
-                else:
-                    # Fallback: try database
-                    try:
-                        all_bomas_result = db_store.conn.execute("""
-                            SELECT DISTINCT name, properties
-                            FROM admin4_boma
-                            WHERE name IS NOT NULL
-                            ORDER BY name
-                        """).fetchall()
-                        
-                        if all_bomas_result:
-                            for boma_name, properties_str in all_bomas_result:
-                                if properties_str:
-                                    try:
-                                        props = json.loads(properties_str)
-                                        parent_payam = (props.get("admin3Name") or 
-                                                       props.get("admin3") or 
-                                                       props.get("payam") or 
-                                                       props.get("PAYAM") or
-                                                       props.get("Payam"))
-                                        if parent_payam and parent_payam.strip().lower() == selected_payam.strip().lower():
-                                            boma_names.append(boma_name)
-                                    except (json.JSONDecodeError, TypeError, AttributeError):
-                                        continue
-                            
-                            # If no matches, show all bomas
-                            if not boma_names:
-                                boma_names = [row[0] for row in all_bomas_result]
-                    except Exception as e:
-                        st.error(f"Error loading bomas: {e}")
-                        # Final fallback: get all bomas from CSV
-                        boma_names = get_all_bomas()
+            boma_names = get_children(hierarchy, "boma", selected_payam) if selected_payam else []
             
             if selected_payam:
                 if not boma_names:
@@ -387,6 +256,9 @@ with tab1:
                         except Exception:
                             pass  # Skip duplicates
                 
+                # Re-index just this village's names
+                db_store.build_name_index(incremental=True)
+                
                 st.success(f"✅ Village '{village_name}' saved successfully!")
                 st.balloons()
                 
@@ -451,6 +323,7 @@ with tab2:
                 imported = 0
                 skipped = 0
                 errors = []
+                village_records = []
                 
                 for idx, row in df.iterrows():
                     try:
@@ -476,20 +349,18 @@ with tab2:
                             except Exception:
                                 pass
                         
-                        # Add village
-                        db_store.add_village(
-                            name=name,
-                            lon=lon,
-                            lat=lat,
-                            state=state,
-                            county=county,
-                            payam=payam,
-                            boma=boma,
-                            data_source=data_source,
-                            source_id=str(idx)
-                        )
-                        
-                        imported += 1
+                        # Queue village for a single bulk insert
+                        village_records.append({
+                            "name": name,
+                            "lon": lon,
+                            "lat": lat,
+                            "state": state,
+                            "county": county,
+                            "payam": payam,
+                            "boma": boma,
+                            "data_source": data_source,
+                            "source_id": str(idx)
+                        })
                         
                     except Exception as e:
                         errors.append((idx, str(e)))
@@ -500,6 +371,14 @@ with tab2:
                     progress_bar.progress(progress)
                     status_text.text(f"Processed {idx + 1}/{len(df)} rows...")
                 
+                if village_records:
+                    try:
+                        imported = len(db_store.bulk_upsert_villages(pd.DataFrame(village_records)))
+                        db_store.build_name_index(incremental=True)
+                    except Exception as e:
+                        errors.append(("all", str(e)))
+                        skipped += len(village_records)
+                
                 progress_bar.empty()
                 status_text.empty()
                 
@@ -596,25 +475,9 @@ with tab3:
                 
                 with col2:
                     # Cascading dropdowns for admin boundaries in edit form
-                    # Load hierarchy from CSV (primary source) or database (fallback)
-                    edit_hierarchy = load_hierarchy_from_csv()
-                    edit_csv_states = get_all_states()
-                    
-                    # Try to get states from database as fallback
-                    edit_db_state_names = []
-                    try:
-                        states_result = db_store.conn.execute("""
-                            SELECT DISTINCT name 
-                            FROM admin1_state 
-                            WHERE name IS NOT NULL 
-                            ORDER BY name
-                        """).fetchall()
-                        edit_db_state_names = [row[0] for row in states_result] if states_result else []
-                    except Exception:
-                        pass
-                    
-                    # Use CSV states if available, otherwise use database states
-                    edit_state_names = edit_csv_states if edit_csv_states else edit_db_state_names
+                    # Parent → children lookups are held in memory on the store
+                    edit_hierarchy = get_hierarchy(db_store)
+                    edit_state_names = get_children(edit_hierarchy, "state", None)
                     
                     # Find current state index
                     current_state = village.get("state") or ""
@@ -631,42 +494,7 @@ with tab3:
                     selected_edit_state = selected_edit_state_idx if selected_edit_state_idx else None
                     
                     # County dropdown - filtered by selected state
-                    county_names = []
-                    if selected_edit_state:
-                        # First try to get from CSV hierarchy (most reliable)
-                        if edit_hierarchy.get("state_to_counties") and selected_edit_state in edit_hierarchy["state_to_counties"]:
-                            county_names = edit_hierarchy["state_to_counties"][selected_edit_state]
-                        else:
-                            # Fallback: try database
-                            try:
-                                counties_result = db_store.conn.execute("""
-                                    SELECT DISTINCT name, properties
-                                    FROM admin2_county
-                                    WHERE name IS NOT NULL
-                                    ORDER BY name
-                                """).fetchall()
-                                
-                                if counties_result:
-                                    for county_name, properties_str in counties_result:
-                                        if properties_str:
-                                            try:
-                                                props = json.loads(properties_str)
-                                                parent_state = (props.get("admin1Name") or 
-                                                               props.get("admin1") or 
-                                                               props.get("state") or 
-                                                               props.get("STATE") or
-                                                               props.get("State"))
-                                                if parent_state and parent_state.strip().lower() == selected_edit_state.strip().lower():
-                                                    county_names.append(county_name)
-                                            except (json.JSONDecodeError, TypeError, AttributeError):
-                                                continue
-                                    
-                                    # If no matches, show all counties
-                                    if not county_names:
-                                        county_names = [row[0] for row in counties_result]
-                            except Exception as e:
-                                # Final fallback: get all counties from CSV
-                                county_names = get_all_counties()
+                    county_names = get_children(edit_hierarchy, "county", selected_edit_state) if selected_edit_state else []
                     
                     # Find current county index
                     current_county = village.get("county") or ""
@@ -684,42 +512,7 @@ with tab3:
                     selected_edit_county = selected_edit_county_idx if selected_edit_county_idx else None
                     
                     # Payam dropdown - filtered by selected county
-                    payam_names = []
-                    if selected_edit_county:
-                        # First try to get from CSV hierarchy (most reliable)
-                        if edit_hierarchy.get("county_to_payams") and selected_edit_county in edit_hierarchy["county_to_payams"]:
-                            payam_names = edit_hierarchy["county_to_payams"][selected_edit_county]
-                        else:
-                            # Fallback: try database
-                            try:
-                                payams_result = db_store.conn.execute("""
-                                    SELECT DISTINCT name, properties
-                                    FROM admin3_payam
-                                    WHERE name IS NOT NULL
-                                    ORDER BY name
-                                """).fetchall()
-                                
-                                if payams_result:
-                                    for payam_name, properties_str in payams_result:
-                                        if properties_str:
-                                            try:
-                                                props = json.loads(properties_str)
-                                                parent_county = (props.get("admin2Name") or 
-                                                               props.get("admin2") or 
-                                                               props.get("county") or 
-                                                               props.get("COUNTY") or
-                                                               props.get("County"))
-                                                if parent_county and parent_county.strip().lower() == selected_edit_county.strip().lower():
-                                                    payam_names.append(payam_name)
-                                            except (json.JSONDecodeError, TypeError, AttributeError):
-                                                continue
-                                    
-                                    # If no matches, show all payams
-                                    if not payam_names:
-                                        payam_names = [row[0] for row in payams_result]
-                            except Exception as e:
-                                # Final fallback: get all payams from CSV
-                                payam_names = get_all_payams()
+                    payam_names = get_children(edit_hierarchy, "payam", selected_edit_county) if selected_edit_county else []
                     
                     # Find current payam index
                     current_payam = village.get("payam") or ""
@@ -737,42 +530,7 @@ with tab3:
                     selected_edit_payam = selected_edit_payam_idx if selected_edit_payam_idx else None
                     
                     # Boma dropdown - filtered by selected payam
-                    boma_names = []
-                    if selected_edit_payam:
-                        # First try to get from CSV hierarchy (most reliable)
-                        if edit_hierarchy.get("payam_to_bomas") and selected_edit_payam in edit_hierarchy["payam_to_bomas"]:
-                            boma_names = edit_hierarchy["payam_to_bomas"][selected_edit_payam]
-                        else:
-                            # Fallback: try database
-                            try:
-                                bomas_result = db_store.conn.execute("""
-                                    SELECT DISTINCT name, properties
-                                    FROM admin4_boma
-                                    WHERE name IS NOT NULL
-                                    ORDER BY name
-                                """).fetchall()
-                                
-                                if bomas_result:
-                                    for boma_name, properties_str in bomas_result:
-                                        if properties_str:
-                                            try:
-                                                props = json.loads(properties_str)
-                                                parent_payam = (props.get("admin3Name") or 
-                                                               props.get("admin3") or 
-                                                               props.get("payam") or 
-                                                               props.get("PAYAM") or
-                                                               props.get("Payam"))
-                                                if parent_payam and parent_payam.strip().lower() == selected_edit_payam.strip().lower():
-                                                    boma_names.append(boma_name)
-                                            except (json.JSONDecodeError, TypeError, AttributeError):
-                                                continue
-                                    
-                                    # If no matches, show all bomas
-                                    if not boma_names:
-                                        boma_names = [row[0] for row in bomas_result]
-                            except Exception as e:
-                                # Final fallback: get all bomas from CSV
-                                boma_names = get_all_bomas()
+                    boma_names = get_children(edit_hierarchy, "boma", selected_edit_payam) if selected_edit_payam else []
                     
                     # Find current boma index
                     current_boma = village.get("boma") or ""
@@ -815,6 +573,7 @@ with tab3:
                             village_id=village["village_id"],
                             data_source=village.get("data_source", "manual")
                         )
+                        db_store.build_name_index(incremental=True)
                         st.success("✅ Village updated!")
                         del st.session_state.edit_village_id
                         st.rerun()
@@ -848,6 +607,7 @@ with tab3:
                                 alternate_name=new_alt_name.strip(),
                                 name_type=alt_name_type
                             )
+                            db_store.build_name_index(incremental=True)
                             st.success("✅ Alternate name added!")
                             st.rerun()
                         except Exception as e:
@@ -14,7 +14,7 @@ import json
 from typing import Dict, Any
 from app.core.geocoder import Geocoder
 from app.core.duckdb_store import DuckDBStore
-from app.core.config import DUCKDB_PATH
+from app.utils.session import init_session_resources
 from app.core.location_extractor import DocumentLocationExtractor
 from app.utils.timing import Timer
 
@@ -51,11 +51,7 @@ Comments: HRD will continue to gather more information on the motive of the inci
 
 
 # Initialize session state if not already initialized
-if "db_store" not in st.session_state:
-    st.session_state.db_store = DuckDBStore(DUCKDB_PATH)
-
-if "geocoder" not in st.session_state:
-    st.session_state.geocoder = Geocoder(st.session_state.db_store)
+init_session_resources()
 
 if "document_extractor" not in st.session_state:
     st.session_state.document_extractor = DocumentLocationExtractor(st.session_state.geocoder)
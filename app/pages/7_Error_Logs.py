@@ -8,11 +8,12 @@ project_root = Path(__file__).parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-import json
 from datetime import datetime
 from typing import List, Dict, Any
 from app.core.config import LOG_FILE, DATA_DIR
+from app.core.error_log_store import ERROR_LEVELS, ErrorLogStore
 from app.utils.error_handler import handle_streamlit_errors
+from app.utils.log_reader import tail_records
 
 st.title("🔍 Error Logs & Diagnostics")
 
@@ -22,35 +23,20 @@ if "error_log_filter_level" not in st.session_state:
 if "error_log_filter_module" not in st.session_state:
     st.session_state.error_log_filter_module = "ALL"
 
+@st.cache_resource(show_spinner=False)
+def get_error_log_store() -> ErrorLogStore:
+    """Error log store shared by all sessions."""
+    return ErrorLogStore()
+
+
 @handle_streamlit_errors()
-def load_error_logs(log_file: Path, max_lines: int = 1000) -> List[Dict[str, Any]]:
-    """Load and parse error logs from file."""
-    error_logs = []
-    
-    if not log_file.exists():
-        return error_logs
-    
+def load_error_logs(log_file: Path, max_records: int = 1000) -> List[Dict[str, Any]]:
+    """Newest error records read backwards from the end of the log files."""
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        # Parse JSON logs (read from end for most recent)
-        for line in reversed(lines[-max_lines:]):
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                log_entry = json.loads(line)
-                # Only show ERROR and CRITICAL level logs
-                if log_entry.get("level") in ["ERROR", "CRITICAL"]:
-                    error_logs.append(log_entry)
-            except json.JSONDecodeError:
-                # Skip invalid JSON lines
-                continue
+        return tail_records(log_file, limit=max_records, levels=ERROR_LEVELS)
     except Exception as e:
         st.error(f"Error reading log file: {e}")
-    
-    return error_logs
+        return []
 
 
 @handle_streamlit_errors()
@@ -111,10 +97,21 @@ with col3:
 if log_file.exists():
     st.subheader("📊 Error Statistics")
     
-    error_logs = load_error_logs(log_file)
-    
-    if error_logs:
+    # Only lines appended since the last rerun are parsed; without the store
+    # (e.g. the database is locked by another process) the newest records
+    # are read from the end of the log files instead
+    try:
+        error_store = get_error_log_store()
+        error_store.ingest(log_file)
+        stats = error_store.statistics()
+        error_logs = None
+    except Exception as e:
+        st.warning(f"Error log index unavailable ({e}); showing the most recent errors only.")
+        error_store = None
+        error_logs = load_error_logs(log_file)
         stats = get_error_statistics(error_logs)
+    
+    if stats["total_errors"]:
         
         # Display statistics
         col1, col2, col3 = st.columns(3)
@@ -150,11 +147,17 @@ if log_file.exists():
             st.session_state.error_log_filter_module = selected_module
         
         # Filter logs
-        filtered_logs = error_logs
-        if selected_level != "ALL":
-            filtered_logs = [log for log in filtered_logs if log.get("level") == selected_level]
-        if selected_module != "ALL":
-            filtered_logs = [log for log in filtered_logs if log.get("module") == selected_module]
+        level_filter = selected_level if selected_level != "ALL" else None
+        module_filter = selected_module if selected_module != "ALL" else None
+        if error_store is not None:
+            filtered_count = error_store.count_errors(level_filter, module_filter)
+        else:
+            filtered_logs = [
+                log for log in error_logs
+                if (level_filter is None or log.get("level") == level_filter)
+                and (module_filter is None or log.get("module") == module_filter)
+            ]
+            filtered_count = len(filtered_logs)
         
         # Error breakdown charts
         st.subheader("📈 Error Breakdown")
@@ -181,17 +184,19 @@ if log_file.exists():
             st.caption("Top 10 Error Types")
         
         # Display filtered errors
-        st.subheader(f"📋 Error Details ({len(filtered_logs)} errors)")
+        st.subheader(f"📋 Error Details ({filtered_count} errors)")
         
-        if filtered_logs:
+        if filtered_count:
             # Pagination
             items_per_page = 10
-            total_pages = (len(filtered_logs) + items_per_page - 1) // items_per_page
+            total_pages = (filtered_count + items_per_page - 1) // items_per_page
             page = st.number_input("Page", min_value=1, max_value=max(1, total_pages), value=1, step=1)
             
             start_idx = (page - 1) * items_per_page
-            end_idx = start_idx + items_per_page
-            page_logs = filtered_logs[start_idx:end_idx]
+            if error_store is not None:
+                page_logs = error_store.query_errors(level_filter, module_filter, limit=items_per_page, offset=start_idx)
+            else:
+                page_logs = filtered_logs[start_idx:start_idx + items_per_page]
             
             for i, log in enumerate(page_logs, start=start_idx + 1):
                 timestamp = log.get("timestamp", "Unknown")
@@ -231,7 +236,7 @@ if log_file.exists():
                 
                 st.divider()
             
-            st.caption(f"Showing {len(page_logs)} of {len(filtered_logs)} errors (Page {page} of {total_pages})")
+            st.caption(f"Showing {len(page_logs)} of {filtered_count} errors (Page {page} of {total_pages})")
         else:
             st.info("No errors match the selected filters.")
     else:
@@ -8,8 +8,6 @@ import json
 import os
 from typing import Dict, List, Optional, Any
 import pydeck as pdk
-from shapely import wkb
-from shapely.geometry import mapping
 from dotenv import load_dotenv
 from openai import OpenAI
 
@@ -18,16 +16,11 @@ project_root = Path(__file__).parent.parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+from app.core.boundary_tiles import get_boundary_geojson
 from app.core.duckdb_store import DuckDBStore
+from app.utils.session import init_session_resources
 from app.core.geocoder import Geocoder
-from app.core.config import DUCKDB_PATH
-from app.core.admin_hierarchy import (
-    load_hierarchy_from_csv,
-    get_all_states,
-    get_all_counties,
-    get_all_payams,
-    get_all_bomas,
-)
+from app.core.admin_hierarchy import get_children, get_hierarchy
 
 # Gracefully handle permission errors (e.g., macOS security restrictions)
 env_path = project_root / ".env"
@@ -52,11 +45,7 @@ except (PermissionError, OSError) as e:
     )
 
 # Initialize session state if not already initialized
-if "db_store" not in st.session_state:
-    st.session_state.db_store = DuckDBStore(DUCKDB_PATH)
-
-if "geocoder" not in st.session_state:
-    st.session_state.geocoder = Geocoder(st.session_state.db_store)
+init_session_resources()
 
 db_store: DuckDBStore = st.session_state.db_store
 geocoder: Geocoder = st.session_state.geocoder
@@ -234,27 +223,11 @@ def candidate_to_result(candidate: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-@st.cache_data(show_spinner=False)
-def get_admin_geojson(layer_name: str, name_value: str) -> Optional[Dict[str, Any]]:
+def get_admin_geojson(layer_name: str, name_value: str, zoom: float = 10) -> Optional[Dict[str, Any]]:
     if not name_value:
         return None
     try:
-        results = db_store.conn.execute(
-            f"SELECT geometry_wkb, name FROM {layer_name} WHERE name = ?",
-            [name_value]
-        ).fetchall()
-        if not results:
-            return None
-        features = []
-        for geometry_wkb, name in results:
-            if geometry_wkb:
-                geom = wkb.loads(geometry_wkb, hex=True)
-                features.append({
-                    "type": "Feature",
-                    "properties": {"name": name},
-                    "geometry": mapping(geom)
-                })
-        return {"type": "FeatureCollection", "features": features}
+        return get_boundary_geojson(db_store, layer_name, zoom, names=[name_value])
     except Exception:
         return None
 
@@ -280,7 +253,8 @@ def render_candidate_map(candidate: Dict[str, Any]):
         )
     ]
 
-    boma_geojson = get_admin_geojson("admin4_boma", candidate.get("boma"))
+    map_zoom = 10
+    boma_geojson = get_admin_geojson("admin4_boma", candidate.get("boma"), map_zoom)
     if boma_geojson:
         layers.append(
             pdk.Layer(
@@ -296,7 +270,7 @@ def render_candidate_map(candidate: Dict[str, Any]):
     view_state = pdk.ViewState(
         longitude=candidate["lon"],
         latitude=candidate["lat"],
-        zoom=10,
+        zoom=map_zoom,
         pitch=0
     )
 
@@ -310,40 +284,33 @@ def render_candidate_map(candidate: Dict[str, Any]):
     st.pydeck_chart(deck)
 
 
-@st.cache_data(show_spinner=False)
-def get_admin_hierarchy():
-    return load_hierarchy_from_csv()
-
-
 def render_manual_entry_panel():
     st.subheader("Manual Coordinates Entry")
     st.markdown("Enter coordinates and select admin hierarchy manually.")
 
-    hierarchy = get_admin_hierarchy()
-    state_names = get_all_states()
-    county_names = get_all_counties()
-    payam_names = get_all_payams()
-    boma_names = get_all_bomas()
+    hierarchy = get_hierarchy(db_store)
 
     col1, col2 = st.columns(2)
     with col1:
         lon = st.number_input("Longitude", value=0.0, format="%.6f", step=0.000001, key="manual_lon")
         lat = st.number_input("Latitude", value=0.0, format="%.6f", step=0.000001, key="manual_lat")
     with col2:
-        selected_state = st.selectbox("State", options=[""] + state_names, key="manual_state_select")
+        selected_state = st.selectbox(
+            "State", options=[""] + get_children(hierarchy, "state", None), key="manual_state_select"
+        )
         selected_county = st.selectbox(
             "County",
-            options=[""] + (hierarchy.get("state_to_counties", {}).get(selected_state, county_names)),
+            options=[""] + get_children(hierarchy, "county", selected_state),
             key="manual_county_select"
         )
         selected_payam = st.selectbox(
             "Payam",
-            options=[""] + (hierarchy.get("county_to_payams", {}).get(selected_county, payam_names)),
+            options=[""] + get_children(hierarchy, "payam", selected_county),
             key="manual_payam_select"
         )
         selected_boma = st.selectbox(
             "Boma",
-            options=[""] + (hierarchy.get("payam_to_bomas", {}).get(selected_payam, boma_names)),
+            options=[""] + get_children(hierarchy, "boma", selected_payam),
             key="manual_boma_select"
         )
 
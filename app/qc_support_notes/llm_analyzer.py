@@ -15,6 +15,7 @@ from app.core.config import (
     AZURE_OPENAI_API_VERSION,
 )
 from app.utils.logging import log_error, log_structured
+from app.utils.metrics import observe
 
 
 class LLMQCAnalyzer:
@@ -130,20 +131,21 @@ Settings:
 """
 
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": f"{system_prompt}\n\n{user_prompt}",
-                    "stream": False,
-                    "format": "json",
-                    "options": {
-                        "temperature": 0.2,  # Low temperature for consistent analysis
-                        "num_predict": 2000,  # Allow longer responses
-                    }
-                },
-                timeout=60
-            )
+            with observe("llm_request_seconds", provider="ollama", operation="_analyze_with_ollama"):
+                response = requests.post(
+                    f"{self.base_url}/api/generate",
+                    json={
+                        "model": self.model,
+                        "prompt": f"{system_prompt}\n\n{user_prompt}",
+                        "stream": False,
+                        "format": "json",
+                        "options": {
+                            "temperature": 0.2,  # Low temperature for consistent analysis
+                            "num_predict": 2000,  # Allow longer responses
+                        }
+                    },
+                    timeout=60
+                )
             
             if response.status_code == 200:
                 result = response.json()
@@ -229,15 +231,16 @@ Settings:
 """
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.2,
-                response_format={"type": "json_object"}
-            )
+            with observe("llm_request_seconds", provider="azure", operation="_analyze_with_openai"):
+                response = self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.2,
+                    response_format={"type": "json_object"}
+                )
             
             content = response.choices[0].message.content
             parsed = json.loads(content)
@@ -9,9 +9,8 @@ project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
-from app.core.config import DUCKDB_PATH, LOG_FILE, LOG_LEVEL
-from app.core.duckdb_store import DuckDBStore
-from app.core.geocoder import Geocoder
+from app.core.config import LOG_FILE, LOG_LEVEL, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_ASYNC
+from app.utils.session import init_session_resources
 from app.utils.logging import setup_logging, log_critical, get_logger
 from app.utils.error_tracking import setup_error_tracking
 from app.utils.static_assets import display_logo, static_file_exists
@@ -20,7 +19,13 @@ from app.utils.static_assets import display_logo, static_file_exists
 setup_error_tracking()
 
 # Setup logging with file rotation
-setup_logging(level=LOG_LEVEL, log_file=LOG_FILE)
+setup_logging(
+    level=LOG_LEVEL,
+    log_file=LOG_FILE,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
+    use_queue=LOG_ASYNC
+)
 
 logger = get_logger()
 
@@ -56,13 +61,8 @@ sys.excepthook = handle_uncaught_exception
 
 # Initialize session state with error handling
 try:
-    if "db_store" not in st.session_state:
-        st.session_state.db_store = DuckDBStore(DUCKDB_PATH)
-        logger.info("Database store initialized")
-
-    if "geocoder" not in st.session_state:
-        st.session_state.geocoder = Geocoder(st.session_state.db_store)
-        logger.info("Geocoder initialized")
+    # Shared across sessions; the first session preloads the geocoder
+    init_session_resources()
 except Exception as e:
     log_critical("Failed to initialize application components", error=e)
     st.error(f"❌ Failed to initialize application: {e}")
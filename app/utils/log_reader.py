@@ -0,0 +1,103 @@
+"""Read JSON log files from the end without loading them whole.
+
+The rotating app log can hold tens of megabytes across its backups; the
+Error Logs page only ever shows the newest few records. Lines are read
+backwards from EOF in fixed-size blocks and JSON-parsed lazily, so the
+cost is proportional to what is displayed rather than to the file size.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+# Bytes read per backwards seek
+BLOCK_SIZE = 64 * 1024
+
+
+def rotated_log_files(log_file: Path) -> List[Path]:
+    """
+    The log file and its RotatingFileHandler backups, oldest first.
+    
+    Args:
+        log_file: Active log file (app.log)
+    
+    Returns:
+        Existing files: app.log.N, ..., app.log.1, app.log
+    """
+    backups = []
+    for path in log_file.parent.glob(f"{log_file.name}.*"):
+        suffix = path.name[len(log_file.name) + 1:]
+        if suffix.isdigit():
+            backups.append((int(suffix), path))
+    files = [path for _, path in sorted(backups, reverse=True)]
+    if log_file.exists():
+        files.append(log_file)
+    return files
+
+
+def iter_lines_reverse(path: Path, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    Yield the lines of a file from last to first.
+    
+    Args:
+        path: File to read
+        block_size: Bytes read per seek
+    
+    Yields:
+        Decoded lines without their newline, blank lines skipped
+    """
+    with open(path, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + remainder).split(b"\n")
+            # The first piece may be the tail of a line in the previous block
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode("utf-8", errors="replace")
+        if remainder.strip():
+            yield remainder.decode("utf-8", errors="replace")
+
+
+def tail_records(
+    log_file: Path,
+    limit: int = 100,
+    levels: Optional[Sequence[str]] = None,
+    include_rotated: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    Newest JSON records, optionally restricted to some levels.
+    
+    Lines that cannot contain a wanted level are skipped before parsing.
+    
+    Args:
+        log_file: Active log file
+        limit: Maximum records returned
+        levels: Levels to keep (e.g. ["ERROR", "CRITICAL"]); None keeps all
+        include_rotated: Continue into backups when the active file runs out
+    
+    Returns:
+        Records, newest first
+    """
+    files = rotated_log_files(log_file) if include_rotated else [log_file] if log_file.exists() else []
+    markers = [f'"level": "{level}"' for level in levels] if levels else None
+    records = []
+    for path in reversed(files):
+        for line in iter_lines_reverse(path):
+            if markers and not any(marker in line for marker in markers):
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(record, dict) or (levels and record.get("level") not in levels):
+                continue
+            records.append(record)
+            if len(records) >= limit:
+                return records
+    return records
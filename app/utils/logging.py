@@ -1,23 +1,95 @@
-"""Enhanced structured logging utilities with file rotation and error tracking."""
+"""Enhanced structured logging utilities with file rotation and error tracking.
+
+Records are handed to a ``QueueHandler`` on the calling thread and written by
+a ``QueueListener`` thread, so hot paths only pay for building a small dict.
+JSON serialization is deferred until a handler actually formats the record,
+and caller metadata is resolved from a per-code-object cache instead of
+``inspect`` on every call.
+"""
+import atexit
+import copy
 import json
 import logging
 import logging.handlers
+import queue
+import random
 import sys
+import threading
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 import functools
 
 # Global logger instance
 _logger = None
 
+# Background listener draining the log queue (when queued logging is enabled)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Cache of code object -> (module, function) for caller lookups
+_caller_cache: Dict[Any, Tuple[str, str]] = {}
+
+# Per-message-key sampling and rate limit configuration
+_sample_rates: Dict[str, float] = {}
+_rate_limits: Dict[str, Tuple[int, float]] = {}
+_rate_state: Dict[str, list] = {}
+_rate_lock = threading.Lock()
+
+
+class _LazyJSON:
+    """Log message payload that is serialized to JSON only when formatted."""
+    
+    __slots__ = ("entry", "created", "_text")
+    
+    def __init__(self, entry: Dict[str, Any], created: float):
+        self.entry = entry
+        self.created = created
+        self._text = None
+    
+    def __str__(self) -> str:
+        if self._text is None:
+            entry = {"timestamp": datetime.utcfromtimestamp(self.created).isoformat()}
+            entry.update(self.entry)
+            self._text = json.dumps(entry, default=str)
+        return self._text
+    
+    def snapshot(self) -> "_LazyJSON":
+        """Copy of the payload that later changes to the caller's values cannot reach."""
+        entry = {
+            key: value.copy() if isinstance(value, (dict, list, set)) else value
+            for key, value in self.entry.items()
+        }
+        return _LazyJSON(entry, self.created)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves JSON serialization to the listener thread.
+    
+    The stock handler formats every record on the caller's thread before
+    enqueueing it. Here the caller's thread only snapshots what the record
+    refers to (the structured payload, or the %-formatted message of plain
+    records), so callers can keep mutating their dicts and args while
+    ``json.dumps`` runs later on the listener.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if isinstance(record.msg, _LazyJSON):
+            record.msg = record.msg.snapshot()
+        else:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
 
 def setup_logging(
     level: str = "INFO",
     log_file: Optional[Path] = None,
     max_bytes: int = 10 * 1024 * 1024,  # 10MB
-    backup_count: int = 5
+    backup_count: int = 5,
+    use_queue: bool = True
 ):
     """
     Setup structured JSON logging with file rotation.
@@ -27,22 +99,33 @@ def setup_logging(
         log_file: Optional path to log file (enables file logging with rotation)
         max_bytes: Maximum log file size before rotation
         backup_count: Number of backup log files to keep
+        use_queue: Write records from a background listener thread instead of
+            the caller's thread
     """
-    global _logger
+    global _logger, _listener
     
     # Get root logger
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, level.upper()))
     
+    # Stop a previous listener and close its handlers (setup may run again on
+    # Streamlit reruns; an open RotatingFileHandler would leak its file)
+    _stop_listener()
+    
     # Clear existing handlers to avoid duplicates
+    for handler in logger.handlers:
+        if not isinstance(handler, logging.handlers.QueueHandler):
+            handler.close()
     logger.handlers.clear()
     
+    handlers = []
+    
     # Console handler with structured JSON
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(getattr(logging, level.upper()))
     console_formatter = logging.Formatter('%(message)s')
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # File handler with rotation (if log_file specified)
     if log_file:
@@ -56,12 +139,41 @@ def setup_logging(
         file_handler.setLevel(getattr(logging, level.upper()))
         file_formatter = logging.Formatter('%(message)s')
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+    else:
+        for handler in handlers:
+            logger.addHandler(handler)
     
     _logger = logger
     return logger
 
 
+def _stop_listener():
+    """Stop the background listener, if any, and close the handlers it wrote to."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def shutdown_logging():
+    """Flush queued records and stop the background listener."""
+    _stop_listener()
+
+
+atexit.register(shutdown_logging)
+
+
 def get_logger():
     """Get the configured logger instance."""
     global _logger
@@ -70,6 +182,81 @@ def get_logger():
     return _logger
 
 
+def set_log_sampling(message_key: str, sample_rate: float):
+    """
+    Only emit a fraction of the records logged under a message key.
+    
+    Args:
+        message_key: Message text (or explicit ``log_key``) to sample
+        sample_rate: Fraction of records to keep (0.0-1.0); 1.0 removes sampling
+    """
+    if sample_rate >= 1.0:
+        _sample_rates.pop(message_key, None)
+    else:
+        _sample_rates[message_key] = max(0.0, sample_rate)
+
+
+def set_log_rate_limit(message_key: str, max_records: int, per_seconds: float = 1.0):
+    """
+    Cap how many records are emitted under a message key per time window.
+    
+    Suppressed records are counted and reported as ``suppressed`` on the next
+    record that gets through.
+    
+    Args:
+        message_key: Message text (or explicit ``log_key``) to limit
+        max_records: Records allowed per window; 0 or less removes the limit
+        per_seconds: Window length in seconds
+    """
+    with _rate_lock:
+        if max_records <= 0:
+            _rate_limits.pop(message_key, None)
+            _rate_state.pop(message_key, None)
+        else:
+            _rate_limits[message_key] = (max_records, per_seconds)
+
+
+def _admit(message_key: str) -> Tuple[bool, int]:
+    """Apply sampling and rate limits; return (emit, suppressed_count)."""
+    sample_rate = _sample_rates.get(message_key)
+    if sample_rate is not None and random.random() >= sample_rate:
+        return False, 0
+    
+    limit = _rate_limits.get(message_key)
+    if limit is None:
+        return True, 0
+    
+    max_records, per_seconds = limit
+    now = time.monotonic()
+    with _rate_lock:
+        # State: [window_start, emitted_in_window, suppressed_since_last_emit]
+        state = _rate_state.setdefault(message_key, [now, 0, 0])
+        if now - state[0] >= per_seconds:
+            state[0] = now
+            state[1] = 0
+        if state[1] >= max_records:
+            state[2] += 1
+            return False, 0
+        state[1] += 1
+        suppressed = state[2]
+        state[2] = 0
+        return True, suppressed
+
+
+def _caller_info(depth: int = 2) -> Tuple[str, str]:
+    """Return (module, function) of the frame ``depth`` levels up, cached per code object."""
+    try:
+        frame = sys._getframe(depth)
+    except ValueError:
+        return "unknown", "unknown"
+    code = frame.f_code
+    info = _caller_cache.get(code)
+    if info is None:
+        info = (frame.f_globals.get('__name__', 'unknown'), code.co_name)
+        _caller_cache[code] = info
+    return info
+
+
 def log_structured(level: str, message: str, **kwargs):
     """
     Log structured JSON message with context.
@@ -77,31 +264,40 @@ def log_structured(level: str, message: str, **kwargs):
     Args:
         level: Log level (info, warning, error, etc.)
         message: Log message
-        **kwargs: Additional structured fields (module, function, user_id, etc.)
+        **kwargs: Additional structured fields (module, function, user_id, etc.).
+            ``log_key`` overrides the message as the sampling/rate-limit key
+            and is not written to the record.
     """
     logger = get_logger()
+    levelno = logging.getLevelName(level.upper())
+    if not isinstance(levelno, int):
+        levelno = logging.INFO
+    if not logger.isEnabledFor(levelno):
+        return
+    
+    message_key = kwargs.pop("log_key", None) or message
+    emit, suppressed = _admit(message_key)
+    if not emit:
+        return
     
     # Get calling function info if not provided
     if 'module' not in kwargs or 'function' not in kwargs:
-        import inspect
-        frame = inspect.currentframe().f_back
-        if frame:
-            if 'module' not in kwargs:
-                kwargs['module'] = frame.f_globals.get('__name__', 'unknown')
-            if 'function' not in kwargs:
-                kwargs['function'] = frame.f_code.co_name
+        module_name, function_name = _caller_info()
+        kwargs.setdefault('module', module_name)
+        kwargs.setdefault('function', function_name)
     
     log_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
         "level": level.upper(),
         "message": message,
-        **kwargs
     }
-    
     # Remove None values for cleaner logs
-    log_entry = {k: v for k, v in log_entry.items() if v is not None}
+    for key, value in kwargs.items():
+        if value is not None:
+            log_entry[key] = value
+    if suppressed:
+        log_entry["suppressed"] = suppressed
     
-    getattr(logger, level.lower(), logger.info)(json.dumps(log_entry))
+    logger.log(levelno, _LazyJSON(log_entry, time.time()))
 
 
 def log_error(error: Exception, context: Optional[Dict[str, Any]] = None, include_traceback: bool = True):
@@ -116,16 +312,9 @@ def log_error(error: Exception, context: Optional[Dict[str, Any]] = None, includ
     logger = get_logger()
     
     # Get calling function info
-    import inspect
-    frame = inspect.currentframe().f_back
-    module_name = 'unknown'
-    function_name = 'unknown'
-    if frame:
-        module_name = frame.f_globals.get('__name__', 'unknown')
-        function_name = frame.f_code.co_name
+    module_name, function_name = _caller_info()
     
     log_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
         "level": "ERROR",
         "error_type": type(error).__name__,
         "error_message": str(error),
@@ -137,7 +326,7 @@ def log_error(error: Exception, context: Optional[Dict[str, Any]] = None, includ
     if include_traceback:
         log_entry["traceback"] = traceback.format_exc()
     
-    logger.error(json.dumps(log_entry))
+    logger.error(_LazyJSON(log_entry, time.time()))
     
     # Also send to Sentry if configured
     try:
@@ -166,16 +355,9 @@ def log_critical(message: str, error: Optional[Exception] = None, context: Optio
     """
     logger = get_logger()
     
-    import inspect
-    frame = inspect.currentframe().f_back
-    module_name = 'unknown'
-    function_name = 'unknown'
-    if frame:
-        module_name = frame.f_globals.get('__name__', 'unknown')
-        function_name = frame.f_code.co_name
+    module_name, function_name = _caller_info()
     
     log_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
         "level": "CRITICAL",
         "message": message,
         "module": module_name,
@@ -188,7 +370,7 @@ def log_critical(message: str, error: Optional[Exception] = None, context: Optio
         log_entry["error_message"] = str(error)
         log_entry["traceback"] = traceback.format_exc()
     
-    logger.critical(json.dumps(log_entry))
+    logger.critical(_LazyJSON(log_entry, time.time()))
     
     # Send to Sentry as critical
     try:
@@ -0,0 +1,285 @@
+"""In-process metrics registry with counters and latency histograms.
+
+Histograms use an HDR-style log-linear bucket layout over integer
+nanoseconds: every power-of-two range is split into a fixed number of linear
+sub-buckets, so recording is O(1) with a bounded relative error (about 6%
+with the default 16 sub-buckets) and memory does not grow with the number
+of observations. Timings come from ``time.perf_counter_ns``.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
+
+# Sub-buckets per power-of-two range (must be a power of two)
+_SUB_BUCKET_COUNT = 16
+_SUB_BUCKET_BITS = _SUB_BUCKET_COUNT.bit_length() - 1
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _bucket_index(value: int) -> int:
+    """Map a non-negative integer value to its bucket index."""
+    if value < _SUB_BUCKET_COUNT:
+        return value
+    shift = value.bit_length() - _SUB_BUCKET_BITS - 1
+    return _SUB_BUCKET_COUNT * shift + (value >> shift)
+
+
+def _bucket_bounds(index: int) -> Tuple[int, int]:
+    """Return the [low, high) value range covered by a bucket index."""
+    if index < _SUB_BUCKET_COUNT:
+        return index, index + 1
+    shift = index // _SUB_BUCKET_COUNT - 1
+    mantissa = index - _SUB_BUCKET_COUNT * shift
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class Counter:
+    """Monotonically increasing counter."""
+    
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: int = 1):
+        """Increment the counter."""
+        with self._lock:
+            self._value += amount
+    
+    @property
+    def value(self) -> int:
+        return self._value
+
+
+class Histogram:
+    """Log-linear histogram of non-negative integer values (nanoseconds)."""
+    
+    def __init__(self):
+        self._buckets: Dict[int, int] = {}
+        self._count = 0
+        self._sum = 0
+        self._min: Optional[int] = None
+        self._max: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def record(self, value: int):
+        """Record a single value."""
+        value = max(0, int(value))
+        index = _bucket_index(value)
+        with self._lock:
+            self._buckets[index] = self._buckets.get(index, 0) + 1
+            self._count += 1
+            self._sum += value
+            if self._min is None or value < self._min:
+                self._min = value
+            if self._max is None or value > self._max:
+                self._max = value
+    
+    @property
+    def count(self) -> int:
+        return self._count
+    
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Estimate a percentile.
+        
+        Args:
+            q: Percentile in the range 0-100
+        
+        Returns:
+            Estimated value (bucket midpoint, clamped to observed min/max) or
+            None if nothing has been recorded
+        """
+        with self._lock:
+            if self._count == 0:
+                return None
+            buckets = sorted(self._buckets.items())
+            count, low_seen, high_seen = self._count, self._min, self._max
+        
+        rank = max(1, int(round(q / 100.0 * count)))
+        seen = 0
+        for index, bucket_count in buckets:
+            seen += bucket_count
+            if seen >= rank:
+                low, high = _bucket_bounds(index)
+                midpoint = (low + high - 1) / 2.0
+                return float(min(max(midpoint, low_seen), high_seen))
+        return float(high_seen)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary statistics in the recorded unit."""
+        with self._lock:
+            count, total, low, high = self._count, self._sum, self._min, self._max
+        return {
+            "count": count,
+            "sum": total,
+            "min": low,
+            "max": high,
+            "mean": total / count if count else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class MetricsRegistry:
+    """Named, labelled counters and histograms."""
+    
+    def __init__(self):
+        self._counters: Dict[str, Dict[LabelKey, Counter]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _label_key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+    
+    def counter(self, name: str, **labels) -> Counter:
+        """Get or create a counter."""
+        key = self._label_key(labels)
+        series = self._counters.get(name)
+        if series is None or key not in series:
+            with self._lock:
+                series = self._counters.setdefault(name, {})
+                series.setdefault(key, Counter())
+        return series[key]
+    
+    def histogram(self, name: str, **labels) -> Histogram:
+        """Get or create a histogram."""
+        key = self._label_key(labels)
+        series = self._histograms.get(name)
+        if series is None or key not in series:
+            with self._lock:
+                series = self._histograms.setdefault(name, {})
+                series.setdefault(key, Histogram())
+        return series[key]
+    
+    def reset(self):
+        """Drop all recorded metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export all metrics as a JSON-serializable dict.
+        
+        Histogram values are converted from nanoseconds to seconds.
+        """
+        counters = []
+        for name, series in sorted(self._counters.items()):
+            for key, counter in sorted(series.items()):
+                counters.append({"name": name, "labels": dict(key), "value": counter.value})
+        
+        histograms = []
+        for name, series in sorted(self._histograms.items()):
+            for key, histogram in sorted(series.items()):
+                snap = histogram.snapshot()
+                histograms.append({
+                    "name": name,
+                    "labels": dict(key),
+                    "count": snap["count"],
+                    **{
+                        stat: (snap[stat] / 1e9 if snap[stat] is not None else None)
+                        for stat in ("sum", "min", "max", "mean", "p50", "p90", "p95", "p99")
+                    },
+                })
+        
+        return {"counters": counters, "histograms": histograms}
+    
+    def to_json(self) -> str:
+        """Export all metrics as JSON text."""
+        return json.dumps(self.to_dict(), indent=2)
+    
+    def to_prometheus(self) -> str:
+        """Export all metrics in the Prometheus text exposition format."""
+        def fmt_labels(labels: Dict[str, str], extra: Optional[Dict[str, str]] = None) -> str:
+            merged = dict(labels)
+            if extra:
+                merged.update(extra)
+            if not merged:
+                return ""
+            parts = []
+            for k, v in merged.items():
+                escaped = v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+                parts.append(f'{k}="{escaped}"')
+            return "{" + ",".join(parts) + "}"
+        
+        exported = self.to_dict()
+        lines: List[str] = []
+        
+        seen = set()
+        for entry in exported["counters"]:
+            if entry["name"] not in seen:
+                seen.add(entry["name"])
+                lines.append(f"# TYPE {entry['name']} counter")
+            lines.append(f"{entry['name']}{fmt_labels(entry['labels'])} {entry['value']}")
+        
+        seen = set()
+        for entry in exported["histograms"]:
+            name = entry["name"]
+            if name not in seen:
+                seen.add(name)
+                lines.append(f"# TYPE {name} summary")
+            for quantile, stat in (("0.5", "p50"), ("0.9", "p90"), ("0.95", "p95"), ("0.99", "p99")):
+                if entry[stat] is not None:
+                    lines.append(f"{name}{fmt_labels(entry['labels'], {'quantile': quantile})} {entry[stat]:.9f}")
+            lines.append(f"{name}_sum{fmt_labels(entry['labels'])} {(entry['sum'] or 0.0):.9f}")
+            lines.append(f"{name}_count{fmt_labels(entry['labels'])} {entry['count']}")
+        
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    return _registry
+
+
+def inc(name: str, amount: int = 1, **labels):
+    """Increment a counter in the process-wide registry."""
+    _registry.counter(name, **labels).inc(amount)
+
+
+def record_ns(name: str, elapsed_ns: int, **labels):
+    """Record a duration in nanoseconds in the process-wide registry."""
+    _registry.histogram(name, **labels).record(elapsed_ns)
+
+
+@contextmanager
+def observe(name: str, **labels) -> Iterator[None]:
+    """
+    Time a block of code into a histogram.
+    
+    Usage:
+        with observe("geocode_stage_seconds", stage="cache"):
+            ...
+    """
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        record_ns(name, time.perf_counter_ns() - start, **labels)
+
+
+def timed(name: str, **labels) -> Callable:
+    """Decorator that records each call's duration into a histogram."""
+    def decorator(func: Callable) -> Callable:
+        histogram_labels = labels or {"function": func.__name__}
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_ns(name, time.perf_counter_ns() - start, **histogram_labels)
+        return wrapper
+    return decorator
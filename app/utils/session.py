@@ -0,0 +1,23 @@
+"""Attach the process-wide store and geocoder to the current Streamlit session."""
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from app.core.resources import get_shared_geocoder, get_shared_store, touch_session
+
+
+def init_session_resources(with_geocoder: bool = True):
+    """
+    Point st.session_state.db_store (and .geocoder) at the shared instances.
+    
+    Pages keep reading st.session_state as before; the state only holds
+    references, so a new session costs no extra store or geocoder.
+    
+    Args:
+        with_geocoder: Also attach the shared geocoder (preloading it on first use)
+    """
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        touch_session(ctx.session_id)
+    if "db_store" not in st.session_state:
+        st.session_state.db_store = get_shared_store()
+    if with_geocoder and "geocoder" not in st.session_state:
+        st.session_state.geocoder = get_shared_geocoder()
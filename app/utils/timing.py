@@ -3,21 +3,23 @@ import time
 from functools import wraps
 from typing import Callable, Any
 from app.utils.logging import log_structured
+from app.utils.metrics import record_ns
 
 
 def time_function(func: Callable) -> Callable:
     """Decorator to time function execution."""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start = time.time()
+        start = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        elapsed = time.time() - start
+        elapsed_ns = time.perf_counter_ns() - start
+        record_ns("function_duration_seconds", elapsed_ns, function=func.__name__)
         
         log_structured(
             "info",
             f"Function {func.__name__} executed",
             function=func.__name__,
-            elapsed_seconds=elapsed
+            elapsed_seconds=elapsed_ns / 1e9
         )
         
         return result
@@ -39,15 +41,16 @@ class Timer:
         self.elapsed = None
     
     def __enter__(self):
-        self.start = time.time()
+        self.start = time.perf_counter_ns()
         return self
     
     def __exit__(self, *args):
-        self.elapsed = time.time() - self.start
+        elapsed_ns = time.perf_counter_ns() - self.start
+        self.elapsed = elapsed_ns / 1e9
+        record_ns("operation_duration_seconds", elapsed_ns, operation=self.operation)
         log_structured(
             "info",
             f"Operation {self.operation} completed",
             operation=self.operation,
             elapsed_seconds=self.elapsed
         )
-
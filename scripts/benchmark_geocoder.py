@@ -0,0 +1,553 @@
+#!/usr/bin/env python3
+"""
+Benchmark the geocoder against a reproducible synthetic South Sudan gazetteer.
+
+Generates a seeded gazetteer (admin polygons, villages with alternate names,
+OSM POIs) in a temporary DuckDB database, then runs cold/warm geocode,
+batch, search and proximity workloads. Results (throughput, latency
+percentiles, peak memory) are written as JSON for regression tracking.
+
+Usage:
+    python scripts/benchmark_geocoder.py --villages 50000 --seed 42
+    python scripts/benchmark_geocoder.py --compare data/benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import geopandas as gpd
+import pandas as pd
+from shapely.geometry import box
+
+from app.core.config import DATA_DIR
+from app.core.duckdb_store import DuckDBStore
+from app.core.geocoder import Geocoder
+from app.core.proximity import analyze_location_proximity
+from app.utils.metrics import get_registry
+
+# South Sudan bounding box (min_lon, min_lat, max_lon, max_lat)
+SOUTH_SUDAN_BBOX = (24.0, 3.5, 35.9, 12.2)
+
+# Syllables typical of Nilotic / Equatorian place names
+SYLLABLES = [
+    "a", "bi", "em", "nom", "ma", "la", "kal", "ben", "tiu", "ru", "ko", "na",
+    "nyang", "dit", "gok", "mach", "ar", "ol", "wau", "yei", "tor", "it", "ka",
+    "jo", "ak", "wer", "ge", "deng", "lu", "pi", "bor", "to", "nj", "yam", "bio",
+    "mun", "dri", "ke", "ji", "kuei", "thok", "pan", "ri", "aw", "eil", "wat",
+]
+
+POI_CATEGORIES = ["hospital", "school", "healthcare", "unmiss", "military", "airport", "idp_camp"]
+
+
+# ---------------------------------------------------------------------------
+# Synthetic gazetteer
+# ---------------------------------------------------------------------------
+
+def _make_name(rng: random.Random, min_syllables: int = 2, max_syllables: int = 3) -> str:
+    """Generate a plausible place name from syllables."""
+    count = rng.randint(min_syllables, max_syllables)
+    return "".join(rng.choice(SYLLABLES) for _ in range(count)).capitalize()
+
+
+def _spelling_variant(rng: random.Random, name: str) -> str:
+    """Produce a transliteration-style spelling variant of a name."""
+    lowered = name.lower()
+    variants = [
+        lowered.replace("i", "e", 1),
+        lowered.replace("e", "i", 1),
+        lowered.replace("n", "nh", 1),
+        lowered.replace("k", "c", 1),
+        lowered.replace("u", "o", 1),
+        lowered + "h" if not lowered.endswith("h") else lowered[:-1],
+        lowered[:-1] if len(lowered) > 4 else lowered + "a",
+    ]
+    candidates = [v for v in variants if v != lowered]
+    return (rng.choice(candidates) if candidates else lowered + "a").capitalize()
+
+
+def _split_box(bounds: Tuple[float, float, float, float], cols: int, rows: int) -> List[Tuple[float, float, float, float]]:
+    """Split a bounding box into a grid of cols x rows cells."""
+    min_x, min_y, max_x, max_y = bounds
+    width = (max_x - min_x) / cols
+    height = (max_y - min_y) / rows
+    cells = []
+    for row in range(rows):
+        for col in range(cols):
+            cells.append((
+                min_x + col * width,
+                min_y + row * height,
+                min_x + (col + 1) * width,
+                min_y + (row + 1) * height,
+            ))
+    return cells
+
+
+def generate_gazetteer(
+    seed: int = 42,
+    n_villages: int = 50000,
+    n_pois: int = 5000,
+    alt_name_fraction: float = 0.3
+) -> Dict[str, Any]:
+    """
+    Generate a seeded synthetic gazetteer shaped like South Sudan.
+    
+    Admin units are nested grid cells: 10 states, 8 counties per state,
+    4 payams per county and 4 bomas per payam.
+    
+    Args:
+        seed: Random seed
+        n_villages: Number of villages
+        n_pois: Number of OSM POIs
+        alt_name_fraction: Fraction of villages with alternate names
+    
+    Returns:
+        Dictionary with admin GeoDataFrames, villages, alternate names and POIs
+    """
+    rng = random.Random(seed)
+    
+    layers: Dict[str, List[Dict[str, Any]]] = {
+        "admin1_state": [], "admin2_county": [], "admin3_payam": [], "admin4_boma": []
+    }
+    bomas: List[Dict[str, Any]] = []
+    
+    for s_idx, s_bounds in enumerate(_split_box(SOUTH_SUDAN_BBOX, 5, 2)):
+        state = f"{_make_name(rng)} State"
+        state_id = f"SS{s_idx:02d}"
+        layers["admin1_state"].append({
+            "feature_id": state_id, "name": state, "geometry": box(*s_bounds),
+        })
+        for c_idx, c_bounds in enumerate(_split_box(s_bounds, 4, 2)):
+            county = _make_name(rng)
+            county_id = f"{state_id}{c_idx:02d}"
+            layers["admin2_county"].append({
+                "feature_id": county_id, "name": county, "geometry": box(*c_bounds),
+                "admin1Name": state,
+            })
+            for p_idx, p_bounds in enumerate(_split_box(c_bounds, 2, 2)):
+                payam = _make_name(rng)
+                payam_id = f"{county_id}{p_idx:02d}"
+                layers["admin3_payam"].append({
+                    "feature_id": payam_id, "name": payam, "geometry": box(*p_bounds),
+                    "admin1Name": state, "admin2Name": county,
+                })
+                for b_idx, b_bounds in enumerate(_split_box(p_bounds, 2, 2)):
+                    boma = _make_name(rng)
+                    boma_id = f"{payam_id}{b_idx:02d}"
+                    record = {
+                        "feature_id": boma_id, "name": boma, "geometry": box(*b_bounds),
+                        "admin1Name": state, "admin2Name": county, "admin3Name": payam,
+                    }
+                    layers["admin4_boma"].append(record)
+                    bomas.append({
+                        "bounds": b_bounds,
+                        "state": state, "county": county, "payam": payam, "boma": boma,
+                        "state_id": state_id, "county_id": county_id,
+                        "payam_id": payam_id, "boma_id": boma_id,
+                    })
+    
+    admin_gdfs = {
+        layer: gpd.GeoDataFrame(rows, crs="EPSG:4326") for layer, rows in layers.items()
+    }
+    
+    villages = []
+    alternates = []
+    for v_idx in range(n_villages):
+        parent = bomas[rng.randrange(len(bomas))]
+        min_x, min_y, max_x, max_y = parent["bounds"]
+        name = _make_name(rng, 2, 4)
+        village_id = f"synthetic_{v_idx:07d}"
+        villages.append({
+            "village_id": village_id,
+            "name": name,
+            "lon": rng.uniform(min_x, max_x),
+            "lat": rng.uniform(min_y, max_y),
+            "state": parent["state"], "county": parent["county"],
+            "payam": parent["payam"], "boma": parent["boma"],
+            "state_id": parent["state_id"], "county_id": parent["county_id"],
+            "payam_id": parent["payam_id"], "boma_id": parent["boma_id"],
+        })
+        if rng.random() < alt_name_fraction:
+            for _ in range(rng.randint(1, 2)):
+                alternates.append({"village_id": village_id, "alternate_name": _spelling_variant(rng, name)})
+    
+    pois = []
+    min_x, min_y, max_x, max_y = SOUTH_SUDAN_BBOX
+    for p_idx in range(n_pois):
+        category = rng.choice(POI_CATEGORIES)
+        pois.append({
+            "osm_id": p_idx + 1,
+            "osm_type": "node",
+            "name": f"{_make_name(rng)} {category.replace('_', ' ').title()}",
+            "category": category,
+            "lon": rng.uniform(min_x, max_x),
+            "lat": rng.uniform(min_y, max_y),
+        })
+    pois_gdf = gpd.GeoDataFrame(
+        pois,
+        geometry=gpd.points_from_xy([p["lon"] for p in pois], [p["lat"] for p in pois]),
+        crs="EPSG:4326"
+    )
+    
+    return {
+        "admin": admin_gdfs,
+        "villages": pd.DataFrame(villages),
+        "alternate_names": pd.DataFrame(alternates, columns=["village_id", "alternate_name"]),
+        "pois": pois_gdf,
+    }
+
+
+def load_gazetteer(db_store: DuckDBStore, gazetteer: Dict[str, Any]) -> Dict[str, float]:
+    """Load a synthetic gazetteer into a store and return per-step timings in seconds."""
+    timings = {}
+    
+    start = time.perf_counter()
+    for layer_name, gdf in gazetteer["admin"].items():
+        db_store.ingest_geojson(layer_name, gdf)
+    timings["admin_ingest_seconds"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    db_store.bulk_upsert_villages(gazetteer["villages"].assign(data_source="synthetic"))
+    db_store.bulk_add_alternate_names(gazetteer["alternate_names"].assign(name_type="variant", source="synthetic"))
+    timings["village_load_seconds"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    db_store.ingest_osm_pois(gazetteer["pois"])
+    timings["poi_ingest_seconds"] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    db_store.build_name_index()
+    timings["build_name_index_seconds"] = time.perf_counter() - start
+    
+    return timings
+
+
+def build_queries(gazetteer: Dict[str, Any], n_queries: int, seed: int) -> List[str]:
+    """
+    Build a mixed geocode query set.
+    
+    Mix: exact village names, misspelled village names, village with
+    county/state context, boma and payam names, and queries that should miss.
+    """
+    rng = random.Random(seed + 1)
+    villages = gazetteer["villages"]
+    bomas = gazetteer["admin"]["admin4_boma"]
+    payams = gazetteer["admin"]["admin3_payam"]
+    
+    queries = []
+    for i in range(n_queries):
+        kind = i % 6
+        row = villages.iloc[rng.randrange(len(villages))]
+        if kind == 0:
+            queries.append(row["name"])
+        elif kind == 1:
+            queries.append(_spelling_variant(rng, row["name"]))
+        elif kind == 2:
+            queries.append(f"{row['name']}, {row['county']} County, {row['state']}")
+        elif kind == 3:
+            queries.append(bomas.iloc[rng.randrange(len(bomas))]["name"])
+        elif kind == 4:
+            queries.append(payams.iloc[rng.randrange(len(payams))]["name"])
+        else:
+            queries.append(f"Nowhere {rng.randint(1000, 9999)} Xyz")
+    return queries
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def _percentile(sorted_values: Sequence[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux and bytes on macOS
+    if sys.platform == "darwin":
+        return peak / 1024 / 1024
+    return peak / 1024
+
+
+def run_workload(
+    name: str,
+    inputs: Sequence[Any],
+    func: Callable[[Any], Any],
+    trace_memory: bool = False
+) -> Dict[str, Any]:
+    """Run func over inputs and return throughput and latency statistics."""
+    if trace_memory:
+        tracemalloc.start()
+    
+    latencies = []
+    start_all = time.perf_counter()
+    for item in inputs:
+        start = time.perf_counter_ns()
+        func(item)
+        latencies.append((time.perf_counter_ns() - start) / 1e6)
+    total = time.perf_counter() - start_all
+    
+    result = {
+        "workload": name,
+        "operations": len(inputs),
+        "total_seconds": round(total, 4),
+        "throughput_per_second": round(len(inputs) / total, 2) if total > 0 else None,
+    }
+    latencies.sort()
+    result["latency_ms"] = {
+        "mean": round(sum(latencies) / len(latencies), 3) if latencies else None,
+        "p50": _percentile(latencies, 50),
+        "p90": _percentile(latencies, 90),
+        "p95": _percentile(latencies, 95),
+        "p99": _percentile(latencies, 99),
+        "max": latencies[-1] if latencies else None,
+    }
+    
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["traced_peak_mb"] = round(peak / 1024 / 1024, 2)
+    result["process_peak_rss_mb"] = round(_peak_rss_mb(), 1)
+    
+    print(f"  {name:<32} {len(inputs):>6} ops  "
+          f"{result['throughput_per_second'] or 0:>10.1f} ops/s  "
+          f"p50 {result['latency_ms']['p50'] or 0:>9.2f} ms  "
+          f"p95 {result['latency_ms']['p95'] or 0:>9.2f} ms")
+    return result
+
+
+def run_benchmarks(
+    db_store: DuckDBStore,
+    gazetteer: Dict[str, Any],
+    n_queries: int,
+    seed: int,
+    trace_memory: bool = False,
+    only: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    """Run all workloads (or only the named ones) against a loaded store."""
+    rng = random.Random(seed + 2)
+    queries = build_queries(gazetteer, n_queries, seed)
+    min_x, min_y, max_x, max_y = SOUTH_SUDAN_BBOX
+    points = [(rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)) for _ in range(max(10, n_queries // 2))]
+    village_names = [gazetteer["villages"].iloc[rng.randrange(len(gazetteer["villages"]))]["name"]
+                     for _ in range(n_queries)]
+    
+    results = []
+    
+    def _run(name, inputs, func, trace):
+        if only and name not in only:
+            return None
+        return run_workload(name, inputs, func, trace)
+    
+    # Cold: a fresh Geocoder (admin layers not yet loaded) and no cache
+    geocoder = Geocoder(db_store)
+    results.append(_run(
+        "geocode_cold", queries[:1], lambda q: geocoder.geocode(q, use_cache=False), trace_memory
+    ))
+    extracted = get_registry().counter("geocode_candidates_total", stage="extracted")
+    scored = get_registry().counter("geocode_candidates_total", stage="scored")
+    before = (extracted.value, scored.value)
+    results.append(_run(
+        "geocode_uncached", queries, lambda q: geocoder.geocode(q, use_cache=False), trace_memory
+    ))
+    if results[-1] is not None:
+        # Each candidate is one fuzzy search per resolution stage
+        results[-1]["candidates_per_query"] = {
+            "extracted": round((extracted.value - before[0]) / len(queries), 2),
+            "scored": round((scored.value - before[1]) / len(queries), 2),
+        }
+    
+    # Warm: populate the cache, then measure repeat queries
+    if not only or "geocode_warm_cache" in only:
+        db_store.conn.execute("DELETE FROM geocode_cache")
+        for query in queries:
+            geocoder.geocode(query, use_cache=True)
+    results.append(_run(
+        "geocode_warm_cache", queries, lambda q: geocoder.geocode(q, use_cache=True), trace_memory
+    ))
+    
+    # Batch: one pass over the whole list, as a batch pipeline would
+    batch = list(queries)
+    results.append(_run(
+        "geocode_batch", [batch], lambda qs: [geocoder.geocode(q, use_cache=False) for q in qs], trace_memory
+    ))
+    if results[-1] is not None:
+        results[-1]["batch_size"] = len(batch)
+        results[-1]["throughput_per_second"] = round(len(batch) / results[-1]["total_seconds"], 2)
+    
+    results.append(_run(
+        "search_villages", village_names, lambda q: db_store.search_villages(q, threshold=0.7, limit=10), trace_memory
+    ))
+    
+    county_names = gazetteer["villages"]["county"].tolist()
+    results.append(_run(
+        "search_villages_constrained",
+        [(village_names[i], county_names[rng.randrange(len(county_names))]) for i in range(len(village_names))],
+        lambda args: db_store.search_villages(args[0], threshold=0.7, limit=10, county_constraint=args[1]),
+        trace_memory
+    ))
+    
+    # Transliteration-style misspellings of known villages: recall@1 by name
+    villages = gazetteer["villages"]
+    variant_pairs = []
+    for _ in range(n_queries):
+        name = villages.iloc[rng.randrange(len(villages))]["name"]
+        variant_pairs.append((_spelling_variant(rng, name), name))
+    variant_hits = []
+    
+    def _search_variant(args):
+        matches = db_store.search_villages(args[0], threshold=0.7, limit=1)
+        variant_hits.append(bool(matches) and matches[0]["name"] == args[1])
+    
+    results.append(_run("search_villages_variants", variant_pairs, _search_variant, trace_memory))
+    if results[-1] is not None:
+        results[-1]["recall_at_1"] = round(sum(variant_hits) / len(variant_hits), 4)
+    
+    results.append(_run(
+        "search_name_index", village_names, lambda q: db_store.search_name_index(q, threshold=0.7, limit=10), trace_memory
+    ))
+    
+    results.append(_run(
+        "get_admin_hierarchy_with_ids", points, lambda p: db_store.get_admin_hierarchy_with_ids(*p), trace_memory
+    ))
+    
+    results.append(_run(
+        "proximity_analysis", points, lambda p: analyze_location_proximity(db_store, p[0], p[1], radius_km=25.0), trace_memory
+    ))
+    
+    return [r for r in results if r is not None]
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Compare workload throughput and p95 latency against a baseline report."""
+    baseline_by_name = {w["workload"]: w for w in baseline.get("workloads", [])}
+    rows = []
+    for workload in current["workloads"]:
+        base = baseline_by_name.get(workload["workload"])
+        if not base:
+            continue
+        row = {"workload": workload["workload"]}
+        if base.get("throughput_per_second") and workload.get("throughput_per_second"):
+            row["throughput_change_pct"] = round(
+                (workload["throughput_per_second"] / base["throughput_per_second"] - 1) * 100, 1
+            )
+        base_p95 = base.get("latency_ms", {}).get("p95")
+        cur_p95 = workload.get("latency_ms", {}).get("p95")
+        if base_p95 and cur_p95:
+            row["p95_change_pct"] = round((cur_p95 / base_p95 - 1) * 100, 1)
+        rows.append(row)
+    return rows
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=project_root, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the geocoder on a synthetic gazetteer")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--villages", type=int, default=50000, help="Number of synthetic villages")
+    parser.add_argument("--pois", type=int, default=5000, help="Number of synthetic OSM POIs")
+    parser.add_argument("--queries", type=int, default=30, help="Number of queries per workload")
+    parser.add_argument("--db-path", type=Path, default=None,
+                        help="Keep the benchmark database at this path (default: temporary)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="JSON report path (default: data/benchmarks/geocoder_<timestamp>.json)")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON report to compare against")
+    parser.add_argument("--workloads", type=str, default=None,
+                        help="Comma-separated workload names to run (default: all)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Measure per-workload Python heap peak with tracemalloc (slower)")
+    args = parser.parse_args()
+    
+    temp_dir = None
+    if args.db_path:
+        db_path = args.db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        if db_path.exists():
+            db_path.unlink()
+    else:
+        temp_dir = tempfile.mkdtemp(prefix="geocoder_bench_")
+        db_path = Path(temp_dir) / "benchmark.duckdb"
+    
+    print(f"Generating synthetic gazetteer (seed={args.seed}, villages={args.villages}, pois={args.pois})...")
+    start = time.perf_counter()
+    gazetteer = generate_gazetteer(args.seed, args.villages, args.pois)
+    generate_seconds = time.perf_counter() - start
+    
+    db_store = DuckDBStore(db_path)
+    try:
+        print("Loading gazetteer into DuckDB...")
+        ingest = load_gazetteer(db_store, gazetteer)
+        ingest["generate_seconds"] = generate_seconds
+        for key, value in ingest.items():
+            print(f"  {key:<32} {value:.2f}s")
+        
+        print("Running workloads...")
+        only = [w.strip() for w in args.workloads.split(",")] if args.workloads else None
+        workloads = run_benchmarks(db_store, gazetteer, args.queries, args.seed, args.trace_memory, only)
+    finally:
+        db_store.close()
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    import duckdb
+    report = {
+        "benchmark": "geocoder",
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": _git_revision(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duckdb": duckdb.__version__,
+        },
+        "parameters": {
+            "seed": args.seed,
+            "villages": args.villages,
+            "alternate_names": len(gazetteer["alternate_names"]),
+            "pois": args.pois,
+            "queries": args.queries,
+        },
+        "ingest": {k: round(v, 4) for k, v in ingest.items()},
+        "workloads": workloads,
+    }
+    
+    if args.compare and args.compare.exists():
+        report["comparison"] = compare_reports(report, json.loads(args.compare.read_text()))
+        print("Comparison with baseline:")
+        for row in report["comparison"]:
+            print(f"  {row['workload']:<32} throughput {row.get('throughput_change_pct', 'n/a'):>7}%  "
+                  f"p95 {row.get('p95_change_pct', 'n/a'):>7}%")
+    
+    output = args.output or DATA_DIR / "benchmarks" / f"geocoder_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, default=str))
+    print(f"✅ Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,12 +11,14 @@ def main():
     parser = argparse.ArgumentParser(description="Build name index")
     parser.add_argument("--db-path", type=Path, default=DUCKDB_PATH,
                        help="DuckDB database path")
+    parser.add_argument("--incremental", action="store_true",
+                       help="Only re-index features changed since the last build")
     
     args = parser.parse_args()
     
     print("Building name index...")
     db_store = DuckDBStore(args.db_path)
-    db_store.build_name_index()
+    db_store.build_name_index(incremental=args.incremental)
     print("✅ Index built successfully")
     
     db_store.close()
@@ -3,17 +3,22 @@
 Evaluate HRD extraction performance by comparing generated reports with originals.
 """
 
+import argparse
 import sys
+import time
 from pathlib import Path
 from docx import Document
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import difflib
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+from app.core.hrd_incident_extractor import HRDIncidentExtractor
+from app.core.normalization import normalize_text
+
 
 def compare_compiled_reports(generated_path: str, original_path: str) -> Dict[str, Any]:
     """Compare generated compiled report with original."""
@@ -94,8 +99,100 @@ def compare_matrices(generated_path: str, original_path: str) -> Dict[str, Any]:
         return {"error": str(e)}
 
 
+def _matrix_keys(matrix_path: str) -> List[tuple]:
+    """(date, normalized location) of every incident in a reference matrix."""
+    df = pd.read_excel(matrix_path)
+    dates = pd.to_datetime(df.get("Date of Incident"), errors="coerce")
+    locations = df.get("Location of Incident", pd.Series([""] * len(df))).fillna("").astype(str)
+    return [
+        (date.date() if not pd.isna(date) else None, normalize_text(location))
+        for date, location in zip(dates, locations)
+    ]
+
+
+def _recall(incidents: List[Any], keys: List[tuple]) -> float:
+    """Share of reference incidents matched by date and overlapping location."""
+    if not keys:
+        return 0.0
+    extracted = [
+        (incident.date_of_incident.date() if incident.date_of_incident else None,
+         normalize_text(incident.location_of_incident or ""))
+        for incident in incidents
+    ]
+    matched = 0
+    for date, location in keys:
+        if any(
+            date == other_date and location and other_location
+            and (location in other_location or other_location in location)
+            for other_date, other_location in extracted
+        ):
+            matched += 1
+    return matched / len(keys)
+
+
+def evaluate_extraction_modes(daily_paths: List[Path], matrix_path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare single-pass (truncated) and map-reduce incident extraction.
+    
+    Args:
+        daily_paths: Field office daily reports (.docx)
+        matrix_path: Reference matrix for recall (optional)
+    
+    Returns:
+        Per mode: seconds, reports/minute, share of report text sent to the
+        LLM, incident count and recall against the matrix
+    """
+    texts = {}
+    for path in daily_paths:
+        texts[path] = "\n".join(para.text for para in Document(path).paragraphs)
+    total_chars = sum(len(text) for text in texts.values()) or 1
+    keys = _matrix_keys(matrix_path) if matrix_path else []
+    
+    results = {}
+    for mode, map_reduce in (("truncated", False), ("map_reduce", True)):
+        extractor = HRDIncidentExtractor(map_reduce=map_reduce)
+        incidents = []
+        start = time.perf_counter()
+        for path, text in texts.items():
+            incidents.extend(extractor.extract_incidents_from_text(text))
+        seconds = time.perf_counter() - start
+        
+        # The single pass only ever sends the first 2000 characters
+        covered = total_chars if map_reduce else sum(min(len(text), 2000) for text in texts.values())
+        results[mode] = {
+            "seconds": seconds,
+            "reports_per_minute": 60 * len(texts) / seconds if seconds else 0.0,
+            "text_coverage": covered / total_chars,
+            "incidents": len(incidents),
+            "recall": _recall(incidents, keys) if keys else None,
+        }
+    return results
+
+
+def print_mode_comparison(results: Dict[str, Dict[str, Any]]):
+    """Print evaluate_extraction_modes results as a table."""
+    print("\n" + "=" * 80)
+    print("EXTRACTION MODES")
+    print("=" * 80)
+    print(f"{'mode':<12}{'seconds':>10}{'reports/min':>14}{'coverage':>10}{'incidents':>11}{'recall':>8}")
+    for mode, row in results.items():
+        recall = f"{row['recall']:.0%}" if row["recall"] is not None else "-"
+        print(f"{mode:<12}{row['seconds']:>10.1f}{row['reports_per_minute']:>14.1f}"
+              f"{row['text_coverage']:>10.0%}{row['incidents']:>11}{recall:>8}")
+
+
 def main():
     """Main evaluation function."""
+    parser = argparse.ArgumentParser(description="Evaluate HRD extraction")
+    parser.add_argument("--dailies", type=Path, help="Folder of daily reports to compare extraction modes on")
+    parser.add_argument("--matrix", type=Path, help="Reference matrix for extraction recall")
+    args = parser.parse_args()
+    
+    if args.dailies:
+        daily_paths = sorted(args.dailies.glob("*.docx"))
+        print_mode_comparison(evaluate_extraction_modes(daily_paths, str(args.matrix) if args.matrix else None))
+        return
+    
     week_folder = Path("resources/Weekly/03-09")
     date = "4 November 2025"
     
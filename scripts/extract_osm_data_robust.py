@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
-"""Robust OSM data extraction with better error handling and incremental processing."""
+"""Robust OSM data extraction: tiled, concurrent and resumable."""
 import sys
 from pathlib import Path
-import time
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
@@ -10,81 +9,14 @@ if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
 from app.core.scrapers.osm_data_extractor import OSMDataExtractor
+from app.core.scrapers.overpass_harvester import (
+    OverpassHarvester, MAX_WORKERS, MIN_REQUEST_INTERVAL, TILE_SIZE
+)
 from app.core.duckdb_store import DuckDBStore
 from app.core.config import DUCKDB_PATH
 import argparse
 
 
-def extract_category_batch(extractor, db_store, categories, bbox, include_roads=False, retries=3):
-    """Extract categories one at a time to avoid timeouts."""
-    all_results = {}
-    
-    # Extract roads separately if requested
-    if include_roads:
-        print("\n" + "="*60)
-        print("Extracting ROADS...")
-        print("="*60)
-        for attempt in range(retries):
-            try:
-                roads_result = extractor.extract_features(
-                    feature_types=[],
-                    bbox=bbox,
-                    include_roads=True
-                )
-                if "roads" in roads_result and not roads_result["roads"].empty:
-                    print(f"✓ Extracted {len(roads_result['roads'])} roads")
-                    db_store.ingest_osm_roads(roads_result["roads"])
-                    print("✓ Roads stored in database")
-                    all_results["roads"] = roads_result["roads"]
-                break
-            except Exception as e:
-                if attempt < retries - 1:
-                    wait_time = (attempt + 1) * 30
-                    print(f"✗ Error (attempt {attempt + 1}/{retries}): {e}")
-                    print(f"  Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"✗ Failed after {retries} attempts: {e}")
-        time.sleep(5)  # Rate limiting
-    
-    # Extract POI categories one at a time
-    for category in categories:
-        print("\n" + "="*60)
-        print(f"Extracting {category.upper()}...")
-        print("="*60)
-        
-        for attempt in range(retries):
-            try:
-                result = extractor.extract_features(
-                    feature_types=[category],
-                    bbox=bbox,
-                    include_roads=False
-                )
-                
-                if category in result and not result[category].empty:
-                    print(f"✓ Extracted {len(result[category])} {category} features")
-                    db_store.ingest_osm_pois(result[category])
-                    print(f"✓ {category.capitalize()} stored in database")
-                    all_results[category] = result[category]
-                else:
-                    print(f"⚠ No {category} features found in this area")
-                break
-                
-            except Exception as e:
-                if attempt < retries - 1:
-                    wait_time = (attempt + 1) * 30
-                    print(f"✗ Error (attempt {attempt + 1}/{retries}): {e}")
-                    print(f"  Waiting {wait_time} seconds before retry...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"✗ Failed after {retries} attempts: {e}")
-        
-        # Rate limiting between categories
-        time.sleep(10)
-    
-    return all_results
-
-
 def main():
     parser = argparse.ArgumentParser(description="Robust OSM data extraction for South Sudan")
     parser.add_argument(
@@ -106,6 +38,29 @@ def main():
         metavar=("MIN_LON", "MIN_LAT", "MAX_LON", "MAX_LAT"),
         help="Bounding box (default: entire South Sudan)"
     )
+    parser.add_argument(
+        "--tile-size",
+        type=float,
+        default=TILE_SIZE,
+        help=f"Initial tile edge in degrees (default: {TILE_SIZE}); tiles that time out are split"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"Concurrent Overpass requests (default: {MAX_WORKERS})"
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=MIN_REQUEST_INTERVAL,
+        help=f"Minimum seconds between request starts (default: {MIN_REQUEST_INTERVAL})"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore checkpoints from a previous run and fetch every tile again"
+    )
     
     args = parser.parse_args()
     
@@ -134,8 +89,8 @@ def main():
     print(f"Categories: {', '.join(feature_types)}")
     print(f"Bounding box: {bbox}")
     print(f"Include roads: {not args.no_roads}")
-    print("\n⚠️  NOTE: This will extract categories ONE AT A TIME")
-    print("   to avoid API timeouts. This may take a while.\n")
+    print(f"Tile size: {args.tile_size} degrees, workers: {args.workers}")
+    print("\n⚠️  NOTE: Tiles are checkpointed; rerun the same command to resume.\n")
     
     # Initialize database
     try:
@@ -146,30 +101,39 @@ def main():
         print("\nMake sure no other process (like Streamlit) is using the database.")
         return 1
     
-    # Extract in batches
+    # Harvest tile by tile
     try:
-        results = extract_category_batch(
-            extractor,
+        harvester = OverpassHarvester(
+            db_store,
+            overpass_url=extractor.overpass_url,
+            max_workers=args.workers,
+            min_interval=args.min_interval
+        )
+        summary = extractor.harvest_features(
             db_store,
-            feature_types,
-            bbox,
+            feature_types=feature_types,
+            bbox=bbox,
             include_roads=not args.no_roads,
-            retries=3
+            harvester=harvester,
+            tile_size=args.tile_size,
+            restart=args.restart
         )
         
         # Summary
         print("\n" + "="*60)
         print("EXTRACTION COMPLETE")
         print("="*60)
-        for key, gdf in results.items():
-            print(f"{key:20s}: {len(gdf):6d} features")
+        for key, count in summary.items():
+            print(f"{key:20s}: {count:6d}")
+        if summary["failed"]:
+            print("\n⚠ Some tiles failed; run the same command again to retry them.")
         
         db_store.close()
         print(f"\n✓ Database location: {DUCKDB_PATH}")
         return 0
         
     except KeyboardInterrupt:
-        print("\n\nExtraction interrupted by user.")
+        print("\n\nExtraction interrupted by user. Finished tiles are saved; rerun to resume.")
         db_store.close()
         return 1
     except Exception as e:
@@ -2,7 +2,6 @@
 import sys
 from pathlib import Path
 import pandas as pd
-from tqdm import tqdm
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -11,6 +10,10 @@ from app.core.duckdb_store import DuckDBStore
 from app.core.config import PROJECT_ROOT
 
 
+# Columns every sheet must have (coordinates and feature name)
+REQUIRED_COLUMNS = ("POINT_X", "POINT_Y", "featureNam")
+
+
 def ingest_compiled_dataset(
     excel_path: Path,
     sheet_name: str = "Complete data set - Boma",
@@ -23,6 +26,13 @@ def ingest_compiled_dataset(
         excel_path: Path to Excel file
         sheet_name: Name of sheet to ingest
         db_store: DuckDBStore instance (creates new if None)
+    
+    Returns:
+        (rows processed, rows skipped, errors) where errors lists
+        (row index, message) for rows skipped because of invalid values
+    
+    Raises:
+        ValueError: If the sheet lacks a required column
     """
     if db_store is None:
         db_store = DuckDBStore()
@@ -33,6 +43,10 @@ def ingest_compiled_dataset(
     
     print(f"Found {len(df)} rows")
     
+    missing = [column for column in REQUIRED_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(f"Sheet '{sheet_name}' is missing required columns: {', '.join(missing)}")
+    
     # Column mapping
     # featureNam -> name
     # POINT_X -> lon
@@ -47,93 +61,73 @@ def ingest_compiled_dataset(
     # featureRef -> alternate name (if different from featureNam)
     # featureAlt -> alternate name
     
-    rows_processed = 0
-    rows_skipped = 0
     errors = []
     
+    def text_column(column: str) -> pd.Series:
+        """Stripped string values, None where missing or blank."""
+        if column not in df.columns:
+            return pd.Series([None] * len(df), index=df.index, dtype=object)
+        values = df[column].astype(str).str.strip()
+        return values.where(df[column].notna() & (values != ""), None)
+    
+    def id_column(column: str) -> pd.Series:
+        """Integer IDs as strings, None where missing."""
+        if column not in df.columns:
+            return pd.Series([None] * len(df), index=df.index, dtype=object)
+        values = pd.to_numeric(df[column], errors="coerce")
+        return values.map(lambda v: str(int(v)) if pd.notna(v) else None)
+    
+    def coordinate_column(column: str) -> pd.Series:
+        """Coordinates as floats; values that are not numbers are reported."""
+        values = pd.to_numeric(df[column], errors="coerce")
+        for idx in df.index[df[column].notna() & values.isna()]:
+            errors.append((idx, f"{column} is not a number: {df.at[idx, column]!r}"))
+        return values
+    
+    # Skip rows with missing or invalid coordinates or feature name
+    lon = coordinate_column("POINT_X")
+    lat = coordinate_column("POINT_Y")
+    names = text_column("featureNam")
+    valid = lon.notna() & lat.notna() & names.notna()
+    rows_skipped = int((~valid).sum())
+    
+    villages = pd.DataFrame({
+        "name": names,
+        "lon": lon,
+        "lat": lat,
+        "state": text_column("admin1_state"),
+        "county": text_column("admin2_county"),
+        "payam": text_column("admin3_payam"),
+        "boma": text_column("admin4_boma"),
+        "county_id": id_column("County_id"),
+        "payam_id": id_column("Payam_id"),
+        "boma_id": id_column("Boma_id"),
+        "data_source": "compiled_dataset",
+        "source_id": df.index.astype(str),
+        "verified": False,
+    })[valid]
+    
     print("Ingesting villages...")
-    for idx, row in tqdm(df.iterrows(), total=len(df), desc="Processing rows"):
-        try:
-            # Skip rows with missing coordinates
-            if pd.isna(row.get("POINT_X")) or pd.isna(row.get("POINT_Y")):
-                rows_skipped += 1
-                continue
-            
-            # Skip rows with missing feature name
-            feature_name = row.get("featureNam")
-            if pd.isna(feature_name) or not str(feature_name).strip():
-                rows_skipped += 1
-                continue
-            
-            name = str(feature_name).strip()
-            lon = float(row["POINT_X"])
-            lat = float(row["POINT_Y"])
-            
-            # Admin boundaries
-            state = str(row.get("admin1_state", "")).strip() if pd.notna(row.get("admin1_state")) else None
-            county = str(row.get("admin2_county", "")).strip() if pd.notna(row.get("admin2_county")) else None
-            payam = str(row.get("admin3_payam", "")).strip() if pd.notna(row.get("admin3_payam")) else None
-            boma = str(row.get("admin4_boma", "")).strip() if pd.notna(row.get("admin4_boma")) else None
-            
-            # Admin IDs
-            county_id = str(int(row["County_id"])) if pd.notna(row.get("County_id")) else None
-            payam_id = str(int(row["Payam_id"])) if pd.notna(row.get("Payam_id")) else None
-            boma_id = str(int(row["Boma_id"])) if pd.notna(row.get("Boma_id")) else None
-            
-            # Add village
-            village_id = db_store.add_village(
-                name=name,
-                lon=lon,
-                lat=lat,
-                state=state if state else None,
-                county=county if county else None,
-                payam=payam if payam else None,
-                boma=boma if boma else None,
-                county_id=county_id,
-                payam_id=payam_id,
-                boma_id=boma_id,
-                data_source="compiled_dataset",
-                source_id=str(idx),
-                verified=False
-            )
-            
-            # Add alternate names if present
-            feature_ref = row.get("featureRef")
-            if pd.notna(feature_ref) and str(feature_ref).strip() and str(feature_ref).strip() != name:
-                try:
-                    db_store.add_alternate_name(
-                        village_id=village_id,
-                        alternate_name=str(feature_ref).strip(),
-                        name_type="alias",
-                        source="compiled_dataset"
-                    )
-                except Exception as e:
-                    # Skip duplicate alternate names
-                    pass
-            
-            feature_alt = row.get("featureAlt")
-            if pd.notna(feature_alt) and str(feature_alt).strip() and str(feature_alt).strip() != name:
-                try:
-                    db_store.add_alternate_name(
-                        village_id=village_id,
-                        alternate_name=str(feature_alt).strip(),
-                        name_type="variant",
-                        source="compiled_dataset"
-                    )
-                except Exception as e:
-                    # Skip duplicate alternate names
-                    pass
-            
-            rows_processed += 1
-            
-        except Exception as e:
-            errors.append((idx, str(e)))
-            rows_skipped += 1
-            continue
+    village_ids = pd.Series(db_store.bulk_upsert_villages(villages), index=villages.index)
+    rows_processed = len(village_ids)
+    
+    # Add alternate names if present (featureRef as alias, featureAlt as variant)
+    alternates = []
+    for column, name_type in (("featureRef", "alias"), ("featureAlt", "variant")):
+        alternate_names = text_column(column)[valid]
+        keep = alternate_names.notna() & (alternate_names != villages["name"])
+        alternates.append(pd.DataFrame({
+            "village_id": village_ids[keep],
+            "alternate_name": alternate_names[keep],
+            "name_type": name_type,
+            "source": "compiled_dataset",
+        }))
+    alternates_added = db_store.bulk_add_alternate_names(pd.concat(alternates, ignore_index=True))
     
     print(f"\nIngestion complete!")
     print(f"  Rows processed: {rows_processed}")
     print(f"  Rows skipped: {rows_skipped}")
+    print(f"  Alternate names added: {alternates_added}")
     if errors:
         print(f"  Errors: {len(errors)}")
         print("\nFirst 10 errors:")
@@ -181,6 +175,9 @@ def main():
             sheet_name=args.sheet_name,
             db_store=db_store
         )
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
     finally:
         db_store.close()
 
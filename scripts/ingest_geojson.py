@@ -4,6 +4,7 @@ import argparse
 import sys
 from pathlib import Path
 import geopandas as gpd
+from app.core.admin_hierarchy import ensure_admin_hierarchy
 from app.core.duckdb_store import DuckDBStore
 from app.core.config import DUCKDB_PATH, LAYER_NAMES
 
@@ -39,6 +40,10 @@ def main():
     db_store.build_name_index()
     print("✅ Index built")
     
+    # Parent → children table for the cascading dropdowns
+    ensure_admin_hierarchy(db_store)
+    print("✅ Admin hierarchy built")
+    
     db_store.close()
 
 
@@ -6,7 +6,7 @@ This script automates the entire workflow:
 1. Read field office daily reports from Dailies folder
 2. Extract incidents using LLM (Ollama/Azure AI)
 3. Compile into HRD Daily Reports
-4. Generate Weekly CivCas Matrix Excel file
+4. Generate Weekly CivCas Matrix (Parquet, with an Excel view on request)
 """
 
 import sys
@@ -22,11 +22,12 @@ sys.path.insert(0, str(project_root))
 
 from app.core.hrd_incident_extractor import HRDIncidentExtractor
 from app.core.hrd_report_compiler import HRDReportCompiler
+from app.core.hrd_incident_store import read_incident_store
 from app.core.hrd_matrix_generator import HRDMatrixGenerator
 from app.core.ollama_location_extractor import OllamaLocationExtractor
 from app.core.azure_ai import AzureAIParser
 from app.core.geocoder import Geocoder
-from app.core.duckdb_store import DuckDBStore
+from app.core.store_replica import open_store
 from app.utils.logging import log_structured
 
 
@@ -83,13 +84,14 @@ def extract_field_office_from_filename(filename: str) -> str:
     return "Unknown"
 
 
-def process_weekly_folder(week_folder_path: Path, output_dir: Path) -> Dict[str, Any]:
+def process_weekly_folder(week_folder_path: Path, output_dir: Path, matrix_format: str = "xlsx") -> Dict[str, Any]:
     """
     Process a weekly folder: dailies → compiled reports → matrix.
     
     Args:
         week_folder_path: Path to week folder (e.g., "03-09")
         output_dir: Directory to save outputs
+        matrix_format: "xlsx" (Parquet plus Excel view) or "parquet" only
         
     Returns:
         Processing results
@@ -103,7 +105,8 @@ def process_weekly_folder(week_folder_path: Path, output_dir: Path) -> Dict[str,
     
     # Initialize components
     try:
-        db_store = DuckDBStore()
+        # Falls back to the app's read-only snapshot while the app holds the database
+        db_store = open_store()
         geocoder = Geocoder(db_store)
     except Exception:
         geocoder = None
@@ -162,6 +165,7 @@ def process_weekly_folder(week_folder_path: Path, output_dir: Path) -> Dict[str,
     
     # 2. Generate compiled daily reports
     compiled_reports = []
+    compiled_by_date = {}
     all_incidents = []
     
     for date, dailies in sorted(dailies_by_date.items()):
@@ -177,29 +181,37 @@ def process_weekly_folder(week_folder_path: Path, output_dir: Path) -> Dict[str,
                 output_path=str(output_path)
             )
             compiled_reports.append(compiled_path)
+            compiled_by_date[date] = compiled_path
             log_structured("info", f"Generated compiled report: {compiled_path}")
         except Exception as e:
             log_structured("error", f"Failed to compile report for {date}",
                           error=str(e))
     
-    # 3. Extract all incidents for matrix
-    for daily_file in daily_files:
-        try:
-            from docx import Document
-            doc = Document(daily_file)
-            text = "\n".join([para.text for para in doc.paragraphs])
-            field_office = extract_field_office_from_filename(daily_file.name)
-            
-            incidents = incident_extractor.extract_incidents_from_text(text, field_office)
+    # 3. Collect incidents for matrix: reuse the incident store written with
+    # each compiled report; only dailies whose report failed are extracted again
+    for date, dailies in sorted(dailies_by_date.items()):
+        compiled_path = compiled_by_date.get(date)
+        incidents = read_incident_store(compiled_path) if compiled_path else None
+        if incidents is not None:
             all_incidents.extend(incidents)
-        except Exception as e:
-            log_structured("error", f"Failed to extract incidents from {daily_file.name}",
-                          error=str(e))
+            continue
+        
+        for daily in dailies:
+            try:
+                from docx import Document
+                doc = Document(daily["file_path"])
+                text = "\n".join([para.text for para in doc.paragraphs])
+                
+                incidents = incident_extractor.extract_incidents_from_text(text, daily["field_office"])
+                all_incidents.extend(incidents)
+            except Exception as e:
+                log_structured("error", f"Failed to extract incidents from {Path(daily['file_path']).name}",
+                              error=str(e))
     
     log_structured("info", f"Extracted {len(all_incidents)} total incidents")
     
     # 4. Generate weekly matrix
-    matrix_filename = f"Weekly CivCas Matrix-{start_date.strftime('%d-%d')} {start_date.strftime('%B %Y')}.xlsx"
+    matrix_filename = f"Weekly CivCas Matrix-{start_date.strftime('%d-%d')} {start_date.strftime('%B %Y')}.{matrix_format}"
     matrix_path = output_dir / matrix_filename
     
     try:
@@ -251,6 +263,12 @@ def main():
         default="resources/Weekly",
         help="Base directory containing week folders"
     )
+    parser.add_argument(
+        "--matrix-format",
+        choices=["xlsx", "parquet"],
+        default="xlsx",
+        help="Matrix output: Parquet with an Excel view (xlsx) or Parquet only"
+    )
     
     args = parser.parse_args()
     
@@ -282,7 +300,7 @@ def main():
     print(f"Output directory: {output_dir}")
     print("-" * 80)
     
-    results = process_weekly_folder(week_folder_path, output_dir)
+    results = process_weekly_folder(week_folder_path, output_dir, args.matrix_format)
     
     if "error" in results:
         print(f"Error: {results['error']}")
@@ -2,26 +2,16 @@
 import sys
 from pathlib import Path
 import time
+import pandas as pd
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Try to import tqdm, but don't fail if not available
-try:
-    from tqdm import tqdm
-    HAS_TQDM = True
-except ImportError:
-    HAS_TQDM = False
-    # Simple progress function if tqdm not available
-    def tqdm(iterable, desc=""):
-        print(f"{desc}: Starting...")
-        return iterable
-
 from app.core.duckdb_store import DuckDBStore
 from app.core.spatial import detect_admin_boundaries_from_point
 from app.core.config import PROJECT_ROOT
+from app.core.scrapers.overpass_harvester import OverpassHarvester, harvest_run_id
 from shapely.geometry import Point
-import requests
 
 
 # South Sudan bounding box (min_lon, min_lat, max_lon, max_lat)
@@ -34,27 +24,25 @@ OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 PLACE_TYPES = ["village", "hamlet", "town", "city", "isolated_dwelling", "suburb", "neighbourhood"]
 
 
-def scrape_osm_places(bbox: tuple, place_types: list, chunk_size: int = 1000):
+def build_places_query(bbox: tuple, place_types: list, timeout: int = 300) -> str:
     """
-    Scrape all places from OpenStreetMap within bounding box.
+    Build the Overpass query for named places in a bounding box.
     
     Args:
         bbox: Bounding box (min_lon, min_lat, max_lon, max_lat)
         place_types: List of place types to scrape
-        chunk_size: Number of results per query (to avoid timeout)
+        timeout: Server-side query timeout in seconds
         
-    Yields:
-        Dict with place information
+    Returns:
+        Overpass QL query string
     """
     min_lon, min_lat, max_lon, max_lat = bbox
     
     # Build place type filter
     place_filter = "|".join(place_types)
     
-    # Query to get all places with names in South Sudan
-    # We'll query in chunks to avoid timeout
-    query = f"""
-    [out:json][timeout:300];
+    return f"""
+    [out:json][timeout:{timeout}];
     (
       node["place"~"^({place_filter})$"]["name"]({min_lat},{min_lon},{max_lat},{max_lon});
       way["place"~"^({place_filter})$"]["name"]({min_lat},{min_lon},{max_lat},{max_lon});
@@ -62,136 +50,92 @@ def scrape_osm_places(bbox: tuple, place_types: list, chunk_size: int = 1000):
     );
     out center;
     """
-    
-    try:
-        print("Querying Overpass API...")
-        response = requests.post(
-            OVERPASS_URL,
-            data=query,
-            headers={"Content-Type": "text/plain"},
-            timeout=600  # 10 minutes timeout
-        )
-        response.raise_for_status()
-        
-        data = response.json()
-        elements = data.get("elements", [])
-        
-        print(f"Found {len(elements)} places in OSM")
-        
-        for element in elements:
-            # Get coordinates
-            lon = None
-            lat = None
-            
-            if element["type"] == "node":
-                lon = element.get("lon")
-                lat = element.get("lat")
-            elif element["type"] in ["way", "relation"]:
-                center = element.get("center", {})
-                lon = center.get("lon")
-                lat = center.get("lat")
-            
-            if lon is None or lat is None:
-                continue
-            
-            # Get properties
-            tags = element.get("tags", {})
-            name = tags.get("name", "").strip()
-            
-            if not name:
-                continue
-            
-            place_type = tags.get("place", "")
-            
-            yield {
-                "name": name,
-                "lon": lon,
-                "lat": lat,
-                "place_type": place_type,
-                "osm_id": element["id"],
-                "osm_type": element["type"],
-                "properties": {
-                    "osm_id": element["id"],
-                    "osm_type": element["type"],
-                    "place_type": place_type,
-                    "admin_level": tags.get("admin_level"),
-                    "wikidata": tags.get("wikidata"),
-                    "wikipedia": tags.get("wikipedia"),
-                    "population": tags.get("population"),
-                    **{k: v for k, v in tags.items() if k not in ["name", "place"] and v}
-                }
-            }
-        
-        # Rate limiting
-        time.sleep(2)
-    
-    except requests.exceptions.RequestException as e:
-        print(f"Error querying Overpass API: {e}")
-        return
-    except Exception as e:
-        print(f"Error processing OSM results: {e}")
-        import traceback
-        traceback.print_exc()
-        return
 
 
-def scrape_all_locations(db_store: DuckDBStore, bbox: tuple = SOUTH_SUDAN_BBOX):
+def element_to_place(element: dict):
     """
-    Scrape all locations from OSM and store in database.
+    Convert an Overpass element into a place record.
     
     Args:
-        db_store: DuckDBStore instance
-        bbox: Bounding box for South Sudan
+        element: Overpass element (nodes with lon/lat, ways/relations with center)
+        
+    Returns:
+        Dict with place information, or None if it has no name or coordinates
     """
-    print("=" * 80)
-    print("Scraping all villages and locations in South Sudan from OpenStreetMap")
-    print("=" * 80)
+    # Get coordinates
+    lon = None
+    lat = None
     
-    # Get existing village count
-    existing_count = db_store.conn.execute("SELECT COUNT(*) FROM villages").fetchone()[0]
-    print(f"Existing villages in database: {existing_count}")
+    if element["type"] == "node":
+        lon = element.get("lon")
+        lat = element.get("lat")
+    elif element["type"] in ["way", "relation"]:
+        center = element.get("center", {})
+        lon = center.get("lon")
+        lat = center.get("lat")
     
-    # Scrape from OSM
-    print("\nScraping from OpenStreetMap...")
-    places = list(scrape_osm_places(bbox, PLACE_TYPES))
+    if lon is None or lat is None:
+        return None
     
-    if not places:
-        print("No places found to scrape")
-        return
+    # Get properties
+    tags = element.get("tags", {})
+    name = tags.get("name", "").strip()
     
-    print(f"\nProcessing {len(places)} places...")
+    if not name:
+        return None
     
-    # Process each place
-    added = 0
+    place_type = tags.get("place", "")
+    
+    return {
+        "name": name,
+        "lon": lon,
+        "lat": lat,
+        "place_type": place_type,
+        "osm_id": element["id"],
+        "osm_type": element["type"],
+        "properties": {
+            "osm_id": element["id"],
+            "osm_type": element["type"],
+            "place_type": place_type,
+            "admin_level": tags.get("admin_level"),
+            "wikidata": tags.get("wikidata"),
+            "wikipedia": tags.get("wikipedia"),
+            "population": tags.get("population"),
+            **{k: v for k, v in tags.items() if k not in ["name", "place"] and v}
+        }
+    }
+
+
+def store_places(db_store: DuckDBStore, places: list) -> dict:
+    """
+    Store scraped places as villages, skipping ones already in the database.
+    
+    Args:
+        db_store: DuckDBStore instance
+        places: Place records from element_to_place
+        
+    Returns:
+        Dict with added and skipped counts and a list of (name, error) tuples
+    """
     skipped = 0
-    updated = 0
     errors = []
+    village_records = []
+    alternate_records = []
     
-    # Use tqdm if available, otherwise simple iteration
-    if HAS_TQDM:
-        places_iter = tqdm(places, desc="Processing places")
-    else:
-        places_iter = places
-        print(f"Processing {len(places)} places...")
-    
-    for place in places_iter:
+    for place in places:
         try:
             name = place["name"]
             lon = place["lon"]
             lat = place["lat"]
             
-            # Check if village already exists (by coordinates with small tolerance)
+            # Check if village already exists (by coordinates with small tolerance).
+            # This also covers places repeated in neighbouring tiles.
             existing = db_store.get_village_by_coordinates(lon, lat, tolerance=0.0001)
             
             if existing:
                 # If exists but from different source, we could add as alternate source
                 # For now, skip if already exists to avoid duplicates
                 # Could enhance later to merge data sources
-                if existing.get("data_source") == "osm" and existing.get("source_id") == f"osm_{place['osm_type']}_{place['osm_id']}":
-                    # Same source, definitely skip
-                    skipped += 1
-                    continue
-                # Different source or no source_id match - could add, but skip for now to avoid duplicates
                 skipped += 1
                 continue
             
@@ -204,57 +148,115 @@ def scrape_all_locations(db_store: DuckDBStore, bbox: tuple = SOUTH_SUDAN_BBOX):
             properties["scraped_from"] = "osm"
             properties["scrape_timestamp"] = time.strftime("%Y-%m-%d %H:%M:%S")
             
-            # Add village to database
-            village_id = db_store.add_village(
-                name=name,
-                lon=lon,
-                lat=lat,
-                state=hierarchy.get("state"),
-                county=hierarchy.get("county"),
-                payam=hierarchy.get("payam"),
-                boma=hierarchy.get("boma"),
-                state_id=hierarchy.get("state_id"),
-                county_id=hierarchy.get("county_id"),
-                payam_id=hierarchy.get("payam_id"),
-                boma_id=hierarchy.get("boma_id"),
-                data_source="osm",
-                source_id=f"osm_{place['osm_type']}_{place['osm_id']}",
-                confidence_score=0.8,  # Medium confidence for scraped data
-                verified=False,
-                properties=properties
-            )
+            # Queue village for the bulk insert below
+            village_records.append({
+                "name": name,
+                "lon": lon,
+                "lat": lat,
+                "state": hierarchy.get("state"),
+                "county": hierarchy.get("county"),
+                "payam": hierarchy.get("payam"),
+                "boma": hierarchy.get("boma"),
+                "state_id": hierarchy.get("state_id"),
+                "county_id": hierarchy.get("county_id"),
+                "payam_id": hierarchy.get("payam_id"),
+                "boma_id": hierarchy.get("boma_id"),
+                "data_source": "osm",
+                "source_id": f"osm_{place['osm_type']}_{place['osm_id']}",
+                "confidence_score": 0.8,  # Medium confidence for scraped data
+                "verified": False,
+                "properties": properties
+            })
             
             # Add alternate names if available
             # OSM might have name:en, name:ar, etc.
             for key, value in place.get("properties", {}).items():
                 if key.startswith("name:") and value and value != name:
-                    try:
-                        db_store.add_alternate_name(
-                            village_id=village_id,
-                            alternate_name=str(value).strip(),
-                            name_type="translation",
-                            source="osm"
-                        )
-                    except Exception:
-                        pass  # Skip duplicates
-            
-            added += 1
+                    alternate_records.append({
+                        "village_index": len(village_records) - 1,
+                        "alternate_name": str(value).strip(),
+                        "name_type": "translation",
+                        "source": "osm"
+                    })
             
-            # Small delay to avoid overwhelming the database
-            if added % 100 == 0:
-                time.sleep(0.1)
-        
         except Exception as e:
             errors.append((place.get("name", "unknown"), str(e)))
             continue
     
+    # Write all new villages and their alternate names in one go
+    added = 0
+    if village_records:
+        village_ids = db_store.bulk_upsert_villages(pd.DataFrame(village_records))
+        added = len(village_ids)
+        if alternate_records:
+            alternates = pd.DataFrame(alternate_records)
+            alternates["village_id"] = [village_ids[i] for i in alternates["village_index"]]
+            db_store.bulk_add_alternate_names(alternates)
+    
+    return {"added": added, "skipped": skipped, "errors": errors}
+
+
+def scrape_all_locations(
+    db_store: DuckDBStore,
+    bbox: tuple = SOUTH_SUDAN_BBOX,
+    harvester: OverpassHarvester = None
+):
+    """
+    Scrape all locations from OSM and store in database.
+    
+    The bounding box is harvested tile by tile; each tile's places are
+    stored as soon as it finishes, so an interrupted scrape resumes with
+    the remaining tiles when run again.
+    
+    Args:
+        db_store: DuckDBStore instance
+        bbox: Bounding box for South Sudan
+        harvester: Configured OverpassHarvester (defaults to the public endpoint)
+    """
+    print("=" * 80)
+    print("Scraping all villages and locations in South Sudan from OpenStreetMap")
+    print("=" * 80)
+    
+    # Get existing village count
+    existing_count = db_store.conn.execute("SELECT COUNT(*) FROM villages").fetchone()[0]
+    print(f"Existing villages in database: {existing_count}")
+    
+    harvester = harvester or OverpassHarvester(db_store, overpass_url=OVERPASS_URL)
+    run_id = harvest_run_id("osm_places", PLACE_TYPES, bbox)
+    totals = {"added": 0, "skipped": 0, "errors": []}
+    
+    def handle_tile(tile, places):
+        result = store_places(db_store, places)
+        totals["added"] += result["added"]
+        totals["skipped"] += result["skipped"]
+        totals["errors"].extend(result["errors"])
+        print(f"  Tile {tile.key}: {len(places)} places, {result['added']} added")
+    
+    # Scrape from OSM
+    print("\nScraping from OpenStreetMap...")
+    summary = harvester.harvest(
+        run_id,
+        bbox,
+        lambda tile_bbox, timeout: build_places_query(tile_bbox, PLACE_TYPES, timeout),
+        handle_tile,
+        parse_element=element_to_place
+    )
+    
+    added = totals["added"]
+    skipped = totals["skipped"]
+    errors = totals["errors"]
+    
     print("\n" + "=" * 80)
     print("Scraping complete!")
     print("=" * 80)
+    print(f"  Tiles: {summary['done']} done, {summary['skipped']} already done, {summary['failed']} failed")
     print(f"  Added: {added}")
     print(f"  Skipped (duplicates): {skipped}")
     print(f"  Errors: {len(errors)}")
     
+    if summary["failed"]:
+        print("\nSome tiles failed; run the scrape again to retry them.")
+    
     if errors:
         print("\nFirst 10 errors:")
         for name, error in errors[:10]:
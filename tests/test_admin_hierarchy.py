@@ -0,0 +1,69 @@
+"""Tests for the materialized admin hierarchy behind the cascading dropdowns."""
+import os
+
+import pandas as pd
+
+from app.core import admin_hierarchy
+from app.core.admin_hierarchy import ensure_admin_hierarchy, get_children, get_hierarchy
+
+
+def test_hierarchy_from_polygons_and_csv(populated_db, sample_admin_data, tmp_path, monkeypatch):
+    """Polygons give parents by properties or containment; the CSV wins where it knows a parent."""
+    monkeypatch.setattr(admin_hierarchy, "ADMIN_HIERARCHY_CACHE_DIR", tmp_path / "cache")
+    county = sample_admin_data["county"].assign(STATE="Test State")
+    populated_db.ingest_geojson("admin2_county", county)
+    csv_path = tmp_path / "compiled.csv"
+    pd.DataFrame({
+        "admin1_state": ["Other State", "Other State"],
+        "admin2_county": ["Other County", "Other County"],
+        "admin3_payam": ["Test Payam", "Test Payam"],
+        "admin4_boma": [" Listed Boma ", None],
+    }).to_csv(csv_path, index=False)
+    
+    hierarchy = get_hierarchy(populated_db, csv_path)
+    
+    assert hierarchy["states"] == ["Other State"]
+    assert get_children(hierarchy, "county", "Test State") == ["Test County"]
+    assert get_children(hierarchy, "payam", "test county") == ["Test Payam"]
+    assert get_children(hierarchy, "boma", "Test Payam") == ["Listed Boma"]
+    assert get_children(hierarchy, "payam", "Unknown County") == ["Test Payam"]
+    
+    # Served from memory until a layer is re-ingested
+    assert get_hierarchy(populated_db, csv_path) is hierarchy
+    assert ensure_admin_hierarchy(populated_db, csv_path) is False
+    populated_db.ingest_geojson("admin4_boma", sample_admin_data["boma"].assign(name="New Boma"))
+    assert get_hierarchy(populated_db, csv_path) is not hierarchy
+
+
+def test_csv_parsed_once_and_cached_by_hash(tmp_path, monkeypatch):
+    """Accessors share one parse; the disk cache survives a restart and a touch."""
+    monkeypatch.setattr(admin_hierarchy, "ADMIN_HIERARCHY_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(admin_hierarchy, "_csv_cache", {})
+    parses = []
+    parse = admin_hierarchy._parse_hierarchy_csv
+    monkeypatch.setattr(admin_hierarchy, "_parse_hierarchy_csv", lambda path: parses.append(path) or parse(path))
+    csv_path = tmp_path / "compiled.csv"
+    pd.DataFrame({
+        "featureNam": ["A", "B", "C"],
+        "admin1_state": ["Jonglei", "Jonglei", "Unity"],
+        "admin2_county": ["Pibor", "Akobo", "Rubkona"],
+        "admin3_payam": ["Gumuruk", "Walgak", "Bentiu"],
+        "admin4_boma": ["Boma 1", "Boma 2", None],
+    }).to_csv(csv_path, index=False)
+    
+    assert admin_hierarchy.get_all_states(csv_path) == ["Jonglei", "Unity"]
+    assert admin_hierarchy.get_all_bomas(csv_path) == ["Boma 1", "Boma 2"]
+    hierarchy = admin_hierarchy.load_hierarchy_from_csv(csv_path)
+    assert hierarchy["state_to_counties"] == {"Jonglei": ["Akobo", "Pibor"], "Unity": ["Rubkona"]}
+    assert len(parses) == 1
+    
+    # New process: in-memory cache empty, file only touched
+    admin_hierarchy._csv_cache.clear()
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert admin_hierarchy.get_all_counties(csv_path) == ["Akobo", "Pibor", "Rubkona"]
+    assert len(parses) == 1
+    
+    csv_path.write_text("admin1_state,admin2_county,admin3_payam,admin4_boma\nLakes,Rumbek Centre,Rumbek,Boma 9\n")
+    assert admin_hierarchy.get_all_states(csv_path) == ["Lakes"]
+    assert len(parses) == 2
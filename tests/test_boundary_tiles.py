@@ -0,0 +1,59 @@
+"""Tests for the multi-resolution admin boundary cache."""
+import geopandas as gpd
+import shapely
+from shapely.geometry import Polygon, shape
+
+from app.core.boundary_tiles import _simplify, ensure_boundary_tiles, get_boundary_geojson, level_for_zoom
+
+
+def _wavy_halves():
+    """Two neighbouring polygons sharing a densely sampled wavy edge."""
+    edge = [(30.0 + i * 0.001, 5.0 + 0.0002 * (i % 2)) for i in range(1001)]
+    north = Polygon(edge + [(31.0, 6.0), (30.0, 6.0)])
+    south = Polygon(edge + [(31.0, 4.0), (30.0, 4.0)])
+    return gpd.GeoDataFrame({"name": ["North", "South"], "geometry": [north, south]}, crs="EPSG:4326")
+
+
+def test_levels_simplify_and_keep_shared_edges(temp_db):
+    """Low zoom gets far fewer vertices, and neighbours still meet without gaps or overlaps."""
+    temp_db.ingest_geojson("admin3_payam", _wavy_halves())
+    
+    assert [level_for_zoom(z) for z in (5, 8, 10, 14)] == ["low", "medium", "high", "full"]
+    
+    low = get_boundary_geojson(temp_db, "admin3_payam", 5)
+    full = get_boundary_geojson(temp_db, "admin3_payam", 14)
+    low_geoms = [shape(feature["geometry"]) for feature in low["features"]]
+    full_geoms = [shape(feature["geometry"]) for feature in full["features"]]
+    
+    assert shapely.get_num_coordinates(low_geoms).sum() < shapely.get_num_coordinates(full_geoms).sum() / 10
+    assert shapely.coverage_is_valid(low_geoms)
+    assert abs(shapely.union_all(low_geoms).area - 2.0) < 1e-6
+    
+    north = get_boundary_geojson(temp_db, "admin3_payam", 10, names=["North"])
+    assert [feature["properties"]["name"] for feature in north["features"]] == ["North"]
+    assert get_boundary_geojson(temp_db, "admin3_payam", 10, bbox=(32.0, 4.0, 33.0, 5.0)) is None
+
+
+def test_tiles_rebuild_only_when_layer_changes(temp_db, sample_admin_data):
+    """Tiles are built once per layer version and rebuilt after a re-ingest."""
+    temp_db.ingest_geojson("admin4_boma", sample_admin_data["boma"])
+    
+    assert ensure_boundary_tiles(temp_db, "admin4_boma") is True
+    assert ensure_boundary_tiles(temp_db, "admin4_boma") is False
+    
+    temp_db.ingest_geojson("admin4_boma", _wavy_halves())
+    
+    assert ensure_boundary_tiles(temp_db, "admin4_boma") is True
+    names = {f["properties"]["name"] for f in get_boundary_geojson(temp_db, "admin4_boma", 10)["features"]}
+    assert names == {"North", "South"}
+
+
+def test_simplify_without_coverage_support(monkeypatch):
+    """Shapely releases without coverage functions fall back to per-polygon simplification."""
+    monkeypatch.delattr(shapely, "coverage_simplify")
+    monkeypatch.delattr(shapely, "coverage_is_valid")
+    geometries = _wavy_halves().geometry.to_numpy()
+    
+    simplified = _simplify(geometries, 0.01)
+    assert all(shapely.is_valid(simplified))
+    assert shapely.get_num_coordinates(simplified).sum() < shapely.get_num_coordinates(geometries).sum()
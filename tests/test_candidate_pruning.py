@@ -0,0 +1,63 @@
+"""Tests for candidate pruning before fuzzy search."""
+from app.core.candidate_pruning import CandidatePruner
+from app.core.normalization import extract_candidates
+
+
+def test_prune_free_text():
+    """Only n-grams built from gazetteer-like words survive."""
+    pruner = CandidatePruner(["malek", "bor", "kuernyang", "bahr el ghazal"])
+    candidates = extract_candidates("Fighting was reported yesterday near Maleek village in Bor County")
+    
+    kept = pruner.prune(candidates)
+    
+    assert {"maleek", "bor", "maleek village", "bor county"} <= kept
+    assert "yesterday" not in kept
+    assert "county" not in kept
+    assert "near maleek village in bor" not in kept
+    assert len(kept) < len(candidates) / 4
+
+
+def test_prune_keeps_stopwords_inside_names():
+    """Stopwords inside a name are allowed, but not at its edges."""
+    pruner = CandidatePruner(["bahr el ghazal", "kuernyang"])
+    
+    assert pruner.is_plausible("bahr el ghazal")
+    assert pruner.is_plausible("kuernyan")
+    assert not pruner.is_plausible("of kuernyang")
+    assert not pruner.is_plausible("zzzqx")
+
+
+def test_geocoder_reports_pruned_candidates(geocoder):
+    """Geocoding records how many candidates were extracted and scored."""
+    from app.utils.metrics import get_registry
+    
+    registry = get_registry()
+    extracted = registry.counter("geocode_candidates_total", stage="extracted")
+    scored = registry.counter("geocode_candidates_total", stage="scored")
+    before = (extracted.value, scored.value)
+    
+    result = geocoder.geocode("Test Village reported yesterday afternoon", use_cache=False)
+    
+    assert result.village == "Test Village"
+    assert extracted.value - before[0] > scored.value - before[1] > 0
+
+
+def test_prune_keeps_first_letter_typos():
+    """Misspellings of a name's first letters are still scored."""
+    pruner = CandidatePruner(["kuajok", "bentiu"])
+    
+    for word in ("kwajok", "cuajok", "gwajok", "bintiu"):
+        assert pruner.is_plausible(word), word
+
+
+def test_geocoder_resolves_first_letter_typos(populated_db):
+    """Pruning does not hide villages the fuzzy search would match."""
+    from app.core.geocoder import Geocoder
+    
+    populated_db.add_village("Kuajok", 31.0, 5.0)
+    populated_db.add_village("Bentiu", 30.9, 4.9)
+    populated_db.build_name_index(incremental=True)
+    geocoder = Geocoder(populated_db)
+    
+    for query, village in (("Kwajok", "Kuajok"), ("Cuajok", "Kuajok"), ("Gwajok", "Kuajok"), ("Bintiu", "Bentiu")):
+        assert geocoder.geocode(query, use_cache=False).village == village, query
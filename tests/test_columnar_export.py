@@ -0,0 +1,111 @@
+"""Tests for the streaming Parquet/GeoParquet/Arrow export."""
+import json
+from datetime import datetime
+
+import duckdb
+import pandas as pd
+import pytest
+import pyarrow.parquet as pq
+import shapely
+
+from app.core.columnar_export import (
+    GeocodeResultBatch,
+    export_excel,
+    iter_batches,
+    write_geocode_results,
+    write_hrd_incidents,
+)
+from app.core.hrd_incident_extractor import HRDIncident
+from app.core.hrd_matrix_generator import HRDMatrixGenerator
+from app.core.models import ExtractedLocation, GeocodeResult
+
+
+def _results(n):
+    for i in range(n):
+        located = i % 2 == 0
+        yield GeocodeResult(
+            input_text=f"Village {i}",
+            normalized_text=f"village {i}",
+            matched_name=f"Village {i}" if located else None,
+            score=0.9 if located else 0.0,
+            lon=31.0 + i if located else None,
+            lat=7.0 if located else None,
+            state="Jonglei" if located else None,
+            alternatives=[{"name": "Other", "score": 0.5}] if i == 0 else None,
+        )
+
+
+def test_geocode_results_stream_to_geoparquet(tmp_path):
+    """Row groups are bounded, points are GeoParquet WKB, and DuckDB queries the file in place."""
+    path = tmp_path / "results.parquet"
+    assert write_geocode_results(_results(5), path, row_group_size=2) == 5
+    
+    parquet_file = pq.ParquetFile(path)
+    assert parquet_file.num_row_groups == 3
+    geo = json.loads(parquet_file.schema_arrow.metadata[b"geo"])
+    assert geo["primary_column"] == "geometry"
+    
+    table = pq.read_table(path)
+    points = shapely.from_wkb(table["geometry"].to_pylist())
+    assert shapely.get_x(points[0]) == 31.0 and points[1] is None
+    assert json.loads(table["alternatives"][0].as_py()) == [{"name": "Other", "score": 0.5}]
+    
+    located = duckdb.sql(f"SELECT COUNT(*) FROM '{path}' WHERE state = 'Jonglei'").fetchone()[0]
+    assert located == 3
+    
+    arrow_path = tmp_path / "results.arrow"
+    write_geocode_results(_results(3), arrow_path, row_group_size=2)
+    assert [batch.num_rows for batch in iter_batches(arrow_path)] == [2, 1]
+
+
+def test_matrix_excel_is_a_view_of_the_parquet(tmp_path):
+    """The .xlsx matrix is exported from the Parquet copy written next to it."""
+    incident = HRDIncident()
+    incident.date_of_incident = datetime(2025, 11, 3)
+    incident.reporting_field_office = "Bentiu"
+    incident.alleged_perpetrators = ["SSPDF", "SPLA-IO"]
+    incident.total_victims = 2
+    incident.lon, incident.lat = 29.8, 9.3
+    
+    matrix_path = tmp_path / "matrix.xlsx"
+    HRDMatrixGenerator().generate_matrix(
+        [incident, HRDIncident()], datetime(2025, 11, 3), datetime(2025, 11, 9), str(matrix_path), 7
+    )
+    
+    matrix = pd.read_excel(matrix_path)
+    columnar = pd.read_parquet(matrix_path.with_suffix(".parquet"))
+    assert list(matrix.columns) == list(columnar.columns) == HRDMatrixGenerator().column_order
+    assert matrix["Incident Code"].tolist() == [7.0, 8.0]
+    assert matrix["Month of interview/report"].tolist() == ["November", "November"]
+    assert matrix["Date of Incident"][0] == pd.Timestamp(2025, 11, 3)
+    assert matrix["Alleged Perpetrator(s)"][0] == "['SSPDF', 'SPLA-IO']"
+    
+    incidents_path = tmp_path / "incidents.parquet"
+    assert write_hrd_incidents([incident], incidents_path) == 1
+    export_excel(incidents_path, tmp_path / "incidents.xlsx")
+    assert "geometry" not in pd.read_excel(tmp_path / "incidents.xlsx").columns
+
+
+def test_result_batch_is_columnar_and_round_trips(tmp_path):
+    """Batches hold Arrow chunks, convert to pandas without copying and rebuild the same results."""
+    results = list(_results(5))
+    batch = GeocodeResultBatch.from_results(results, chunk_size=2)
+    
+    assert len(batch) == 5
+    table = batch.to_arrow()
+    assert table["lon"].num_chunks == 3
+    
+    frame = batch.to_pandas()
+    assert isinstance(frame["lon"].dtype, pd.ArrowDtype)
+    assert frame["state"].tolist()[:2] == ["Jonglei", pd.NA]
+    assert batch.to_records() == [result.to_dict() for result in results]
+    assert list(batch) == results
+    
+    path = tmp_path / "batch.parquet"
+    assert write_geocode_results(batch, path) == 5
+    assert pq.ParquetFile(path).num_row_groups == 3
+    
+    with pytest.raises(AttributeError):
+        results[0].extra = 1
+    with pytest.raises(AttributeError):
+        ExtractedLocation("Bor", "in Bor", "regex", 3, 6).extra = 1
@@ -0,0 +1,64 @@
+"""Tests for the tail log reader and the incremental error log store."""
+import json
+
+from app.core.error_log_store import ErrorLogStore
+from app.utils.log_reader import iter_lines_reverse, tail_records
+
+
+def _write(path, records, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def _record(i, level="ERROR", module="geocoder"):
+    return {
+        "timestamp": f"2025-11-03T10:00:{i:02d}",
+        "level": level,
+        "message": f"event {i}",
+        "error_type": "ValueError" if level != "INFO" else None,
+        "module": module,
+    }
+
+
+def test_tail_records_reads_backwards_across_rotated_files(tmp_path):
+    """Newest records come first, spanning block boundaries and backups."""
+    log_file = tmp_path / "app.log"
+    _write(log_file.with_name("app.log.1"), [_record(i) for i in range(5)])
+    _write(log_file, [_record(i, level="INFO") if i % 2 else _record(i) for i in range(5, 15)])
+    
+    lines = list(iter_lines_reverse(log_file, block_size=16))
+    assert [json.loads(line)["message"] for line in lines] == [f"event {i}" for i in range(14, 4, -1)]
+    
+    records = tail_records(log_file, limit=8, levels=["ERROR"])
+    assert [record["message"] for record in records] == [f"event {i}" for i in (14, 12, 10, 8, 6, 4, 3, 2)]
+
+
+def test_store_ingests_incrementally_and_follows_rotation(tmp_path):
+    """Only appended lines are parsed; a rotated file keeps its offset."""
+    log_file = tmp_path / "app.log"
+    store = ErrorLogStore(tmp_path / "errors.duckdb")
+    _write(log_file, [_record(0), _record(1, level="INFO"), _record(2, level="CRITICAL", module="hrd")])
+    
+    assert store.ingest(log_file) == 2
+    assert store.ingest(log_file) == 0
+    
+    log_file.rename(log_file.with_name("app.log.1"))
+    _write(log_file, [_record(3), _record(4, module="hrd")])
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write('{"level": "ERROR", "message": "half wri')
+    
+    assert store.ingest(log_file) == 2
+    assert store.count_errors() == 4
+    assert store.count_errors(module="hrd") == 2
+    assert store.count_errors(level="CRITICAL", module="hrd") == 1
+    assert [record["message"] for record in store.query_errors(limit=2, offset=1)] == ["event 3", "event 2"]
+    
+    stats = store.statistics()
+    assert stats["total_errors"] == 4
+    assert stats["by_level"] == {"ERROR": 3, "CRITICAL": 1}
+    
+    log_file.with_name("app.log.1").unlink()
+    store.ingest(log_file)
+    assert store.count_errors() == 2
+    store.close()
@@ -58,3 +58,16 @@ def test_geocode_cache(geocoder):
     assert result1.lon == result2.lon
     assert result1.lat == result2.lat
 
+
+def test_alternatives_computed_on_demand(geocoder):
+    """Alternatives are only computed when asked for and carry centroids."""
+    result = geocoder.geocode("Test Village", use_cache=False)
+    assert result.alternatives == []
+    
+    alternatives = geocoder.get_alternatives(result)
+    
+    assert alternatives is result.alternatives
+    assert alternatives[0]["feature_id"] == result.feature_id
+    assert alternatives[0]["lon"] == result.lon
+    assert alternatives[0]["lat"] == result.lat
+    assert geocoder.geocode("Test Village", use_cache=False, include_alternatives=True).alternatives == alternatives
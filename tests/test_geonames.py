@@ -0,0 +1,42 @@
+"""Tests for the GeoNames gazetteer provider."""
+import pandas as pd
+
+from app.gazetteers.geonames import GeoNamesProvider
+
+
+ROWS = [
+    ["370737", "Bentiu", "Bentiu", "Bantiu,Bentio", "9.2333", "29.8", "P", "PPLA", "SS", "", "01", "", "", "", "7653", "", "415", "Africa/Juba", "2020-01-01"],
+    ["373303", "Bahr el Ghazal", "Bahr el Ghazal", "Bahr al-Ghazal", "9.5", "30.0", "H", "STM", "SS", "", "", "", "", "", "0", "", "400", "Africa/Juba", "2020-01-01"],
+    ["375000", "Bentiu", "Bentiu", "", "15.0", "32.5", "P", "PPL", "SD", "", "", "", "", "", "0", "", "380", "Africa/Khartoum", "2020-01-01"],
+]
+
+
+def _write_tsv(path):
+    path.write_text("\n".join("\t".join(row) for row in ROWS) + "\n", encoding="utf-8")
+    return path
+
+
+def test_fetch_features_by_alias_and_prefix(tmp_path):
+    """Queries match names, aliases and token prefixes within the country only."""
+    provider = GeoNamesProvider(_write_tsv(tmp_path / "SS.txt"), cache_dir=tmp_path / "cache")
+    
+    assert len(provider.gdf) == 2
+    assert provider.fetch_features("bantiu")["geonameid"].tolist() == [370737]
+    assert provider.fetch_features("Bent")["name"].tolist() == ["Bentiu"]
+    assert provider.fetch_features("al-ghaz")["name"].tolist() == ["Bahr el Ghazal"]
+    assert provider.fetch_features("el ghazal", bbox=(29, 9, 31, 10))["name"].tolist() == ["Bahr el Ghazal"]
+    assert provider.fetch_features("juba").empty
+
+
+def test_reload_uses_parquet_cache(tmp_path, monkeypatch):
+    """A second load reads the Parquet cache instead of parsing the TSV."""
+    data_path = _write_tsv(tmp_path / "allCountries.txt")
+    GeoNamesProvider(data_path, cache_dir=tmp_path / "cache")
+    
+    def fail(*args, **kwargs):
+        raise AssertionError("TSV parsed again")
+    monkeypatch.setattr(pd, "read_csv", fail)
+    provider = GeoNamesProvider(data_path, cache_dir=tmp_path / "cache")
+    
+    assert len(provider.gdf) == 2
+    assert provider.fetch_features("bentio")["name"].tolist() == ["Bentiu"]
@@ -0,0 +1,78 @@
+"""Tests for the incident stores written with compiled HRD reports."""
+import os
+from datetime import datetime
+
+import pandas as pd
+from docx import Document
+
+from app.core import hrd_incident_extractor
+from app.core.hrd_incident_extractor import HRDIncident
+from app.core.hrd_incident_store import incident_store_path, read_incident_store
+from app.core.hrd_matrix_generator import HRDMatrixGenerator
+from app.core.hrd_report_compiler import HRDReportCompiler
+
+
+class StubExtractor:
+    """Returns one incident per daily and counts calls."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def extract_incidents_from_text(self, text, field_office=None):
+        self.calls += 1
+        incident = HRDIncident()
+        incident.date_of_incident = datetime(2025, 11, 3)
+        incident.reporting_field_office = field_office
+        incident.incident_state = "Unity"
+        incident.location_of_incident = "Rubkona"
+        incident.types_of_violations = "Killed"
+        incident.total_victims = 2
+        incident.description = text.strip()
+        return [incident]
+
+
+def test_matrix_reads_incident_store_without_llm(tmp_path, monkeypatch):
+    """Compiling writes the store; the matrix uses it instead of re-extracting."""
+    daily_path = tmp_path / "Bentiu daily.docx"
+    daily = Document()
+    daily.add_paragraph("Two civilians were killed in Rubkona by unidentified armed men.")
+    daily.save(daily_path)
+    
+    extractor = StubExtractor()
+    report_path = tmp_path / "HRD Daily Report_03 November 2025.docx"
+    HRDReportCompiler(extractor).compile_daily_report(
+        datetime(2025, 11, 3), [{"file_path": str(daily_path), "field_office": "Bentiu"}], str(report_path)
+    )
+    
+    stored = read_incident_store(report_path)
+    assert incident_store_path(report_path).exists()
+    assert stored[0].reporting_field_office == "Bentiu"
+    assert stored[0].date_of_incident == datetime(2025, 11, 3)
+    
+    def no_llm(*args, **kwargs):
+        raise AssertionError("incidents were re-extracted")
+    monkeypatch.setattr(hrd_incident_extractor, "HRDIncidentExtractor", no_llm)
+    
+    matrix_path = tmp_path / "matrix.xlsx"
+    HRDMatrixGenerator().generate_from_compiled_reports(
+        [str(report_path)], datetime(2025, 11, 3), datetime(2025, 11, 9), str(matrix_path)
+    )
+    
+    matrix = pd.read_excel(matrix_path)
+    assert extractor.calls == 1
+    assert matrix["Reporting Field Office"].tolist() == ["Bentiu"]
+    assert matrix["Total Victims"].tolist() == [2]
+
+
+def test_missing_or_outdated_store_is_ignored(tmp_path):
+    """Reports without a store, or edited after it was written, fall back to extraction."""
+    report_path = tmp_path / "report.docx"
+    Document().save(report_path)
+    assert read_incident_store(report_path) is None
+    
+    incident_store_path(report_path).write_text("", encoding="utf-8")
+    assert read_incident_store(report_path) == []
+    
+    stat = incident_store_path(report_path).stat()
+    os.utime(report_path, (stat.st_atime, stat.st_mtime + 10))
+    assert read_incident_store(report_path) is None
@@ -0,0 +1,135 @@
+"""Tests for map-reduce incident extraction over long HRD reports."""
+import re
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.core.hrd_incident_extractor import HRDIncident, HRDIncidentExtractor
+from app.core.hrd_map_reduce import estimate_tokens, merge_incidents, split_report
+
+
+TOWNS = ["Rubkona", "Leer", "Mayom", "Koch", "Panyijiar", "Guit"]
+FILLER = " Sources added that the attackers fled towards the swamps and no arrests were made." * 6
+INCIDENT = re.compile(r"On (\d+) November 2025, (\d+) civilians were killed in (\w+)")
+
+
+def _report() -> str:
+    lines = [
+        "United Nations Mission in South Sudan (UNMISS)",
+        "Bentiu Field Office Daily Report",
+        "Highlights: On 3 November 2025, 2 civilians were killed in Rubkona.",
+        "Conflict-Related Violations/Abuses",
+    ]
+    for day, town in enumerate(TOWNS, start=3):
+        lines.append(f"Civilians killed in {town}")
+        lines.append(f"On {day} November 2025, 2 civilians were killed in {town} by armed youth.{FILLER}")
+        lines.append("Comment: HRD will continue to monitor the situation.")
+    return "\n".join(lines)
+
+
+class StubGeocoder:
+    """Records the threads it is called from."""
+    
+    def __init__(self):
+        self.threads = set()
+    
+    def geocode(self, location, use_cache=True):
+        self.threads.add(threading.current_thread())
+        return SimpleNamespace(lat=9.2, lon=29.8, payam=None, county="Rubkona")
+
+
+def test_split_report_keeps_incidents_whole():
+    """Chunks respect the size limit, never cut an incident, and carry the report header."""
+    report = _report()
+    chunks = split_report(report, 1200)
+    
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 1200 for chunk in chunks)
+    for town in TOWNS:
+        holding = [chunk for chunk in chunks if f"killed in {town} by" in chunk]
+        assert len(holding) == 1
+        assert f"Civilians killed in {town}\nOn " in holding[0]
+    assert all(chunk.startswith("United Nations Mission") for chunk in chunks)
+    assert split_report("Short report.", 1200) == ["Short report."]
+
+
+def test_merge_incidents_fills_fields_and_keeps_longest_description():
+    """Incidents with the same date, location and victims collapse into one."""
+    brief, full = HRDIncident(), HRDIncident()
+    for incident in (brief, full):
+        incident.date_of_incident = datetime(2025, 11, 3, 8)
+        incident.location_of_incident = "Rubkona"
+        incident.total_victims = 2
+    brief.description = "Two killed."
+    brief.alleged_perpetrators = "Armed youth"
+    full.location_of_incident = "rubkona "
+    full.description = "Two civilians were killed in Rubkona by armed youth."
+    full.incident_state = "Unity"
+    other = HRDIncident()
+    other.location_of_incident = "Leer"
+    
+    merged = merge_incidents([brief, full, other])
+    
+    assert merged == [brief, other]
+    assert brief.description == full.description
+    assert (brief.incident_state, brief.alleged_perpetrators) == ("Unity", "Armed youth")
+
+
+def test_merge_incidents_keeps_undated_unlocated_incidents_apart():
+    """Incidents with nothing to match on are never merged."""
+    looting, abduction, undated = HRDIncident(), HRDIncident(), HRDIncident()
+    looting.description = "Soldiers looted cattle"
+    abduction.description = "Woman abducted near river"
+    undated.location_of_incident = "Rubkona"
+    undated.description = "Two killed."
+    dated = HRDIncident()
+    dated.date_of_incident = datetime(2025, 11, 3)
+    dated.location_of_incident = "Rubkona"
+    
+    assert merge_incidents([looting, abduction, undated, dated]) == [looting, abduction, undated, dated]
+
+
+def test_map_reduce_extracts_whole_report_within_budget(monkeypatch):
+    """Every chunk is extracted concurrently under the token budget and duplicates are merged."""
+    geocoder = StubGeocoder()
+    extractor = HRDIncidentExtractor(
+        ollama_extractor=SimpleNamespace(enabled=True),
+        azure_parser=SimpleNamespace(enabled=False),
+        geocoder=geocoder,
+        chunk_tokens=300,
+        token_budget=2 * estimate_tokens("x" * 1200),
+        max_workers=4
+    )
+    lock = threading.Lock()
+    in_flight = {"tokens": 0, "peak": 0, "calls": 0}
+    
+    def fake_ollama(text, field_office, max_chars=2000, geocode=True):
+        assert not geocode and len(text) <= max_chars
+        with lock:
+            in_flight["tokens"] += estimate_tokens(text)
+            in_flight["peak"] = max(in_flight["peak"], in_flight["tokens"])
+            in_flight["calls"] += 1
+        time.sleep(0.05)
+        incidents = []
+        for line in text.splitlines():
+            for day, victims, town in INCIDENT.findall(line):
+                incident = HRDIncident()
+                incident.date_of_incident = datetime(2025, 11, int(day))
+                incident.location_of_incident = town
+                incident.total_victims = int(victims)
+                incident.description = line
+                incidents.append(incident)
+        with lock:
+            in_flight["tokens"] -= estimate_tokens(text)
+        return incidents
+    monkeypatch.setattr(extractor, "_extract_with_ollama", fake_ollama)
+    
+    incidents = extractor.extract_incidents_from_text(_report(), "Bentiu")
+    
+    assert [incident.location_of_incident for incident in incidents] == TOWNS
+    assert incidents[0].description.endswith(FILLER)
+    assert all(incident.lat == 9.2 for incident in incidents)
+    assert geocoder.threads == {threading.main_thread()}
+    assert in_flight["calls"] > 2
+    assert in_flight["peak"] <= extractor.token_budget.capacity
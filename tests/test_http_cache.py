@@ -0,0 +1,97 @@
+"""Tests for the scrapers' on-disk HTTP cache."""
+import json
+
+import pytest
+import requests
+
+from app.core.scrapers.http_cache import CacheMiss, HTTPCache
+from app.core.scrapers.osm_scraper import OSMScraper
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.content = json.dumps(payload).encode("utf-8")
+        self.status_code = status_code
+        self.headers = {"Content-Type": "application/json"}
+
+
+@pytest.fixture
+def overpass_calls(monkeypatch):
+    """Record network requests and answer with one village node."""
+    calls = []
+    
+    def fake_request(method, url, **kwargs):
+        calls.append(kwargs.get("data"))
+        return FakeResponse({"elements": [
+            {"type": "node", "id": 42, "lon": 29.8, "lat": 9.23, "tags": {"name": "Bentiu", "place": "town"}}
+        ]})
+    monkeypatch.setattr(requests, "request", fake_request)
+    return calls
+
+
+def test_identical_queries_hit_the_cache(tmp_path, overpass_calls):
+    """A repeated search is served from disk, across scraper instances."""
+    cache = HTTPCache(tmp_path / "http.sqlite", mode="normal")
+    
+    first = OSMScraper(http_cache=cache).search_village("Bentiu")
+    second = OSMScraper(http_cache=cache).search_village("Bentiu")
+    OSMScraper(http_cache=cache).search_village("Rubkona")
+    
+    assert first == second
+    assert first[0]["lon"] == 29.8
+    assert len(overpass_calls) == 2
+    assert cache.stats()["entries"] == 2
+
+
+def test_offline_mode_replays_and_never_fetches(tmp_path, overpass_calls):
+    """Offline mode replays expired entries and turns misses into CacheMiss."""
+    path = tmp_path / "http.sqlite"
+    HTTPCache(path, mode="normal").request("POST", "http://overpass.test/api", data="query")
+    
+    offline = HTTPCache(path, ttl=0, mode="offline")
+    assert offline.request("POST", "http://overpass.test/api", data="query").from_cache
+    with pytest.raises(CacheMiss):
+        offline.request("POST", "http://overpass.test/api", data="other query")
+    assert OSMScraper(http_cache=offline).search_village("Bentiu") == []
+    assert len(overpass_calls) == 1
+
+
+def test_size_bound_evicts_least_recently_used(tmp_path, overpass_calls):
+    """Entries beyond max_bytes are evicted oldest-access first."""
+    cache = HTTPCache(tmp_path / "http.sqlite", max_bytes=250, mode="normal")
+    for query in ["a", "b"]:
+        cache.request("POST", "http://overpass.test/api", data=query)
+    cache.request("POST", "http://overpass.test/api", data="a")
+    cache.request("POST", "http://overpass.test/api", data="c")
+    
+    assert cache.stats()["entries"] == 2
+    assert cache.request("POST", "http://overpass.test/api", data="a").from_cache
+    assert not cache.request("POST", "http://overpass.test/api", data="b").from_cache
+
+
+def test_expired_entries_are_revalidated(tmp_path, monkeypatch):
+    """An expired entry with an ETag is re-fetched conditionally and renewed on 304."""
+    sent = []
+    
+    def fake_request(method, url, **kwargs):
+        sent.append(kwargs.get("headers") or {})
+        if sent[-1].get("If-None-Match") == '"v1"':
+            response = FakeResponse({}, status_code=304)
+            response.content = b""
+        else:
+            response = FakeResponse({"elements": []})
+        response.headers["ETag"] = '"v1"'
+        return response
+    monkeypatch.setattr(requests, "request", fake_request)
+    
+    cache = HTTPCache(tmp_path / "http.sqlite", ttl=3600, mode="normal")
+    first = cache.request("POST", "http://overpass.test/api", data="query")
+    cache._conn.execute("UPDATE responses SET created_at = created_at - 7200")
+    
+    revalidated = cache.request("POST", "http://overpass.test/api", data="query")
+    assert sent[1] == {"If-None-Match": '"v1"'}
+    assert revalidated.from_cache and revalidated.status_code == 200
+    assert revalidated.json() == first.json() == {"elements": []}
+    
+    assert cache.request("POST", "http://overpass.test/api", data="query").from_cache
+    assert len(sent) == 2
@@ -0,0 +1,51 @@
+"""Tests for columnar feature ingest."""
+import json
+import geopandas as gpd
+from shapely.geometry import Point, LineString, Polygon
+
+
+def test_ingest_geojson_columns(temp_db):
+    """Polygon layers get WKB, GeoJSON, properties and a projected centroid."""
+    gdf = gpd.GeoDataFrame(
+        [{"feature_id": "S1", "name": "Test State", "code": 7,
+          "geometry": Polygon([(30.0, 4.0), (32.0, 4.0), (32.0, 6.0), (30.0, 6.0)])}],
+        crs="EPSG:4326"
+    )
+    temp_db.ingest_geojson("admin1_state", gdf)
+    
+    feature = temp_db.get_feature("admin1_state", "S1")
+    assert feature["name"] == "Test State"
+    assert abs(feature["centroid_lon"] - 31.0) < 0.01
+    assert abs(feature["centroid_lat"] - 5.0) < 0.01
+    assert temp_db.get_geometry("admin1_state", "S1").equals(gdf.geometry.iloc[0])
+    
+    geojson, properties = temp_db.conn.execute(
+        "SELECT geometry_geojson, properties FROM admin1_state"
+    ).fetchone()
+    assert json.loads(geojson)["geometry"]["type"] == "Polygon"
+    assert json.loads(properties) == {"feature_id": "S1", "name": "Test State", "code": "7"}
+
+
+def test_ingest_osm_upserts_duplicates(temp_db):
+    """Re-ingesting OSM features updates rows in place, last duplicate wins."""
+    roads = gpd.GeoDataFrame(
+        [{"osm_id": 5, "highway": "primary", "geometry": LineString([(30.0, 5.0), (31.0, 6.0)])}],
+        crs="EPSG:4326"
+    )
+    temp_db.ingest_osm_roads(roads)
+    temp_db.ingest_osm_roads(roads.assign(highway="secondary"))
+    
+    assert temp_db.conn.execute("SELECT feature_id, highway FROM osm_roads").fetchall() == [("way_5", "secondary")]
+    
+    pois = gpd.GeoDataFrame(
+        [
+            {"osm_id": 1, "osm_type": "node", "name": "Old", "category": "school", "geometry": Point(30.0, 5.0)},
+            {"osm_id": 1, "osm_type": "node", "name": "New", "category": "school", "geometry": Point(30.5, 5.5)},
+        ],
+        crs="EPSG:4326"
+    )
+    temp_db.ingest_osm_pois(pois)
+    
+    assert temp_db.conn.execute("SELECT feature_id, name, lon, lat FROM osm_pois").fetchall() == [
+        ("node_1", "New", 30.5, 5.5)
+    ]
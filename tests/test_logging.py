@@ -0,0 +1,116 @@
+"""Tests for structured logging."""
+import json
+import logging
+import queue
+import pytest
+from app.utils import logging as app_logging
+from app.utils.logging import log_structured, set_log_rate_limit, set_log_sampling
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+    
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+@pytest.fixture
+def captured():
+    """Attach a capturing handler to the root logger."""
+    logger = logging.getLogger()
+    handler = _ListHandler()
+    old_level = logger.level
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield handler.records
+    logger.removeHandler(handler)
+    logger.setLevel(old_level)
+
+
+def test_log_structured_caller_metadata(captured):
+    """Module and function default to the caller."""
+    log_structured("info", "hello", count=3, empty=None)
+    
+    entry = captured[-1]
+    assert entry["message"] == "hello"
+    assert entry["level"] == "INFO"
+    assert entry["count"] == 3
+    assert "empty" not in entry
+    assert entry["module"] == __name__
+    assert entry["function"] == "test_log_structured_caller_metadata"
+    assert "timestamp" in entry
+
+
+def test_log_structured_skips_disabled_level(captured):
+    """Records below the logger level are dropped before serialization."""
+    log_structured("debug", "not shown")
+    assert captured == []
+
+
+def test_rate_limit_reports_suppressed(captured):
+    """Rate-limited records are counted on the next emitted record."""
+    set_log_rate_limit("burst", max_records=2, per_seconds=3600)
+    try:
+        for _ in range(5):
+            log_structured("info", "burst")
+        assert len(captured) == 2
+        
+        # Open a new window and check the suppressed count is reported
+        app_logging._rate_state["burst"][0] -= 3600
+        log_structured("info", "burst")
+        assert captured[-1]["suppressed"] == 3
+    finally:
+        set_log_rate_limit("burst", 0)
+
+
+def test_sampling_by_log_key(captured):
+    """A zero sample rate drops every record for the key."""
+    set_log_sampling("sampled", 0.0)
+    try:
+        log_structured("info", "varying text 1", log_key="sampled")
+        log_structured("info", "varying text 2", log_key="sampled")
+        assert captured == []
+    finally:
+        set_log_sampling("sampled", 1.0)
+
+
+def test_queued_records_snapshot_caller_values():
+    """Values mutated after logging do not change the queued record."""
+    log_queue = queue.SimpleQueue()
+    logger = logging.getLogger("test_logging.queued")
+    handler = app_logging._DeferredQueueHandler(log_queue)
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    try:
+        ids = [1, 2]
+        logger.info(app_logging._LazyJSON({"message": "batch", "ids": ids}, 0.0))
+        args = {"name": "Kuajok"}
+        logger.info("looked up %(name)s", args)
+        ids.append(3)
+        args["name"] = "Wau"
+    finally:
+        logger.removeHandler(handler)
+        logger.propagate = True
+    
+    assert json.loads(log_queue.get().getMessage())["ids"] == [1, 2]
+    assert log_queue.get().getMessage() == "looked up Kuajok"
+
+
+def test_setup_logging_closes_previous_listener_handlers(tmp_path):
+    """Reconfiguring logging closes the file handler of the previous listener."""
+    logger = logging.getLogger()
+    old_handlers, old_level = list(logger.handlers), logger.level
+    try:
+        app_logging.setup_logging(log_file=tmp_path / "app.log")
+        first = [h for h in app_logging._listener.handlers if isinstance(h, logging.FileHandler)][0]
+        assert first.stream is not None
+        
+        app_logging.setup_logging(log_file=tmp_path / "app.log")
+        assert first.stream is None
+    finally:
+        app_logging.shutdown_logging()
+        logger.handlers[:] = old_handlers
+        logger.setLevel(old_level)
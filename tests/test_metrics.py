@@ -0,0 +1,42 @@
+"""Tests for the metrics registry."""
+import pytest
+from app.utils.metrics import Histogram, MetricsRegistry, _bucket_index, _bucket_bounds
+
+
+def test_bucket_roundtrip():
+    """Every value falls inside the bounds of its bucket."""
+    for value in [0, 1, 15, 16, 17, 31, 32, 1000, 123456789, 2**40 + 5]:
+        low, high = _bucket_bounds(_bucket_index(value))
+        assert low <= value < high
+
+
+def test_histogram_percentiles():
+    """Percentiles stay within the bucket relative error."""
+    histogram = Histogram()
+    for value in range(1, 10001):
+        histogram.record(value * 1000)
+    
+    p50 = histogram.percentile(50)
+    p99 = histogram.percentile(99)
+    assert p50 == pytest.approx(5_000_000, rel=0.07)
+    assert p99 == pytest.approx(9_900_000, rel=0.07)
+    assert histogram.count == 10000
+
+
+def test_registry_exports():
+    """Registry exports counters and histograms as JSON and Prometheus text."""
+    registry = MetricsRegistry()
+    registry.counter("geocode_cache_total", result="hit").inc()
+    registry.counter("geocode_cache_total", result="hit").inc(2)
+    registry.histogram("geocode_stage_seconds", stage="cache").record(2_000_000)
+    
+    exported = registry.to_dict()
+    assert exported["counters"][0]["value"] == 3
+    histogram = exported["histograms"][0]
+    assert histogram["labels"] == {"stage": "cache"}
+    assert histogram["max"] == pytest.approx(0.002)
+    
+    text = registry.to_prometheus()
+    assert 'geocode_cache_total{result="hit"} 3' in text
+    assert "# TYPE geocode_stage_seconds summary" in text
+    assert 'geocode_stage_seconds_count{stage="cache"} 1' in text
@@ -0,0 +1,41 @@
+"""Tests for incremental name index builds."""
+
+
+def _index_rows(db_store):
+    return db_store.conn.execute("""
+        SELECT layer, canonical_name, alias FROM name_index ORDER BY canonical_name, alias NULLS FIRST
+    """).fetchall()
+
+
+def test_incremental_build_applies_village_changes(populated_db):
+    """Village edits are indexed without rebuilding other layers."""
+    populated_db.search_name_index("Test Village")  # load the in-memory matcher
+    state_ids = populated_db.conn.execute("SELECT id FROM name_index WHERE layer = 'admin1_state'").fetchall()
+    
+    village_id = populated_db.add_village("Malek", 31.0, 5.0)
+    populated_db.add_alternate_name(village_id, "Maleek")
+    populated_db.build_name_index(incremental=True)
+    
+    assert ("villages", "Malek", None) in _index_rows(populated_db)
+    assert ("villages", "Malek", "Maleek") in _index_rows(populated_db)
+    assert populated_db.conn.execute("SELECT id FROM name_index WHERE layer = 'admin1_state'").fetchall() == state_ids
+    assert populated_db.search_name_index("Malek", layer="villages")[0]["feature_id"] == village_id
+    
+    populated_db.delete_village(village_id)
+    populated_db.build_name_index(incremental=True)
+    
+    assert not [row for row in _index_rows(populated_db) if row[1] == "Malek"]
+    assert not populated_db.search_name_index("Malek", layer="villages")
+    assert populated_db.conn.execute("SELECT COUNT(*) FROM name_index_changes").fetchone()[0] == 0
+
+
+def test_incremental_build_matches_full_build(populated_db, sample_admin_data):
+    """Replacing a layer and re-indexing incrementally gives the same rows as a full build."""
+    populated_db.ingest_geojson("admin4_boma", sample_admin_data["boma"].assign(name="Renamed Boma"))
+    populated_db.build_name_index(incremental=True)
+    incremental_rows = _index_rows(populated_db)
+    
+    populated_db.build_name_index()
+    
+    assert ("admin4_boma", "Renamed Boma", None) in incremental_rows
+    assert incremental_rows == _index_rows(populated_db)
@@ -1,6 +1,6 @@
 """Tests for text normalization."""
 import pytest
-from app.core.normalization import normalize_text, generate_ngrams, extract_candidates
+from app.core.normalization import normalize_text, generate_ngrams, extract_candidates, phonetic_key
 
 
 def test_normalize_text():
@@ -38,3 +38,12 @@ def test_extract_candidates():
     assert "of" not in candidates
     assert "juba" in candidates
 
+
+def test_phonetic_key():
+    """Test transliteration variants share a phonetic key."""
+    assert phonetic_key("Abiemnom") == phonetic_key("Abiemnhom")
+    assert phonetic_key("Bentui") == phonetic_key("Bentiu")
+    assert phonetic_key("Kwajok") == phonetic_key("Kuajok")
+    assert phonetic_key("Rumbeck") == phonetic_key("Rumbek")
+    assert phonetic_key("Kuernyang") != phonetic_key("Kuernyak")
+    assert phonetic_key("") == ""
@@ -0,0 +1,143 @@
+"""Tests for the tiled Overpass harvester against a local stub server."""
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core.scrapers.osm_data_extractor import OSMDataExtractor
+from app.core.scrapers.overpass_harvester import OverpassHarvester, OverpassTimeout, iter_elements
+
+
+BBOX = (30.0, 4.0, 32.0, 6.0)
+
+# One hospital per quarter degree
+NODES = [
+    {"type": "node", "id": i * 8 + j + 1, "lon": 30.1 + 0.25 * i, "lat": 4.1 + 0.25 * j,
+     "tags": {"amenity": "hospital", "name": f"Hospital {i}-{j}"}}
+    for i in range(8) for j in range(8)
+]
+
+_BBOX_FILTER = re.compile(r"\(([-\d.]+),([-\d.]+),([-\d.]+),([-\d.]+)\)")
+
+
+class StubOverpass(BaseHTTPRequestHandler):
+    """Answers Overpass queries from NODES; times out on tiles wider than one degree."""
+    
+    def do_POST(self):
+        query = self.rfile.read(int(self.headers["Content-Length"])).decode("utf-8")
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            busy = server.busy_responses > 0
+            server.busy_responses -= busy
+        if busy:
+            self.send_response(429)
+            self.end_headers()
+            return
+        
+        min_lat, min_lon, max_lat, max_lon = map(float, _BBOX_FILTER.search(query).groups())
+        body = {"version": 0.6, "elements": []}
+        if max_lon - min_lon > 1.0:
+            body["remark"] = "runtime error: Query timed out in \"query\" at line 3 after 180 seconds."
+        else:
+            body["elements"] = [
+                node for node in NODES
+                if min_lon <= node["lon"] < max_lon and min_lat <= node["lat"] < max_lat
+            ]
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def overpass_server():
+    """Stub Overpass endpoint on a local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOverpass)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.busy_responses = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _harvester(store, server):
+    return OverpassHarvester(
+        store,
+        overpass_url=f"http://127.0.0.1:{server.server_port}/api/interpreter",
+        min_interval=0.0,
+        backoff_base=0.01
+    )
+
+
+def test_iter_elements_across_chunk_boundaries():
+    """Elements are decoded whole even when chunks split them mid-character."""
+    body = json.dumps({"version": 0.6, "elements": NODES[:3] + [{"type": "node", "id": 99, "tags": {"name": "Wau — Tɔŋ"}}]},
+                      ensure_ascii=False).encode("utf-8")
+    chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+    
+    elements = list(iter_elements(chunks))
+    
+    assert [element["id"] for element in elements] == [1, 2, 3, 99]
+    assert elements[-1]["tags"]["name"] == "Wau — Tɔŋ"
+    
+    timed_out = b'{"elements": [], "remark": "runtime error: Query timed out after 180 seconds."}'
+    with pytest.raises(OverpassTimeout):
+        list(iter_elements([timed_out]))
+
+
+def test_harvest_splits_tiles_and_resumes(temp_db, overpass_server):
+    """Timed-out tiles are split, every tile is stored, and a rerun fetches nothing."""
+    overpass_server.busy_responses = 1
+    extractor = OSMDataExtractor()
+    
+    summary = extractor.harvest_features(
+        temp_db, ["hospital"], bbox=BBOX, include_roads=False,
+        harvester=_harvester(temp_db, overpass_server), tile_size=2.0
+    )
+    
+    assert summary["split"] == 1
+    assert summary["done"] == 4
+    assert summary["elements"] == len(NODES)
+    assert temp_db.conn.execute("SELECT COUNT(*) FROM osm_pois WHERE category = 'hospital'").fetchone()[0] == len(NODES)
+    
+    requests_before = overpass_server.requests
+    summary = extractor.harvest_features(
+        temp_db, ["hospital"], bbox=BBOX, include_roads=False,
+        harvester=_harvester(temp_db, overpass_server), tile_size=2.0
+    )
+    
+    assert overpass_server.requests == requests_before
+    assert summary["skipped"] == 4 and summary["done"] == 0
+
+
+def test_harvest_retries_failed_tiles_on_next_run(temp_db, overpass_server):
+    """A tile that fails is checkpointed as failed and fetched again next time."""
+    calls = []
+    
+    def handle_tile(tile, elements):
+        calls.append(tile.key)
+        if len(calls) == 1:
+            raise RuntimeError("disk full")
+    
+    def build_query(bbox, timeout):
+        min_lon, min_lat, max_lon, max_lat = bbox
+        return f"[out:json][timeout:{timeout}];node({min_lat},{min_lon},{max_lat},{max_lon});out;"
+    
+    harvester = _harvester(temp_db, overpass_server)
+    first = harvester.harvest("test-run", BBOX, build_query, handle_tile, tile_size=1.0)
+    second = harvester.harvest("test-run", BBOX, build_query, handle_tile, tile_size=1.0)
+    
+    assert (first["done"], first["failed"]) == (3, 1)
+    assert (second["done"], second["skipped"]) == (1, 3)
+    assert calls[-1] == calls[0]
@@ -0,0 +1,104 @@
+"""Tests for the q-gram inverted index."""
+import numpy as np
+import pytest
+
+from app.core import duckdb_store, qgram_index
+from app.core.qgram_index import QGramIndex, StringEntries, qgrams
+
+
+def _index(names):
+    postings = sorted({(gram, string_id) for string_id, name in enumerate(names) for gram in qgrams(name)})
+    return QGramIndex(
+        enumerate(names),
+        np.array([gram for gram, _ in postings], dtype=object),
+        np.array([string_id for _, string_id in postings])
+    )
+
+
+def test_shortlist_ranks_by_shared_grams():
+    """Misspellings shortlist the right name first; unrelated names are left out."""
+    index = _index(["abiemnhom", "kuernyang", "malek", "bentiu"])
+    
+    assert index.shortlist("abiemnom")[0] == "abiemnhom"
+    assert index.shortlist("kuernyan") == ["kuernyang"]
+    assert index.shortlist("zzzz") == []
+    
+    index.add([(4, "kuernyak")])
+    assert index.shortlist("kuernyak")[0] == "kuernyak"
+    
+    extended = index.extended([(5, "kuajok")])
+    assert extended.shortlist("kwajok") == ["kuajok"]
+    assert index.shortlist("kwajok") == []
+
+
+def test_shortlist_counts_common_grams_past_the_seed_budget(monkeypatch):
+    """Common grams only confirm candidates from rarer ones, with the same counts."""
+    index = _index(["kuajok", "kuajoc"] + [f"kua{i:03d}" for i in range(50)])
+    exact = index.shortlist("kuajok")
+    
+    monkeypatch.setattr(qgram_index, "QGRAM_SEED_POSTINGS", 4)
+    
+    assert index.shortlist("kuajok") == exact == ["kuajok", "kuajoc"]
+
+
+def test_string_entries_group_entries_by_string_id():
+    """Entries of each shortlisted string come back together, ascending."""
+    index = _index(["kuajok", "malek", "bentiu"])
+    string_entries = StringEntries(index, ["malek", "kuajok", "unindexed", "malek", "kuajok", "malek"])
+    
+    indexes, positions = string_entries.lookup(np.array([1, 2, 0]))
+    
+    assert indexes.tolist() == [0, 3, 5, 1, 4]
+    assert positions.tolist() == [0, 0, 0, 2, 2]
+
+
+@pytest.fixture
+def shortlisted_db(temp_db, monkeypatch):
+    """Store that always goes through the q-gram shortlist."""
+    monkeypatch.setattr(duckdb_store, "QGRAM_SCAN_LIMIT", 0)
+    temp_db.add_village("Kuernyang", 29.5, 9.2, state="Unity")
+    temp_db.add_village("Malek", 31.5, 6.2, state="Jonglei")
+    return temp_db
+
+
+def test_search_villages_uses_persisted_index(shortlisted_db):
+    """Village search finds misspellings and names added after the index was loaded."""
+    assert shortlisted_db.search_villages("Kuernyan")[0]["name"] == "Kuernyang"
+    assert shortlisted_db.conn.execute("SELECT COUNT(*) FROM qgram_strings").fetchone()[0] == 2
+    
+    village_id = shortlisted_db.add_village("Abiemnhom", 29.1, 9.6, state="Unity")
+    shortlisted_db.add_alternate_name(village_id, "Abyemnom")
+    
+    results = shortlisted_db.search_villages("Abyemnom")
+    assert results[0]["village_id"] == village_id
+    assert results[0]["matched_alternate_name"] == "Abyemnom"
+
+
+def test_search_name_index_shortlist_alias_alignment(shortlisted_db):
+    """Alias rows are scored on their alias and report it."""
+    village_id = shortlisted_db.search_villages("Malek")[0]["village_id"]
+    shortlisted_db.add_alternate_name(village_id, "Malakiir")
+    shortlisted_db.build_name_index()
+    
+    results = shortlisted_db.search_name_index("Malakiir", layer="villages")
+    
+    assert results[0]["feature_id"] == village_id
+    assert results[0]["alias"] == "Malakiir"
+    assert results[0]["score"] == 1.0
+
+
+def test_shortlist_filters_shared_names_by_pool(shortlisted_db):
+    """Entries sharing a name are narrowed to the constrained pool before scoring."""
+    for i, state in enumerate(["Warrap", "Lakes", "Unity", "Jonglei"]):
+        village_id = shortlisted_db.add_village("Kuajok", 28.0 + i, 8.0, state=state)
+    shortlisted_db.add_alternate_name(village_id, "Kuajok Town")
+    
+    results = shortlisted_db.search_villages("Kwajok", state_constraint="Jonglei")
+    assert [r["village_id"] for r in results] == [village_id]
+    
+    # Phonetic key probe and fuzzy scoring of the shortlisted names
+    for query in ["Kwajok", "Guajok"]:
+        results = shortlisted_db.search_villages(query, include_alternates=False, limit=10)
+        assert len(results) == 4
+        assert not any("matched_alternate_name" in r for r in results)
+    assert [r["village_id"] for r in shortlisted_db.search_villages("Guajok", state_constraint="Jonglei")] == [village_id]
@@ -0,0 +1,97 @@
+"""Tests for the process-wide store and geocoder shared by Streamlit sessions."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.core import duckdb_store, resources
+
+
+@pytest.fixture
+def shared(populated_db):
+    """Shared resources over the populated test database."""
+    store = resources.get_shared_store(populated_db.db_path)
+    yield store
+    resources.reset_shared_resources()
+
+
+def test_sessions_share_one_preloaded_geocoder(shared):
+    """Concurrent sessions geocode through one geocoder, each thread on its own cursor."""
+    geocoder = resources.get_shared_geocoder()
+    assert resources.get_shared_geocoder() is geocoder
+    assert set(geocoder.admin_layers) >= {"admin1_state", "admin4_boma"}
+    layers = geocoder.admin_layers
+    
+    cursors = {}
+    barrier = threading.Barrier(4)
+    
+    def session(i):
+        barrier.wait()
+        resources.touch_session(f"session-{i}")
+        cursors[i] = shared.conn
+        assert shared.conn is cursors[i]
+        return resources.get_shared_geocoder().geocode("Test Village", use_cache=False)
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(session, range(4)))
+    
+    assert all(result.matched_name == "Test Village" for result in results)
+    assert len({id(cursor) for cursor in cursors.values()}) == 4
+    assert shared.conn is not cursors[0]
+    assert geocoder.admin_layers is layers
+    
+    report = resources.memory_report({"query": "Test Village"})
+    assert report["active_sessions"] == 4
+    assert report["shared_bytes"] > 0
+    if report["rss_bytes"] is not None:
+        assert report["bytes_per_session"] == report["rss_bytes"] // 4
+
+
+def test_sessions_rebuild_stale_indexes_once(shared, monkeypatch):
+    """After a write, concurrent searches rebuild the shared indexes once and all see it."""
+    monkeypatch.setattr(duckdb_store, "QGRAM_SCAN_LIMIT", 0)
+    shared.search_villages("Test Village")
+    
+    calls = {"build_qgram_index": 0, "_load_village_partitions": 0}
+    for name in calls:
+        method = getattr(shared, name)
+        
+        def counted(*args, _name=name, _method=method, **kwargs):
+            calls[_name] += 1
+            time.sleep(0.05)  # widen the race window
+            return _method(*args, **kwargs)
+        monkeypatch.setattr(shared, name, counted)
+    
+    shared.add_village("Kuajok", 31.0, 5.0)
+    barrier = threading.Barrier(8)
+    
+    def session(_):
+        barrier.wait()
+        return shared.search_villages("Kwajok")[0]["name"]
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        names = list(executor.map(session, range(8)))
+    
+    assert names == ["Kuajok"] * 8
+    assert calls == {"build_qgram_index": 1, "_load_village_partitions": 1}
+
+
+def test_sessions_apply_name_index_changes_once(shared):
+    """Concurrent incremental builds after a save index each change exactly once."""
+    shared.build_name_index()
+    village_id = shared.add_village("Malek", 31.0, 5.0)
+    barrier = threading.Barrier(4)
+    
+    def session(_):
+        barrier.wait()
+        shared.build_name_index(incremental=True)
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(session, range(4)))
+    
+    rows = shared.conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT id) FROM name_index WHERE feature_id = ?", [village_id]
+    ).fetchone()
+    assert rows == (1, 1)
+    assert shared.search_name_index("Malek", layer="villages")[0]["feature_id"] == village_id
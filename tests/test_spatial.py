@@ -1,9 +1,11 @@
 """Tests for spatial operations."""
+import math
 import pytest
 from shapely.geometry import Point
 import geopandas as gpd
 from app.core.spatial import spatial_join_point_to_polygons, get_admin_hierarchy
-from app.core.centroids import compute_centroid
+from app.core.centroids import compute_centroid, compute_centroids
+from app.core.config import CENTROID_CRS
 
 
 def test_spatial_join_point_to_polygons(sample_admin_data):
@@ -46,3 +48,17 @@ def test_compute_centroid(sample_admin_data):
     assert 30.0 <= lon <= 32.0
     assert 4.0 <= lat <= 6.0
 
+
+def test_compute_centroids_batch(sample_admin_data):
+    """Batch centroids match a projected GeoSeries centroid; points pass through, missing rows are NaN."""
+    polygon = sample_admin_data["boma"].geometry.iloc[0]
+    lon, lat = compute_centroids([polygon, Point(30.5, 7.25), None])
+    
+    reference = gpd.GeoSeries([polygon], crs="EPSG:4326").to_crs(CENTROID_CRS).centroid.to_crs("EPSG:4326")
+    assert (lon[0], lat[0]) == pytest.approx((reference.x.iloc[0], reference.y.iloc[0]))
+    assert compute_centroid(polygon) == pytest.approx((lon[0], lat[0]))
+    assert (lon[1], lat[1]) == (30.5, 7.25)
+    assert math.isnan(lon[2]) and math.isnan(lat[2])
+    
+    auto_lon, auto_lat = compute_centroids([polygon], target_crs="auto")
+    assert (auto_lon[0], auto_lat[0]) == pytest.approx((lon[0], lat[0]), abs=1e-3)
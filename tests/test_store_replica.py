@@ -0,0 +1,123 @@
+"""Tests for read-only snapshot replicas of the store."""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from app.core import duckdb_store
+from app.core.admin_hierarchy import get_hierarchy
+from app.core.boundary_tiles import get_boundary_geojson
+from app.core.geocoder import Geocoder
+from app.core.store_replica import drain_spool, open_replica, publish_snapshot, replica_paths
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_replica_serves_reads_and_spools_cache_writes(populated_db):
+    """A replica geocodes from the snapshot; its cache writes reach the primary via the spool."""
+    with pytest.raises(FileNotFoundError):
+        open_replica(populated_db.db_path)
+    
+    snapshot = publish_snapshot(populated_db)
+    assert snapshot == replica_paths(populated_db.db_path)[0]
+    assert publish_snapshot(populated_db) is None
+    
+    replica = open_replica(populated_db.db_path)
+    try:
+        assert replica.read_only
+        result = Geocoder(replica).geocode("Test Village", use_cache=False)
+        assert result.village == "Test Village"
+        
+        replica.set_cache({**result.to_dict(), "normalized_text": "spooled village"})
+        assert replica.get_cache("spooled village") is None
+        assert populated_db.get_cache("spooled village") is None
+    finally:
+        replica.close()
+    
+    assert drain_spool(populated_db) == 1
+    assert populated_db.get_cache("spooled village")["village"] == "Test Village"
+    assert drain_spool(populated_db) == 0
+    assert publish_snapshot(populated_db) == snapshot
+
+
+def test_open_store_falls_back_to_snapshot_when_locked(populated_db):
+    """Another process gets the read-only snapshot while this one holds the database."""
+    publish_snapshot(populated_db)
+    script = (
+        "import sys\n"
+        "from app.core.store_replica import open_store\n"
+        "store = open_store(sys.argv[1])\n"
+        "print(store.read_only, store.search_name_index('test village', limit=1)[0]['canonical_name'])\n"
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", script, str(populated_db.db_path)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.split("\n")[-2] == "True Test Village"
+
+
+def test_replica_searches_large_pools_without_writing(populated_db, monkeypatch, tmp_path):
+    """Shortlisted searches, lazy indexes and backfills work on a read-only snapshot."""
+    monkeypatch.setattr(duckdb_store, "QGRAM_SCAN_LIMIT", 10)
+    names = [f"Village {i}" for i in range(50)] + ["Kuajok"]
+    populated_db.bulk_upsert_villages(pd.DataFrame({
+        "name": names, "lon": 31.0, "lat": 5.0, "county": "Test County"
+    }))
+    populated_db.build_name_index(incremental=True)
+    # Not in the q-gram index yet, and missing the codes and keys of an old bulk load
+    populated_db.add_village("Malek", 31.0, 5.0, county="Test County")
+    populated_db.conn.execute("UPDATE villages SET phonetic_key = NULL, county_code = NULL")
+    publish_snapshot(populated_db)
+    
+    replica = open_replica(populated_db.db_path)
+    try:
+        assert replica.search_villages("Kuajok")[0]["name"] == "Kuajok"
+        assert replica.search_villages("Malek", county_constraint="Test County")[0]["name"] == "Malek"
+        assert replica.search_name_index("Test Village")
+        assert Geocoder(replica).geocode("Kuajok", use_cache=False).village == "Kuajok"
+        assert get_hierarchy(replica, tmp_path / "no_dataset.csv")["counties"] == ["Test County"]
+        get_boundary_geojson(replica, "admin2_county", 8)
+    finally:
+        replica.close()
+
+
+def test_drain_spool_recovers_interrupted_and_damaged_files(temp_db):
+    """Leftover claimed files are drained again, and a cut-off line does not lose the rest."""
+    _, spool_dir = replica_paths(temp_db.db_path)
+    spool_dir.mkdir()
+    
+    def cache_line(text):
+        record = {"input_text": text, "normalized_text": text, "village": text.title()}
+        return json.dumps({"table": "geocode_cache", "record": record}) + "\n"
+    
+    (spool_dir / "101.1.draining").write_text(cache_line("left over"), encoding="utf-8")
+    (spool_dir / "102.jsonl").write_text(
+        cache_line("first") + "not json\n" + cache_line("second") + cache_line("cut off")[:20],
+        encoding="utf-8"
+    )
+    
+    assert drain_spool(temp_db) == 3
+    assert list(spool_dir.iterdir()) == []
+    for text in ("left over", "first", "second"):
+        assert temp_db.get_cache(text)["village"] == text.title()
+
+
+def test_publish_snapshot_quotes_paths(tmp_path):
+    """Database paths containing quotes can still be snapshotted."""
+    db_dir = tmp_path / "o'brien"
+    db_dir.mkdir()
+    store = duckdb_store.DuckDBStore(db_dir / "test.duckdb")
+    try:
+        snapshot = publish_snapshot(store)
+    finally:
+        store.close()
+    
+    replica = open_replica(db_dir / "test.duckdb")
+    try:
+        assert replica.read_only and snapshot.exists()
+    finally:
+        replica.close()
@@ -0,0 +1,105 @@
+"""Tests for village search with admin constraints."""
+import pytest
+from app.utils.metrics import get_registry
+
+
+@pytest.fixture
+def village_db(temp_db):
+    """Database with villages in two states."""
+    temp_db.add_village("Kuernyang", 29.5, 9.2, state="Unity State", county="Rubkona", payam="Nhialdiu")
+    temp_db.add_village("Kuernyak", 31.6, 6.8, state="Jonglei", county="Bor South", payam="Makuach")
+    temp_db.add_village("Malek", 31.5, 6.2, state="Jonglei", county="Bor South", payam="Kolnyang")
+    return temp_db
+
+
+def test_search_villages_state_constraint(village_db):
+    """Constraint selects only villages in the matching state."""
+    results = village_db.search_villages("Kuernyan", state_constraint="Jonglei State")
+    
+    assert results
+    assert all(r["state"] == "Jonglei" for r in results)
+
+
+def test_search_villages_partial_county_constraint(village_db):
+    """A constraint without an exact code matches codes that contain it."""
+    results = village_db.search_villages("Malek", county_constraint="Bor")
+    
+    assert len(results) == 1
+    assert results[0]["name"] == "Malek"
+    assert results[0]["score"] == 1.0
+
+
+def test_search_villages_alternate_name_partition(village_db):
+    """Alternate names are searched within the same partitions."""
+    village_id = village_db.search_villages("Malek")[0]["village_id"]
+    village_db.add_alternate_name(village_id, "Malakiir")
+    
+    results = village_db.search_villages("Malakiir", payam_constraint="Kolnyang Payam")
+    
+    assert results[0]["village_id"] == village_id
+    assert results[0]["matched_alternate_name"] == "Malakiir"
+
+
+def test_search_villages_sees_admin_updates(village_db):
+    """Partitions are rebuilt after a village's admin units change."""
+    village_id = village_db.search_villages("Kuernyang", state_constraint="Unity")[0]["village_id"]
+    village_db.update_village_admin_boundaries(village_id, state="Warrap", county="Twic")
+    
+    results = village_db.search_villages("Kuernyang", county_constraint="Twic County")
+    
+    assert results[0]["village_id"] == village_id
+    assert results[0]["state"] == "Warrap"
+
+
+def test_bulk_upsert_villages_matches_add_village(temp_db):
+    """Bulk upsert uses add_village's IDs and updates existing rows."""
+    import pandas as pd
+    
+    village_id = temp_db.add_village("Malek", 31.5, 6.2, state="Jonglei")
+    ids = temp_db.bulk_upsert_villages(pd.DataFrame([
+        {"name": "Malek", "lon": 31.5, "lat": 6.2, "state": "Jonglei State", "properties": {"src": "csv"}},
+        {"name": "Kuernyang", "lon": 29.5, "lat": 9.2, "state": "Unity"},
+    ]))
+    
+    assert ids[0] == village_id
+    assert temp_db.conn.execute("SELECT COUNT(*) FROM villages").fetchone()[0] == 2
+    assert temp_db.get_village(village_id)["state"] == "Jonglei State"
+    assert temp_db.get_village(village_id)["properties"] == {"src": "csv"}
+    
+    alternates = pd.DataFrame({"village_id": ids, "alternate_name": ["Maleek", "Kuernyan"]})
+    assert temp_db.bulk_add_alternate_names(alternates) == 2
+    assert temp_db.bulk_add_alternate_names(alternates) == 0
+    
+    results = temp_db.search_villages("Maleek", state_constraint="Jonglei")
+    assert results[0]["village_id"] == village_id
+
+
+def test_bulk_upsert_villages_parses_verified_text(temp_db):
+    """CSV flags like "False" and "0" are not read as truthy strings."""
+    import pandas as pd
+    
+    flags = ["False", "0", "no", "True", "1", "yes", True, 0.0]
+    ids = temp_db.bulk_upsert_villages(pd.DataFrame({
+        "name": [f"Village {i}" for i in range(len(flags))], "lon": 31.0, "lat": 5.0, "verified": flags
+    }))
+    
+    assert [temp_db.get_village(village_id)["verified"] for village_id in ids] == [
+        False, False, False, True, True, True, True, False
+    ]
+
+
+def test_search_villages_phonetic_key_probe(village_db):
+    """Spelling variants are found through the phonetic key, including old rows without keys."""
+    village_db.add_village("Abiemnhom", 29.1, 9.6, state="Unity")
+    village_db.conn.execute("UPDATE villages SET phonetic_key = NULL")
+    village_db.invalidate_village_partitions()
+    hits = get_registry().counter("village_key_probe_total", result="hit")
+    before = hits.value
+    
+    results = village_db.search_villages("Abyemnom", state_constraint="Unity")
+    
+    assert results[0]["name"] == "Abiemnhom"
+    assert hits.value == before + 1
+    assert village_db.conn.execute(
+        "SELECT phonetic_key FROM villages WHERE name = 'Abiemnhom'"
+    ).fetchone()[0] == "abmnm"